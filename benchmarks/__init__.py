@@ -0,0 +1,10 @@
+# coding: utf-8
+"""
+Benchmarks for SampleDB
+
+Each benchmark module can be run using: python -m benchmarks.<name> [...]
+
+The benchmarks empty the configured database before seeding it, so they must
+only be run against a dedicated database, set explicitly using the
+SAMPLEDB_SQLALCHEMY_DATABASE_URI environment variable.
+"""
@@ -0,0 +1,84 @@
+# coding: utf-8
+"""
+Benchmark for authenticating API requests using an API token, depending on
+the number of API tokens.
+
+Usage: python -m benchmarks.api_tokens [<num_tokens> ...]
+"""
+
+import secrets
+import sys
+
+import bcrypt
+
+from sampledb import db
+from sampledb.logic import users
+from sampledb.logic.authentication import _hash_api_token
+from sampledb.models import APILogEntry, Authentication, AuthenticationType, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+
+def seed(user_id, num_tokens, store_hashes):
+    # all tokens share the part verified using bcrypt, as hashing it for
+    # each token would take too long
+    password = secrets.token_hex(28)
+    bcrypt_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    api_tokens = []
+    for _ in range(num_tokens):
+        api_token = secrets.token_hex(4) + password
+        api_tokens.append(api_token)
+        db.session.add(Authentication(
+            login={
+                'login': api_token[:8],
+                'bcrypt_hash': bcrypt_hash,
+                'description': 'API Token'
+            },
+            authentication_type=AuthenticationType.API_TOKEN,
+            confirmed=True,
+            user_id=user_id,
+            api_token_hash=_hash_api_token(api_token) if store_hashes else None
+        ))
+    db.session.commit()
+    return api_tokens
+
+
+def main(arguments):
+    try:
+        token_counts = [int(argument) for argument in arguments] or [10, 100, 1000]
+    except ValueError:
+        print(__doc__)
+        exit(1)
+    app = create_benchmark_app()
+    client = app.test_client()
+    results = []
+    with app.app_context():
+        user_id = users.create_user('User', 'example@fz-juelich.de', UserType.PERSON).id
+    for num_tokens in token_counts:
+        with app.app_context():
+            APILogEntry.query.delete()
+            Authentication.query.delete()
+            db.session.commit()
+            legacy_api_token = seed(user_id, num_tokens, store_hashes=False)[-1]
+            api_token = seed(user_id, num_tokens, store_hashes=True)[-1]
+
+        def request(api_token):
+            r = client.get('/api/v1/users/me', headers={'Authorization': 'Bearer ' + api_token})
+            assert r.status_code == 200
+
+        # the first request using a legacy token verifies it using bcrypt
+        results.append(('{:>5} tokens, legacy token'.format(num_tokens), measure(
+            lambda: request(legacy_api_token),
+            repetitions=1
+        )))
+        results.append(('{:>5} tokens, legacy token after first use'.format(num_tokens), measure(
+            lambda: request(legacy_api_token)
+        )))
+        results.append(('{:>5} tokens, token with hash'.format(num_tokens), measure(
+            lambda: request(api_token)
+        )))
+    print_results('API token authentication:', results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
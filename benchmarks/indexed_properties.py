@@ -0,0 +1,133 @@
+# coding: utf-8
+"""
+Benchmark for searching and sorting objects by properties with and without
+indexed properties.
+
+Usage: python -m benchmarks.indexed_properties [<num_objects>]
+"""
+
+import sys
+
+from sampledb import db
+from sampledb.logic import actions, effective_object_permissions, indexed_properties, object_search, object_sorting, users
+from sampledb.logic.object_permissions import get_objects_with_permissions
+from sampledb.models import ActionType, Objects, Permissions, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+QUERIES = [
+    ('name == "Sample 1234"', None),
+    ('mass > 999kg', None),
+    ('mass == 500kg', None),
+    ('date == 2020-01-15', None),
+    ('#tag7', None),
+    ('', ('mass', 'quantity')),
+    ('', ('name', 'text'))
+]
+
+
+def seed(num_objects):
+    user_id = users.create_user('User', 'example@fz-juelich.de', UserType.PERSON).id
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'mass': {
+                'title': 'Mass',
+                'type': 'quantity',
+                'units': 'kg'
+            },
+            'date': {
+                'title': 'Date',
+                'type': 'datetime'
+            },
+            'tags': {
+                'title': 'Tags',
+                'type': 'tags'
+            }
+        },
+        'required': ['name']
+    })
+    other_action = actions.create_action(ActionType.SAMPLE_CREATION, 'Other Action', '', action.schema)
+    parameters = {
+        'num_objects': num_objects,
+        'user_id': user_id,
+        'schema_hash': Objects.store_schema(action.schema, connection=db.session.connection())
+    }
+    db.session.execute(db.text("""
+    INSERT INTO objects_current (version_id, action_id, data, schema_hash, user_id, utc_datetime)
+    SELECT 0, actions.id, json_build_object(
+        'name', json_build_object('_type', 'text', 'text', 'Sample ' || i),
+        'mass', json_build_object('_type', 'quantity', 'units', 'kg', 'dimensionality', '[mass]', 'magnitude_in_base_units', (i * 7919) % 1000),
+        'date', json_build_object('_type', 'datetime', 'utc_datetime', to_char(TIMESTAMP '2020-01-01' + (i % 3650) * INTERVAL '1 day', 'YYYY-MM-DD HH24:MI:SS')),
+        'tags', json_build_object('_type', 'tags', 'tags', json_build_array('tag' || (i % 1000)))
+    ), :schema_hash, :user_id, NOW()
+    FROM generate_series(1, :num_objects) AS i
+    JOIN actions ON actions.id = CASE WHEN i % 2 = 0 THEN {} ELSE {} END
+    """.format(action.id, other_action.id)), parameters)
+    db.session.execute(db.text("""
+    INSERT INTO user_object_permissions (object_id, user_id, permissions)
+    SELECT object_id, :user_id, 'GRANT'
+    FROM objects_current
+    """), parameters)
+    db.session.commit()
+    effective_object_permissions.rebuild_effective_permissions()
+    db.session.execute("ANALYZE")
+    db.session.commit()
+    return user_id, action.id
+
+
+def run_queries(user_id, action_id, suffix):
+    results = []
+    for query_string, sorting in QUERIES:
+        filter_func, search_tree, use_advanced_search = object_search.generate_filter_func(query_string, True)
+        filter_func, search_notes = object_search.wrap_filter_func(filter_func)
+        if sorting is None:
+            sorting_func = None
+            limit = None
+            name = query_string
+        else:
+            sorting_func = object_sorting.descending(object_sorting.property_value(*sorting))
+            limit = 50
+            name = 'sort by {} (limit={})'.format(sorting[0], limit)
+
+        def query():
+            return get_objects_with_permissions(
+                user_id=user_id,
+                permissions=Permissions.READ,
+                filter_func=filter_func,
+                sorting_func=sorting_func,
+                action_id=action_id,
+                limit=limit
+            )
+        num_objects = len(query())
+        results.append((
+            '{} ({} objects, {})'.format(name, num_objects, suffix),
+            measure(query)
+        ))
+    return results
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 200000
+    app = create_benchmark_app()
+    with app.app_context():
+        user_id, action_id = seed(num_objects)
+        results = run_queries(user_id, action_id, 'not indexed')
+        for property_name in ['name', 'mass', 'date', 'tags']:
+            indexed_properties.create_indexed_property(action_id, [property_name])
+        db.session.execute("ANALYZE")
+        db.session.commit()
+        results += run_queries(user_id, action_id, 'indexed')
+    print_results('Searching {} objects of two actions:'.format(num_objects), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+# coding: utf-8
+"""
+Benchmark for creating a batch of samples, compared to creating the same
+samples one at a time.
+
+Usage: python -m benchmarks.object_batch [<batch_size> ...]
+"""
+
+import sys
+
+from sampledb.logic import actions, object_permissions, objects, users
+from sampledb.models import ActionType, Permissions, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+
+def seed():
+    user_ids = [
+        users.create_user('User {}'.format(i), 'example@fz-juelich.de', UserType.PERSON).id
+        for i in range(5)
+    ]
+    for user_id in user_ids[1:]:
+        object_permissions.set_default_permissions_for_user(user_ids[0], user_id, Permissions.READ)
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'tags': {
+                'title': 'Tags',
+                'type': 'tags'
+            }
+        },
+        'required': ['name']
+    })
+    return user_ids[0], action.id
+
+
+def get_data_sequence(batch_size):
+    return [
+        {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {}'.format(i)
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': ['batch', 'sample{}'.format(i % 10)]
+            }
+        }
+        for i in range(batch_size)
+    ]
+
+
+def main(arguments):
+    try:
+        batch_sizes = [int(argument) for argument in arguments] or [10, 100, 1000]
+    except ValueError:
+        print(__doc__)
+        exit(1)
+    app = create_benchmark_app()
+    with app.app_context():
+        user_id, action_id = seed()
+        results = []
+        for batch_size in batch_sizes:
+            data_sequence = get_data_sequence(batch_size)
+            results.append(('{:>4} samples, one at a time'.format(batch_size), measure(
+                lambda: [objects.create_object(action_id, data, user_id) for data in data_sequence],
+                repetitions=3
+            )))
+            results.append(('{:>4} samples, as a batch'.format(batch_size), measure(
+                lambda: objects.create_object_batch(action_id, data_sequence, user_id),
+                repetitions=3
+            )))
+    print_results('Batch creation:', results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
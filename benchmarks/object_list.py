@@ -0,0 +1,138 @@
+# coding: utf-8
+"""
+Benchmark for rendering the object list with different page sizes.
+
+Usage: python -m benchmarks.object_list [<num_objects>]
+"""
+
+import sys
+
+import flask_login
+import sqlalchemy
+
+from sampledb import db
+from sampledb.logic import actions, effective_object_permissions, users
+from sampledb.models import ActionType, Objects, User, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+PAGE_SIZES = [10, 100, 1000]
+
+
+def seed(num_objects):
+    user_ids = [
+        users.create_user('User {}'.format(i), 'example@fz-juelich.de', UserType.PERSON).id
+        for i in range(10)
+    ]
+    sample_action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            }
+        },
+        'required': ['name']
+    })
+    measurement_action = actions.create_action(ActionType.MEASUREMENT, 'Measurement Action', '', {
+        'title': 'Measurement',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'sample': {
+                'title': 'Sample',
+                'type': 'sample'
+            }
+        },
+        'required': ['name'],
+        'displayProperties': ['sample']
+    })
+    parameters = {
+        'num_objects': num_objects,
+        'num_users': len(user_ids),
+        'first_user_id': min(user_ids),
+        'sample_action_id': sample_action.id,
+        'measurement_action_id': measurement_action.id,
+        'sample_schema_hash': Objects.store_schema(sample_action.schema, connection=db.session.connection()),
+        'measurement_schema_hash': Objects.store_schema(measurement_action.schema, connection=db.session.connection())
+    }
+    for statement in [
+        """
+        INSERT INTO objects_current (version_id, action_id, data, schema_hash, user_id, utc_datetime)
+        SELECT 0, :sample_action_id, json_build_object('name', json_build_object('_type', 'text', 'text', 'Sample ' || i)), :sample_schema_hash, :first_user_id + i % :num_users, NOW()
+        FROM generate_series(1, :num_objects) AS i
+        """,
+        """
+        INSERT INTO objects_current (version_id, action_id, data, schema_hash, user_id, utc_datetime)
+        SELECT 0, :measurement_action_id, json_build_object('name', json_build_object('_type', 'text', 'text', 'Measurement ' || i), 'sample', json_build_object('_type', 'sample', 'object_id', i)), :measurement_schema_hash, :first_user_id + i % :num_users, NOW()
+        FROM generate_series(1, :num_objects) AS i
+        """,
+        """
+        INSERT INTO objects_previous (object_id, version_id, action_id, data, schema_hash, user_id, utc_datetime)
+        SELECT object_id, 0, action_id, data, schema_hash, user_id, utc_datetime - INTERVAL '1 day'
+        FROM objects_current
+        WHERE object_id % 2 = 0
+        """,
+        """
+        UPDATE objects_current
+        SET version_id = 1, user_id = :first_user_id + (user_id + 1) % :num_users
+        WHERE object_id % 2 = 0
+        """,
+        """
+        INSERT INTO user_object_permissions (object_id, user_id, permissions)
+        SELECT object_id, :first_user_id, 'GRANT'
+        FROM objects_current
+        """
+    ]:
+        db.session.execute(db.text(statement), parameters)
+    db.session.commit()
+    effective_object_permissions.rebuild_effective_permissions()
+    db.session.execute("ANALYZE")
+    db.session.commit()
+    return user_ids[0], measurement_action.id
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 2000
+    app = create_benchmark_app()
+
+    @app.route('/benchmark/users/<int:user_id>/login')
+    def login(user_id):
+        flask_login.login_user(User.query.get(user_id))
+        return ''
+
+    with app.app_context():
+        user_id, action_id = seed(num_objects)
+
+    num_queries = [0]
+
+    def count_query(*args, **kwargs):
+        num_queries[0] += 1
+
+    with app.app_context():
+        sqlalchemy.event.listen(db.engine, 'before_cursor_execute', count_query)
+
+    client = app.test_client()
+    client.get('/benchmark/users/{}/login'.format(user_id))
+    results = []
+    for page_size in PAGE_SIZES:
+        url = '/objects/?action={}&limit={}'.format(action_id, page_size)
+        assert client.get(url).status_code == 200
+        num_queries[0] = 0
+        client.get(url)
+        results.append((
+            'limit={} ({} queries)'.format(page_size, num_queries[0]),
+            measure(lambda: client.get(url))
+        ))
+    print_results('Object list with {} measurements referencing {} samples:'.format(num_objects, num_objects), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
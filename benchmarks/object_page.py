@@ -0,0 +1,132 @@
+# coding: utf-8
+"""
+Benchmark for rendering the page of an object with many references to
+users, samples and locations.
+
+Usage: python -m benchmarks.object_page [<num_references>]
+"""
+
+import sys
+
+import flask_login
+import sqlalchemy
+
+from sampledb import db
+from sampledb.logic import actions, comments, instruments, locations, object_permissions, objects, users
+from sampledb.models import ActionType, Permissions, User, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+
+def seed(num_references):
+    user_ids = [
+        users.create_user('User {}'.format(i), 'example@fz-juelich.de', UserType.PERSON).id
+        for i in range(5)
+    ]
+    instrument = instruments.create_instrument('Instrument', '')
+    instruments.set_instrument_responsible_users(instrument.id, user_ids[:2])
+    sample_action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            }
+        },
+        'required': ['name']
+    }, instrument_id=instrument.id)
+    measurement_action = actions.create_action(ActionType.MEASUREMENT, 'Measurement Action', '', {
+        'title': 'Measurement',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'samples': {
+                'title': 'Samples',
+                'type': 'array',
+                'items': {
+                    'title': 'Sample',
+                    'type': 'sample'
+                }
+            }
+        },
+        'required': ['name']
+    }, instrument_id=instrument.id)
+    sample_ids = [
+        objects.create_object(sample_action.id, {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {}'.format(i)
+            }
+        }, user_ids[i % len(user_ids)]).id
+        for i in range(num_references)
+    ]
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Measurement'
+        },
+        'samples': [
+            {
+                '_type': 'sample',
+                'object_id': sample_id
+            }
+            for sample_id in sample_ids
+        ]
+    }
+    object_id = objects.create_object(measurement_action.id, data, user_ids[0]).id
+    location_ids = []
+    for i in range(num_references):
+        location_ids.append(locations.create_location('Location {}'.format(i), '', location_ids[-1] if location_ids else None, user_ids[0]).id)
+        locations.assign_location_to_object(object_id, location_ids[-1], user_ids[(i + 1) % len(user_ids)], user_ids[i % len(user_ids)], '')
+        comments.create_comment(object_id, user_ids[i % len(user_ids)], 'Comment {}'.format(i))
+    for user_id in user_ids:
+        object_permissions.set_user_object_permissions(object_id, user_id, Permissions.WRITE)
+    return user_ids[0], object_id
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_references = int(arguments[0]) if arguments else 20
+    app = create_benchmark_app()
+
+    @app.route('/benchmark/users/<int:user_id>/login')
+    def login(user_id):
+        flask_login.login_user(User.query.get(user_id))
+        return ''
+
+    with app.test_request_context():
+        # creating notifications requires a request context for URLs
+        user_id, object_id = seed(num_references)
+
+    num_queries = [0]
+
+    def count_query(*args, **kwargs):
+        num_queries[0] += 1
+
+    with app.app_context():
+        sqlalchemy.event.listen(db.engine, 'before_cursor_execute', count_query)
+
+    client = app.test_client()
+    client.get('/benchmark/users/{}/login'.format(user_id))
+    url = '/objects/{}'.format(object_id)
+    results = []
+    for process_cache_timeout in [0, 60]:
+        app.config['PROCESS_CACHE_TIMEOUT'] = process_cache_timeout
+        assert client.get(url).status_code == 200
+        num_queries[0] = 0
+        client.get(url)
+        results.append((
+            'process cache timeout={} ({} queries)'.format(process_cache_timeout, num_queries[0]),
+            measure(lambda: client.get(url), repetitions=10)
+        ))
+    print_results('Object page with {} samples, locations and comments:'.format(num_references), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
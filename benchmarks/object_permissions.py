@@ -0,0 +1,182 @@
+# coding: utf-8
+"""
+Benchmark comparing the user_object_permissions_by_all view with the
+materialized effective_user_object_permissions table.
+
+Usage: python -m benchmarks.object_permissions [<num_objects>]
+"""
+
+import sys
+
+from sampledb import db
+from sampledb.logic import actions, effective_object_permissions, instruments, users
+from sampledb.models import ActionType, Objects, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+NUM_USERS = 50
+NUM_GROUPS = 10
+NUM_PROJECTS = 10
+
+VIEW_OBJECT_IDS_QUERY = db.text("""
+SELECT object_id
+FROM user_object_permissions_by_all
+WHERE user_id = :user_id OR user_id IS NULL
+GROUP BY (object_id)
+HAVING MAX(permissions_int) >= :min_permissions_int
+""")
+
+TABLE_OBJECT_IDS_QUERY = db.text("""
+SELECT object_id
+FROM effective_user_object_permissions
+WHERE user_id = :user_id AND permissions_int >= :min_permissions_int
+UNION
+SELECT object_id
+FROM public_objects
+WHERE :min_permissions_int <= 1
+""")
+
+VIEW_SINGLE_OBJECT_QUERY = db.text("""
+SELECT MAX(permissions_int)
+FROM user_object_permissions_by_all
+WHERE (user_id = :user_id OR user_id IS NULL) AND object_id = :object_id
+""")
+
+TABLE_SINGLE_OBJECT_QUERY = db.text("""
+SELECT GREATEST(
+    (
+        SELECT permissions_int
+        FROM effective_user_object_permissions
+        WHERE user_id = :user_id AND object_id = :object_id
+    ),
+    (
+        SELECT 1
+        FROM public_objects
+        WHERE object_id = :object_id
+    )
+)
+""")
+
+
+def seed(num_objects):
+    user_ids = [
+        users.create_user('User {}'.format(i), 'example@fz-juelich.de', UserType.PERSON).id
+        for i in range(NUM_USERS)
+    ]
+    instrument = instruments.create_instrument('Example Instrument', '')
+    instruments.set_instrument_responsible_users(instrument.id, user_ids[:2])
+    schema = {
+        'title': 'Example Object',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            }
+        },
+        'required': ['name']
+    }
+    action_ids = [
+        actions.create_action(ActionType.SAMPLE_CREATION, 'Independent Action', '', schema).id,
+        actions.create_action(ActionType.MEASUREMENT, 'Instrument Action', '', schema, instrument_id=instrument.id).id
+    ]
+    parameters = {
+        'num_objects': num_objects,
+        'num_users': NUM_USERS,
+        'num_groups': NUM_GROUPS,
+        'num_projects': NUM_PROJECTS,
+        'first_user_id': min(user_ids),
+        'first_action_id': min(action_ids),
+        'schema_hash': Objects.store_schema(schema, connection=db.session.connection())
+    }
+    for statement in [
+        """
+        INSERT INTO objects_current (version_id, action_id, data, schema_hash, user_id, utc_datetime)
+        SELECT 0, :first_action_id + i % 2, json_build_object('name', json_build_object('_type', 'text', 'text', 'Object ' || i)), :schema_hash, :first_user_id + i % :num_users, NOW()
+        FROM generate_series(1, :num_objects) AS i
+        """,
+        """
+        INSERT INTO groups (name, description)
+        SELECT 'Group ' || i, ''
+        FROM generate_series(1, :num_groups) AS i
+        """,
+        """
+        INSERT INTO user_group_memberships (user_id, group_id)
+        SELECT users.id, groups.id
+        FROM users JOIN groups ON users.id % :num_groups = groups.id % :num_groups
+        """,
+        """
+        INSERT INTO projects (name, description)
+        SELECT 'Project ' || i, ''
+        FROM generate_series(1, :num_projects) AS i
+        """,
+        """
+        INSERT INTO user_project_permissions (project_id, user_id, permissions)
+        SELECT projects.id, users.id, 'WRITE'
+        FROM users JOIN projects ON users.id % :num_projects = projects.id % :num_projects
+        """,
+        """
+        INSERT INTO group_project_permissions (project_id, group_id, permissions)
+        SELECT projects.id, groups.id, 'READ'
+        FROM groups JOIN projects ON groups.id % :num_projects = (projects.id + 1) % :num_projects
+        """,
+        """
+        INSERT INTO user_object_permissions (object_id, user_id, permissions)
+        SELECT object_id, user_id, 'GRANT'
+        FROM objects_current
+        """,
+        """
+        INSERT INTO group_object_permissions (object_id, group_id, permissions)
+        SELECT object_id, (SELECT MIN(id) FROM groups) + object_id % :num_groups, 'READ'
+        FROM objects_current
+        WHERE object_id % 10 = 0
+        """,
+        """
+        INSERT INTO project_object_permissions (object_id, project_id, permissions)
+        SELECT object_id, (SELECT MIN(id) FROM projects) + object_id % :num_projects, 'WRITE'
+        FROM objects_current
+        WHERE object_id % 10 = 5
+        """,
+        """
+        INSERT INTO public_objects (object_id)
+        SELECT object_id
+        FROM objects_current
+        WHERE object_id % 20 = 3
+        """
+    ]:
+        db.session.execute(db.text(statement), parameters)
+    db.session.commit()
+    effective_object_permissions.rebuild_effective_permissions()
+    db.session.execute("ANALYZE")
+    db.session.commit()
+    return user_ids
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 10000
+    app = create_benchmark_app()
+    with app.app_context():
+        user_ids = seed(num_objects)
+        user_id = user_ids[len(user_ids) // 2]
+        object_id = num_objects // 2
+        connection = db.engine.connect()
+        assert sorted(connection.execute(VIEW_OBJECT_IDS_QUERY, user_id=user_id, min_permissions_int=1).fetchall()) == sorted(connection.execute(TABLE_OBJECT_IDS_QUERY, user_id=user_id, min_permissions_int=1).fetchall())
+        results = []
+        for name, query, parameters in [
+            ('view: readable object IDs', VIEW_OBJECT_IDS_QUERY, {'user_id': user_id, 'min_permissions_int': 1}),
+            ('table: readable object IDs', TABLE_OBJECT_IDS_QUERY, {'user_id': user_id, 'min_permissions_int': 1}),
+            ('view: writable object IDs', VIEW_OBJECT_IDS_QUERY, {'user_id': user_id, 'min_permissions_int': 2}),
+            ('table: writable object IDs', TABLE_OBJECT_IDS_QUERY, {'user_id': user_id, 'min_permissions_int': 2}),
+            ('view: single object', VIEW_SINGLE_OBJECT_QUERY, {'user_id': user_id, 'object_id': object_id}),
+            ('table: single object', TABLE_SINGLE_OBJECT_QUERY, {'user_id': user_id, 'object_id': object_id}),
+        ]:
+            results.append((name, measure(lambda: connection.execute(query, **parameters).fetchall())))
+        results.append(('rebuild table', measure(effective_object_permissions.rebuild_effective_permissions, repetitions=1)))
+        print_results('Object permissions with {} objects and {} users:'.format(num_objects, len(user_ids)), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
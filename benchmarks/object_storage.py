@@ -0,0 +1,116 @@
+# coding: utf-8
+"""
+Benchmark for the storage size of objects and the time for listing them,
+with schemas stored once in the objects_schemas table.
+
+For comparison, the size of the schemas if they were stored in every row and
+the time for listing the objects with their schemas included in every row
+are reported as well.
+
+Usage: python -m benchmarks.object_storage [<num_objects>]
+"""
+
+import sys
+
+from sampledb import db
+from sampledb.logic import actions, objects, users
+from sampledb.models import ActionType, Object, Objects, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+NUM_PROPERTIES = 50
+NUM_VERSIONS = 3
+
+
+def seed(num_objects):
+    user_id = users.create_user('User', 'example@fz-juelich.de', UserType.PERSON).id
+    properties = {
+        'name': {
+            'title': 'Name',
+            'type': 'text'
+        }
+    }
+    for i in range(NUM_PROPERTIES):
+        properties['property{}'.format(i)] = {
+            'title': 'Property {}'.format(i),
+            'note': 'A description of property {} as it might be shown in a form.'.format(i),
+            'type': 'quantity',
+            'units': 'mg'
+        }
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': properties,
+        'required': ['name']
+    })
+    created_objects = objects.create_object_batch(action.id, [
+        {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {}'.format(i)
+            }
+        }
+        for i in range(num_objects)
+    ], user_id)
+    for version_id in range(1, NUM_VERSIONS):
+        objects.create_and_update_objects([], [
+            (object.object_id, {'name': {'_type': 'text', 'text': 'Sample {} v{}'.format(i, version_id)}}, None)
+            for i, object in enumerate(created_objects)
+        ], user_id)
+    db.session.execute("ANALYZE")
+    db.session.commit()
+
+
+def get_table_size(table_name):
+    return db.session.execute(
+        "SELECT pg_total_relation_size(:table_name)",
+        {'table_name': table_name}
+    ).scalar()
+
+
+def get_inlined_schema_size(table_name):
+    return db.session.execute("""
+        SELECT COALESCE(SUM(pg_column_size(s.schema)), 0)
+        FROM {table_name} AS o
+        JOIN objects_schemas AS s ON s.hash = o.schema_hash
+    """.format(table_name=table_name)).scalar()
+
+
+def list_objects_with_inlined_schemas():
+    return [Object(*row) for row in db.session.execute("""
+        SELECT o.object_id, o.version_id, o.action_id, o.data, s.schema, o.user_id, o.utc_datetime
+        FROM objects_current AS o
+        JOIN objects_schemas AS s ON s.hash = o.schema_hash
+        ORDER BY o.object_id DESC
+    """).fetchall()]
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 2000
+    app = create_benchmark_app()
+    with app.app_context():
+        seed(num_objects)
+        print('Storage for {} objects with {} versions each:'.format(num_objects, NUM_VERSIONS))
+        for table_name in ('objects_current', 'objects_previous', 'objects_schemas'):
+            print(' - {:<17} {:10.1f} kB'.format(table_name, get_table_size(table_name) / 1024))
+        for table_name in ('objects_current', 'objects_previous'):
+            print(' - schemas inlined in {:<17} {:10.1f} kB'.format(table_name, get_inlined_schema_size(table_name) / 1024))
+        db.session.commit()
+
+        def list_objects_with_cold_cache():
+            Objects._schemas_by_hash.clear()
+            objects.get_objects()
+
+        results = [
+            ('schemas inlined in every row', measure(list_objects_with_inlined_schemas)),
+            ('schema hashes, cold schema cache', measure(list_objects_with_cold_cache)),
+            ('schema hashes, warm schema cache', measure(objects.get_objects))
+        ]
+    print_results('Listing {} objects:'.format(num_objects), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
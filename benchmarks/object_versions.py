@@ -0,0 +1,138 @@
+# coding: utf-8
+"""
+Benchmark for the storage size of previous object versions and the time for
+reading them, with all previous versions stored as full snapshots and with
+previous versions stored as patches between periodic snapshots.
+
+Usage: python -m benchmarks.object_versions [<num_objects> [<snapshot_interval>]]
+"""
+
+import sys
+
+from sampledb import db
+from sampledb.logic import actions, objects, users
+from sampledb.models import ActionType, Objects, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+NUM_ROWS = 200
+NUM_VERSIONS = 20
+
+
+def seed(num_objects):
+    user_id = users.create_user('User', 'example@fz-juelich.de', UserType.PERSON).id
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'measurements': {
+                'title': 'Measurements',
+                'type': 'array',
+                'style': 'table',
+                'items': {
+                    'title': 'Measurement',
+                    'type': 'array',
+                    'items': {
+                        'title': 'Value',
+                        'type': 'quantity',
+                        'units': 'mg'
+                    }
+                }
+            }
+        },
+        'required': ['name']
+    })
+
+    def get_data(i, version_id):
+        # each version changes the name and a single table cell
+        return {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {} v{}'.format(i, version_id)
+            },
+            'measurements': [
+                [
+                    {
+                        '_type': 'quantity',
+                        'dimensionality': '[mass]',
+                        'units': 'mg',
+                        'magnitude_in_base_units': (row * 3 + column + (version_id if row == version_id else 0)) * 1e-6
+                    }
+                    for column in range(3)
+                ]
+                for row in range(NUM_ROWS)
+            ]
+        }
+
+    created_objects = objects.create_object_batch(action.id, [get_data(i, 0) for i in range(num_objects)], user_id)
+    for version_id in range(1, NUM_VERSIONS):
+        objects.create_and_update_objects([], [
+            (object.object_id, get_data(i, version_id), None)
+            for i, object in enumerate(created_objects)
+        ], user_id)
+    db.session.execute("ANALYZE")
+    db.session.commit()
+    return [object.object_id for object in created_objects]
+
+
+def get_table_size(table_name):
+    db.session.commit()
+    # the size is only accurate after the replaced rows have been removed
+    connection = db.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+    try:
+        connection.execute("VACUUM FULL {}".format(table_name))
+        return connection.execute(
+            db.text("SELECT pg_total_relation_size(:table_name)"),
+            {'table_name': table_name}
+        ).scalar()
+    finally:
+        connection.close()
+
+
+def measure_reads(object_ids, name):
+    object_id = object_ids[len(object_ids) // 2]
+
+    def get_object_version_with_cold_cache():
+        Objects.clear_version_cache()
+        objects.get_object(object_id, 1)
+
+    def get_object_versions_with_cold_cache():
+        Objects.clear_version_cache()
+        objects.get_object_versions(object_id)
+
+    return [
+        ('{}, single version, cold cache'.format(name), measure(get_object_version_with_cold_cache)),
+        ('{}, single version, warm cache'.format(name), measure(lambda: objects.get_object(object_id, 1))),
+        ('{}, all versions, cold cache'.format(name), measure(get_object_versions_with_cold_cache)),
+        ('{}, all versions, warm cache'.format(name), measure(lambda: objects.get_object_versions(object_id))),
+        ('{}, metadata of all versions'.format(name), measure(lambda: objects.get_object_versions_metadata(object_id)))
+    ]
+
+
+def main(arguments):
+    if len(arguments) > 2:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 100
+    snapshot_interval = int(arguments[1]) if len(arguments) > 1 else 10
+    app = create_benchmark_app()
+    with app.app_context():
+        object_ids = seed(num_objects)
+        print('Storage for {} objects with {} versions each:'.format(num_objects, NUM_VERSIONS))
+        print(' - {:<40} {:10.1f} kB'.format('full snapshots', get_table_size('objects_previous') / 1024))
+        results = measure_reads(object_ids, 'full snapshots')
+
+        Objects.convert_previous_versions(snapshot_interval)
+        name = 'patches, snapshot interval {}'.format(snapshot_interval)
+        print(' - {:<40} {:10.1f} kB'.format(name, get_table_size('objects_previous') / 1024))
+        results.extend(measure_reads(object_ids, name))
+        db.session.commit()
+    print_results('Reading previous versions of an object:', results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
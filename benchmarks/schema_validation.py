@@ -0,0 +1,53 @@
+# coding: utf-8
+"""
+Benchmark for validating object data by interpreting the schema and by using
+compiled validators.
+
+This benchmark does not require a database.
+
+Usage: python -m benchmarks.schema_validation [<num_repetitions>]
+"""
+
+import glob
+import json
+import os
+import sys
+
+from sampledb.logic import schemas
+from sampledb.logic.errors import ValidationError
+
+from .utils import measure, print_results
+
+SCHEMA_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'sampledb', 'schemas')
+
+
+def load_examples():
+    examples = []
+    for schema_file_name in sorted(glob.glob(os.path.join(SCHEMA_DIRECTORY, '*.json'))):
+        with open(schema_file_name, encoding='utf-8') as schema_file:
+            schema = json.load(schema_file)
+        try:
+            schemas.validate_schema(schema)
+            data = schemas.generate_placeholder(schema)
+            schemas.validate(data, schema)
+        except ValidationError:
+            continue
+        examples.append((os.path.basename(schema_file_name), schema, data))
+    return examples
+
+
+def main(num_repetitions):
+    for name, schema, data in load_examples():
+        schemas.clear_validator_cache()
+        results = [
+            ('validate', measure(lambda: schemas.validate(data, schema), num_repetitions)),
+            ('compile_validator', measure(lambda: schemas.compile_validator(schema), num_repetitions)),
+            ('validate_with_compiled_validator', measure(lambda: schemas.validate_with_compiled_validator(data, schema), num_repetitions)),
+            ('validate_schema', measure(lambda: schemas.validate_schema(schema), num_repetitions)),
+            ('validate_schema_once', measure(lambda: schemas.validate_schema_once(schema), num_repetitions))
+        ]
+        print_results(name, results)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,143 @@
+# coding: utf-8
+"""
+Load test for the server throughput using different numbers of worker
+processes and threads.
+
+Concurrent clients repeatedly request object pages, with every tenth request
+being a slow PDF export of several objects.
+
+Usage: python -m benchmarks.server_throughput [<num_clients> [<duration>]]
+"""
+
+import multiprocessing
+import random
+import statistics
+import sys
+import threading
+import time
+
+import flask_login
+import requests
+
+from sampledb import db
+from sampledb.logic import actions, object_permissions, objects, users
+from sampledb.models import ActionType, User, UserType
+from sampledb.scripts import run
+
+from .utils import create_benchmark_app
+
+PORT = 8945
+
+# (worker processes, worker threads)
+SETTINGS = [(1, 4), (1, 16), (4, 4), (4, 8)]
+
+
+def seed(num_users, num_objects):
+    user_ids = [
+        users.create_user('User {}'.format(i), 'example@fz-juelich.de', UserType.PERSON).id
+        for i in range(num_users)
+    ]
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'mass': {
+                'title': 'Mass',
+                'type': 'quantity',
+                'units': 'g'
+            }
+        },
+        'required': ['name']
+    })
+    object_ids = []
+    for i in range(num_objects):
+        object_id = objects.create_object(action.id, {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {}'.format(i)
+            },
+            'mass': {
+                '_type': 'quantity',
+                'dimensionality': '[mass]',
+                'units': 'g',
+                'magnitude_in_base_units': i / 1000
+            }
+        }, user_ids[i % num_users]).id
+        object_permissions.set_object_public(object_id)
+        object_ids.append(object_id)
+    return user_ids, object_ids
+
+
+def run_client(user_id, object_ids, end_time, durations):
+    session = requests.Session()
+    session.get('http://localhost:{}/benchmark/users/{}/login'.format(PORT, user_id))
+    for i in range(sys.maxsize):
+        object_id = random.choice(object_ids)
+        if i % 10 == 0:
+            url = 'http://localhost:{}/objects/{}/pdf?object_ids=[{}]'.format(PORT, object_id, ','.join(map(str, object_ids[:5])))
+        else:
+            url = 'http://localhost:{}/objects/{}'.format(PORT, object_id)
+        start_time = time.perf_counter()
+        assert session.get(url).status_code == 200
+        if time.perf_counter() > end_time:
+            break
+        durations.append((i % 10 == 0, time.perf_counter() - start_time))
+
+
+def main(arguments):
+    if len(arguments) > 2:
+        print(__doc__)
+        exit(1)
+    num_clients = int(arguments[0]) if arguments else 16
+    duration = float(arguments[1]) if len(arguments) > 1 else 20
+    app = create_benchmark_app()
+
+    @app.route('/benchmark/users/<int:user_id>/login')
+    def login(user_id):
+        flask_login.login_user(User.query.get(user_id))
+        return ''
+
+    with app.app_context():
+        user_ids, object_ids = seed(num_clients, 100)
+        db.engine.dispose()
+
+    print('Server throughput with {} clients:'.format(num_clients))
+    for num_processes, num_threads in SETTINGS:
+        app.config['WORKER_PROCESSES'] = num_processes
+        app.config['WORKER_THREADS'] = num_threads
+        server_process = multiprocessing.Process(target=run.serve, args=(app, PORT))
+        server_process.start()
+        for _ in range(100):
+            try:
+                requests.get('http://localhost:{}/'.format(PORT))
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+        durations = []
+        end_time = time.perf_counter() + duration
+        clients = [
+            threading.Thread(target=run_client, args=(user_id, object_ids, end_time, durations))
+            for user_id in user_ids
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        server_process.terminate()
+        server_process.join()
+        object_page_durations = [d for is_export, d in durations if not is_export]
+        print(" - {} processes, {:>2} threads: {:6.1f} requests/s, object page median {:7.1f} ms, 95th percentile {:7.1f} ms".format(
+            num_processes,
+            num_threads,
+            len(durations) / duration,
+            statistics.median(object_page_durations) * 1000,
+            sorted(object_page_durations)[int(len(object_page_durations) * 0.95)] * 1000
+        ))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
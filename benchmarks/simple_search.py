@@ -0,0 +1,117 @@
+# coding: utf-8
+"""
+Benchmark for the simple search, comparing a substring search in the
+serialized object data with the full text search using the search vectors.
+
+Usage: python -m benchmarks.simple_search [<num_objects>]
+"""
+
+import json
+import sys
+
+import sqlalchemy
+
+from sampledb import db
+from sampledb.logic import actions, effective_object_permissions, object_search, object_sorting, objects, users
+from sampledb.logic.object_permissions import get_objects_with_permissions
+from sampledb.models import ActionType, Objects, Permissions, UserType
+
+from .utils import create_benchmark_app, measure, print_results
+
+QUERY_STRINGS = ['Sample 1234', 'tag7', 'description', 'unknown']
+
+
+def seed(num_objects):
+    user_id = users.create_user('User', 'example@fz-juelich.de', UserType.PERSON).id
+    action = actions.create_action(ActionType.SAMPLE_CREATION, 'Sample Action', '', {
+        'title': 'Sample',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            },
+            'description': {
+                'title': 'Description',
+                'type': 'text',
+                'multiline': True
+            },
+            'tags': {
+                'title': 'Tags',
+                'type': 'tags'
+            }
+        },
+        'required': ['name']
+    })
+    parameters = {
+        'num_objects': num_objects,
+        'user_id': user_id,
+        'action_id': action.id,
+        'schema_hash': Objects.store_schema(action.schema, connection=db.session.connection())
+    }
+    db.session.execute(db.text("""
+    INSERT INTO objects_current (version_id, action_id, data, schema_hash, user_id, utc_datetime)
+    SELECT 0, :action_id, json_build_object(
+        'name', json_build_object('_type', 'text', 'text', 'Sample ' || i),
+        'description', json_build_object('_type', 'text', 'text', CASE WHEN i % 100 = 0 THEN 'A longer description of sample ' || i ELSE '' END),
+        'tags', json_build_object('_type', 'tags', 'tags', json_build_array('tag' || (i % 1000)))
+    ), :schema_hash, :user_id, NOW()
+    FROM generate_series(1, :num_objects) AS i
+    """), parameters)
+    db.session.execute(db.text("""
+    INSERT INTO user_object_permissions (object_id, user_id, permissions)
+    SELECT object_id, :user_id, 'GRANT'
+    FROM objects_current
+    """), parameters)
+    db.session.commit()
+    effective_object_permissions.rebuild_effective_permissions()
+    return user_id
+
+
+def substring_filter_func(query_string):
+    def filter_func(data, search_notes):
+        return data.cast(sqlalchemy.String).ilike('%: "%' + json.dumps(query_string)[1:-1] + '%"%')
+    return filter_func
+
+
+def run_queries(user_id, limit):
+    results = []
+    for query_string in QUERY_STRINGS:
+        for name, filter_func, sorting_func in [
+            ('substring', substring_filter_func(query_string), None),
+            ('full text', object_search.generate_filter_func(query_string, False)[0], object_sorting.descending(object_sorting.relevance(query_string)))
+        ]:
+            filter_func, search_notes = object_search.wrap_filter_func(filter_func)
+
+            def query():
+                return get_objects_with_permissions(
+                    user_id=user_id,
+                    permissions=Permissions.READ,
+                    filter_func=filter_func,
+                    sorting_func=sorting_func,
+                    limit=limit
+                )
+            results.append((
+                '"{}" ({}, {} objects)'.format(query_string, name, len(query())),
+                measure(query)
+            ))
+    return results
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    num_objects = int(arguments[0]) if arguments else 100000
+    app = create_benchmark_app()
+    with app.app_context():
+        user_id = seed(num_objects)
+        results = [('update search vectors', measure(objects.update_search_vectors, repetitions=1))]
+        db.session.execute("ANALYZE")
+        db.session.commit()
+        results += run_queries(user_id, limit=50)
+    print_results('Simple search in {} objects (limit=50):'.format(num_objects), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
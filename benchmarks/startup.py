@@ -0,0 +1,41 @@
+# coding: utf-8
+"""
+Benchmark for the time needed for starting a SampleDB process.
+
+Usage: python -m benchmarks.startup
+"""
+
+import os
+import subprocess
+import sys
+
+import sampledb.config
+
+from .utils import create_benchmark_app, measure, print_results
+
+
+def main(arguments):
+    if arguments:
+        print(__doc__)
+        exit(1)
+    # create the tables and run the migrations once, like the migrate script
+    create_benchmark_app()
+
+    env = dict(os.environ)
+    for key in ('MAIL_SERVER', 'MAIL_SENDER', 'CONTACT_EMAIL'):
+        env['SAMPLEDB_' + key] = getattr(sampledb.config, key)
+
+    def run_python(code, **additional_env):
+        subprocess.run([sys.executable, '-c', code], env=dict(env, **additional_env), check=True, stderr=subprocess.DEVNULL)
+
+    results = [
+        ('python', measure(lambda: run_python('pass'))),
+        ('import sampledb', measure(lambda: run_python('import sampledb'))),
+        ('create_app()', measure(lambda: run_python('import sampledb; sampledb.create_app()'))),
+        ('create_app() skipping migrations', measure(lambda: run_python('import sampledb; sampledb.create_app()', SAMPLEDB_SKIP_DATABASE_MIGRATIONS='true'))),
+    ]
+    print_results('Startup time:', results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,62 @@
+# coding: utf-8
+"""
+
+"""
+
+import os
+import statistics
+import sys
+import time
+import typing
+
+import sqlalchemy
+
+import sampledb
+import sampledb.config
+import sampledb.utils
+
+
+def create_benchmark_app():
+    """
+    Empty the benchmark database and create a SampleDB app using it.
+
+    :return: the app
+    """
+    if not os.environ.get('SAMPLEDB_SQLALCHEMY_DATABASE_URI'):
+        print("Error: SAMPLEDB_SQLALCHEMY_DATABASE_URI must be set to a dedicated benchmark database, as its contents will be deleted", file=sys.stderr)
+        exit(1)
+    sampledb.config.MAIL_SUPPRESS_SEND = True
+    for key in ('MAIL_SERVER', 'MAIL_SENDER', 'CONTACT_EMAIL'):
+        if getattr(sampledb.config, key) is None:
+            setattr(sampledb.config, key, 'sampledb@example.com')
+    sampledb.utils.empty_database(sqlalchemy.create_engine(sampledb.config.SQLALCHEMY_DATABASE_URI))
+    return sampledb.create_app()
+
+
+def measure(function: typing.Callable[[], typing.Any], repetitions: int = 5) -> float:
+    """
+    Call a function repeatedly and return the median duration of a call.
+
+    :param function: the function to measure
+    :param repetitions: the number of calls
+    :return: the median duration in seconds
+    """
+    durations = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return statistics.median(durations)
+
+
+def print_results(title: str, results: typing.Sequence[typing.Tuple[str, float]]) -> None:
+    """
+    Print the results of a benchmark as a table.
+
+    :param title: the benchmark title
+    :param results: a list of (name, duration in seconds) tuples
+    """
+    print(title)
+    name_width = max(len(name) for name, _ in results)
+    for name, duration in results:
+        print(" - {name:<{width}}  {duration:10.3f} ms".format(name=name, width=name_width, duration=duration * 1000))
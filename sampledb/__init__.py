@@ -26,6 +26,7 @@ def create_app():
     app.config.from_object(sampledb.config)
 
     sampledb.config.check_config(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sampledb.config.get_sqlalchemy_engine_options(app.config)
 
     login_manager.init_app(app)
     mail.init_app(app)
@@ -33,6 +34,7 @@ def create_app():
     sampledb.api.server.api.init_app(app)
 
     app.register_blueprint(sampledb.frontend.frontend)
+    app.teardown_request(sampledb.logic.caching.clear_request_caches)
 
     login_manager.login_view = 'frontend.sign_in'
     app.jinja_env.globals.update(
@@ -50,8 +52,20 @@ def create_app():
     sampledb.logic.files.FILE_STORAGE_PATH = app.config['FILE_STORAGE_PATH']
 
     with app.app_context():
-        db.metadata.create_all(bind=db.engine)
         sampledb.models.Objects.bind = db.engine
-        sampledb.models.migrations.run(db)
+        sampledb.models.Objects.snapshot_interval = int(app.config['OBJECT_VERSION_SNAPSHOT_INTERVAL'])
+        if not sampledb.config.is_enabled(app.config['SKIP_DATABASE_MIGRATIONS']):
+            migrate_database()
 
     return app
+
+
+def migrate_database():
+    """
+    Create all missing tables and run all migrations that have not been run
+    before.
+
+    This requires an app context.
+    """
+    db.metadata.create_all(bind=db.engine)
+    sampledb.models.migrations.run(db)
@@ -4,7 +4,7 @@ RESTful API for iffSamples
 """
 
 from flask_restful import Api
-from .objects import Object, Objects, ObjectVersion, ObjectVersions
+from .objects import Object, Objects, ObjectsBulk, ObjectVersion, ObjectVersionDiff, ObjectVersions
 from .actions import Action, Actions
 from .files import ObjectFile, ObjectFiles
 from .instruments import Instrument, Instruments
@@ -14,9 +14,11 @@ from .users import CurrentUser, User, Users
 
 api = Api()
 api.add_resource(Objects, '/api/v1/objects/', endpoint='api.objects')
+api.add_resource(ObjectsBulk, '/api/v1/objects/bulk', endpoint='api.objects_bulk')
 api.add_resource(Object, '/api/v1/objects/<int:object_id>', endpoint='api.object')
 api.add_resource(ObjectVersions, '/api/v1/objects/<int:object_id>/versions/', endpoint='api.object_versions')
 api.add_resource(ObjectVersion, '/api/v1/objects/<int:object_id>/versions/<int:version_id>', endpoint='api.object_version')
+api.add_resource(ObjectVersionDiff, '/api/v1/objects/<int:object_id>/versions/<int:version_id>/diff', endpoint='api.object_version_diff')
 api.add_resource(Actions, '/api/v1/actions/', endpoint='api.actions')
 api.add_resource(Action, '/api/v1/actions/<int:action_id>', endpoint='api.action')
 api.add_resource(Instruments, '/api/v1/instruments/', endpoint='api.instruments')
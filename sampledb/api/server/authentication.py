@@ -30,7 +30,7 @@ def verify_token(api_token):
 def verify_password(username, password):
     if not username:
         return None
-    flask.g.user = login(username, password)
+    flask.g.user = login(username, password, use_cache=True)
     return flask.g.user
 
 
@@ -3,20 +3,99 @@
 RESTful API for iffSamples
 """
 
+import itertools
 import json
+import typing
+
 import flask
 
 from flask_restful import Resource
 
 from sampledb.api.server.authentication import multi_auth, object_permissions_required, Permissions
 from sampledb.logic.actions import get_action
-from sampledb.logic.objects import get_object, update_object, create_object
-from sampledb.logic.object_permissions import get_objects_with_permissions
+from sampledb.logic.objects import get_object, get_objects, update_object, create_object, create_and_update_objects, get_object_versions_metadata, get_object_version_diff
+from sampledb.logic.object_permissions import get_objects_with_permissions, iter_objects_with_permissions, get_user_objects_permissions
+from sampledb.logic.object_search import generate_filter_func, wrap_filter_func
+from sampledb.logic.object_pagination import encode_cursor, decode_cursor, get_num_objects_estimate
 from sampledb.logic import errors
+from sampledb.logic.schemas import validate
+from sampledb.models import ActionType, Object
 
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
 
+def _parse_object_creation(request_json: typing.Any) -> typing.Tuple[int, dict]:
+    """
+    Check the JSON representation of an object to create.
+
+    :param request_json: the JSON representation of the object
+    :return: the action ID and data for the new object
+    :raise ValueError: if the JSON representation is invalid, with a message
+        describing the problem
+    """
+    if not isinstance(request_json, dict):
+        raise ValueError("JSON object body required")
+    for key in request_json:
+        if key not in {'object_id', 'version_id', 'action_id', 'schema', 'data'}:
+            raise ValueError("invalid key '{}'".format(key))
+    if 'object_id' in request_json:
+        raise ValueError("object_id cannot be set")
+    if 'version_id' in request_json:
+        if request_json['version_id'] != 0:
+            raise ValueError("version_id must be 0")
+    if 'action_id' not in request_json:
+        raise ValueError("action_id must be set")
+    action_id = request_json['action_id']
+    if not isinstance(action_id, int):
+        raise ValueError("action_id must be an integer")
+    try:
+        action = get_action(action_id=action_id)
+    except errors.ActionDoesNotExistError:
+        raise ValueError("action {} does not exist".format(action_id))
+    if 'schema' in request_json:
+        if request_json['schema'] != action.schema:
+            raise ValueError("schema must be:\n{}".format(json.dumps(action.schema, indent=4)))
+    if 'data' not in request_json:
+        raise ValueError("data must be set")
+    return action_id, request_json['data']
+
+
+def _parse_object_update(request_json: typing.Any, object: Object) -> typing.Tuple[dict, dict]:
+    """
+    Check the JSON representation of a new version of an object.
+
+    :param request_json: the JSON representation of the object version
+    :param object: the current version of the object
+    :return: the data and schema for the new object version
+    :raise ValueError: if the JSON representation is invalid, with a message
+        describing the problem
+    """
+    if not isinstance(request_json, dict):
+        raise ValueError("JSON object body required")
+    for key in request_json:
+        if key not in {'object_id', 'version_id', 'action_id', 'schema', 'data'}:
+            raise ValueError("invalid key '{}'".format(key))
+    action = get_action(action_id=object.action_id)
+    if 'object_id' in request_json:
+        if request_json['object_id'] != object.object_id:
+            raise ValueError("object_id must be {}".format(object.object_id))
+    if 'version_id' in request_json:
+        if request_json['version_id'] != object.version_id + 1:
+            raise ValueError("version_id must be {}".format(object.version_id + 1))
+    if 'action_id' in request_json:
+        if request_json['action_id'] != object.action_id:
+            raise ValueError("action_id must be {}".format(object.action_id))
+    if 'schema' in request_json:
+        if request_json['schema'] != object.schema and request_json['schema'] != action.schema:
+            raise ValueError("schema must be either:\n{}\nor:\n{}".format(json.dumps(object.schema, indent=4), json.dumps(action.schema, indent=4)))
+        schema = request_json['schema']
+    else:
+        schema = object.schema
+    if 'data' not in request_json:
+        raise ValueError("data must be set")
+    return request_json['data'], schema
+
+
 class ObjectVersion(Resource):
     @object_permissions_required(Permissions.READ)
     def get(self, object_id: int, version_id: int):
@@ -35,49 +114,59 @@ class ObjectVersion(Resource):
         }
 
 
+class ObjectVersionDiff(Resource):
+    @object_permissions_required(Permissions.READ)
+    def get(self, object_id: int, version_id: int):
+        if 'from_version_id' in flask.request.args:
+            try:
+                from_version_id = int(flask.request.args['from_version_id'])
+            except ValueError:
+                return {
+                    "message": "from_version_id must be an integer"
+                }, 400
+        elif version_id > 0:
+            from_version_id = version_id - 1
+        else:
+            return {
+                "message": "from_version_id must be set for version 0"
+            }, 400
+        try:
+            patch = get_object_version_diff(object_id=object_id, from_version_id=from_version_id, to_version_id=version_id)
+        except errors.ObjectVersionDoesNotExistError:
+            return {
+                "message": "version {} or {} of object {} does not exist".format(from_version_id, version_id, object_id)
+            }, 404
+        return {
+            'object_id': object_id,
+            'from_version_id': from_version_id,
+            'version_id': version_id,
+            'patch': patch
+        }
+
+
 class ObjectVersions(Resource):
+    @object_permissions_required(Permissions.READ)
+    def get(self, object_id: int):
+        return [
+            {
+                'object_id': version_metadata.object_id,
+                'version_id': version_metadata.version_id,
+                'user_id': version_metadata.user_id,
+                'utc_datetime': version_metadata.utc_datetime.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            for version_metadata in get_object_versions_metadata(object_id=object_id)
+        ]
+
     @object_permissions_required(Permissions.WRITE)
     def post(self, object_id: int):
         request_json = flask.request.get_json(force=True)
-        if not isinstance(request_json, dict):
-            return {
-                "message": "JSON object body required"
-            }, 400
-        for key in request_json:
-            if key not in {'object_id', 'version_id', 'action_id', 'schema', 'data'}:
-                return {
-                    "message": "invalid key '{}'".format(key)
-                }, 400
         object = get_object(object_id=object_id)
-        action = get_action(action_id=object.action_id)
-        if 'object_id' in request_json:
-            if request_json['object_id'] != object.object_id:
-                return {
-                    "message": "object_id must be {}".format(object.object_id)
-                }, 400
-        if 'version_id' in request_json:
-            if request_json['version_id'] != object.version_id + 1:
-                return {
-                    "message": "version_id must be {}".format(object.version_id + 1)
-                }, 400
-        if 'action_id' in request_json:
-            if request_json['action_id'] != object.action_id:
-                return {
-                    "message": "action_id must be {}".format(object.action_id)
-                }, 400
-        if 'schema' in request_json:
-            if request_json['schema'] != object.schema and request_json['schema'] != action.schema:
-                return {
-                    "message": "schema must be either:\n{}\nor:\n{}".format(json.dumps(object.schema, indent=4), json.dumps(action.schema, indent=4))
-                }, 400
-            schema = request_json['schema']
-        else:
-            schema = object.schema
-        if 'data' not in request_json:
+        try:
+            data, schema = _parse_object_update(request_json, object)
+        except ValueError as e:
             return {
-                "message": "data must be set"
+                "message": str(e)
             }, 400
-        data = request_json['data']
         try:
             update_object(
                 object_id=object.object_id,
@@ -114,39 +203,138 @@ class Object(Resource):
         return flask.redirect(object_version_url, code=302)
 
 
+def object_to_json(object):
+    return {
+        'object_id': object.object_id,
+        'version_id': object.version_id,
+        'action_id': object.action_id,
+        'schema': object.schema,
+        'data': object.data
+    }
+
+
 class Objects(Resource):
     @multi_auth.login_required
     def get(self):
-        # TODO: implement filters
-        def filter_func(data):
-            return True
         action_id = None
+        if 'action_id' in flask.request.args:
+            try:
+                action_id = int(flask.request.args['action_id'])
+            except ValueError:
+                return {
+                    "message": "action_id must be an integer"
+                }, 400
         action_type = None
-        project_id = None
-        search_notes = []
+        if 'action_type' in flask.request.args:
+            action_type = {
+                'sample': ActionType.SAMPLE_CREATION,
+                'measurement': ActionType.MEASUREMENT,
+                'simulation': ActionType.SIMULATION
+            }.get(flask.request.args['action_type'])
+            if action_type is None:
+                return {
+                    "message": "action_type must be one of: sample, measurement, simulation"
+                }, 400
+        limit = None
+        if 'limit' in flask.request.args:
+            try:
+                limit = int(flask.request.args['limit'])
+            except ValueError:
+                limit = None
+            if limit is None or limit <= 0:
+                return {
+                    "message": "limit must be a positive integer"
+                }, 400
+        cursor = None
+        if 'cursor' in flask.request.args:
+            try:
+                cursor_values = decode_cursor(flask.request.args['cursor'])
+            except errors.InvalidCursorError:
+                cursor_values = None
+            if cursor_values is None or len(cursor_values) != 1 or type(cursor_values[0]) is not int:
+                return {
+                    "message": "invalid cursor"
+                }, 400
+            # objects are sorted by their ID, so it is both sorting key and tie-breaker
+            cursor = (cursor_values[0], cursor_values[0])
+        query_string = flask.request.args.get('q', '')
+        use_advanced_search = 'advanced' in flask.request.args
+        try:
+            filter_func, search_tree, use_advanced_search = generate_filter_func(query_string, use_advanced_search)
+        except Exception:
+            return {
+                "message": "invalid search query"
+            }, 400
+        filter_func, search_notes = wrap_filter_func(filter_func)
+        stream = flask.request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+        next_cursor = []
         try:
-            objects = get_objects_with_permissions(
+            if stream:
+                objects = iter_objects_with_permissions(
+                    user_id=flask.g.user.id,
+                    permissions=Permissions.READ,
+                    filter_func=filter_func,
+                    action_id=action_id,
+                    action_type=action_type,
+                    limit=limit,
+                    cursor=cursor,
+                    next_cursor=next_cursor
+                )
+                # the first objects are fetched before the response is
+                # started, so that errors in the query can still be reported
+                first_object = next(objects, None)
+                if first_object is not None:
+                    objects = itertools.chain([first_object], objects)
+            else:
+                objects = get_objects_with_permissions(
+                    user_id=flask.g.user.id,
+                    permissions=Permissions.READ,
+                    filter_func=filter_func,
+                    action_id=action_id,
+                    action_type=action_type,
+                    limit=limit,
+                    cursor=cursor,
+                    next_cursor=next_cursor
+                )
+        except Exception as e:
+            search_notes.append(('error', "Error during search: {}".format(e), 0, 0))
+        for search_note in search_notes:
+            if search_note[0] == 'error':
+                return {
+                    "message": search_note[1]
+                }, 400
+        headers = {}
+        if next_cursor:
+            next_url = flask.url_for(
+                'api.objects',
+                **{k: v for k, v in flask.request.args.items() if k != 'cursor'},
+                cursor=encode_cursor([next_cursor[0][1]]),
+                _external=True
+            )
+            headers['Link'] = '<{}>; rel="next"'.format(next_url)
+        if 'count' in flask.request.args:
+            headers['X-Total-Count'] = str(get_num_objects_estimate(
                 user_id=flask.g.user.id,
                 permissions=Permissions.READ,
+                cache_key=(query_string, use_advanced_search),
                 filter_func=filter_func,
                 action_id=action_id,
-                action_type=action_type,
-                project_id=project_id
+                action_type=action_type
+            ))
+        if stream:
+            def generate_ndjson():
+                for object in objects:
+                    yield json.dumps(object_to_json(object), separators=(',', ':')) + '\n'
+            return flask.Response(
+                flask.stream_with_context(generate_ndjson()),
+                200,
+                headers,
+                mimetype='application/x-ndjson'
             )
-        except Exception as e:
-            search_notes.append(('error', "Error during search: {}".format(e), 0, 0))
-            objects = []
-        # TODO handle search notes and set error code
         return [
-            {
-                'object_id': object.object_id,
-                'version_id': object.version_id,
-                'action_id': object.action_id,
-                'schema': object.schema,
-                'data': object.data
-            }
+            object_to_json(object)
             for object in objects
-        ]
+        ], 200, headers
 
     @multi_auth.login_required
     def post(self):
@@ -155,57 +343,17 @@ class Objects(Resource):
                 'message': 'user has been marked as read only'
             }, 400
         request_json = flask.request.get_json(force=True)
-        if not isinstance(request_json, dict):
-            return {
-                "message": "JSON object body required"
-            }, 400
-        for key in request_json:
-            if key not in {'object_id', 'version_id', 'action_id', 'schema', 'data'}:
-                return {
-                    "message": "invalid key '{}'".format(key)
-                }, 400
-        if 'object_id' in request_json:
-            return {
-                "message": "object_id cannot be set"
-            }, 400
-        if 'version_id' in request_json:
-            if request_json['version_id'] != 0:
-                return {
-                    "message": "version_id must be 0"
-                }, 400
-        if 'action_id' in request_json:
-            if not isinstance(request_json['action_id'], int):
-                return {
-                    "message": "action_id must be an integer"
-                }, 400
-            action_id = request_json['action_id']
-            try:
-                action = get_action(action_id=action_id)
-            except errors.ActionDoesNotExistError:
-                return {
-                    "message": "action {} does not exist".format(action_id)
-                }, 400
-        else:
-            return {
-                "message": "action_id must be set"
-            }, 400
-        if 'schema' in request_json:
-            if request_json['schema'] != action.schema:
-                return {
-                    "message": "schema must be:\n{}".format(json.dumps(action.schema, indent=4))
-                }, 400
-        schema = action.schema
-        if 'data' not in request_json:
+        try:
+            action_id, data = _parse_object_creation(request_json)
+        except ValueError as e:
             return {
-                "message": "data must be set"
+                "message": str(e)
             }, 400
-        data = request_json['data']
         try:
             object = create_object(
                 action_id=action_id,
                 data=data,
-                user_id=flask.g.user.id,
-                schema=schema
+                user_id=flask.g.user.id
             )
         except errors.ValidationError as e:
             messages = e.message.splitlines()
@@ -222,3 +370,140 @@ class Objects(Resource):
             version_id=object.version_id
         )
         return flask.redirect(object_version_url, code=201)
+
+
+class ObjectsBulk(Resource):
+    @multi_auth.login_required
+    def post(self):
+        if flask.g.user.is_readonly:
+            return {
+                'message': 'user has been marked as read only'
+            }, 400
+        if flask.request.mimetype == 'application/x-ndjson':
+            request_json = []
+            for line_number, line in enumerate(flask.request.get_data(as_text=True).splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    request_json.append(json.loads(line))
+                except ValueError:
+                    return {
+                        "message": "invalid JSON in line {}".format(line_number)
+                    }, 400
+        else:
+            request_json = flask.request.get_json(force=True)
+            if not isinstance(request_json, list):
+                return {
+                    "message": "JSON array body required"
+                }, 400
+        # objects to update are identified by their object_id, so all
+        # current objects and permissions can be loaded at once
+        object_ids = {
+            item['object_id']
+            for item in request_json
+            if isinstance(item, dict) and type(item.get('object_id')) is int
+        }
+        current_objects = {
+            object.object_id: object
+            for object in get_objects(object_ids=object_ids)
+        } if object_ids else {}
+        permissions = get_user_objects_permissions(user_id=flask.g.user.id, object_ids=current_objects.keys())
+        creations = []
+        updates = []
+        # whether each item is an update, to match items to their results
+        item_is_update = []
+        updated_object_ids = set()
+        item_errors = []
+        for index, item in enumerate(request_json):
+            is_update = isinstance(item, dict) and 'object_id' in item
+            item_is_update.append(is_update)
+            try:
+                if is_update:
+                    object_id = item['object_id']
+                    if type(object_id) is not int:
+                        raise ValueError("object_id must be an integer")
+                    if object_id not in current_objects or Permissions.READ not in permissions[object_id]:
+                        raise ValueError("object {} does not exist".format(object_id))
+                    if Permissions.WRITE not in permissions[object_id]:
+                        raise ValueError("insufficient permissions to update object {}".format(object_id))
+                    if object_id in updated_object_ids:
+                        raise ValueError("object {} can only be updated once".format(object_id))
+                    data, schema = _parse_object_update(item, current_objects[object_id])
+                    updates.append((object_id, data, schema))
+                    updated_object_ids.add(object_id)
+                else:
+                    action_id, data = _parse_object_creation(item)
+                    creations.append((action_id, data))
+            except ValueError as e:
+                item_errors.append({
+                    "index": index,
+                    "message": str(e)
+                })
+        if not item_errors:
+            try:
+                created_objects, updated_objects = create_and_update_objects(
+                    creations=creations,
+                    updates=updates,
+                    user_id=flask.g.user.id
+                )
+            except errors.ValidationError as e:
+                # no changes have been applied, so validate each item to find
+                # the invalid ones
+                item_errors = _validate_bulk_items(item_is_update, creations, updates)
+                if not item_errors:
+                    messages = e.message.splitlines()
+                    return {
+                        "message": "validation failed:\n - {}".format('\n - '.join(messages))
+                    }, 400
+            except (errors.ActionDoesNotExistError, errors.ObjectDoesNotExistError):
+                return {
+                    "message": "failed to create or update objects"
+                }, 400
+        if item_errors:
+            return {
+                "message": "invalid objects, no changes have been applied",
+                "errors": item_errors
+            }, 400
+        created_objects = iter(created_objects)
+        updated_objects = iter(updated_objects)
+        results = []
+        for is_update in item_is_update:
+            if is_update:
+                object = next(updated_objects)
+            else:
+                object = next(created_objects)
+            results.append({
+                'object_id': object.object_id,
+                'version_id': object.version_id
+            })
+        return results, 200
+
+
+def _validate_bulk_items(item_is_update: typing.List[bool], creations: typing.List[typing.Tuple[int, dict]], updates: typing.List[typing.Tuple[int, dict, dict]]) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Validate the data of the items in a bulk request.
+
+    :param item_is_update: whether each item of the bulk request is an update
+    :param creations: the action ID and data of each object to create
+    :param updates: the object ID, data and schema of each object to update
+    :return: a list containing the index and error message of each invalid
+        item
+    """
+    creations = iter(creations)
+    updates = iter(updates)
+    item_errors = []
+    for index, is_update in enumerate(item_is_update):
+        if is_update:
+            object_id, data, schema = next(updates)
+        else:
+            action_id, data = next(creations)
+            schema = get_action(action_id).schema
+        try:
+            validate(data, schema)
+        except errors.ValidationError as e:
+            messages = e.message.splitlines()
+            item_errors.append({
+                "index": index,
+                "message": "validation failed:\n - {}".format('\n - '.join(messages))
+            })
+    return item_errors
@@ -108,6 +108,36 @@ def check_config(config: typing.Mapping[str, typing.Any]) -> None:
         exit(1)
 
 
+def is_enabled(value: typing.Any) -> bool:
+    """
+    Return whether a boolean config value is enabled, which may have been set
+    to a string using an environment variable.
+
+    :param value: the config value
+    :return: whether the value is enabled
+    """
+    return str(value).lower() in {'true', 'yes', 'on', '1'}
+
+
+def get_sqlalchemy_engine_options(config: typing.MutableMapping[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """
+    Get the options for creating the SQLAlchemy engine from the database
+    connection pool settings.
+
+    Flask-SQLAlchemy would use some of these settings as they are and warn that
+    they are deprecated, so they are removed from the config mapping.
+
+    :param config: the config mapping
+    :return: the engine options
+    """
+    return {
+        'pool_size': int(config.pop('SQLALCHEMY_POOL_SIZE')),
+        'max_overflow': int(config.pop('SQLALCHEMY_MAX_OVERFLOW')),
+        'pool_recycle': int(config.pop('SQLALCHEMY_POOL_RECYCLE')),
+        'pool_pre_ping': is_enabled(config['SQLALCHEMY_POOL_PRE_PING'])
+    }
+
+
 # prefix for all routes (used by run script)
 SERVER_PATH = '/'
 
@@ -172,5 +202,76 @@ JUPYTERHUB_URL = None
 # users may take a long time to fill out a form during an experiment
 WTF_CSRF_TIME_LIMIT = 12 * 60 * 60
 
+# number of seconds for which the number of objects found by a search is
+# cached when paginating object lists using cursors
+OBJECT_COUNT_CACHE_TIMEOUT = 60
+
+# number of seconds for which actions, instruments and the locations tree are
+# cached in each process, or 0 to only cache them for the duration of a request
+PROCESS_CACHE_TIMEOUT = 0
+
+# interval between previous object versions stored as full snapshots, while
+# the versions in between are stored as patches to the following version, or
+# 0 to store all previous versions as full snapshots. Existing versions can be
+# converted using the convert_object_versions script.
+OBJECT_VERSION_SNAPSHOT_INTERVAL = 0
+
+# number of seconds for which credentials used for HTTP Basic authentication
+# of API requests are cached after being verified, or 0 to verify them for
+# every request. When using several processes, changed passwords or removed
+# authentication methods may be accepted by other processes until then, so
+# the cache is disabled by default.
+CREDENTIAL_CACHE_TIMEOUT = 0
+
+# maximum number of idle connections to the LDAP server kept for searching
+# users in each process
+LDAP_CONNECTION_POOL_SIZE = 4
+
+# whether API log entries are stored by a background thread instead of during
+# the request, and the number of entries stored at once, the maximum time in
+# seconds that an entry waits to be stored and the maximum number of queued
+# entries per process, after which new entries are dropped
+API_LOG_ASYNC = False
+API_LOG_BATCH_SIZE = 100
+API_LOG_FLUSH_INTERVAL = 1
+API_LOG_MAX_QUEUE_SIZE = 10000
+
+# whether notification emails are sent by the process_jobs script instead of
+# during the request creating the notification
+SEND_EMAILS_USING_JOBS = False
+
+# job queue settings for the process_jobs script: the maximum number of jobs
+# processed at once, the number of seconds between checks for new jobs, the
+# maximum number of attempts for each job and the number of seconds before
+# the first retry, which is doubled for every following attempt
+JOB_BATCH_SIZE = 100
+JOB_POLL_INTERVAL = 5
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 60
+
+# number of threads handling requests in each process of the run script
+WORKER_THREADS = 4
+
+# number of processes started by the run script, all of which accept
+# connections on the same socket, or 1 to handle all requests in a single
+# process
+WORKER_PROCESSES = 1
+
+# database connection pool settings for each process
+# see: https://docs.sqlalchemy.org/en/13/core/pooling.html
+# the pool size should be at least WORKER_THREADS, as threads have to wait
+# for a connection if all connections are in use
+SQLALCHEMY_POOL_SIZE = 5
+SQLALCHEMY_MAX_OVERFLOW = 10
+# number of seconds after which connections are replaced, or -1 to disable
+SQLALCHEMY_POOL_RECYCLE = -1
+# whether connections are tested before being used, so that connections
+# closed by the database server can be replaced
+SQLALCHEMY_POOL_PRE_PING = False
+
+# whether creating missing tables and running migrations should be skipped
+# when starting SampleDB, e.g. because the migrate script is run instead
+SKIP_DATABASE_MIGRATIONS = False
+
 # environment variables override these values
 use_environment_configuration(env_prefix='SAMPLEDB_')
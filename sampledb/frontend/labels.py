@@ -3,6 +3,7 @@ Module for generation sample/object labels as PDF files.
 """
 import io
 import base64
+import functools
 import os
 from PIL import Image
 from reportlab.pdfgen.canvas import Canvas
@@ -13,7 +14,8 @@ import qrcode
 import qrcode.image.pil
 
 
-def _generate_ghs_image_uris():
+@functools.lru_cache(maxsize=None)
+def _get_ghs_image_uris():
     ghs_image_uris = []
     GHS_IMAGE_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'static', 'img')
     for i in range(0, 10):
@@ -28,9 +30,6 @@ def _generate_ghs_image_uris():
     return ghs_image_uris
 
 
-GHS_IMAGE_URIS = _generate_ghs_image_uris()
-
-
 def _draw_centered_wrapped_text(canvas, text, left_offset, width, top_cursor, font_name, font_size, line_height):
     lines = []
     while text:
@@ -104,12 +103,12 @@ def _draw_label(canvas, sample_name, sample_creator, sample_creation_date, sampl
         top_cursor -= 4.5 * mm
     if len(ghs_classes) == 1:
         top_cursor -= 9 * mm
-        canvas.drawImage(GHS_IMAGE_URIS[ghs_classes[0]], left_offset + ((right_offset - left_offset) / 2 - 9 * mm / 2), top_cursor + 5, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
+        canvas.drawImage(_get_ghs_image_uris()[ghs_classes[0]], left_offset + ((right_offset - left_offset) / 2 - 9 * mm / 2), top_cursor + 5, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
     else:
         for i, ghs_class in enumerate(ghs_classes, start=ghs_start_position):
             if i % 3 == 0:
                 top_cursor -= 9 * mm
-            canvas.drawImage(GHS_IMAGE_URIS[ghs_class], left_offset + ((right_offset - left_offset) / 2 - 19 * mm / 2) + 0.5 * mm + (i % 3 == 1) * 9 * mm + (i % 3 == 2) * 4.5 * mm, top_cursor + 5 - (i % 3 == 2) * 4.5 * mm, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
+            canvas.drawImage(_get_ghs_image_uris()[ghs_class], left_offset + ((right_offset - left_offset) / 2 - 19 * mm / 2) + 0.5 * mm + (i % 3 == 1) * 9 * mm + (i % 3 == 2) * 4.5 * mm, top_cursor + 5 - (i % 3 == 2) * 4.5 * mm, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
         if (len(ghs_classes) - 1) % 3 == 0:
             top_cursor -= 4.5 * mm
 
@@ -166,7 +165,7 @@ def _draw_long_label(canvas: Canvas, sample_name, sample_creator, sample_creatio
     )
     left_cursor += 1 * mm + text_width
     for ghs_class in ghs_classes:
-        canvas.drawImage(GHS_IMAGE_URIS[ghs_class], left_cursor, bottom_offset + height / 2 - 4.5 * mm, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
+        canvas.drawImage(_get_ghs_image_uris()[ghs_class], left_cursor, bottom_offset + height / 2 - 4.5 * mm, 9 * mm, 9 * mm, (255, 255, 255, 255, 255, 255))
         left_cursor += 9 * mm
     if height != 9 * mm:
         left_cursor += 1 * mm
@@ -12,7 +12,7 @@ import typing
 
 from . import frontend
 from ..logic import errors
-from ..logic.locations import Location, create_location, get_location, get_locations_tree, update_location, get_object_location_assignment, confirm_object_responsibility
+from ..logic.locations import Location, create_location, get_location, get_locations_tree, get_ancestor_location_ids, get_descendent_location_ids, update_location, get_object_location_assignment, confirm_object_responsibility
 from ..logic.security_tokens import verify_token
 from ..logic.notifications import mark_notification_for_being_assigned_as_responsible_user_as_read
 from .utils import check_current_user_is_not_readonly
@@ -47,11 +47,10 @@ def location(location_id):
         check_current_user_is_not_readonly()
         return _show_location_form(location, None)
     locations_map, locations_tree = get_locations_tree()
-    ancestors = []
-    parent_location = location
-    while parent_location.parent_location_id is not None:
-        parent_location = get_location(parent_location.parent_location_id)
-        ancestors.insert(0, (parent_location.id, parent_location.name))
+    ancestors = [
+        (ancestor_id, locations_map[ancestor_id].name)
+        for ancestor_id in reversed(get_ancestor_location_ids(location_id))
+    ]
     for ancestor_id, ancestor_name in ancestors:
         locations_tree = locations_tree[ancestor_id]
     locations_tree = locations_tree[location_id]
@@ -130,22 +129,7 @@ def _show_location_form(location: typing.Optional[Location], parent_location: ty
     invalid_location_ids = []
     if location is not None:
         invalid_location_ids.append(location.id)
-        ancestor_ids = []
-        _parent_location = location
-        while _parent_location.parent_location_id is not None:
-            _parent_location = get_location(_parent_location.parent_location_id)
-            ancestor_ids.insert(0, _parent_location.id)
-        locations_subtree = locations_tree
-        for ancestor_id in ancestor_ids:
-            locations_subtree = locations_subtree[ancestor_id]
-        locations_subtree = locations_subtree[location.id]
-        unhandled_descendent_ids_and_subtrees = [(descendent_id, locations_subtree) for descendent_id in locations_subtree]
-        while unhandled_descendent_ids_and_subtrees:
-            descendent_id, locations_subtree = unhandled_descendent_ids_and_subtrees.pop(0)
-            invalid_location_ids.append(descendent_id)
-            locations_subtree = locations_subtree[descendent_id]
-            for descendent_id in locations_subtree:
-                unhandled_descendent_ids_and_subtrees.append((descendent_id, locations_subtree))
+        invalid_location_ids.extend(get_descendent_location_ids(location.id))
 
     location_form = LocationForm()
     location_form.parent_location.choices = [('-1', '-')] + [
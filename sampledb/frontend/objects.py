@@ -16,19 +16,19 @@ import werkzeug.utils
 from . import frontend
 from .. import logic
 from ..logic import user_log, object_log, comments, object_sorting
-from ..logic.actions import ActionType, get_action
+from ..logic.actions import ActionType, get_action, get_actions_by_ids
 from ..logic.action_permissions import get_user_action_permissions
-from ..logic.object_permissions import Permissions, get_user_object_permissions, object_is_public, get_object_permissions_for_users, set_object_public, set_user_object_permissions, set_group_object_permissions, set_project_object_permissions, get_objects_with_permissions, get_object_permissions_for_groups, get_object_permissions_for_projects, request_object_permissions
+from ..logic.object_permissions import Permissions, get_user_object_permissions, get_user_objects_permissions, object_is_public, get_object_permissions_for_users, set_object_public, set_user_object_permissions, set_group_object_permissions, set_project_object_permissions, get_objects_with_permissions, get_object_permissions_for_groups, get_object_permissions_for_projects, request_object_permissions
 from ..logic.datatypes import JSONEncoder
-from ..logic.users import get_user, get_users, get_users_by_name
+from ..logic.users import get_user, get_users, get_users_by_name, get_users_by_ids
 from ..logic.schemas import validate, generate_placeholder
 from ..logic.settings import get_user_settings, set_user_settings
-from ..logic.object_search import generate_filter_func, wrap_filter_func
+from ..logic.object_search import generate_filter_func, wrap_filter_func, should_use_advanced_search
 from ..logic.groups import get_group, get_user_groups
-from ..logic.objects import create_object, create_object_batch, update_object, get_object, get_object_versions
+from ..logic.objects import create_object, create_object_batch, update_object, get_object, get_objects, get_object_versions_metadata
 from ..logic.object_log import ObjectLogEntryType
 from ..logic.projects import get_project, get_user_projects, get_user_project_permissions
-from ..logic.locations import get_location, get_object_ids_at_location, get_object_location_assignment, get_object_location_assignments, get_locations, assign_location_to_object, get_locations_tree
+from ..logic.locations import get_location, get_object_location_assignment, get_object_location_assignments, get_locations, assign_location_to_object, get_locations_tree
 from ..logic.files import FileLogEntryType
 from ..logic.errors import GroupDoesNotExistError, ObjectDoesNotExistError, UserDoesNotExistError, ActionDoesNotExistError, ValidationError, ProjectDoesNotExistError, LocationDoesNotExistError
 from .objects_forms import ObjectPermissionsForm, ObjectForm, ObjectVersionRestoreForm, ObjectUserPermissionsForm, CommentForm, ObjectGroupPermissionsForm, ObjectProjectPermissionsForm, FileForm, FileInformationForm, FileHidingForm, ObjectLocationAssignmentForm, ExternalLinkForm, ObjectPublicationForm
@@ -57,6 +57,7 @@ def on_unauthorized(object_id):
 def objects():
     object_ids = flask.request.args.get('ids', '')
     objects = []
+    original_versions = {}
     if object_ids:
         object_ids = object_ids.split(',')
         try:
@@ -64,16 +65,21 @@ def objects():
         except ValueError:
             object_ids = []
 
-        readable_object_ids = []
-        for object_id in object_ids:
-            if Permissions.READ in get_user_object_permissions(object_id, user_id=flask_login.current_user.id):
-                readable_object_ids.append(object_id)
-        object_ids = readable_object_ids
-        for object_id in object_ids:
-            try:
-                objects.append(get_object(object_id))
-            except logic.errors.ObjectDoesNotExistError:
-                pass
+        objects_permissions = get_user_objects_permissions(user_id=flask_login.current_user.id, object_ids=object_ids)
+        object_ids = [
+            object_id
+            for object_id in object_ids
+            if Permissions.READ in objects_permissions[object_id]
+        ]
+        objects_by_id = {
+            obj.object_id: obj
+            for obj in get_objects(object_ids=object_ids, original_versions=original_versions)
+        }
+        objects = [
+            objects_by_id[object_id]
+            for object_id in object_ids
+            if object_id in objects_by_id
+        ]
         action_id = None
         action = None
         action_type = None
@@ -83,7 +89,6 @@ def objects():
         user = None
         user_id = None
         doi = None
-        object_ids_at_location = None
         project = None
         query_string = ''
         use_advanced_search = False
@@ -93,6 +98,8 @@ def objects():
         search_tree = None
         limit = None
         offset = None
+        cursor = None
+        next_cursor = None
         pagination_enabled = True
         num_objects_found = len(objects)
         sorting_property_name = None
@@ -115,15 +122,12 @@ def objects():
         try:
             location_id = int(flask.request.args.get('location', ''))
             location = get_location(location_id)
-            object_ids_at_location = get_object_ids_at_location(location_id)
         except ValueError:
             location_id = None
             location = None
-            object_ids_at_location = None
         except LocationDoesNotExistError:
             location_id = None
             location = None
-            object_ids_at_location = None
         try:
             action_id = int(flask.request.args.get('action', ''))
         except ValueError:
@@ -178,8 +182,6 @@ def objects():
                 offset = None
             elif offset > 100000000:
                 offset = 100000000
-        if limit is not None and offset is None:
-            offset = 0
 
         sorting_order_name = flask.request.args.get('order', None)
         if sorting_order_name == 'asc':
@@ -190,6 +192,13 @@ def objects():
             sorting_order = None
 
         sorting_property_name = flask.request.args.get('sortby', None)
+        if sorting_property_name is None and sorting_order is None:
+            simple_search_query_string = flask.request.args.get('q', '').strip()
+            if simple_search_query_string and flask.request.args.get('advanced', None) is None and not should_use_advanced_search(simple_search_query_string)[0]:
+                # rank the results of a simple search by relevance by default
+                sorting_property_name = '_relevance'
+                sorting_order_name = 'desc'
+                sorting_order = object_sorting.descending
 
         if sorting_order is None:
             if sorting_property_name is None:
@@ -201,17 +210,47 @@ def objects():
 
         if sorting_property_name is None:
             sorting_property_name = '_object_id'
+        sorting_property_type = None
         if sorting_property_name == '_object_id':
             sorting_property = object_sorting.object_id()
         elif sorting_property_name == '_creation_date':
             sorting_property = object_sorting.creation_date()
         elif sorting_property_name == '_last_modification_date':
             sorting_property = object_sorting.last_modification_date()
+        elif sorting_property_name == '_relevance':
+            sorting_property = object_sorting.relevance(flask.request.args.get('q', ''))
         else:
-            sorting_property = object_sorting.property_value(sorting_property_name)
+            if action_id is not None:
+                # sort indexed properties using the index expression
+                sorting_property_type = logic.indexed_properties.get_indexed_property_type(action_id, [sorting_property_name])
+            sorting_property = object_sorting.property_value(sorting_property_name, sorting_property_type)
 
         sorting_function = sorting_order(sorting_property)
 
+        # without an offset, pages are queried using a cursor, which is only
+        # valid for the sorting it was created with
+        cursor = None
+        if limit is not None and offset is None and 'cursor' in flask.request.args:
+            try:
+                cursor_values = logic.object_pagination.decode_cursor(flask.request.args['cursor'])
+            except logic.errors.InvalidCursorError:
+                cursor_values = None
+            if cursor_values is not None and len(cursor_values) == 4 and cursor_values[:2] == [sorting_property_name, sorting_order_name] and type(cursor_values[3]) is int:
+                cursor_key = cursor_values[2]
+                if sorting_property_name == '_object_id':
+                    is_valid_cursor_key = type(cursor_key) is int
+                elif sorting_property_name in ('_creation_date', '_last_modification_date'):
+                    is_valid_cursor_key = isinstance(cursor_key, datetime.datetime)
+                elif sorting_property_name == '_relevance' or sorting_property_type in ('quantity', 'sample', 'measurement'):
+                    is_valid_cursor_key = cursor_key is None or type(cursor_key) in (int, float)
+                elif sorting_property_type == 'bool':
+                    is_valid_cursor_key = cursor_key is None or type(cursor_key) is bool
+                else:
+                    is_valid_cursor_key = cursor_key is None or isinstance(cursor_key, str)
+                if is_valid_cursor_key:
+                    cursor = (cursor_key, cursor_values[3])
+        next_cursor = None
+
         query_string = flask.request.args.get('q', '')
         search_tree = None
         use_advanced_search = flask.request.args.get('advanced', None) is not None
@@ -248,35 +287,12 @@ def objects():
                 raise
         filter_func, search_notes = wrap_filter_func(filter_func)
         search_notes.extend(additional_search_notes)
-        if user_id is None:
-            object_ids_for_user = None
-        else:
-            object_ids_for_user = user_log.get_user_related_object_ids(user_id)
-        if doi is None:
-            object_ids_for_doi = None
-        else:
-            object_ids_for_doi = logic.publications.get_object_ids_linked_to_doi(doi)
         if use_advanced_search and not must_use_advanced_search:
             search_notes.append(('info', "The advanced search was used automatically. Search for \"{}\" to use the simple search.".format(query_string), 0, 0))
         try:
-            object_ids = None
-            if object_ids_at_location is not None:
-                if object_ids is None:
-                    object_ids = set()
-                object_ids = object_ids.union(object_ids_at_location)
-            if object_ids_for_user is not None:
-                if object_ids is None:
-                    object_ids = set()
-                object_ids = object_ids.union(object_ids_for_user)
-            if object_ids_for_doi is not None:
-                if object_ids is None:
-                    object_ids = set()
-                object_ids = object_ids.union(object_ids_for_doi)
-            if object_ids:
-                pagination_enabled = False
-                limit = None
-                offset = None
+            use_cursor = limit is not None and offset is None
             num_objects_found_list = []
+            next_cursor_list = []
             objects = get_objects_with_permissions(
                 user_id=flask_login.current_user.id,
                 permissions=Permissions.READ,
@@ -287,10 +303,38 @@ def objects():
                 action_id=action_id,
                 action_type=action_type,
                 project_id=project_id,
-                object_ids=object_ids,
-                num_objects_found=num_objects_found_list
+                location_id=location_id,
+                related_user_id=user_id,
+                doi=doi,
+                num_objects_found=num_objects_found_list if offset is not None else None,
+                original_versions=original_versions,
+                cursor=cursor,
+                next_cursor=next_cursor_list if use_cursor else None
             )
-            num_objects_found = num_objects_found_list[0]
+            if offset is not None:
+                num_objects_found = num_objects_found_list[0]
+            elif use_cursor and (cursor is not None or next_cursor_list):
+                # counting all objects is as expensive as querying them, so
+                # only an estimate is used for cursor-based pagination
+                num_search_notes = len(search_notes)
+                num_objects_found = logic.object_pagination.get_num_objects_estimate(
+                    user_id=flask_login.current_user.id,
+                    permissions=Permissions.READ,
+                    cache_key=(query_string, use_advanced_search),
+                    filter_func=filter_func,
+                    action_id=action_id,
+                    action_type=action_type,
+                    project_id=project_id,
+                    location_id=location_id,
+                    related_user_id=user_id,
+                    doi=doi
+                )
+                del search_notes[num_search_notes:]
+            else:
+                num_objects_found = len(objects)
+            if next_cursor_list:
+                next_cursor_key, next_cursor_object_id = next_cursor_list[0]
+                next_cursor = logic.object_pagination.encode_cursor([sorting_property_name, sorting_order_name, next_cursor_key, next_cursor_object_id])
         except Exception as e:
             search_notes.append(('error', "Error during search: {}".format(e), 0, 0))
             objects = []
@@ -299,21 +343,29 @@ def objects():
             objects = []
             advanced_search_had_error = True
 
+    # load users and actions for all objects at once to avoid one query per object
+    users_by_id = {
+        user.id: user
+        for user in get_users_by_ids(
+            [obj.user_id for obj in objects] + [original_user_id for original_user_id, original_utc_datetime in original_versions.values()]
+        )
+    }
+    actions_by_id = {
+        action.id: action
+        for action in get_actions_by_ids(obj.action_id for obj in objects)
+    }
     for i, obj in enumerate(objects):
-        if obj.version_id == 0:
-            original_object = obj
-        else:
-            original_object = get_object(object_id=obj.object_id, version_id=0)
+        original_user_id, original_utc_datetime = original_versions[obj.object_id]
         objects[i] = {
             'object_id': obj.object_id,
             'version_id': obj.version_id,
-            'created_by': get_user(original_object.user_id),
-            'created_at': original_object.utc_datetime.strftime('%Y-%m-%d'),
-            'modified_by': get_user(obj.user_id),
+            'created_by': users_by_id[original_user_id],
+            'created_at': original_utc_datetime.strftime('%Y-%m-%d'),
+            'modified_by': users_by_id[obj.user_id],
             'last_modified_at': obj.utc_datetime.strftime('%Y-%m-%d'),
             'data': obj.data,
             'schema': obj.schema,
-            'action': get_action(obj.action_id),
+            'action': actions_by_id[obj.action_id],
             'display_properties': {}
         }
 
@@ -339,13 +391,25 @@ def objects():
             elif obj['schema']['properties'][property_name]['type'] == 'measurement':
                 measurement_ids.add(obj['data'][property_name]['object_id'])
 
+    # load all referenced samples and measurements the user may read at once
+    referenced_objects_permissions = get_user_objects_permissions(user_id=flask_login.current_user.id, object_ids=sample_ids.union(measurement_ids))
+    referenced_objects = {
+        obj.object_id: obj
+        for obj in get_objects(object_ids=[
+            object_id
+            for object_id, permissions in referenced_objects_permissions.items()
+            if Permissions.READ in permissions
+        ])
+    }
     samples = {
-        sample_id: get_object(object_id=sample_id)
+        sample_id: referenced_objects[sample_id]
         for sample_id in sample_ids
+        if sample_id in referenced_objects
     }
     measurements = {
-        measurement_id: get_object(object_id=measurement_id)
+        measurement_id: referenced_objects[measurement_id]
         for measurement_id in measurement_ids
+        if measurement_id in referenced_objects
     }
     if action_id is None:
         show_action = True
@@ -353,10 +417,12 @@ def objects():
         show_action = False
 
     def build_modified_url(**kwargs):
+        # cursors are only valid for the current sorting and page size, so
+        # they are only kept if set explicitly, and None removes an argument
         return flask.url_for(
             '.objects',
-            **{k: v for k, v in flask.request.args.items() if k not in kwargs},
-            **kwargs
+            **{k: v for k, v in flask.request.args.items() if k not in kwargs and k != 'cursor'},
+            **{k: v for k, v in kwargs.items() if v is not None}
         )
     return flask.render_template(
         'objects/objects.html',
@@ -382,6 +448,8 @@ def objects():
         sorting_order=sorting_order_name,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        next_cursor=next_cursor,
         pagination_enabled=pagination_enabled,
         num_objects_found=num_objects_found,
         show_action=show_action,
@@ -994,7 +1062,8 @@ def export_to_pdf(object_id):
         try:
             object_ids = json.loads(flask.request.args['object_ids'])
             object_ids = [int(i) for i in object_ids]
-            if any((Permissions.READ not in get_user_object_permissions(i, flask_login.current_user.id)) for i in object_ids):
+            objects_permissions = get_user_objects_permissions(user_id=flask_login.current_user.id, object_ids=object_ids)
+            if any((Permissions.READ not in objects_permissions[i]) for i in object_ids):
                 return flask.abort(400)
         except Exception:
             return flask.abort(400)
@@ -1185,7 +1254,7 @@ def object_versions(object_id):
     object = get_object(object_id=object_id)
     if object is None:
         return flask.abort(404)
-    object_versions = get_object_versions(object_id=object_id)
+    object_versions = get_object_versions_metadata(object_id=object_id)
     object_versions.sort(key=lambda object_version: -object_version.version_id)
     return flask.render_template('objects/object_versions.html', get_user=get_user, object=object, object_versions=object_versions)
 
@@ -6,18 +6,23 @@
 from . import actions
 from . import api_log
 from . import authentication
+from . import caching
 from . import comments
 from . import datatypes
+from . import effective_object_permissions
 from . import errors
 from . import favorites
 from . import files
 from . import groups
+from . import indexed_properties
 from . import instruments
+from . import jobs
 from . import ldap
 from . import locations
 from . import notifications
 from . import objects
 from . import object_log
+from . import object_pagination
 from . import object_relationships
 from . import object_search
 from . import object_permissions
@@ -43,18 +48,23 @@ __all__ = [
     'actions',
     'api_log',
     'authentication',
+    'caching',
     'comments',
     'datatypes',
+    'effective_object_permissions',
     'errors',
     'favorites',
     'files',
     'groups',
+    'indexed_properties',
     'instruments',
+    'jobs',
     'ldap',
     'locations',
     'notifications',
     'objects',
     'object_log',
+    'object_pagination',
     'object_relationships',
     'object_search',
     'object_permissions',
@@ -71,5 +81,5 @@ __all__ = [
     'where_filters',
 ]
 
-Objects._data_validator = schemas.validate
-Objects._schema_validator = schemas.validate_schema
+Objects._data_validator = schemas.validate_with_compiled_validator
+Objects._schema_validator = schemas.validate_schema_once
@@ -12,6 +12,7 @@ from . import users
 from . import projects
 from . import instruments
 from ..models import Permissions, UserActionPermissions, GroupActionPermissions, ProjectActionPermissions, PublicActions, Action, ActionType
+from ..models.groups import association_table as user_group_memberships
 
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
@@ -189,19 +190,29 @@ def get_user_action_permissions(action_id, user_id, include_instrument_responsib
     if Permissions.GRANT in permissions:
         return min(permissions, max_permissions)
     if include_groups:
-        for group in groups.get_user_groups(user_id):
-            group_action_permissions = GroupActionPermissions.query.filter_by(action_id=action_id, group_id=group.id).first()
-            if group_action_permissions is not None and permissions in group_action_permissions.permissions:
-                permissions = group_action_permissions.permissions
+        group_action_permissions = GroupActionPermissions.query.join(
+            user_group_memberships,
+            user_group_memberships.c.group_id == GroupActionPermissions.group_id
+        ).filter(
+            GroupActionPermissions.action_id == action_id,
+            user_group_memberships.c.user_id == user_id
+        ).all()
+        for single_group_action_permissions in group_action_permissions:
+            if permissions in single_group_action_permissions.permissions:
+                permissions = single_group_action_permissions.permissions
     if Permissions.GRANT in permissions:
         return min(permissions, max_permissions)
     if include_projects:
-        for user_project in projects.get_user_projects(user_id, include_groups=include_groups):
-            user_project_permissions = projects.get_user_project_permissions(user_project.id, user_id, include_groups=include_groups)
-            if user_project_permissions not in permissions:
-                project_action_permissions = ProjectActionPermissions.query.filter_by(action_id=action_id, project_id=user_project.id).first()
-                if project_action_permissions is not None:
-                    permissions = min(user_project_permissions, project_action_permissions.permissions)
+        user_project_ids_and_permissions = projects.get_user_project_ids_and_permissions(user_id, include_groups=include_groups)
+        if user_project_ids_and_permissions:
+            project_action_permissions = ProjectActionPermissions.query.filter(
+                ProjectActionPermissions.action_id == action_id,
+                ProjectActionPermissions.project_id.in_(user_project_ids_and_permissions.keys())
+            ).order_by(ProjectActionPermissions.project_id).all()
+            for single_project_action_permissions in project_action_permissions:
+                user_project_permissions = user_project_ids_and_permissions[single_project_action_permissions.project_id]
+                if user_project_permissions not in permissions:
+                    permissions = min(user_project_permissions, single_project_action_permissions.permissions)
     if Permissions.READ in permissions:
         return min(permissions, max_permissions)
     # lastly, the action may be public, so all users have READ permissions
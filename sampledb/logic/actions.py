@@ -23,7 +23,7 @@ import typing
 
 from .. import db
 from ..models import Action, ActionType
-from . import errors, instruments, users, schemas
+from . import caching, errors, instruments, users, schemas
 
 
 def create_action(
@@ -85,6 +85,20 @@ def get_actions(action_type: typing.Optional[ActionType] = None) -> typing.List[
     return Action.query.all()
 
 
+def get_actions_by_ids(action_ids: typing.Iterable[int]) -> typing.List[Action]:
+    """
+    Returns all actions with the given IDs using a single query.
+
+    :param action_ids: the IDs of the actions
+    :return: the list of actions with these IDs
+    """
+    action_ids = list(set(action_ids))
+    if not action_ids:
+        return []
+    return Action.query.filter(Action.id.in_(action_ids)).all()
+
+
+@caching.cached('actions', Action)
 def get_action(action_id: int) -> Action:
     """
     Returns the action with the given action ID.
@@ -121,3 +135,4 @@ def update_action(action_id: int, name: str, description: str, schema: dict) ->
     action.schema = schema
     db.session.add(action)
     db.session.commit()
+    caching.invalidate('actions', action_id)
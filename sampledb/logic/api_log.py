@@ -1,15 +1,174 @@
 # coding: utf-8
 """
+Logic module for the API log
 
+API log entries are either stored during the request using an API token or,
+if API_LOG_ASYNC is enabled, added to a bounded queue and stored in batches
+by a background thread. The queue is flushed when the process exits. If it
+is full, new entries are dropped instead of blocking the request.
 """
 
+import atexit
 import datetime
+import logging
+import os
+import queue
+import threading
+import time
 import typing
-from ..models import APILogEntry, HTTPMethod
+
+import flask
+
+from ..config import is_enabled
+from ..models import APILogEntry, Authentication, HTTPMethod
 from .. import db
 
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class _APILogWriter(object):
+    """
+    Background thread storing queued API log entries using multi-row inserts.
+    """
+
+    def __init__(self, engine: typing.Any, batch_size: int, flush_interval: float, max_queue_size: int) -> None:
+        self._engine = engine
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stopped = threading.Event()
+        self._statistics_lock = threading.Lock()
+        self.pid = os.getpid()
+        self.statistics = {'written': 0, 'dropped': 0}
+        self._thread = threading.Thread(target=self._run, name='api-log-writer', daemon=True)
+        self._thread.start()
+
+    def add(self, values: typing.Dict[str, typing.Any]) -> bool:
+        try:
+            self._queue.put_nowait(values)
+            return True
+        except queue.Full:
+            with self._statistics_lock:
+                self.statistics['dropped'] += 1
+            return False
+
+    def _get_entries(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        # wait for a first entry, then collect entries until the batch is full
+        # or the flush interval has passed
+        entries = []
+        deadline = None
+        while len(entries) < self._batch_size:
+            if self._stopped.is_set():
+                timeout = 0
+            elif deadline is None:
+                timeout = self._flush_interval
+            else:
+                timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    entries.append(self._queue.get(timeout=timeout))
+                else:
+                    entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                if entries or self._stopped.is_set():
+                    break
+                continue
+            if deadline is None:
+                deadline = time.monotonic() + self._flush_interval
+        return entries
+
+    def _write(self, entries: typing.List[typing.Dict[str, typing.Any]]) -> None:
+        try:
+            with self._engine.begin() as connection:
+                # API tokens may have been removed since the entries were
+                # queued, and their entries would prevent storing the others
+                api_token_ids = {
+                    row[0]
+                    for row in connection.execute(
+                        db.select([Authentication.__table__.c.id])
+                        .where(Authentication.__table__.c.id.in_({entry['api_token_id'] for entry in entries}))
+                    )
+                }
+                valid_entries = [entry for entry in entries if entry['api_token_id'] in api_token_ids]
+                if valid_entries:
+                    connection.execute(APILogEntry.__table__.insert(), valid_entries)
+            with self._statistics_lock:
+                self.statistics['written'] += len(valid_entries)
+                self.statistics['dropped'] += len(entries) - len(valid_entries)
+        except Exception:
+            logging.getLogger('sampledb.api_log').exception('Failed to store {} API log entries'.format(len(entries)))
+            with self._statistics_lock:
+                self.statistics['dropped'] += len(entries)
+        finally:
+            for _ in entries:
+                self._queue.task_done()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set() or not self._queue.empty():
+            entries = self._get_entries()
+            if entries:
+                self._write(entries)
+
+    def flush(self) -> None:
+        """
+        Wait until all queued entries have been stored.
+        """
+        self._queue.join()
+
+    def stop(self, timeout: typing.Optional[float] = None) -> None:
+        """
+        Store all queued entries and stop the background thread.
+
+        :param timeout: the maximum time in seconds to wait for the thread
+        """
+        self._stopped.set()
+        self._thread.join(timeout)
+
+
+def _get_writer() -> _APILogWriter:
+    global _writer
+    with _writer_lock:
+        # threads are not inherited by forked worker processes, so each
+        # process needs its own writer
+        if _writer is None or _writer.pid != os.getpid():
+            config = flask.current_app.config
+            _writer = _APILogWriter(
+                engine=db.engine,
+                batch_size=int(config['API_LOG_BATCH_SIZE']),
+                flush_interval=float(config['API_LOG_FLUSH_INTERVAL']),
+                max_queue_size=int(config['API_LOG_MAX_QUEUE_SIZE'])
+            )
+            atexit.register(_writer.stop)
+        return _writer
+
+
+def flush_log_entries() -> None:
+    """
+    Wait until all API log entries queued in this process have been stored.
+    """
+    with _writer_lock:
+        writer = _writer
+    if writer is not None and writer.pid == os.getpid():
+        writer.flush()
+
+
+def get_log_writer_statistics() -> typing.Dict[str, int]:
+    """
+    Get the number of API log entries which were stored or dropped by the
+    background writer of this process.
+
+    :return: a dict containing the writer statistics
+    """
+    with _writer_lock:
+        writer = _writer
+    if writer is None or writer.pid != os.getpid():
+        return {'written': 0, 'dropped': 0}
+    with writer._statistics_lock:
+        return dict(writer.statistics)
+
 
 def get_api_log_entries(api_token_id: int) -> typing.List[APILogEntry]:
     """
@@ -25,15 +184,26 @@ def create_log_entry(api_token_id: int, method: HTTPMethod, route: str):
     """
     Create a new API log entry.
 
+    If API_LOG_ASYNC is enabled, the entry is queued and stored later.
+
     :param api_token_id: the ID of an existing API token
     :param method: the HTTP method
     :param route: the route
     """
+    utc_datetime = datetime.datetime.utcnow()
+    if is_enabled(flask.current_app.config['API_LOG_ASYNC']):
+        _get_writer().add({
+            'api_token_id': api_token_id,
+            'method': method,
+            'route': route,
+            'utc_datetime': utc_datetime
+        })
+        return
     api_log_entry = APILogEntry(
         api_token_id=api_token_id,
         method=method,
         route=route,
-        utc_datetime=datetime.datetime.utcnow()
+        utc_datetime=utc_datetime
     )
     db.session.add(api_log_entry)
     db.session.commit()
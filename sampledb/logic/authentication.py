@@ -1,3 +1,8 @@
+import hashlib
+import hmac
+import json
+import secrets
+
 import bcrypt
 import typing
 import flask
@@ -5,7 +10,11 @@ import flask
 from .. import logic, db
 from .ldap import validate_user, create_user_from_ldap, is_ldap_configured
 from ..models import Authentication, AuthenticationType, User
-from . import errors, api_log
+from . import errors, api_log, caching, users
+
+# random key for the HMAC of cached credentials, so that the cache does not
+# contain the passwords themselves or hashes that could be checked offline
+_CREDENTIAL_CACHE_KEY = secrets.token_bytes(32)
 
 
 def _hash_password(password: str) -> str:
@@ -16,11 +25,33 @@ def _validate_password_hash(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
 
+def _hash_api_token(api_token: str) -> str:
+    # API tokens are random, so a fast hash is sufficient for storing them
+    return hashlib.sha256(api_token.encode('utf-8')).hexdigest()
+
+
 def _validate_password_authentication(authentication_method: Authentication, password: str) -> bool:
     password_hash = authentication_method.login['bcrypt_hash']
     return _validate_password_hash(password, password_hash)
 
 
+def _get_credential_cache_key(login: str, password: str) -> str:
+    credentials = json.dumps([login, password]).encode('utf-8')
+    return hmac.new(_CREDENTIAL_CACHE_KEY, credentials, hashlib.sha256).hexdigest()
+
+
+def _get_credential_cache_timeout() -> float:
+    return float(flask.current_app.config['CREDENTIAL_CACHE_TIMEOUT'])
+
+
+def clear_credential_cache() -> None:
+    """
+    Clear the credentials cached by login in the current process, e.g. after
+    a password has been changed or an authentication method was removed.
+    """
+    caching.clear_process_cache('credentials')
+
+
 def _add_password_authentication(user_id: int, login: str, password: str, authentication_type: AuthenticationType, confirmed: bool = True) -> None:
     login = login.lower().strip()
     if Authentication.query.filter(Authentication.login['login'].astext == login).first():
@@ -110,22 +141,46 @@ def add_api_token(user_id: int, api_token: str, description: str) -> None:
         },
         authentication_type=AuthenticationType.API_TOKEN,
         confirmed=True,
-        user_id=user_id
+        user_id=user_id,
+        api_token_hash=_hash_api_token(api_token)
     )
     db.session.add(authentication)
     db.session.commit()
 
 
-def login(login: str, password: str) -> typing.Optional[User]:
+def login(login: str, password: str, use_cache: bool = False) -> typing.Optional[User]:
     """
     Authenticate a user and create an LDAP based user if necessary.
 
+    If use_cache is True, successfully verified credentials are cached for
+    CREDENTIAL_CACHE_TIMEOUT seconds, so that clients authenticating with
+    every request, e.g. using HTTP Basic authentication for the API, do not
+    need to be verified using bcrypt or LDAP every time.
+
     :param login: the name, email or LDAP uid to use during authentication
     :param password: the password
+    :param use_cache: whether cached credentials may be used
     :return: the user or None
     """
     # convert to lower case to enforce case insensitivity
     login = login.lower().strip()
+    timeout = _get_credential_cache_timeout() if use_cache else 0
+    if timeout > 0:
+        cache_key = _get_credential_cache_key(login, password)
+        cached_values = caching.get_process_cache_entry('credentials', cache_key, timeout)
+        if cached_values is not None:
+            try:
+                return users.get_user(cached_values['user_id'])
+            except errors.UserDoesNotExistError:
+                clear_credential_cache()
+        user = _login(login, password)
+        if user is not None:
+            caching.set_process_cache_entry('credentials', cache_key, {'user_id': user.id})
+        return user
+    return _login(login, password)
+
+
+def _login(login: str, password: str) -> typing.Optional[User]:
     # filter email + password or username + password or username (ldap)
     authentication_methods = Authentication.query.filter(
         db.or_(
@@ -175,18 +230,38 @@ def login_via_api_token(api_token: str) -> typing.Optional[User]:
     """
     # convert to lower case to enforce case insensitivity
     api_token = api_token.lower().strip()
+    api_token_hash = _hash_api_token(api_token)
+    authentication_method = Authentication.query.filter(
+        db.and_(Authentication.api_token_hash == api_token_hash,
+                Authentication.type == AuthenticationType.API_TOKEN)
+    ).first()
+    if authentication_method is None:
+        authentication_method = _login_via_legacy_api_token(api_token, api_token_hash)
+    if authentication_method is None or not authentication_method.confirmed:
+        return None
+    api_log.create_log_entry(authentication_method.id, getattr(api_log.HTTPMethod, flask.request.method, api_log.HTTPMethod.OTHER), flask.request.path)
+    return authentication_method.user
+
+
+def _login_via_legacy_api_token(api_token: str, api_token_hash: str) -> typing.Optional[Authentication]:
+    # API tokens created before their hashes were stored have to be found by
+    # their first characters and verified using bcrypt. Their hash is stored
+    # after the first successful verification, so this is only done once.
     username, password = api_token[:8], api_token[8:]
     authentication_methods = Authentication.query.filter(
         db.and_(Authentication.login['login'].astext == username,
-                Authentication.type == AuthenticationType.API_TOKEN)
+                Authentication.type == AuthenticationType.API_TOKEN,
+                Authentication.api_token_hash.is_(None))
     ).all()
 
     for authentication_method in authentication_methods:
         if not authentication_method.confirmed:
             continue
         if _validate_password_authentication(authentication_method, password):
-            api_log.create_log_entry(authentication_method.id, getattr(api_log.HTTPMethod, flask.request.method, api_log.HTTPMethod.OTHER), flask.request.path)
-            return authentication_method.user
+            authentication_method.api_token_hash = api_token_hash
+            db.session.add(authentication_method)
+            db.session.commit()
+            return authentication_method
     return None
 
 
@@ -236,6 +311,7 @@ def remove_authentication_method(authentication_method_id: int) -> bool:
             raise errors.OnlyOneAuthenticationMethod('one authentication-method must at least exist, delete not possible')
     db.session.delete(authentication_method)
     db.session.commit()
+    clear_credential_cache()
     return True
 
 
@@ -259,6 +335,7 @@ def change_password_in_authentication_method(authentication_method_id: int, pass
     authentication_method.login = {'login': authentication_method.login['login'], 'bcrypt_hash': _hash_password(password)}
     db.session.add(authentication_method)
     db.session.commit()
+    clear_credential_cache()
     return True
 
 
@@ -0,0 +1,237 @@
+# coding: utf-8
+"""
+Logic module for caching users, actions, instruments and locations
+
+These are looked up many times while handling a single request, e.g. when
+rendering the users, actions and locations referenced by an object or its
+log entries. Their getters use a cache stored in flask.g, so that each of
+them is queried at most once per request.
+
+Actions and instruments change rarely, so they can additionally be cached
+in a process-level cache for PROCESS_CACHE_TIMEOUT seconds. Update functions
+invalidate the cached values in the current process, so when using several
+processes, other processes may use outdated values until they time out.
+
+Values that are derived from a whole table, like the tree of all locations,
+can be cached in the same way using cached_value.
+"""
+
+import collections
+import copy
+import functools
+import threading
+import time
+import typing
+
+import flask
+import sqlalchemy.orm
+
+from .. import db
+
+# maximum number of values in each process-level cache
+MAX_NUM_PROCESS_CACHE_ENTRIES = 1000
+
+_process_caches = collections.defaultdict(collections.OrderedDict)
+_process_cache_statistics = collections.defaultdict(lambda: {'hits': 0, 'misses': 0})
+_process_caches_lock = threading.Lock()
+
+
+def _get_request_cache(cache_name: str) -> typing.Optional[typing.Dict[typing.Any, typing.Any]]:
+    if not flask.has_request_context():
+        return None
+    request_caches = flask.g.setdefault('_sampledb_caches', {})
+    return request_caches.setdefault(cache_name, {})
+
+
+def _get_process_cache_timeout() -> float:
+    if not flask.has_app_context():
+        return 0
+    return float(flask.current_app.config['PROCESS_CACHE_TIMEOUT'])
+
+
+def _get_column_values(instance: typing.Any) -> typing.Dict[str, typing.Any]:
+    mapper = sqlalchemy.inspect(instance).mapper
+    return {
+        column_property.key: copy.deepcopy(getattr(instance, column_property.key))
+        for column_property in mapper.column_attrs
+    }
+
+
+def _get_instance(model: typing.Any, column_values: typing.Dict[str, typing.Any]) -> typing.Any:
+    # create a detached instance from a deep copy of the cached values, so that
+    # it can be merged into the session without loading it from the database
+    instance = sqlalchemy.inspect(model).class_manager.new_instance()
+    for key, value in column_values.items():
+        sqlalchemy.orm.attributes.set_committed_value(instance, key, copy.deepcopy(value))
+    sqlalchemy.orm.make_transient_to_detached(instance)
+    return db.session.merge(instance, load=False)
+
+
+def cached(cache_name: str, model: typing.Any = None) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """
+    Create a decorator for caching the results of a getter function, which
+    is given a single ID, in the request cache.
+
+    If a model is given, the getter must return instances of this model, and
+    these are also cached in the process-level cache.
+
+    :param cache_name: the name of the cache
+    :param model: the SQLAlchemy model returned by the getter (optional)
+    :return: the decorator
+    """
+    def decorator(function: typing.Callable) -> typing.Callable:
+        @functools.wraps(function)
+        def cached_function(*args, **kwargs):
+            object_id, = args + tuple(kwargs.values())
+            request_cache = _get_request_cache(cache_name)
+            if request_cache is not None and object_id in request_cache:
+                return request_cache[object_id]
+            result = None
+            timeout = _get_process_cache_timeout() if model is not None else 0
+            if timeout > 0:
+                column_values = get_process_cache_entry(cache_name, object_id, timeout)
+                if column_values is not None:
+                    result = _get_instance(model, column_values)
+            if result is None:
+                result = function(*args, **kwargs)
+                if timeout > 0:
+                    set_process_cache_entry(cache_name, object_id, _get_column_values(result))
+            if request_cache is not None:
+                request_cache[object_id] = result
+            return result
+        return cached_function
+    return decorator
+
+
+def cached_value(cache_name: str) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """
+    Create a decorator for caching the result of a getter function without
+    any parameters, both in the request cache and in the process-level cache.
+
+    As the cached result is shared, it must not be modified by the caller.
+
+    :param cache_name: the name of the cache
+    :return: the decorator
+    """
+    def decorator(function: typing.Callable) -> typing.Callable:
+        @functools.wraps(function)
+        def cached_function():
+            request_cache = _get_request_cache(cache_name)
+            if request_cache is not None and None in request_cache:
+                return request_cache[None]
+            result = None
+            timeout = _get_process_cache_timeout()
+            if timeout > 0:
+                result = get_process_cache_entry(cache_name, None, timeout)
+            if result is None:
+                result = function()
+                if timeout > 0:
+                    set_process_cache_entry(cache_name, None, result)
+            if request_cache is not None:
+                request_cache[None] = result
+            return result
+        return cached_function
+    return decorator
+
+
+def get_process_cache_entry(cache_name: str, object_id: typing.Any, timeout: float) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Get a value from a process-level cache, counting the hit or miss.
+
+    :param cache_name: the name of the cache
+    :param object_id: the ID the value was cached for
+    :param timeout: the time in seconds after which values are outdated
+    :return: the cached value, or None if it is missing or outdated
+    """
+    now = time.monotonic()
+    with _process_caches_lock:
+        process_cache = _process_caches[cache_name]
+        statistics = _process_cache_statistics[cache_name]
+        if object_id in process_cache:
+            cached_time, column_values = process_cache[object_id]
+            if now - cached_time < timeout:
+                process_cache.move_to_end(object_id)
+                statistics['hits'] += 1
+                return column_values
+            del process_cache[object_id]
+        statistics['misses'] += 1
+        return None
+
+
+def set_process_cache_entry(cache_name: str, object_id: typing.Any, column_values: typing.Dict[str, typing.Any]) -> None:
+    """
+    Store a value in a process-level cache, removing the least recently used
+    values if the cache contains more than MAX_NUM_PROCESS_CACHE_ENTRIES.
+
+    :param cache_name: the name of the cache
+    :param object_id: the ID to cache the value for
+    :param column_values: the value to cache
+    """
+    with _process_caches_lock:
+        process_cache = _process_caches[cache_name]
+        process_cache[object_id] = (time.monotonic(), column_values)
+        process_cache.move_to_end(object_id)
+        while len(process_cache) > MAX_NUM_PROCESS_CACHE_ENTRIES:
+            process_cache.popitem(last=False)
+
+
+def invalidate(cache_name: str, object_id: typing.Any) -> None:
+    """
+    Remove a cached value from the request cache and the process-level cache.
+
+    :param cache_name: the name of the cache
+    :param object_id: the ID the value was cached for
+    """
+    request_cache = _get_request_cache(cache_name)
+    if request_cache is not None:
+        request_cache.pop(object_id, None)
+    with _process_caches_lock:
+        _process_caches[cache_name].pop(object_id, None)
+
+
+def clear_request_caches(exception: typing.Optional[BaseException] = None) -> None:
+    """
+    Clear all request caches, e.g. when tearing down a request, as flask.g
+    may outlive it if the application context was pushed before.
+
+    :param exception: an exception raised while handling the request, if any
+    """
+    flask.g.pop('_sampledb_caches', None)
+
+
+def clear_process_cache(cache_name: str) -> None:
+    """
+    Clear a single process-level cache, e.g. if its values cannot be
+    invalidated individually.
+
+    :param cache_name: the name of the cache
+    """
+    with _process_caches_lock:
+        _process_caches[cache_name].clear()
+
+
+def clear_process_caches() -> None:
+    """
+    Clear all process-level caches and their statistics.
+    """
+    with _process_caches_lock:
+        _process_caches.clear()
+        _process_cache_statistics.clear()
+
+
+def get_process_cache_statistics() -> typing.Dict[str, typing.Dict[str, int]]:
+    """
+    Get the number of hits, misses and cached values for each process-level
+    cache.
+
+    :return: a dict mapping cache names to their statistics
+    """
+    with _process_caches_lock:
+        return {
+            cache_name: {
+                'hits': statistics['hits'],
+                'misses': statistics['misses'],
+                'size': len(_process_caches[cache_name])
+            }
+            for cache_name, statistics in _process_cache_statistics.items()
+        }
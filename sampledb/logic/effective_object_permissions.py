@@ -0,0 +1,138 @@
+# coding: utf-8
+"""
+Logic module for the materialized effective object permissions
+
+Resolving the permissions a user has for an object requires combining the
+user's own permissions with those granted to groups and projects the user is
+a member of, as well as those of instrument responsible users. The view
+user_object_permissions_by_all combines these sources, however querying it
+means evaluating all of them for every object in the database.
+
+To avoid this, the maximum permissions of each user for each object are
+stored in the effective_user_object_permissions table. Whenever one of the
+underlying sources changes, the affected rows are recomputed from the view,
+restricted to the affected objects or users.
+
+Public objects are not included in this table, as the public_objects table
+can be joined directly.
+"""
+
+import typing
+
+from .. import db
+
+
+def update_effective_permissions_for_objects(object_ids: typing.Iterable[int]) -> None:
+    """
+    Recompute the effective permissions of all users for the given objects.
+
+    This function does not commit the session, so it should be called before
+    the change causing the recomputation is committed.
+
+    :param object_ids: the IDs of existing objects
+    """
+    object_ids = list(set(object_ids))
+    if not object_ids:
+        return
+    db.session.flush()
+    db.session.execute(
+        db.text("""
+        DELETE FROM effective_user_object_permissions
+        WHERE object_id = ANY(:object_ids)
+        """),
+        {'object_ids': object_ids}
+    )
+    db.session.execute(
+        db.text("""
+        INSERT INTO effective_user_object_permissions
+        (user_id, object_id, permissions_int)
+        SELECT user_id, object_id, MAX(permissions_int)
+        FROM user_object_permissions_by_all
+        WHERE user_id IS NOT NULL AND object_id = ANY(:object_ids)
+        GROUP BY user_id, object_id
+        HAVING MAX(permissions_int) > 0
+        """),
+        {'object_ids': object_ids}
+    )
+
+
+def update_effective_permissions_for_users(user_ids: typing.Iterable[int]) -> None:
+    """
+    Recompute the effective permissions of the given users for all objects.
+
+    This function does not commit the session, so it should be called before
+    the change causing the recomputation is committed.
+
+    :param user_ids: the IDs of existing users
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    db.session.flush()
+    db.session.execute(
+        db.text("""
+        DELETE FROM effective_user_object_permissions
+        WHERE user_id = ANY(:user_ids)
+        """),
+        {'user_ids': user_ids}
+    )
+    db.session.execute(
+        db.text("""
+        INSERT INTO effective_user_object_permissions
+        (user_id, object_id, permissions_int)
+        SELECT user_id, object_id, MAX(permissions_int)
+        FROM user_object_permissions_by_all
+        WHERE user_id = ANY(:user_ids)
+        GROUP BY user_id, object_id
+        HAVING MAX(permissions_int) > 0
+        """),
+        {'user_ids': user_ids}
+    )
+
+
+def rebuild_effective_permissions() -> None:
+    """
+    Recompute the effective permissions of all users for all objects.
+    """
+    db.session.execute(db.text("""
+    DELETE FROM effective_user_object_permissions
+    """))
+    db.session.execute(db.text("""
+    INSERT INTO effective_user_object_permissions
+    (user_id, object_id, permissions_int)
+    SELECT user_id, object_id, MAX(permissions_int)
+    FROM user_object_permissions_by_all
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id, object_id
+    HAVING MAX(permissions_int) > 0
+    """))
+    db.session.commit()
+
+
+def verify_effective_permissions() -> typing.List[typing.Tuple[int, int, typing.Optional[int], typing.Optional[int]]]:
+    """
+    Compare the effective permissions with those computed by the view.
+
+    :return: a list of tuples containing the user ID, the object ID, the
+        stored permissions and the expected permissions for each mismatch
+    """
+    return [
+        tuple(row)
+        for row in db.session.execute(db.text("""
+        SELECT
+        COALESCE(e.user_id, v.user_id) AS user_id,
+        COALESCE(e.object_id, v.object_id) AS object_id,
+        e.permissions_int AS stored_permissions_int,
+        v.permissions_int AS expected_permissions_int
+        FROM effective_user_object_permissions AS e
+        FULL OUTER JOIN (
+            SELECT user_id, object_id, MAX(permissions_int) AS permissions_int
+            FROM user_object_permissions_by_all
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id, object_id
+            HAVING MAX(permissions_int) > 0
+        ) AS v ON e.user_id = v.user_id AND e.object_id = v.object_id
+        WHERE e.permissions_int IS DISTINCT FROM v.permissions_int
+        ORDER BY user_id, object_id
+        """)).fetchall()
+    ]
@@ -188,3 +188,19 @@ class LDAPNotConfiguredError(Exception):
 
 class UserIsReadonlyError(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class IndexedPropertyDoesNotExistError(Exception):
+    pass
+
+
+class IndexedPropertyAlreadyExistsError(Exception):
+    pass
+
+
+class InvalidIndexedPropertyError(Exception):
+    pass
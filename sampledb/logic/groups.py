@@ -25,6 +25,7 @@ from ..models import groups
 from .users import get_user
 from .security_tokens import generate_token, MAX_AGE
 from .notifications import create_notification_for_being_invited_to_a_group
+from .effective_object_permissions import update_effective_permissions_for_users
 from . import errors
 
 
@@ -125,9 +126,11 @@ def delete_group(group_id: int) -> None:
     group = groups.Group.query.get(group_id)
     if group is None:
         raise errors.GroupDoesNotExistError()
+    member_ids = [user.id for user in group.members]
     # group permissions and group default permissions will be deleted due to
     # ondelete = "CASCADE" in the model. No need to delete them manually here.
     db.session.delete(group)
+    update_effective_permissions_for_users(member_ids)
     db.session.commit()
 
 
@@ -241,6 +244,7 @@ def add_user_to_group(group_id: int, user_id: int) -> None:
     if user in group.members:
         raise errors.UserAlreadyMemberOfGroupError()
     group.members.append(user)
+    update_effective_permissions_for_users([user.id])
     db.session.commit()
 
 
@@ -270,4 +274,5 @@ def remove_user_from_group(group_id: int, user_id: int) -> None:
     group.members.remove(user)
     if not group.members:
         db.session.delete(group)
+    update_effective_permissions_for_users([user.id])
     db.session.commit()
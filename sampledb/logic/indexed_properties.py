@@ -0,0 +1,169 @@
+# coding: utf-8
+"""
+Logic module for indexed object properties
+
+Searching and sorting objects by their properties requires extracting values
+from the JSONB data column, e.g. casting a quantity's magnitude to a float,
+which cannot use an index by default. Administrators can register properties
+of an action as indexed properties, so that an expression index is created
+on objects_current for the objects created with that action.
+
+The index expressions match those emitted by where_filters and by
+object_sorting.property_value, so PostgreSQL can use these indexes whenever
+a query is limited to objects of the action.
+"""
+
+import typing
+
+from .. import db
+from . import errors
+from .actions import get_action
+from ..models import IndexedObjectProperty
+
+# index expressions for each supported property type, for the property
+# at :property_path in the data column
+INDEX_EXPRESSIONS = {
+    'text': ('btree', "((data #> :property_path) ->> 'text'), object_id"),
+    'quantity': ('btree', "CAST((data #> :property_path) ->> 'magnitude_in_base_units' AS FLOAT), object_id"),
+    'bool': ('btree', "CAST((data #> :property_path) ->> 'value' AS BOOLEAN), object_id"),
+    'datetime': ('btree', "((data #> :property_path) ->> 'utc_datetime'), object_id"),
+    'sample': ('btree', "CAST((data #> :property_path) ->> 'object_id' AS INTEGER), object_id"),
+    'measurement': ('btree', "CAST((data #> :property_path) ->> 'object_id' AS INTEGER), object_id"),
+    'tags': ('gin', "((data #> :property_path) -> 'tags') jsonb_path_ops")
+}
+
+
+def _get_index_name(indexed_property_id: int) -> str:
+    return 'ix_objects_current_indexed_property_{}'.format(indexed_property_id)
+
+
+def _get_property_path_literal(property_path: typing.Sequence[str]) -> str:
+    # use the same array literal as SQLAlchemy uses for JSONB paths, so that
+    # the index expression matches those in queries
+    return '{%s}' % ', '.join(property_path)
+
+
+def get_property_type(action_id: int, property_path: typing.Sequence[str]) -> typing.Optional[str]:
+    """
+    Get the type of a property in an action's schema.
+
+    :param action_id: the ID of an existing action
+    :param property_path: the list of property names leading to the property
+    :return: the property type or None, if there is no such property
+    :raise errors.ActionDoesNotExistError: when no action with the given
+        action ID exists
+    """
+    schema = get_action(action_id).schema
+    for property_name in property_path:
+        if not isinstance(schema, dict) or schema.get('type') != 'object':
+            return None
+        schema = schema.get('properties', {}).get(property_name)
+    if not isinstance(schema, dict):
+        return None
+    return schema.get('type')
+
+
+def get_indexed_property(indexed_property_id: int) -> IndexedObjectProperty:
+    """
+    Get an indexed property.
+
+    :param indexed_property_id: the ID of an existing indexed property
+    :return: the indexed property
+    :raise errors.IndexedPropertyDoesNotExistError: when no indexed property
+        with the given ID exists
+    """
+    indexed_property = IndexedObjectProperty.query.get(indexed_property_id)
+    if indexed_property is None:
+        raise errors.IndexedPropertyDoesNotExistError()
+    return indexed_property
+
+
+def get_indexed_properties(action_id: typing.Optional[int] = None) -> typing.List[IndexedObjectProperty]:
+    """
+    Get all indexed properties, optionally limited to those of one action.
+
+    :param action_id: the ID of an action (optional)
+    :return: the list of indexed properties
+    """
+    query = IndexedObjectProperty.query
+    if action_id is not None:
+        query = query.filter_by(action_id=action_id)
+    return query.order_by(IndexedObjectProperty.id).all()
+
+
+def get_indexed_property_type(action_id: int, property_path: typing.Sequence[str]) -> typing.Optional[str]:
+    """
+    Get the type of an indexed property, if the property is indexed and its
+    type in the action's schema has not changed since the index was created.
+
+    :param action_id: the ID of an existing action
+    :param property_path: the list of property names leading to the property
+    :return: the property type or None
+    """
+    indexed_property = IndexedObjectProperty.query.filter_by(action_id=action_id, property_path=list(property_path)).first()
+    if indexed_property is None:
+        return None
+    if get_property_type(action_id, property_path) != indexed_property.property_type:
+        return None
+    return indexed_property.property_type
+
+
+def create_indexed_property(action_id: int, property_path: typing.Sequence[str]) -> IndexedObjectProperty:
+    """
+    Register a property of an action as indexed property and create an
+    index for it.
+
+    :param action_id: the ID of an existing action
+    :param property_path: the list of property names leading to the property
+    :return: the created indexed property
+    :raise errors.ActionDoesNotExistError: when no action with the given
+        action ID exists
+    :raise errors.InvalidIndexedPropertyError: when the property does not
+        exist or its type cannot be indexed
+    :raise errors.IndexedPropertyAlreadyExistsError: when the property is
+        already indexed
+    """
+    property_path = list(property_path)
+    property_type = get_property_type(action_id, property_path)
+    if not property_path or property_type not in INDEX_EXPRESSIONS:
+        raise errors.InvalidIndexedPropertyError()
+    if IndexedObjectProperty.query.filter_by(action_id=action_id, property_path=property_path).first() is not None:
+        raise errors.IndexedPropertyAlreadyExistsError()
+    indexed_property = IndexedObjectProperty(
+        action_id=action_id,
+        property_path=property_path,
+        property_type=property_type
+    )
+    db.session.add(indexed_property)
+    db.session.flush()
+    index_method, index_expression = INDEX_EXPRESSIONS[property_type]
+    # the index name and action ID are integers and the index expression is
+    # one of the constants above, so only the path needs to be a parameter
+    db.session.execute(
+        db.text("""
+        CREATE INDEX {index_name} ON objects_current USING {index_method} ({index_expression})
+        WHERE action_id = {action_id}
+        """.format(
+            index_name=_get_index_name(indexed_property.id),
+            index_method=index_method,
+            index_expression=index_expression,
+            action_id=int(action_id)
+        )),
+        {'property_path': _get_property_path_literal(property_path)}
+    )
+    db.session.commit()
+    return indexed_property
+
+
+def delete_indexed_property(indexed_property_id: int) -> None:
+    """
+    Remove an indexed property and drop its index.
+
+    :param indexed_property_id: the ID of an existing indexed property
+    :raise errors.IndexedPropertyDoesNotExistError: when no indexed property
+        with the given ID exists
+    """
+    indexed_property = get_indexed_property(indexed_property_id)
+    db.session.execute(db.text("DROP INDEX IF EXISTS {}".format(_get_index_name(indexed_property.id))))
+    db.session.delete(indexed_property)
+    db.session.commit()
@@ -15,7 +15,8 @@ import typing
 from .. import db
 from ..models import Instrument
 from ..models.instruments import instrument_user_association_table
-from . import users, errors
+from . import caching, users, errors
+from .effective_object_permissions import update_effective_permissions_for_users
 
 
 def create_instrument(name: str, description: str) -> Instrument:
@@ -44,6 +45,7 @@ def get_instruments() -> typing.List[Instrument]:
     return Instrument.query.all()
 
 
+@caching.cached('instruments', Instrument)
 def get_instrument(instrument_id: int) -> Instrument:
     """
     Returns the instrument with the given instrument ID.
@@ -76,6 +78,7 @@ def update_instrument(instrument_id: int, name: str, description: str) -> None:
     instrument.description = description
     db.session.add(instrument)
     db.session.commit()
+    caching.invalidate('instruments', instrument_id)
 
 
 def add_instrument_responsible_user(instrument_id: int, user_id: int) -> None:
@@ -100,7 +103,9 @@ def add_instrument_responsible_user(instrument_id: int, user_id: int) -> None:
         raise errors.UserAlreadyResponsibleForInstrumentError()
     instrument.responsible_users.append(user)
     db.session.add(instrument)
+    update_effective_permissions_for_users([user.id])
     db.session.commit()
+    caching.invalidate('instruments', instrument_id)
 
 
 def remove_instrument_responsible_user(instrument_id: int, user_id: int) -> None:
@@ -125,7 +130,9 @@ def remove_instrument_responsible_user(instrument_id: int, user_id: int) -> None
         raise errors.UserNotResponsibleForInstrumentError()
     instrument.responsible_users.remove(user)
     db.session.add(instrument)
+    update_effective_permissions_for_users([user.id])
     db.session.commit()
+    caching.invalidate('instruments', instrument_id)
 
 
 def set_instrument_responsible_users(instrument_id: int, user_ids: typing.List[int]) -> None:
@@ -142,12 +149,15 @@ def set_instrument_responsible_users(instrument_id: int, user_ids: typing.List[i
     instrument = Instrument.query.get(instrument_id)
     if instrument is None:
         raise errors.InstrumentDoesNotExistError()
+    previous_user_ids = [user.id for user in instrument.responsible_users]
     instrument.responsible_users.clear()
     for user_id in user_ids:
         user = users.get_user(user_id)
         instrument.responsible_users.append(user)
     db.session.add(instrument)
+    update_effective_permissions_for_users(previous_user_ids + [user.id for user in instrument.responsible_users])
     db.session.commit()
+    caching.invalidate('instruments', instrument_id)
 
 
 def get_user_instruments(user_id: int) -> typing.List[int]:
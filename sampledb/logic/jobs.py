@@ -0,0 +1,137 @@
+# coding: utf-8
+"""
+Logic module for the job queue
+
+Work which does not need to be done while handling a request, like sending
+notification emails, can be stored as jobs in the database. These are then
+processed in batches by the process_jobs script, which may run as several
+processes at once, as each job is locked while it is processed.
+
+Each job type has a handler which is given the data of several jobs and
+returns an error message or None for each of them. Failed jobs are retried
+after JOB_RETRY_DELAY seconds, doubling the delay after each attempt, until
+JOB_MAX_ATTEMPTS attempts have failed.
+"""
+
+import datetime
+import logging
+import time
+import typing
+
+import flask
+
+from .. import db
+from ..models import Job, JobType, JobStatus
+
+_job_handlers = {}
+
+
+def job_handler(type: JobType) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """
+    Create a decorator for registering the handler of a job type.
+
+    :param type: the job type
+    :return: the decorator
+    """
+    def decorator(function: typing.Callable[[typing.List[typing.Dict[str, typing.Any]]], typing.List[typing.Optional[str]]]) -> typing.Callable:
+        _job_handlers[type] = function
+        return function
+    return decorator
+
+
+def create_jobs(type: JobType, data_sequence: typing.Sequence[typing.Dict[str, typing.Any]]) -> None:
+    """
+    Create several jobs of the same type using a single insert.
+
+    :param type: the type of the new jobs
+    :param data_sequence: the data of each job
+    """
+    if not data_sequence:
+        return
+    utc_datetime = datetime.datetime.utcnow()
+    db.session.execute(Job.__table__.insert(), [
+        {
+            'type': type,
+            'data': data,
+            'status': JobStatus.PENDING,
+            'num_attempts': 0,
+            'utc_datetime_created': utc_datetime,
+            'utc_datetime_next_attempt': utc_datetime
+        }
+        for data in data_sequence
+    ])
+    db.session.commit()
+
+
+def get_jobs(status: typing.Optional[JobStatus] = None) -> typing.List[Job]:
+    """
+    Get all jobs, or those with a given status.
+
+    :param status: the job status (optional)
+    :return: the jobs
+    """
+    query = Job.query
+    if status is not None:
+        query = query.filter_by(status=status)
+    return query.order_by(Job.id).all()
+
+
+def process_jobs(batch_size: typing.Optional[int] = None) -> int:
+    """
+    Process a batch of pending jobs which are due.
+
+    Successful jobs are deleted, while failed jobs are either scheduled for
+    another attempt or marked as failed.
+
+    :param batch_size: the maximum number of jobs to process, or None to use
+        JOB_BATCH_SIZE
+    :return: the number of processed jobs
+    """
+    config = flask.current_app.config
+    if batch_size is None:
+        batch_size = int(config['JOB_BATCH_SIZE'])
+    max_attempts = int(config['JOB_MAX_ATTEMPTS'])
+    retry_delay = float(config['JOB_RETRY_DELAY'])
+    utc_datetime = datetime.datetime.utcnow()
+    # other workers skip the locked jobs instead of waiting for them
+    jobs = Job.query.filter(
+        Job.status == JobStatus.PENDING,
+        Job.utc_datetime_next_attempt <= utc_datetime
+    ).order_by(Job.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    jobs_by_type = {}
+    for job in jobs:
+        jobs_by_type.setdefault(job.type, []).append(job)
+    for job_type, jobs_of_type in jobs_by_type.items():
+        try:
+            error_messages = _job_handlers[job_type]([job.data for job in jobs_of_type])
+        except Exception as e:
+            logging.getLogger('sampledb.jobs').exception('Failed to process jobs of type {}'.format(job_type.name))
+            error_messages = [str(e) or type(e).__name__] * len(jobs_of_type)
+        for job, error_message in zip(jobs_of_type, error_messages):
+            if error_message is None:
+                db.session.delete(job)
+                continue
+            job.num_attempts += 1
+            job.error_message = error_message
+            if job.num_attempts >= max_attempts:
+                job.status = JobStatus.FAILED
+            else:
+                job.utc_datetime_next_attempt = utc_datetime + datetime.timedelta(seconds=retry_delay * 2 ** (job.num_attempts - 1))
+            db.session.add(job)
+    db.session.commit()
+    return len(jobs)
+
+
+def run_worker(poll_interval: typing.Optional[float] = None) -> None:
+    """
+    Process jobs until the process is stopped, waiting for new jobs whenever
+    no jobs are due.
+
+    :param poll_interval: the time in seconds between checks for new jobs, or
+        None to use JOB_POLL_INTERVAL
+    """
+    if poll_interval is None:
+        poll_interval = float(flask.current_app.config['JOB_POLL_INTERVAL'])
+    while True:
+        if not process_jobs():
+            time.sleep(poll_interval)
@@ -1,8 +1,14 @@
 # coding: utf-8
 """
 Implementation of LDAP authentication.
+
+Connections used for searching users are kept in a pool and reused, so that
+not every search has to open a new SSL connection and bind to the server.
 """
 
+import collections
+import threading
+
 import ldap3
 import ldap3.core.exceptions
 import flask
@@ -15,6 +21,11 @@ from . import errors
 from . import users
 from ..config import LDAP_REQUIRED_CONFIG_KEYS
 
+_servers = {}
+_connection_pools = collections.defaultdict(list)
+_connection_statistics = {'created': 0, 'reused': 0}
+_connection_pools_lock = threading.Lock()
+
 
 def is_ldap_configured() -> bool:
     """
@@ -28,6 +39,70 @@ def is_ldap_configured() -> bool:
     ])
 
 
+def _get_server(ldap_host: str) -> ldap3.Server:
+    # the server object stores the schema information read when binding
+    with _connection_pools_lock:
+        if ldap_host not in _servers:
+            _servers[ldap_host] = ldap3.Server(ldap_host, use_ssl=True, get_info=ldap3.ALL)
+        return _servers[ldap_host]
+
+
+def _get_pooled_connection(ldap_host: str, user_dn: typing.Optional[str], password: typing.Optional[str]) -> typing.Tuple[ldap3.Connection, bool]:
+    with _connection_pools_lock:
+        connection_pool = _connection_pools[(ldap_host, user_dn, password)]
+        if connection_pool:
+            _connection_statistics['reused'] += 1
+            return connection_pool.pop(), True
+        _connection_statistics['created'] += 1
+    connection = ldap3.Connection(_get_server(ldap_host), user=user_dn, password=password, auto_bind=True)
+    return connection, False
+
+
+def _release_pooled_connection(connection: ldap3.Connection, ldap_host: str, user_dn: typing.Optional[str], password: typing.Optional[str]) -> None:
+    pool_size = int(flask.current_app.config['LDAP_CONNECTION_POOL_SIZE'])
+    with _connection_pools_lock:
+        connection_pool = _connection_pools[(ldap_host, user_dn, password)]
+        if connection.bound and len(connection_pool) < pool_size:
+            connection_pool.append(connection)
+            return
+    connection.unbind()
+
+
+def get_connection_statistics() -> typing.Dict[str, int]:
+    """
+    Get the number of connections for searching users which were created or
+    reused from the pool, and the number of idle connections in the pool.
+
+    :return: a dict containing the connection statistics
+    """
+    with _connection_pools_lock:
+        return {
+            'created': _connection_statistics['created'],
+            'reused': _connection_statistics['reused'],
+            'idle': sum(len(connection_pool) for connection_pool in _connection_pools.values())
+        }
+
+
+def close_connections() -> None:
+    """
+    Close all idle pooled LDAP connections and reset the statistics.
+    """
+    with _connection_pools_lock:
+        connections = [
+            connection
+            for connection_pool in _connection_pools.values()
+            for connection in connection_pool
+        ]
+        _connection_pools.clear()
+        _servers.clear()
+        _connection_statistics.update({'created': 0, 'reused': 0})
+    for connection in connections:
+        try:
+            connection.unbind()
+        except ldap3.core.exceptions.LDAPException:
+            pass
+
+
 def _get_user_dn_and_attributes(user_ldap_uid: str, attributes: typing.Sequence[str] = ()) -> typing.Optional[typing.Sequence[typing.Any]]:
     ldap_host = flask.current_app.config['LDAP_SERVER']
     user_base_dn = flask.current_app.config['LDAP_USER_BASE_DN']
@@ -35,25 +110,37 @@ def _get_user_dn_and_attributes(user_ldap_uid: str, attributes: typing.Sequence[
     object_def = flask.current_app.config['LDAP_OBJECT_DEF']
     user_dn = flask.current_app.config['LDAP_USER_DN']
     password = flask.current_app.config['LDAP_PASSWORD']
-    server = ldap3.Server(ldap_host, use_ssl=True, get_info=ldap3.ALL)
-    try:
-        connection = ldap3.Connection(server, user=user_dn, password=password, auto_bind=True)
-        object_def = ldap3.ObjectDef(object_def, connection)
-        reader = ldap3.Reader(connection, object_def, user_base_dn, uid_filter.format(user_ldap_uid))
-        reader.search(attributes)
-        # search if uid matches exactly one user, not more
-        if len(reader) != 1:
+    while True:
+        connection = None
+        reused = False
+        try:
+            connection, reused = _get_pooled_connection(ldap_host, user_dn, password)
+            reader = ldap3.Reader(connection, ldap3.ObjectDef(object_def, connection), user_base_dn, uid_filter.format(user_ldap_uid))
+            reader.search(attributes)
+        except ldap3.core.exceptions.LDAPException:
+            if connection is not None:
+                try:
+                    connection.unbind()
+                except ldap3.core.exceptions.LDAPException:
+                    pass
+            if reused:
+                # the pooled connection may have been closed by the server,
+                # so try again using another connection
+                continue
             return None
-        user_attributes = [reader[0].entry_dn]
-        for attribute in attributes:
-            value = getattr(reader[0], attribute, None)
-            if value:
-                user_attributes.append(value[0])
-            else:
-                user_attributes.append(None)
-        return user_attributes
-    except ldap3.core.exceptions.LDAPException:
+        _release_pooled_connection(connection, ldap_host, user_dn, password)
+        break
+    # search if uid matches exactly one user, not more
+    if len(reader) != 1:
         return None
+    user_attributes = [reader[0].entry_dn]
+    for attribute in attributes:
+        value = getattr(reader[0], attribute, None)
+        if value:
+            user_attributes.append(value[0])
+        else:
+            user_attributes.append(None)
+    return user_attributes
 
 
 def validate_user(user_ldap_uid: str, password: str) -> bool:
@@ -83,9 +170,11 @@ def validate_user(user_ldap_uid: str, password: str) -> bool:
     ldap_host = flask.current_app.config['LDAP_SERVER']
     # try to bind with user credentials if a matching user exists
     try:
-        server = ldap3.Server(ldap_host, use_ssl=True, get_info=ldap3.ALL)
-        connection = ldap3.Connection(server, user=user_dn, password=password, raise_exceptions=False)
-        return bool(connection.bind())
+        connection = ldap3.Connection(_get_server(ldap_host), user=user_dn, password=password, raise_exceptions=False)
+        try:
+            return bool(connection.bind())
+        finally:
+            connection.unbind()
     except ldap3.core.exceptions.LDAPException:
         return False
 
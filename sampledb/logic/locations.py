@@ -5,14 +5,25 @@ Logic module for locations and object location assignments.
 Locations are fully user-defined using a name and a description. Users with
 WRITE permissions for an object can assign it to a location with an optional
 description for details on where the object is stored.
+
+As the locations tree is needed for most pages showing locations, it is
+loaded using a single query and cached, so that ancestors and descendents of
+a location can be found without further queries. Creating or updating a
+location invalidates this cache.
+
+The current location assignment of each object is additionally stored in
+a separate table, so that objects can be filtered by their current location
+without querying the whole assignment history.
 """
 
 import collections
 import datetime
 import typing
 
+from sqlalchemy.dialects.postgresql import insert
+
 from .. import db
-from . import user_log, object_log, objects, users, errors
+from . import caching, user_log, object_log, objects, users, errors
 from .notifications import create_notification_for_being_assigned_as_responsible_user
 from ..models import locations
 
@@ -36,6 +47,9 @@ class Location(collections.namedtuple('Location', ['id', 'name', 'description',
         )
 
 
+_LocationsIndex = collections.namedtuple('_LocationsIndex', ['locations_map', 'child_location_ids'])
+
+
 class ObjectLocationAssignment(collections.namedtuple('ObjectLocationAssignment', ['id', 'object_id', 'location_id', 'user_id', 'description', 'utc_datetime', 'responsible_user_id', 'confirmed'])):
     """
     This class provides an immutable wrapper around models.locations.ObjectLocationAssignment.
@@ -85,6 +99,7 @@ def create_location(name: str, description: str, parent_location_id: typing.Opti
     )
     db.session.add(location)
     db.session.commit()
+    caching.invalidate('locations_tree', None)
     user_log.create_location(user_id, location.id)
     return Location.from_database(location)
 
@@ -111,16 +126,21 @@ def update_location(location_id: int, name: str, description: str, parent_locati
     if location is None:
         raise errors.LocationDoesNotExistError()
     if parent_location_id is not None:
-        if location_id == parent_location_id or location_id in _get_location_ancestors(parent_location_id):
+        # the cached tree might be outdated if the locations were changed by another process
+        caching.invalidate('locations_tree', None)
+        if location_id == parent_location_id or location_id in get_ancestor_location_ids(parent_location_id):
             raise errors.CyclicLocationError()
     location.name = name
     location.description = description
     location.parent_location_id = parent_location_id
     db.session.add(location)
     db.session.commit()
+    caching.invalidate('locations', location_id)
+    caching.invalidate('locations_tree', None)
     user_log.update_location(user_id, location.id)
 
 
+@caching.cached('locations')
 def get_location(location_id: int) -> Location:
     """
     Get a location.
@@ -154,41 +174,87 @@ def get_locations_tree() -> typing.Tuple[typing.Dict[int, Location], typing.Any]
 
     :return: the list of all locations and the locations tree
     """
-    locations = get_locations()
-    locations_map = {
-        location.id: location
-        for location in locations
-    }
+    locations_index = _get_locations_index()
     locations_tree = {}
-    locations_tree_helper = {None: locations_tree}
-    unvisited_locations = locations
-    while unvisited_locations:
-        locations = unvisited_locations
-        unvisited_locations = []
-        for location in locations:
-            if location.parent_location_id in locations_tree_helper:
-                locations_subtree = locations_tree_helper[location.parent_location_id]
-                locations_subtree[location.id] = {}
-                locations_tree_helper[location.id] = locations_subtree[location.id]
-            else:
-                unvisited_locations.append(location)
-    return locations_map, locations_tree
+    unvisited_location_ids_and_subtrees = [(None, locations_tree)]
+    while unvisited_location_ids_and_subtrees:
+        location_id, locations_subtree = unvisited_location_ids_and_subtrees.pop()
+        for child_location_id in locations_index.child_location_ids.get(location_id, ()):
+            locations_subtree[child_location_id] = {}
+            unvisited_location_ids_and_subtrees.append((child_location_id, locations_subtree[child_location_id]))
+    return dict(locations_index.locations_map), locations_tree
 
 
-def _get_location_ancestors(location_id: int) -> typing.List[int]:
+def get_ancestor_location_ids(location_id: int) -> typing.List[int]:
     """
-    Get the list of all ancestor location IDs.
+    Get the list of all ancestor location IDs, starting with the parent
+    location ID.
 
     :param location_id: the ID of an existing location
     :return: the list of all ancestor location IDs
     :raise errors.LocationDoesNotExistError: when no location with the given
         location ID exists
     """
+    locations_map = _get_existing_location_index(location_id).locations_map
     ancestor_location_ids = []
+    location_id = locations_map[location_id].parent_location_id
     while location_id is not None:
         ancestor_location_ids.append(location_id)
-        location_id = get_location(location_id).parent_location_id
-    return ancestor_location_ids[1:]
+        location_id = locations_map[location_id].parent_location_id
+    return ancestor_location_ids
+
+
+def get_descendent_location_ids(location_id: int) -> typing.Set[int]:
+    """
+    Get the set of all descendent location IDs.
+
+    :param location_id: the ID of an existing location
+    :return: the set of all descendent location IDs
+    :raise errors.LocationDoesNotExistError: when no location with the given
+        location ID exists
+    """
+    child_location_ids = _get_existing_location_index(location_id).child_location_ids
+    descendent_location_ids = set()
+    unvisited_location_ids = [location_id]
+    while unvisited_location_ids:
+        for child_location_id in child_location_ids.get(unvisited_location_ids.pop(), ()):
+            descendent_location_ids.add(child_location_id)
+            unvisited_location_ids.append(child_location_id)
+    return descendent_location_ids
+
+
+@caching.cached_value('locations_tree')
+def _get_locations_index() -> _LocationsIndex:
+    """
+    Get all locations and the IDs of their child locations.
+
+    :return: the locations map and a dict mapping location IDs (or None for
+        top-level locations) to the IDs of their child locations
+    """
+    locations_map = {}
+    child_location_ids = {}
+    for location in locations.Location.query.order_by(locations.Location.id).all():
+        locations_map[location.id] = Location.from_database(location)
+        child_location_ids.setdefault(location.parent_location_id, []).append(location.id)
+    return _LocationsIndex(locations_map, child_location_ids)
+
+
+def _get_existing_location_index(location_id: int) -> _LocationsIndex:
+    """
+    Get the locations index, ensuring that it contains a location.
+
+    :param location_id: the ID of an existing location
+    :return: the locations index
+    :raise errors.LocationDoesNotExistError: when no location with the given
+        location ID exists
+    """
+    locations_index = _get_locations_index()
+    if location_id not in locations_index.locations_map:
+        # ensure the location exists, as it might have been created by another process
+        get_location(location_id)
+        caching.invalidate('locations_tree', None)
+        locations_index = _get_locations_index()
+    return locations_index
 
 
 def assign_location_to_object(object_id: int, location_id: typing.Optional[int], responsible_user_id: typing.Optional[int], user_id: int, description: str) -> None:
@@ -224,6 +290,20 @@ def assign_location_to_object(object_id: int, location_id: typing.Optional[int],
         confirmed=(user_id == responsible_user_id)
     )
     db.session.add(object_location_assignment)
+    db.session.flush()
+    db.session.execute(
+        insert(locations.CurrentObjectLocationAssignment.__table__).values(
+            object_id=object_id,
+            object_location_assignment_id=object_location_assignment.id,
+            location_id=location_id
+        ).on_conflict_do_update(
+            index_elements=[locations.CurrentObjectLocationAssignment.object_id],
+            set_={
+                'object_location_assignment_id': object_location_assignment.id,
+                'location_id': location_id
+            }
+        )
+    )
     db.session.commit()
     if responsible_user_id is not None:
         users.get_user(responsible_user_id)
@@ -262,7 +342,12 @@ def get_current_object_location_assignment(object_id: int) -> typing.Optional[Ob
     """
     # ensure the object exists
     objects.get_object(object_id)
-    object_location_assignment = locations.ObjectLocationAssignment.query.filter_by(object_id=object_id).order_by(locations.ObjectLocationAssignment.utc_datetime.desc()).first()
+    object_location_assignment = locations.ObjectLocationAssignment.query.join(
+        locations.CurrentObjectLocationAssignment,
+        locations.CurrentObjectLocationAssignment.object_location_assignment_id == locations.ObjectLocationAssignment.id
+    ).filter(
+        locations.CurrentObjectLocationAssignment.object_id == object_id
+    ).first()
     if object_location_assignment is not None:
         object_location_assignment = ObjectLocationAssignment.from_database(object_location_assignment)
     return object_location_assignment
@@ -284,24 +369,45 @@ def get_object_location_assignment(object_location_assignment_id: int) -> Object
     return object_location_assignment
 
 
-def get_object_ids_at_location(location_id: int) -> typing.Set[int]:
+def get_object_ids_at_location(location_id: int, include_sublocations: bool = False) -> typing.Set[int]:
     """
     Get a list of all objects currently assigned to a location.
 
     :param location_id: the ID of an existing location
+    :param include_sublocations: whether or not objects currently assigned
+        to any descendent location should be included as well
     :return: the list of object IDs assigned to the location
     :raise errors.LocationDoesNotExistError: when no location with the given
         location ID exists
     """
     # ensure the location exists
     get_location(location_id)
-    object_location_assignments = locations.ObjectLocationAssignment.query.filter_by(location_id=location_id).all()
-    object_ids = set()
-    for object_location_assignment in object_location_assignments:
-        object_id = object_location_assignment.object_id
-        if get_current_object_location_assignment(object_id).location_id == location_id:
-            object_ids.add(object_id)
-    return object_ids
+    if include_sublocations:
+        location_ids = db.session.query(
+            locations.Location.id
+        ).filter(
+            locations.Location.id == location_id
+        ).cte('location_ids', recursive=True)
+        location_ids = location_ids.union_all(
+            db.session.query(
+                locations.Location.id
+            ).join(
+                location_ids,
+                locations.Location.parent_location_id == location_ids.c.id
+            )
+        )
+        location_filter = locations.CurrentObjectLocationAssignment.location_id.in_(db.session.query(location_ids.c.id))
+    else:
+        location_filter = locations.CurrentObjectLocationAssignment.location_id == location_id
+    object_ids = db.session.query(
+        locations.CurrentObjectLocationAssignment.object_id
+    ).filter(
+        location_filter
+    ).all()
+    return {
+        object_id
+        for object_id, in object_ids
+    }
 
 
 def confirm_object_responsibility(object_location_assignment_id: int) -> None:
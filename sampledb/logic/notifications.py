@@ -4,6 +4,7 @@
 """
 
 import collections
+import contextlib
 import datetime
 import typing
 import smtplib
@@ -11,9 +12,10 @@ import smtplib
 import flask
 import flask_mail
 
-from . import errors, users, objects, groups, projects
+from . import errors, users, objects, groups, projects, jobs
 from .. import logic
-from ..models import notifications
+from ..config import is_enabled
+from ..models import notifications, JobType
 from ..models.notifications import NotificationType, NotificationMode
 from .. import db
 from .. import mail
@@ -135,7 +137,41 @@ def _create_notification(type: NotificationType, user_id: int, data: typing.Dict
     if notification_mode == NotificationMode.WEBAPP:
         _store_notification(type, user_id, data)
     if notification_mode == NotificationMode.EMAIL:
-        _send_notification(type, user_id, data)
+        _send_notifications(type, [(user_id, data)])
+
+
+def _create_notifications(type: NotificationType, user_ids_and_data: typing.Sequence[typing.Tuple[int, typing.Dict[str, typing.Any]]]) -> None:
+    """
+    Create new notifications of the same type for several existing users and
+    handle them according to the users' settings.
+
+    The notifications are stored using a single insert and emails are sent
+    as a batch.
+
+    :param type: the type of the new notifications
+    :param user_ids_and_data: a list of (user ID, data) tuples
+    """
+    notification_modes = _get_notification_modes_for_type_and_users(type, {user_id for user_id, data in user_ids_and_data})
+    utc_datetime = datetime.datetime.utcnow()
+    stored_notifications = [
+        {
+            'type': type,
+            'user_id': user_id,
+            'data': data,
+            'was_read': False,
+            'utc_datetime': utc_datetime
+        }
+        for user_id, data in user_ids_and_data
+        if notification_modes[user_id] == NotificationMode.WEBAPP
+    ]
+    if stored_notifications:
+        db.session.execute(notifications.Notification.__table__.insert(), stored_notifications)
+        db.session.commit()
+    _send_notifications(type, [
+        (user_id, data)
+        for user_id, data in user_ids_and_data
+        if notification_modes[user_id] == NotificationMode.EMAIL
+    ])
 
 
 def _store_notification(type: NotificationType, user_id: int, data: typing.Dict[str, typing.Any]) -> None:
@@ -160,13 +196,54 @@ def _store_notification(type: NotificationType, user_id: int, data: typing.Dict[
     db.session.commit()
 
 
-def _send_notification(type: NotificationType, user_id: int, data: typing.Dict[str, typing.Any]) -> None:
+def _send_notifications(type: NotificationType, user_ids_and_data: typing.Sequence[typing.Tuple[int, typing.Dict[str, typing.Any]]]) -> None:
+    """
+    Send new notifications by email.
+
+    If SEND_EMAILS_USING_JOBS is enabled, a job is created for each email
+    instead, so that the emails are sent by the process_jobs script.
+
+    :param type: the type of the new notifications
+    :param user_ids_and_data: a list of (user ID, data) tuples
+    :raise errors.UserDoesNotExistError: when no user with one of the given
+        user IDs exists and the emails are sent directly
+    """
+    if not user_ids_and_data:
+        return
+    if is_enabled(flask.current_app.config['SEND_EMAILS_USING_JOBS']):
+        # the URLs in the emails are generated using the URL of the current
+        # request, if there is one
+        base_url = flask.request.url_root if flask.has_request_context() else None
+        jobs.create_jobs(JobType.SEND_NOTIFICATION_EMAIL, [
+            {
+                'type': type.name,
+                'user_id': user_id,
+                'data': data,
+                'base_url': base_url
+            }
+            for user_id, data in user_ids_and_data
+        ])
+        return
+    messages = [
+        _create_notification_email(type, user_id, data)
+        for user_id, data in user_ids_and_data
+    ]
+    with mail.connect() as connection:
+        for message in messages:
+            try:
+                connection.send(message)
+            except smtplib.SMTPRecipientsRefused:
+                pass
+
+
+def _create_notification_email(type: NotificationType, user_id: int, data: typing.Dict[str, typing.Any]) -> flask_mail.Message:
     """
-    Send a new notification by email.
+    Create the email for a new notification.
 
     :param type: the type of the new notification
     :param user_id: the ID of an existing user
     :param data: the data for the new notification
+    :return: the email message
     :raise errors.UserDoesNotExistError: when no user with the given user ID
         exists
     """
@@ -180,16 +257,57 @@ def _send_notification(type: NotificationType, user_id: int, data: typing.Dict[s
     text = flask.render_template(template_path + '.txt', user=user, type=type, data=data, get_user=users.get_user, get_group=groups.get_group, get_project=projects.get_project)
     while '\n\n\n' in text:
         text = text.replace('\n\n\n', '\n\n')
-    try:
-        mail.send(flask_mail.Message(
-            subject,
-            sender=flask.current_app.config['MAIL_SENDER'],
-            recipients=[user.email],
-            body=text,
-            html=html
-        ))
-    except smtplib.SMTPRecipientsRefused:
-        pass
+    return flask_mail.Message(
+        subject,
+        sender=flask.current_app.config['MAIL_SENDER'],
+        recipients=[user.email],
+        body=text,
+        html=html
+    )
+
+
+@jobs.job_handler(JobType.SEND_NOTIFICATION_EMAIL)
+def _send_notification_emails(notification_emails: typing.Sequence[typing.Dict[str, typing.Any]]) -> typing.List[typing.Optional[str]]:
+    """
+    Send the notification emails of a batch of jobs using a single SMTP
+    connection.
+
+    Failures are returned instead of raised, so that the job queue can retry
+    the failed emails. Emails to removed users or refused recipients are not
+    retried.
+
+    :param notification_emails: a list of dicts containing the notification
+        type name, user ID and data, and the base URL for generating URLs
+    :return: an error message or None for each email
+    """
+    error_messages = []
+    with mail.connect() as connection:
+        for notification_email in notification_emails:
+            base_url = notification_email['base_url']
+            if base_url is not None and not flask.has_request_context():
+                request_context = flask.current_app.test_request_context(base_url=base_url)
+            else:
+                request_context = contextlib.ExitStack()
+            try:
+                with request_context:
+                    message = _create_notification_email(
+                        type=NotificationType[notification_email['type']],
+                        user_id=notification_email['user_id'],
+                        data=notification_email['data']
+                    )
+            except errors.UserDoesNotExistError:
+                # the user might have been removed since the job was created
+                error_messages.append(None)
+                continue
+            try:
+                connection.send(message)
+            except smtplib.SMTPRecipientsRefused:
+                error_messages.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                error_messages.append(str(e) or type(e).__name__)
+            else:
+                error_messages.append(None)
+    return error_messages
 
 
 def mark_notification_as_read(notification_id: int) -> None:
@@ -305,6 +423,35 @@ def get_notification_mode_for_type(type: NotificationType, user_id: int) -> Noti
     return NotificationMode.WEBAPP
 
 
+def _get_notification_modes_for_type_and_users(type: NotificationType, user_ids: typing.Collection[int]) -> typing.Dict[int, NotificationMode]:
+    """
+    Get the notification mode for several users for a specific notification
+    type, using a single query.
+
+    :param type: the notification type to get the modes for
+    :param user_ids: the IDs of existing users
+    :return: a dict mapping user IDs to notification modes
+    """
+    notification_modes = {
+        user_id: NotificationMode.WEBAPP
+        for user_id in user_ids
+    }
+    if not notification_modes:
+        return notification_modes
+    notification_modes_for_types = notifications.NotificationModeForType.query.filter(
+        notifications.NotificationModeForType.user_id.in_(user_ids),
+        db.or_(
+            notifications.NotificationModeForType.type == type,
+            notifications.NotificationModeForType.type.is_(None)
+        )
+    ).all()
+    # modes for the specific type take precedence over those for all types
+    notification_modes_for_types.sort(key=lambda notification_mode_for_type: notification_mode_for_type.type is not None)
+    for notification_mode_for_type in notification_modes_for_types:
+        notification_modes[notification_mode_for_type.user_id] = notification_mode_for_type.mode
+    return notification_modes
+
+
 def get_notification_modes(user_id: int) -> typing.Dict[typing.Optional[NotificationType], NotificationMode]:
     """
     Get the notification modes for a user.
@@ -470,8 +617,17 @@ def create_announcement_notification_for_all_users(message: str, html: typing.Op
     :param message: the message for the notification
     :param html: a HTML-formatted version of the message (optional)
     """
-    for user in users.get_users():
-        create_announcement_notification(user.id, message, html)
+    data = {
+        'message': message,
+        'html': html
+    }
+    _create_notifications(
+        type=NotificationType.ANNOUNCEMENT,
+        user_ids_and_data=[
+            (user.id, data)
+            for user in users.get_users()
+        ]
+    )
 
 
 def create_notification_for_having_received_an_objects_permissions_request(user_id: int, object_id: int, requester_id: int) -> None:
@@ -15,21 +15,27 @@ __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
 def get_object_log_entries(object_id: int, user_id: typing.Optional[int] = None) -> typing.List[ObjectLogEntry]:
     object_log_entries = ObjectLogEntry.query.filter_by(object_id=object_id).order_by(db.desc(ObjectLogEntry.utc_datetime)).all()
+    using_object_types = {
+        ObjectLogEntryType.USE_OBJECT_IN_MEASUREMENT: 'measurement',
+        ObjectLogEntryType.USE_OBJECT_IN_SAMPLE_CREATION: 'sample'
+    }
+    if user_id is not None:
+        objects_permissions = object_permissions.get_user_objects_permissions(
+            user_id=user_id,
+            object_ids=[
+                object_log_entry.data[using_object_types[object_log_entry.type] + '_id']
+                for object_log_entry in object_log_entries
+                if object_log_entry.type in using_object_types
+            ]
+        )
     processed_object_log_entries = []
     for object_log_entry in object_log_entries:
-        use_object_entry = False
-        using_object_type = ''
-        if object_log_entry.type == ObjectLogEntryType.USE_OBJECT_IN_MEASUREMENT:
-            use_object_entry = True
-            using_object_type = 'measurement'
-        elif object_log_entry.type == ObjectLogEntryType.USE_OBJECT_IN_SAMPLE_CREATION:
-            use_object_entry = True
-            using_object_type = 'sample'
-        if use_object_entry:
+        if object_log_entry.type in using_object_types:
+            using_object_type = using_object_types[object_log_entry.type]
             using_object_id = using_object_type + '_id'
             object_id = object_log_entry.data[using_object_id]
             object = objects.get_object(object_id=object_id)
-            if user_id is not None and Permissions.READ not in object_permissions.get_user_object_permissions(object_id=object_id, user_id=user_id):
+            if user_id is not None and Permissions.READ not in objects_permissions[object_id]:
                 # Clear the using object ID, the user may only know that the
                 # object was used for some other object, but not for which
                 object_log_entry.data[using_object_id] = None
@@ -52,6 +58,24 @@ def _store_new_log_entry(type: ObjectLogEntryType, object_id: int, user_id: int,
     db.session.commit()
 
 
+def _store_new_log_entries(type: ObjectLogEntryType, user_id: int, data_by_object_id: typing.Sequence[typing.Tuple[int, dict]]):
+    # this function does not commit the session, so that the log entries can
+    # be stored in the same transaction as the changes they describe
+    if not data_by_object_id:
+        return
+    utc_datetime = datetime.datetime.utcnow()
+    db.session.execute(ObjectLogEntry.__table__.insert().values([
+        {
+            'type': type,
+            'object_id': object_id,
+            'user_id': user_id,
+            'data': data,
+            'utc_datetime': utc_datetime
+        }
+        for object_id, data in data_by_object_id
+    ]))
+
+
 def create_object(user_id: int, object_id: int, previous_object_id: typing.Optional[int] = None):
     data = {}
     if previous_object_id:
@@ -75,6 +99,26 @@ def edit_object(user_id: int, object_id: int, version_id: int):
     )
 
 
+def edit_objects(user_id: int, object_and_version_ids: typing.Sequence[typing.Tuple[int, int]]):
+    """
+    Create log entries for several edited objects.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction updating the objects.
+
+    :param user_id: the ID of the user who edited the objects
+    :param object_and_version_ids: a list of (object ID, version ID) tuples
+    """
+    _store_new_log_entries(
+        type=ObjectLogEntryType.EDIT_OBJECT,
+        user_id=user_id,
+        data_by_object_id=[
+            (object_id, {'version_id': version_id})
+            for object_id, version_id in object_and_version_ids
+        ]
+    )
+
+
 def restore_object_version(user_id: int, object_id: int, version_id: int, restored_version_id: int):
     _store_new_log_entry(
         type=ObjectLogEntryType.RESTORE_OBJECT_VERSION,
@@ -142,6 +186,67 @@ def create_batch(user_id: int, object_id: int, batch_object_ids: typing.List[int
     )
 
 
+def create_batch_for_objects(user_id: int, batch_object_ids: typing.List[int]):
+    """
+    Create the log entries for all objects of a batch.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction creating the objects.
+
+    :param user_id: the ID of the user who created the batch
+    :param batch_object_ids: the IDs of the objects in the batch
+    """
+    _store_new_log_entries(
+        type=ObjectLogEntryType.CREATE_BATCH,
+        user_id=user_id,
+        data_by_object_id=[
+            (object_id, {'object_ids': batch_object_ids})
+            for object_id in batch_object_ids
+        ]
+    )
+
+
+def use_objects_in_measurements(user_id: int, object_and_measurement_ids: typing.Sequence[typing.Tuple[int, int]]):
+    """
+    Create log entries for objects being used in measurements.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction creating the measurements.
+
+    :param user_id: the ID of the user who created the measurements
+    :param object_and_measurement_ids: a list of (object ID, measurement ID)
+        tuples
+    """
+    _store_new_log_entries(
+        type=ObjectLogEntryType.USE_OBJECT_IN_MEASUREMENT,
+        user_id=user_id,
+        data_by_object_id=[
+            (object_id, {'measurement_id': measurement_id})
+            for object_id, measurement_id in object_and_measurement_ids
+        ]
+    )
+
+
+def use_objects_in_samples(user_id: int, object_and_sample_ids: typing.Sequence[typing.Tuple[int, int]]):
+    """
+    Create log entries for objects being used in creating samples.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction creating the samples.
+
+    :param user_id: the ID of the user who created the samples
+    :param object_and_sample_ids: a list of (object ID, sample ID) tuples
+    """
+    _store_new_log_entries(
+        type=ObjectLogEntryType.USE_OBJECT_IN_SAMPLE_CREATION,
+        user_id=user_id,
+        data_by_object_id=[
+            (object_id, {'sample_id': sample_id})
+            for object_id, sample_id in object_and_sample_ids
+        ]
+    )
+
+
 def assign_location(user_id: int, object_id: int, object_location_assignment_id: int):
     _store_new_log_entry(
         type=ObjectLogEntryType.ASSIGN_LOCATION,
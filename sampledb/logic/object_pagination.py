@@ -0,0 +1,145 @@
+# coding: utf-8
+"""
+Logic module for cursor-based pagination of object lists
+
+Using an offset to paginate objects requires the database to skip all
+objects before the requested page, and counting all objects for every page
+requires it to query the whole filtered list. Instead, a cursor contains the
+sorting key and the object ID of the last object on the previous page, so
+that the next page can be queried directly.
+
+As the total number of objects is not known when using cursors, it can be
+queried separately and is cached for a short time, so that it is only an
+estimate of the current number of objects.
+"""
+
+import base64
+import collections
+import datetime
+import json
+import threading
+import time
+import typing
+
+import flask
+
+from . import errors
+from .object_permissions import get_num_objects_with_permissions
+from ..models import ActionType, Permissions
+
+# maximum number of cached object counts
+MAX_NUM_CACHED_OBJECT_COUNTS = 1000
+
+_object_counts = collections.OrderedDict()
+_object_counts_lock = threading.Lock()
+
+
+def encode_cursor(values: typing.Sequence[typing.Any]) -> str:
+    """
+    Encode the values of a cursor as URL-safe string.
+
+    :param values: a sequence of JSON serializable values or datetimes
+    :return: the encoded cursor
+    """
+    def default(value):
+        if isinstance(value, datetime.datetime):
+            return {
+                '_type': 'datetime',
+                'utc_datetime': value.strftime('%Y-%m-%d %H:%M:%S.%f')
+            }
+        raise TypeError()
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=default, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> typing.List[typing.Any]:
+    """
+    Decode a cursor created using encode_cursor.
+
+    :param cursor: the encoded cursor
+    :return: the list of values
+    :raise errors.InvalidCursorError: when the cursor could not be decoded
+    """
+    def object_hook(value):
+        if value.get('_type') == 'datetime' and isinstance(value.get('utc_datetime'), str):
+            return datetime.datetime.strptime(value['utc_datetime'], '%Y-%m-%d %H:%M:%S.%f')
+        raise ValueError()
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'), object_hook=object_hook)
+    except Exception:
+        raise errors.InvalidCursorError()
+    if not isinstance(values, list):
+        raise errors.InvalidCursorError()
+    return values
+
+
+def get_num_objects_estimate(
+        user_id: int,
+        permissions: Permissions,
+        cache_key: typing.Hashable,
+        filter_func: typing.Callable = lambda data: True,
+        action_id: typing.Optional[int] = None,
+        action_type: typing.Optional[ActionType] = None,
+        project_id: typing.Optional[int] = None,
+        location_id: typing.Optional[int] = None,
+        related_user_id: typing.Optional[int] = None,
+        doi: typing.Optional[str] = None
+) -> int:
+    """
+    Return the number of objects a user has the given permissions for, using
+    a cached value if one exists.
+
+    Cached values are used for OBJECT_COUNT_CACHE_TIMEOUT seconds, so the
+    returned number may differ from the current number of objects.
+
+    :param user_id: the ID of an existing user
+    :param permissions: the minimum permissions the user needs
+    :param cache_key: a hashable value identifying the filter function, e.g.
+        the search query it was generated from
+    :param filter_func: a lambda that may return an SQLAlchemy filter when
+        given the object table's data column
+    :param action_id: the ID of an action to limit the objects to (optional)
+    :param action_type: the type of actions to limit the objects to (optional)
+    :param project_id: the ID of a project to limit the objects to those
+        the project has the given permissions for (optional)
+    :param location_id: the ID of a location to limit the objects to those
+        currently assigned to it (optional)
+    :param related_user_id: the ID of a user to limit the objects to those
+        related to the user according to the user log (optional)
+    :param doi: the simplified DOI of a publication to limit the objects to
+        those linked to it (optional)
+    :return: the (estimated) number of objects
+    """
+    timeout = float(flask.current_app.config['OBJECT_COUNT_CACHE_TIMEOUT'])
+    key = (user_id, permissions, cache_key, action_id, action_type, project_id, location_id, related_user_id, doi)
+    now = time.monotonic()
+    with _object_counts_lock:
+        if key in _object_counts:
+            cached_time, num_objects = _object_counts[key]
+            if now - cached_time < timeout:
+                return num_objects
+            del _object_counts[key]
+    num_objects = get_num_objects_with_permissions(
+        user_id=user_id,
+        permissions=permissions,
+        filter_func=filter_func,
+        action_id=action_id,
+        action_type=action_type,
+        project_id=project_id,
+        location_id=location_id,
+        related_user_id=related_user_id,
+        doi=doi
+    )
+    if timeout > 0:
+        with _object_counts_lock:
+            _object_counts[key] = (now, num_objects)
+            while len(_object_counts) > MAX_NUM_CACHED_OBJECT_COUNTS:
+                _object_counts.popitem(last=False)
+    return num_objects
+
+
+def clear_num_objects_estimates() -> None:
+    """
+    Clear all cached object counts.
+    """
+    with _object_counts_lock:
+        _object_counts.clear()
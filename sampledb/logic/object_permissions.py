@@ -23,11 +23,13 @@ import sqlalchemy
 from .. import db
 from . import errors
 from . import actions
-from .groups import get_user_groups, get_group_member_ids
+from .effective_object_permissions import update_effective_permissions_for_objects
+from .groups import get_group_member_ids
 from .instruments import get_instrument
 from .notifications import create_notification_for_having_received_an_objects_permissions_request
 from . import objects
 from ..models import Permissions, UserObjectPermissions, GroupObjectPermissions, ProjectObjectPermissions, PublicObjects, ActionType, Action, Object, DefaultUserPermissions, DefaultGroupPermissions, DefaultProjectPermissions, DefaultPublicPermissions
+from ..models.groups import association_table as user_group_memberships
 from . import projects
 from .users import get_user
 
@@ -112,9 +114,18 @@ def get_user_object_permissions(object_id: int, user_id: int, include_instrument
     if include_instrument_responsible_users and include_groups and include_projects:
         stmt = db.text("""
         SELECT
-        MAX(permissions_int)
-        FROM user_object_permissions_by_all
-        WHERE (user_id = :user_id OR user_id IS NULL) AND object_id = :object_id
+        GREATEST(
+            (
+                SELECT permissions_int
+                FROM effective_user_object_permissions
+                WHERE user_id = :user_id AND object_id = :object_id
+            ),
+            (
+                SELECT 1
+                FROM public_objects
+                WHERE object_id = :object_id
+            )
+        )
         """)
         permissions_int = db.engine.execute(stmt, {
             'user_id': user_id,
@@ -148,21 +159,31 @@ def get_user_object_permissions(object_id: int, user_id: int, include_instrument
     if Permissions.GRANT in permissions:
         return permissions
     if include_groups:
-        for group in get_user_groups(user_id):
-            group_object_permissions = GroupObjectPermissions.query.filter_by(object_id=object_id, group_id=group.id).first()
-            if group_object_permissions is not None and permissions in group_object_permissions.permissions:
-                permissions = group_object_permissions.permissions
+        group_object_permissions = GroupObjectPermissions.query.join(
+            user_group_memberships,
+            user_group_memberships.c.group_id == GroupObjectPermissions.group_id
+        ).filter(
+            GroupObjectPermissions.object_id == object_id,
+            user_group_memberships.c.user_id == user_id
+        ).all()
+        for single_group_object_permissions in group_object_permissions:
+            if permissions in single_group_object_permissions.permissions:
+                permissions = single_group_object_permissions.permissions
     if include_readonly and user.is_readonly and Permissions.READ in permissions:
         return Permissions.READ
     if Permissions.GRANT in permissions:
         return permissions
     if include_projects:
-        for user_project in projects.get_user_projects(user_id, include_groups=include_groups):
-            user_project_permissions = projects.get_user_project_permissions(user_project.id, user_id, include_groups=include_groups)
-            if user_project_permissions not in permissions:
-                project_object_permissions = ProjectObjectPermissions.query.filter_by(object_id=object_id, project_id=user_project.id).first()
-                if project_object_permissions is not None:
-                    permissions = min(user_project_permissions, project_object_permissions.permissions)
+        user_project_ids_and_permissions = projects.get_user_project_ids_and_permissions(user_id, include_groups=include_groups)
+        if user_project_ids_and_permissions:
+            project_object_permissions = ProjectObjectPermissions.query.filter(
+                ProjectObjectPermissions.object_id == object_id,
+                ProjectObjectPermissions.project_id.in_(user_project_ids_and_permissions.keys())
+            ).order_by(ProjectObjectPermissions.project_id).all()
+            for single_project_object_permissions in project_object_permissions:
+                user_project_permissions = user_project_ids_and_permissions[single_project_object_permissions.project_id]
+                if user_project_permissions not in permissions:
+                    permissions = min(user_project_permissions, single_project_object_permissions.permissions)
     if include_readonly and user.is_readonly and Permissions.READ in permissions:
         return Permissions.READ
     if Permissions.READ in permissions:
@@ -174,6 +195,50 @@ def get_user_object_permissions(object_id: int, user_id: int, include_instrument
     return Permissions.NONE
 
 
+def get_user_objects_permissions(user_id: int, object_ids: typing.Iterable[int], include_readonly: bool = True) -> typing.Dict[int, Permissions]:
+    """
+    Get the permissions of a user for several objects using a single query.
+
+    Object IDs that do not belong to an existing object are mapped to
+    Permissions.NONE.
+
+    :param user_id: the ID of an existing user
+    :param object_ids: the IDs of the objects
+    :param include_readonly: whether or not to limit the permissions to READ
+        if the user is readonly
+    :return: a dict mapping each object ID to the user's permissions
+    :raise errors.UserDoesNotExistError: when no user with the given user ID
+        exists
+    """
+    user = get_user(user_id)
+    object_ids = list(set(object_ids))
+    if not object_ids:
+        return {}
+    stmt = db.text("""
+    SELECT
+    ids.object_id,
+    GREATEST(
+        effective_user_object_permissions.permissions_int,
+        CASE WHEN public_objects.object_id IS NULL THEN 0 ELSE 1 END
+    )
+    FROM UNNEST(CAST(:object_ids AS INTEGER[])) AS ids(object_id)
+    LEFT OUTER JOIN effective_user_object_permissions
+    ON effective_user_object_permissions.object_id = ids.object_id AND effective_user_object_permissions.user_id = :user_id
+    LEFT OUTER JOIN public_objects
+    ON public_objects.object_id = ids.object_id
+    """)
+    objects_permissions = {}
+    for object_id, permissions_int in db.engine.execute(stmt, {
+        'user_id': user_id,
+        'object_ids': object_ids
+    }).fetchall():
+        permissions = Permissions(min(max(permissions_int or 0, 0), 3))
+        if include_readonly and user.is_readonly:
+            permissions = min(permissions, Permissions.READ)
+        objects_permissions[object_id] = permissions
+    return objects_permissions
+
+
 def set_user_object_permissions(object_id: int, user_id: int, permissions: Permissions):
     assert user_id is not None
     if permissions == Permissions.NONE:
@@ -185,6 +250,7 @@ def set_user_object_permissions(object_id: int, user_id: int, permissions: Permi
         else:
             user_object_permissions.permissions = permissions
         db.session.add(user_object_permissions)
+    update_effective_permissions_for_objects([object_id])
     db.session.commit()
 
 
@@ -199,6 +265,7 @@ def set_group_object_permissions(object_id: int, group_id: int, permissions: Per
         else:
             group_object_permissions.permissions = permissions
         db.session.add(group_object_permissions)
+    update_effective_permissions_for_objects([object_id])
     db.session.commit()
 
 
@@ -225,6 +292,7 @@ def set_project_object_permissions(object_id: int, project_id: int, permissions:
         else:
             project_object_permissions.permissions = permissions
         db.session.add(project_object_permissions)
+    update_effective_permissions_for_objects([object_id])
     db.session.commit()
 
 
@@ -242,19 +310,82 @@ def set_initial_permissions(obj):
     set_object_public(object_id=obj.object_id, is_public=should_be_public)
 
 
-def get_objects_with_permissions(
+def set_initial_permissions_for_objects(objects: typing.Sequence[Object]) -> None:
+    """
+    Set the initial permissions for several objects created by the same user,
+    using the user's default permissions.
+
+    The permissions are inserted with a single statement per table, and this
+    function does not commit the session, so that it can be used as part of
+    the transaction creating the objects.
+
+    :param objects: the newly created objects, which must have been created
+        by the same user
+    """
+    if not objects:
+        return
+    creator_id = objects[0].user_id
+    assert all(obj.user_id == creator_id for obj in objects)
+    object_ids = [obj.object_id for obj in objects]
+    for model, id_column_name, default_permissions in [
+        (UserObjectPermissions, 'user_id', get_default_permissions_for_users(creator_id=creator_id)),
+        (GroupObjectPermissions, 'group_id', get_default_permissions_for_groups(creator_id=creator_id)),
+        (ProjectObjectPermissions, 'project_id', get_default_permissions_for_projects(creator_id=creator_id))
+    ]:
+        values = [
+            {
+                'object_id': object_id,
+                id_column_name: id,
+                'permissions': permissions
+            }
+            for id, permissions in default_permissions.items()
+            if permissions != Permissions.NONE
+            for object_id in object_ids
+        ]
+        if values:
+            db.session.execute(model.__table__.insert().values(values))
+    if default_is_public(creator_id=creator_id):
+        db.session.execute(PublicObjects.__table__.insert().values([
+            {'object_id': object_id}
+            for object_id in object_ids
+        ]))
+    update_effective_permissions_for_objects(object_ids)
+
+
+def _get_objects_with_permissions_query(
         user_id: int,
         permissions: Permissions,
-        filter_func: typing.Callable = lambda data: True,
-        sorting_func: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
-        limit: typing.Optional[int] = None,
-        offset: typing.Optional[int] = None,
         action_id: typing.Optional[int] = None,
         action_type: typing.Optional[ActionType] = None,
         project_id: typing.Optional[int] = None,
         object_ids: typing.Optional[typing.Sequence[int]] = None,
-        **kwargs
-) -> typing.List[Object]:
+        location_id: typing.Optional[int] = None,
+        related_user_id: typing.Optional[int] = None,
+        doi: typing.Optional[str] = None
+) -> typing.Tuple[typing.Any, typing.Any, typing.Dict[str, typing.Any]]:
+    """
+    Create the action filter, table and parameters for querying all objects
+    a user has the given permissions for.
+
+    All other filters are applied in the query as well, so that the objects
+    can be counted and paginated by the database.
+
+    :param user_id: the ID of an existing user
+    :param permissions: the minimum permissions the user needs
+    :param action_id: the ID of an action to limit the objects to (optional)
+    :param action_type: the type of actions to limit the objects to (optional)
+    :param project_id: the ID of a project to limit the objects to those
+        the project has the given permissions for (optional)
+    :param object_ids: the IDs of the objects to limit the objects to
+        (optional)
+    :param location_id: the ID of a location to limit the objects to those
+        currently assigned to it (optional)
+    :param related_user_id: the ID of a user to limit the objects to those
+        related to the user according to the user log (optional)
+    :param doi: the simplified DOI of a publication to limit the objects to
+        those linked to it (optional)
+    :return: the action filter, the table and the query parameters
+    """
     if action_type is not None and action_id is not None:
         action_filter = db.and_(Action.type == action_type, Action.id == action_id)
     elif action_type is not None:
@@ -264,50 +395,198 @@ def get_objects_with_permissions(
     else:
         action_filter = None
 
+    parameters = {
+        'min_permissions_int': permissions.value,
+        'user_id': user_id
+    }
+    joins = []
+    filters = []
+    if location_id is not None:
+        joins.append("INNER JOIN current_object_location_assignments AS l ON l.object_id = o.object_id AND l.location_id = :location_id")
+        parameters['location_id'] = location_id
+    if project_id is not None:
+        joins.append("INNER JOIN project_object_permissions AS pp ON pp.object_id = o.object_id AND pp.project_id = :project_id AND pp.permissions::text = ANY(:project_permissions)")
+        parameters['project_id'] = project_id
+        parameters['project_permissions'] = [
+            project_permissions.name
+            for project_permissions in Permissions
+            if project_permissions != Permissions.NONE and permissions in project_permissions
+        ]
+    if object_ids is not None:
+        filters.append("o.object_id = ANY(:object_ids)")
+        parameters['object_ids'] = list(object_ids)
+    if related_user_id is not None:
+        filters.append("""o.object_id IN (
+        SELECT (u.data->>'object_id')::int
+        FROM user_log_entries AS u
+        WHERE u.user_id = :related_user_id AND u.data->>'object_id' IS NOT NULL
+        UNION
+        SELECT json_array_elements_text(u.data->'object_ids')::int
+        FROM user_log_entries AS u
+        WHERE u.user_id = :related_user_id AND u.data->>'object_id' IS NULL AND json_typeof(u.data->'object_ids') = 'array'
+    )""")
+        parameters['related_user_id'] = related_user_id
+    if doi is not None:
+        filters.append("o.object_id IN (SELECT op.object_id FROM object_publications AS op WHERE op.doi = :doi)")
+        parameters['doi'] = doi
+
+    # all joins match at most one row per object, so no deduplication is
+    # needed and filters or sorting on the objects can use their indexes
     stmt = db.text("""
     SELECT
-    o.object_id, o.version_id, o.action_id, o.data, o.schema, o.user_id, o.utc_datetime
-    FROM (
-        SELECT
-        object_id
-        FROM user_object_permissions_by_all
-        WHERE user_id = :user_id OR user_id IS NULL
-        GROUP BY (object_id)
-        HAVING MAX(permissions_int) >= :min_permissions_int
-    ) AS p
-    JOIN objects_current AS o ON o.object_id = p.object_id
-    """)
+    o.object_id, o.version_id, o.action_id, o.data, o.schema_hash, o.user_id, o.utc_datetime, o.search_vector
+    FROM objects_current AS o
+    {joins}
+    LEFT OUTER JOIN effective_user_object_permissions AS e ON e.object_id = o.object_id AND e.user_id = :user_id
+    LEFT OUTER JOIN public_objects AS p ON p.object_id = o.object_id
+    WHERE (e.permissions_int >= :min_permissions_int OR (:min_permissions_int <= 1 AND p.object_id IS NOT NULL))
+    {filters}
+    """.format(
+        joins='\n    '.join(joins),
+        filters=''.join('AND ' + filter + '\n    ' for filter in filters)
+    ))
     stmt = stmt.columns(
         objects.Objects._current_table.c.object_id,
         objects.Objects._current_table.c.version_id,
         objects.Objects._current_table.c.action_id,
         objects.Objects._current_table.c.data,
-        objects.Objects._current_table.c.schema,
+        objects.Objects._current_table.c.schema_hash,
         objects.Objects._current_table.c.user_id,
-        objects.Objects._current_table.c.utc_datetime
+        objects.Objects._current_table.c.utc_datetime,
+        objects.Objects._current_table.c.search_vector
     )
     table = sqlalchemy.sql.alias(stmt)
+    return action_filter, table, parameters
 
-    parameters = {
-        'min_permissions_int': permissions.value,
-        'user_id': user_id
-    }
 
-    objs = objects.get_objects(filter_func=filter_func, action_filter=action_filter, table=table, parameters=parameters, sorting_func=sorting_func, limit=limit, offset=offset, **kwargs)
-    if project_id is not None:
-        filtered_objs = []
-        for obj in objs:
-            project_object_permissions = ProjectObjectPermissions.query.filter_by(object_id=obj.object_id, project_id=project_id).first()
-            if project_object_permissions is not None and permissions in project_object_permissions.permissions:
-                filtered_objs.append(obj)
-        objs = filtered_objs
-    if object_ids is not None:
-        filtered_objs = []
-        for obj in objs:
-            if obj.object_id in object_ids:
-                filtered_objs.append(obj)
-        objs = filtered_objs
-    return objs
+def get_objects_with_permissions(
+        user_id: int,
+        permissions: Permissions,
+        filter_func: typing.Callable = lambda data: True,
+        sorting_func: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+        limit: typing.Optional[int] = None,
+        offset: typing.Optional[int] = None,
+        action_id: typing.Optional[int] = None,
+        action_type: typing.Optional[ActionType] = None,
+        project_id: typing.Optional[int] = None,
+        object_ids: typing.Optional[typing.Sequence[int]] = None,
+        location_id: typing.Optional[int] = None,
+        related_user_id: typing.Optional[int] = None,
+        doi: typing.Optional[str] = None,
+        **kwargs
+) -> typing.List[Object]:
+    action_filter, table, parameters = _get_objects_with_permissions_query(
+        user_id=user_id,
+        permissions=permissions,
+        action_id=action_id,
+        action_type=action_type,
+        project_id=project_id,
+        object_ids=object_ids,
+        location_id=location_id,
+        related_user_id=related_user_id,
+        doi=doi
+    )
+    return objects.get_objects(filter_func=filter_func, action_filter=action_filter, table=table, parameters=parameters, sorting_func=sorting_func, limit=limit, offset=offset, **kwargs)
+
+
+def iter_objects_with_permissions(
+        user_id: int,
+        permissions: Permissions,
+        filter_func: typing.Callable = lambda data: True,
+        sorting_func: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+        limit: typing.Optional[int] = None,
+        action_id: typing.Optional[int] = None,
+        action_type: typing.Optional[ActionType] = None,
+        project_id: typing.Optional[int] = None,
+        object_ids: typing.Optional[typing.Sequence[int]] = None,
+        location_id: typing.Optional[int] = None,
+        related_user_id: typing.Optional[int] = None,
+        doi: typing.Optional[str] = None,
+        **kwargs
+) -> typing.Iterator[Object]:
+    """
+    Return an iterator over all objects a user has the given permissions for,
+    fetching the objects in batches while iterating.
+
+    :param user_id: the ID of an existing user
+    :param permissions: the minimum permissions the user needs
+    :param filter_func: a lambda that may return an SQLAlchemy filter when
+        given the object table's data column
+    :param sorting_func: the sorting function to use (optional)
+    :param limit: the maximum number of objects (optional)
+    :param action_id: the ID of an action to limit the objects to (optional)
+    :param action_type: the type of actions to limit the objects to (optional)
+    :param project_id: the ID of a project to limit the objects to those
+        the project has the given permissions for (optional)
+    :param object_ids: the IDs of the objects to limit the objects to
+        (optional)
+    :param location_id: the ID of a location to limit the objects to those
+        currently assigned to it (optional)
+    :param related_user_id: the ID of a user to limit the objects to those
+        related to the user according to the user log (optional)
+    :param doi: the simplified DOI of a publication to limit the objects to
+        those linked to it (optional)
+    :return: an iterator over the objects
+    """
+    action_filter, table, parameters = _get_objects_with_permissions_query(
+        user_id=user_id,
+        permissions=permissions,
+        action_id=action_id,
+        action_type=action_type,
+        project_id=project_id,
+        object_ids=object_ids,
+        location_id=location_id,
+        related_user_id=related_user_id,
+        doi=doi
+    )
+    return objects.iter_objects(filter_func=filter_func, action_filter=action_filter, table=table, parameters=parameters, sorting_func=sorting_func, limit=limit, **kwargs)
+
+
+def get_num_objects_with_permissions(
+        user_id: int,
+        permissions: Permissions,
+        filter_func: typing.Callable = lambda data: True,
+        action_id: typing.Optional[int] = None,
+        action_type: typing.Optional[ActionType] = None,
+        project_id: typing.Optional[int] = None,
+        object_ids: typing.Optional[typing.Sequence[int]] = None,
+        location_id: typing.Optional[int] = None,
+        related_user_id: typing.Optional[int] = None,
+        doi: typing.Optional[str] = None
+) -> int:
+    """
+    Return the number of objects a user has the given permissions for.
+
+    :param user_id: the ID of an existing user
+    :param permissions: the minimum permissions the user needs
+    :param filter_func: a lambda that may return an SQLAlchemy filter when
+        given the object table's data column
+    :param action_id: the ID of an action to limit the objects to (optional)
+    :param action_type: the type of actions to limit the objects to (optional)
+    :param project_id: the ID of a project to limit the objects to those
+        the project has the given permissions for (optional)
+    :param object_ids: the IDs of the objects to limit the objects to
+        (optional)
+    :param location_id: the ID of a location to limit the objects to those
+        currently assigned to it (optional)
+    :param related_user_id: the ID of a user to limit the objects to those
+        related to the user according to the user log (optional)
+    :param doi: the simplified DOI of a publication to limit the objects to
+        those linked to it (optional)
+    :return: the number of objects
+    """
+    action_filter, table, parameters = _get_objects_with_permissions_query(
+        user_id=user_id,
+        permissions=permissions,
+        action_id=action_id,
+        action_type=action_type,
+        project_id=project_id,
+        object_ids=object_ids,
+        location_id=location_id,
+        related_user_id=related_user_id,
+        doi=doi
+    )
+    return objects.count_objects(filter_func=filter_func, action_filter=action_filter, table=table, parameters=parameters)
 
 
 class InvalidDefaultPermissionsError(Exception):
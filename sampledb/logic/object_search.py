@@ -1,8 +1,8 @@
 # coding: utf-8
 import functools
-import json
 import typing
-from sqlalchemy import String, and_, or_
+import sqlalchemy
+from sqlalchemy import and_, or_
 from sqlalchemy.sql.expression import select, true, false, not_
 from . import where_filters
 from . import datatypes
@@ -723,6 +723,23 @@ def should_use_advanced_search(query_string: str) -> typing.Tuple[bool, str]:
     return False, query_string
 
 
+def get_full_text_search_query(query_string: str) -> typing.Any:
+    """
+    Create a full text search query for the simple search.
+
+    Every word in the query string has to match the beginning of a word in
+    the name, tags or text values of an object.
+
+    :param query_string: the query string
+    :return: the SQLAlchemy expression for the text search query
+    """
+    # quotes and backslashes would need to be escaped, but they separate words
+    # in PostgreSQL's text search parser anyway
+    words = query_string.replace("'", ' ').replace('\\', ' ').split()
+    tsquery = ' & '.join("'{}':*".format(word) for word in words)
+    return sqlalchemy.func.to_tsquery('simple', tsquery)
+
+
 def generate_filter_func(query_string: str, use_advanced_search: bool) -> typing.Tuple[typing.Callable, typing.Any, bool]:
     """
     Generates a filter function for use with SQLAlchemy and the JSONB data
@@ -801,9 +818,8 @@ def generate_filter_func(query_string: str, use_advanced_search: bool) -> typing
             # Simple search in values
             def filter_func(data, search_notes, query_string=query_string):
                 """ Filter objects based on search query string """
-                # The query string is converted to json to escape quotes, backslashes, etc
-                query_string = json.dumps(query_string)[1:-1]
-                return data.cast(String).ilike('%: "%' + query_string + '%"%')
+                # the search vector column belongs to the same table as data
+                return data.table.c.search_vector.op('@@')(get_full_text_search_query(query_string))
     else:
         def filter_func(data, search_notes):
             """ Return all objects"""
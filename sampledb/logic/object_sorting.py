@@ -6,6 +6,8 @@
 import sqlalchemy
 import typing
 
+from .object_search import get_full_text_search_query
+
 
 def ascending(sorting_func: typing.Any) -> typing.Any:
     """
@@ -17,6 +19,8 @@ def ascending(sorting_func: typing.Any) -> typing.Any:
     def modified_sorting_func(current_columns, original_columns, sorting_func=sorting_func):
         return sqlalchemy.sql.asc(sorting_func(current_columns, original_columns))
     modified_sorting_func.require_original_columns = getattr(sorting_func, 'require_original_columns', False)
+    modified_sorting_func.sorting_key_func = sorting_func
+    modified_sorting_func.is_descending = False
     return modified_sorting_func
 
 
@@ -30,6 +34,8 @@ def descending(sorting_func: typing.Any) -> typing.Any:
     def modified_sorting_func(current_columns, original_columns, sorting_func=sorting_func):
         return sqlalchemy.sql.desc(sorting_func(current_columns, original_columns))
     modified_sorting_func.require_original_columns = getattr(sorting_func, 'require_original_columns', False)
+    modified_sorting_func.sorting_key_func = sorting_func
+    modified_sorting_func.is_descending = True
     return modified_sorting_func
 
 
@@ -67,13 +73,47 @@ def last_modification_date() -> typing.Callable[[typing.Any], typing.Any]:
     return sorting_func
 
 
-def property_value(property_name: str) -> typing.Callable[[typing.Any], typing.Any]:
+def relevance(query_string: str) -> typing.Callable[[typing.Any], typing.Any]:
+    """
+    Create a sorting function to sort by relevance for a simple search.
+
+    :param query_string: the query string of the simple search
+    :return: the sorting function
+    """
+    def sorting_func(current_columns: typing.Any, original_columns: typing.Any) -> typing.Any:
+        # the rank is cast to double precision so that it can be used in cursors
+        return sqlalchemy.func.ts_rank(current_columns.search_vector, get_full_text_search_query(query_string)).cast(sqlalchemy.Float)
+    return sorting_func
+
+
+def property_value(property_name: str, property_type: typing.Optional[str] = None) -> typing.Callable[[typing.Any], typing.Any]:
     """
     Create a sorting function to sort by an arbitrary property.
 
+    If the property type is known, e.g. because the property is an indexed
+    property of the action the objects are limited to, the objects are sorted
+    by the value for this type only, using the same expression as the index.
+
     :param property_name: the name of the property to sort by
+    :param property_type: the type of the property (optional)
     :return: the sorting function
     """
+    if property_type is not None:
+        def sorting_func(current_columns: typing.Any, original_columns: typing.Any) -> typing.Any:
+            value = current_columns.data[(property_name,)]
+            if property_type == 'text':
+                return value['text'].astext
+            if property_type == 'quantity':
+                return value['magnitude_in_base_units'].astext.cast(sqlalchemy.Float)
+            if property_type == 'bool':
+                return value['value'].astext.cast(sqlalchemy.Boolean)
+            if property_type == 'datetime':
+                return value['utc_datetime'].astext
+            if property_type in ('sample', 'measurement'):
+                return value['object_id'].astext.cast(sqlalchemy.Integer)
+            return sqlalchemy.sql.null()
+        return sorting_func
+
     def sorting_func(current_columns: typing.Any, original_columns: typing.Any) -> typing.Any:
         columns = current_columns
         return sqlalchemy.sql.expression.case([
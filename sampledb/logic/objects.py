@@ -12,8 +12,11 @@ the functions in this module should be called from within a Flask app context.
 """
 
 
+import collections
 import typing
+from .. import db
 from ..models import Objects, Object, Action, ActionType
+from ..models.json_patch import make_patch
 from . import object_log, user_log, object_permissions, errors, users, actions, tags
 import sqlalchemy.exc
 
@@ -55,6 +58,10 @@ def create_object_batch(action_id: int, data_sequence: typing.Sequence[dict], us
     permissions. When creating multiple objects for the same action and user
     this function should be used instead of repeatedly calling create_object.
 
+    The data of all objects is validated before any object is created, and
+    the objects are created in a single transaction, so that either all or
+    none of them are created.
+
     :param action_id: the ID of an existing action
     :param data_sequence: a sequence containing the objects' data, which must
         fit to the action's schema
@@ -65,29 +72,119 @@ def create_object_batch(action_id: int, data_sequence: typing.Sequence[dict], us
     :raise errors.UserDoesNotExistError: when no user with the given
         user ID exists
     """
-    objects = []
-    actions.get_action(action_id)
-    users.get_user(user_id)
     try:
-        for data in data_sequence:
-            try:
-                object = Objects.create_object(data=data, schema=None, user_id=user_id, action_id=action_id)
-            except sqlalchemy.exc.IntegrityError:
-                raise
-            objects.append(object)
-    finally:
-        if objects:
-            # objects created before the integrity error must still be accessible
-            batch_object_ids = [object.id for object in objects]
-            user_log.create_batch(user_id=user_id, batch_object_ids=batch_object_ids)
-            for object in objects:
-                object_log.create_batch(object_id=object.object_id, user_id=user_id, batch_object_ids=batch_object_ids)
-                _update_object_references(object, user_id=user_id)
-                object_permissions.set_initial_permissions(object)
-                tags.update_object_tag_usage(object)
+        objects = _create_object_batch(action_id=action_id, data_sequence=data_sequence, user_id=user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return objects
+
+
+def _create_object_batch(action_id: int, data_sequence: typing.Sequence[dict], user_id: int) -> typing.List[Object]:
+    """
+    Creates a batch of objects, like create_object_batch, without committing
+    the session.
+    """
+    action = actions.get_action(action_id)
+    users.get_user(user_id)
+    objects = Objects.create_objects(data_sequence=data_sequence, schema=None, user_id=user_id, action_id=action_id, connection=db.session.connection())
+    if not objects:
+        return objects
+    batch_object_ids = [object.id for object in objects]
+    object_log.create_batch_for_objects(user_id=user_id, batch_object_ids=batch_object_ids)
+    user_log.create_batches(user_id=user_id, batches_object_ids=[batch_object_ids])
+    _update_objects_references(objects, previous_objects=None, action_type=action.type, user_id=user_id)
+    object_permissions.set_initial_permissions_for_objects(objects)
+    tags.add_tag_usage(objects)
+    return objects
+
+
+def _update_objects(updates: typing.Sequence[typing.Tuple[int, dict, typing.Optional[typing.Dict[str, typing.Any]]]], user_id: int) -> typing.List[Object]:
+    """
+    Updates several objects to new versions, handling logging, object
+    references and tag usage for all of them at once.
+
+    This function does not commit the session.
+
+    :param updates: a sequence of (object ID, data, schema) tuples, with
+        schema being None to keep the current object schema
+    :param user_id: the ID of the user who updated the objects
+    :return: the updated objects
+    :raise errors.ObjectDoesNotExistError: when no object with one of the
+        given object IDs exists
+    :raise errors.UserDoesNotExistError: when no user with the given
+        user ID exists
+    """
+    if not updates:
+        return []
+    users.get_user(user_id)
+    connection = db.session.connection()
+    previous_objects = {
+        object.object_id: object
+        for object in Objects.get_current_objects(object_ids=[object_id for object_id, data, schema in updates], connection=connection)
+    }
+    objects = Objects.update_objects(updates, user_id=user_id, connection=connection)
+    if objects is None:
+        raise errors.ObjectDoesNotExistError()
+    object_and_version_ids = [(object.object_id, object.version_id) for object in objects]
+    user_log.edit_objects(user_id=user_id, object_and_version_ids=object_and_version_ids)
+    object_log.edit_objects(user_id=user_id, object_and_version_ids=object_and_version_ids)
+    objects_by_action_type = {}
+    for object in objects:
+        action_type = actions.get_action(object.action_id).type
+        objects_by_action_type.setdefault(action_type, []).append(object)
+    for action_type, objects_of_type in objects_by_action_type.items():
+        _update_objects_references(objects_of_type, previous_objects=previous_objects, action_type=action_type, user_id=user_id)
+    tags.update_objects_tag_usage(objects, previous_objects.values())
     return objects
 
 
+def create_and_update_objects(
+        creations: typing.Sequence[typing.Tuple[int, dict]],
+        updates: typing.Sequence[typing.Tuple[int, dict, typing.Optional[typing.Dict[str, typing.Any]]]],
+        user_id: int
+) -> typing.Tuple[typing.List[Object], typing.List[Object]]:
+    """
+    Creates and updates several objects in a single transaction, so that
+    either all or none of the changes are applied. This function also handles
+    logging, object references, tag usage and default object permissions.
+
+    Objects created using the same action are created as a batch, as if using
+    create_object_batch.
+
+    :param creations: a sequence of (action ID, data) tuples for the objects
+        to create
+    :param updates: a sequence of (object ID, data, schema) tuples for the
+        objects to update, with schema being None to keep the current object
+        schema, containing each object ID at most once
+    :param user_id: the ID of the user who creates and updates the objects
+    :return: the created objects in the order of creations and the updated
+        objects in the order of updates
+    :raise errors.ActionDoesNotExistError: when no action with one of the
+        given action IDs exists
+    :raise errors.ObjectDoesNotExistError: when no object with one of the
+        given object IDs exists
+    :raise errors.UserDoesNotExistError: when no user with the given
+        user ID exists
+    """
+    data_by_action_id = collections.OrderedDict()
+    for index, (action_id, data) in enumerate(creations):
+        data_by_action_id.setdefault(action_id, []).append((index, data))
+    created_objects = [None] * len(creations)
+    try:
+        for action_id, indexed_data in data_by_action_id.items():
+            objects = _create_object_batch(action_id=action_id, data_sequence=[data for index, data in indexed_data], user_id=user_id)
+            for (index, data), object in zip(indexed_data, objects):
+                created_objects[index] = object
+        updated_objects = _update_objects(updates, user_id=user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return created_objects, updated_objects
+
+
 def update_object(object_id: int, data: dict, user_id: int, schema: typing.Optional[typing.Dict[str, typing.Any]] = None) -> None:
     """
     Updates the object to a new version. This function also handles logging
@@ -182,6 +279,46 @@ def get_object_versions(object_id: int) -> typing.List[Object]:
     return object_versions
 
 
+def get_object_versions_metadata(object_id: int) -> typing.List[Objects.VersionMetadata]:
+    """
+    Returns the metadata of all versions of an object, sorted from oldest to
+    newest. Unlike get_object_versions, this does not load the data and
+    schemas of the versions.
+
+    :param object_id: the ID of the existing object
+    :return: the version metadata, containing the object ID, version ID,
+        user ID and datetime of each version
+    :raise errors.ObjectDoesNotExistError: when no object with the given
+        object ID exists
+    """
+    versions_metadata = Objects.get_object_versions_metadata(object_id=object_id)
+    if not versions_metadata:
+        raise errors.ObjectDoesNotExistError()
+    return versions_metadata
+
+
+def get_object_version_diff(object_id: int, from_version_id: int, to_version_id: int) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Returns the differences between the data of two versions of an object as
+    a JSON patch (RFC 6902), which turns the data of the first version into
+    the data of the second version. Only these two versions are loaded.
+
+    :param object_id: the ID of the existing object
+    :param from_version_id: the ID of the object's existing version to
+        compare from
+    :param to_version_id: the ID of the object's existing version to compare to
+    :return: the JSON patch as a list of operations
+    :raise errors.ObjectDoesNotExistError: when no object with the given
+        object ID exists
+    :raise errors.ObjectVersionDoesNotExistError: when an object with the
+        given object ID exists, but does not have a version with one of the
+        given version IDs
+    """
+    from_object = get_object(object_id=object_id, version_id=from_version_id)
+    to_object = get_object(object_id=object_id, version_id=to_version_id)
+    return make_patch(from_object.data, to_object.data)
+
+
 def get_objects(filter_func=lambda data: True, action_filter=None, **kwargs) -> typing.List[Object]:
     """
     Returns all objects, optionally after filtering the objects by their data
@@ -200,54 +337,149 @@ def get_objects(filter_func=lambda data: True, action_filter=None, **kwargs) ->
     return Objects.get_current_objects(filter_func=filter_func, action_table=action_table, action_filter=action_filter, **kwargs)
 
 
-def _get_object_properties(object: Object) -> typing.List[typing.Tuple[typing.List[str], dict, dict]]:
+def iter_objects(filter_func=lambda data: True, action_filter=None, **kwargs) -> typing.Iterator[Object]:
     """
-    Returns a list of all properties of an object, as 3-tuples consisting of
-    the path to the property, its schema and the actual data.
+    Returns an iterator over all objects, optionally after filtering the
+    objects by their data or by their actions' information.
 
-    :param object: the object
-    :return: a list of one 3-tuples for reach of the object's properties
+    The objects are fetched in batches while iterating, so that they do not
+    need to be loaded into memory at once.
+
+    :param filter_func: a lambda that may return an SQLAlchemy filter when
+        given the object table's data column
+    :param action_filter: a SQLAlchemy comparator, used to query only objects
+        created by specific actions
+    :return: an iterator over all objects or those matching the given filters
+    """
+    if action_filter is None:
+        action_table = None
+    else:
+        action_table = Action.__table__
+    return Objects.iter_current_objects(filter_func=filter_func, action_table=action_table, action_filter=action_filter, **kwargs)
+
+
+def count_objects(filter_func=lambda data: True, action_filter=None, **kwargs) -> int:
+    """
+    Returns the number of objects, optionally after filtering the objects by
+    their data or by their actions' information.
+
+    :param filter_func: a lambda that may return an SQLAlchemy filter when
+        given the object table's data column
+    :param action_filter: a SQLAlchemy comparator, used to count only objects
+        created by specific actions
+    :return: the number of all objects or those matching the given filters
+    """
+    if action_filter is None:
+        action_table = None
+    else:
+        action_table = Action.__table__
+    return Objects.count_current_objects(filter_func=filter_func, action_table=action_table, action_filter=action_filter, **kwargs)
+
+
+def update_search_vectors() -> int:
     """
-    def iter_object_properties(previous_path, schema, data):
-        if schema['type'] == 'object':
-            for property_name in schema['properties']:
+    Updates the full text search vectors of all objects, e.g. after
+    upgrading from a version which did not maintain them.
+
+    :return: the number of updated objects
+    """
+    return Objects.update_search_vectors()
+
+
+def convert_object_versions(snapshot_interval: int) -> int:
+    """
+    Converts the storage of all previous object versions to use the given
+    snapshot interval, e.g. after changing OBJECT_VERSION_SNAPSHOT_INTERVAL.
+
+    :param snapshot_interval: the interval between previous versions stored
+        as full snapshots, or 0 to store all previous versions as full
+        snapshots
+    :return: the number of converted object versions
+    """
+    return Objects.convert_previous_versions(snapshot_interval)
+
+
+def get_object_action_types(object_ids: typing.Iterable[int]) -> typing.Dict[int, ActionType]:
+    """
+    Returns the types of the actions used to create the objects with the
+    given IDs, using a single query.
+
+    :param object_ids: the IDs of objects
+    :return: a dict mapping the IDs of existing objects to their action types,
+        without entries for object IDs of objects which do not exist
+    """
+    object_ids = set(object_ids)
+    if not object_ids:
+        return {}
+    current_objects_table = Objects.object_id_column.table
+    return dict(db.session.query(
+        current_objects_table.c.object_id,
+        Action.type
+    ).join(
+        Action,
+        Action.id == current_objects_table.c.action_id
+    ).filter(
+        current_objects_table.c.object_id.in_(object_ids)
+    ).all())
+
+
+def iter_object_references(data: typing.Any, schema: typing.Any, path: typing.Optional[typing.List[typing.Union[str, int]]] = None) -> typing.Iterator[typing.Tuple[typing.List[typing.Union[str, int]], int, str]]:
+    """
+    Yields all references to other objects in the given object data.
+
+    The data does not need to be valid, so that the referenced objects can be
+    looked up at once before the data is validated. Parts of the data which do
+    not fit to the schema are skipped.
+
+    :param data: the object data
+    :param schema: the object schema
+    :param path: the path to this subinstance / subschema
+    :return: an iterator over (path, referenced object ID, schema type) tuples
+    """
+    if path is None:
+        path = []
+    if not isinstance(schema, dict):
+        return
+    if schema.get('type') == 'object':
+        if isinstance(data, dict) and isinstance(schema.get('properties'), dict):
+            for property_name, property_schema in schema['properties'].items():
                 if property_name in data:
-                    for property in iter_object_properties(previous_path + [property_name], schema['properties'][property_name], data[property_name]):
-                        yield property
-        elif schema['type'] == 'array':
+                    yield from iter_object_references(data[property_name], property_schema, path + [property_name])
+    elif schema.get('type') == 'array':
+        if isinstance(data, list):
             for index, item in enumerate(data):
-                for property in iter_object_properties(previous_path + [index], schema['items'], item):
-                    yield property
-        else:
-            yield previous_path, schema, data
-    return list(iter_object_properties([], object.schema, object.data))
+                yield from iter_object_references(item, schema.get('items'), path + [index])
+    elif schema.get('type') in ('sample', 'measurement'):
+        if isinstance(data, dict) and isinstance(data.get('object_id'), int):
+            yield path, data['object_id'], schema['type']
 
 
-def find_object_references(object: Object, find_previous_referenced_object_ids: bool = True) -> typing.List[typing.Tuple[int, typing.Optional[int]]]:
+def find_object_references(object: Object, find_previous_referenced_object_ids: bool = True, previous_object: typing.Optional[Object] = None) -> typing.List[typing.Tuple[int, typing.Optional[int]]]:
     """
     Searches for references to other objects.
 
     :param object: the updated (or newly created) object
     :param find_previous_referenced_object_ids: whether or not to find
         previous referenced object ids
+    :param previous_object: the previous version of the object, if it has
+        already been loaded
     """
     referenced_object_ids = []
-    for path, schema, data in _get_object_properties(object):
-        if schema['type'] in ('sample', 'measurement') and data is not None and data['object_id'] is not None:
-            referenced_object_id = data['object_id']
-            previous_referenced_object_id = None
-            if find_previous_referenced_object_ids and object.version_id > 0:
-                previous_object_version = get_object(object.object_id, object.version_id - 1)
-                previous_data = previous_object_version.data
-                try:
-                    for path_element in path:
-                        previous_data = previous_data[path_element]
-                except (KeyError, IndexError):
-                    pass
-                else:
-                    if previous_data is not None and previous_data['object_id'] is not None:
-                        previous_referenced_object_id = previous_data['object_id']
-            referenced_object_ids.append((referenced_object_id, previous_referenced_object_id))
+    for path, referenced_object_id, schema_type in iter_object_references(object.data, object.schema):
+        previous_referenced_object_id = None
+        if find_previous_referenced_object_ids and object.version_id > 0:
+            if previous_object is None:
+                previous_object = get_object(object.object_id, object.version_id - 1)
+            previous_data = previous_object.data
+            try:
+                for path_element in path:
+                    previous_data = previous_data[path_element]
+            except (KeyError, IndexError, TypeError):
+                pass
+            else:
+                if isinstance(previous_data, dict) and previous_data.get('object_id') is not None:
+                    previous_referenced_object_id = previous_data['object_id']
+        referenced_object_ids.append((referenced_object_id, previous_referenced_object_id))
     return referenced_object_ids
 
 
@@ -263,9 +495,35 @@ def _update_object_references(object: Object, user_id: int) -> None:
     :param user_id: the user who caused the object update or creation
     """
     action_type = actions.get_action(object.action_id).type
-    for referenced_object_id, previous_referenced_object_id in find_object_references(object):
-        if referenced_object_id != previous_referenced_object_id:
-            if action_type == ActionType.MEASUREMENT:
-                object_log.use_object_in_measurement(object_id=referenced_object_id, user_id=user_id, measurement_id=object.object_id)
-            elif action_type == ActionType.SAMPLE_CREATION:
-                object_log.use_object_in_sample(object_id=referenced_object_id, user_id=user_id, sample_id=object.object_id)
+    _update_objects_references([object], previous_objects=None, action_type=action_type, user_id=user_id)
+    db.session.commit()
+
+
+def _update_objects_references(objects: typing.Sequence[Object], previous_objects: typing.Optional[typing.Mapping[int, Object]], action_type: ActionType, user_id: int) -> None:
+    """
+    Searches for references to other objects in several objects created or
+    updated using actions of the same type and updates these accordingly,
+    like _update_object_references.
+
+    This function does not commit the session.
+
+    :param objects: the updated (or newly created) objects
+    :param previous_objects: a dict mapping object IDs to the previous
+        versions of the objects, or None if previous versions should only be
+        loaded when an object contains references
+    :param action_type: the type of the objects' actions
+    :param user_id: the user who caused the object updates or creations
+    """
+    referenced_and_referencing_object_ids = []
+    for object in objects:
+        if previous_objects is None:
+            object_references = find_object_references(object)
+        else:
+            object_references = find_object_references(object, previous_object=previous_objects[object.object_id])
+        for referenced_object_id, previous_referenced_object_id in object_references:
+            if referenced_object_id != previous_referenced_object_id:
+                referenced_and_referencing_object_ids.append((referenced_object_id, object.object_id))
+    if action_type == ActionType.MEASUREMENT:
+        object_log.use_objects_in_measurements(user_id=user_id, object_and_measurement_ids=referenced_and_referencing_object_ids)
+    elif action_type == ActionType.SAMPLE_CREATION:
+        object_log.use_objects_in_samples(user_id=user_id, object_and_sample_ids=referenced_and_referencing_object_ids)
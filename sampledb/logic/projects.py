@@ -16,6 +16,10 @@ SQLAlchemy ORM class.
 
 As the project models use flask-sqlalchemy however, the functions in this
 module should be called from within a Flask application context.
+
+Memberships via groups and the transitive subproject relationships are
+resolved in the database, using joins and recursive queries, so that they
+require a constant number of queries and are always up to date.
 """
 
 from sqlalchemy.exc import IntegrityError
@@ -26,10 +30,12 @@ import flask
 
 from .. import db
 from ..models import projects, Permissions, UserProjectPermissions, GroupProjectPermissions, SubprojectRelationship
+from ..models.groups import association_table as user_group_memberships
 from .users import get_user
 from .security_tokens import generate_token, MAX_AGE
 from . import groups
 from . import errors
+from .effective_object_permissions import update_effective_permissions_for_users
 from . import notifications
 
 
@@ -132,10 +138,12 @@ def delete_project(project_id: int) -> None:
     project = projects.Project.query.get(project_id)
     if project is None:
         raise errors.ProjectDoesNotExistError()
+    member_user_ids = get_project_member_user_ids_and_permissions(project_id, include_groups=True).keys()
     # project object permissions and project default permissions will be
     # deleted due to ondelete = "CASCADE" in the model. No need to delete
     # them manually here.
     db.session.delete(project)
+    update_effective_permissions_for_users(member_user_ids)
     db.session.commit()
 
 
@@ -184,12 +192,18 @@ def get_project_member_user_ids_and_permissions(project_id: int, include_groups:
         for single_user_permissions in user_permissions
     }
     if include_groups:
-        member_group_ids_and_permissions = get_project_member_group_ids_and_permissions(project_id)
-        for member_group_id, permissions in member_group_ids_and_permissions.items():
-            group_member_ids = groups.get_group_member_ids(member_group_id)
-            for user_id in group_member_ids:
-                if user_id not in member_user_ids_and_permissions or permissions not in member_user_ids_and_permissions[user_id]:
-                    member_user_ids_and_permissions[user_id] = permissions
+        group_member_user_ids_and_permissions = db.session.query(
+            user_group_memberships.c.user_id,
+            GroupProjectPermissions.permissions
+        ).join(
+            user_group_memberships,
+            user_group_memberships.c.group_id == GroupProjectPermissions.group_id
+        ).filter(
+            GroupProjectPermissions.project_id == project_id
+        ).all()
+        for user_id, permissions in group_member_user_ids_and_permissions:
+            if user_id not in member_user_ids_and_permissions or permissions not in member_user_ids_and_permissions[user_id]:
+                member_user_ids_and_permissions[user_id] = permissions
     return member_user_ids_and_permissions
 
 
@@ -208,19 +222,57 @@ def get_user_project_permissions(project_id: int, user_id: int, include_groups:
     :raise errors.UserDoesNotExistError: when no user with the given user ID
         exists
     """
-    user_permissions = projects.UserProjectPermissions.query.filter_by(project_id=project_id, user_id=user_id).first()
-    if user_permissions:
-        permissions = user_permissions.permissions
-    else:
+    project_ids_and_permissions = _get_user_project_ids_and_permissions(user_id, include_groups=include_groups, project_id=project_id)
+    if project_id not in project_ids_and_permissions:
         # verify that project exists or raise error
         get_project(project_id)
-        permissions = Permissions.NONE
+        return Permissions.NONE
+    return project_ids_and_permissions[project_id]
+
+
+def get_user_project_ids_and_permissions(user_id: int, include_groups: bool = False) -> typing.Dict[int, Permissions]:
+    """
+    Returns a dict of the IDs of all projects the user with the given user ID
+    is a member of, mapping them to the user's permissions for the project.
+
+    :param user_id: the ID of an existing user
+    :param include_groups: whether or not groups membership should be
+        considered as well
+    :return: the project ID to permissions dict
+    :raise errors.UserDoesNotExistError: when no user with the given
+        user ID exists
+    """
+    get_user(user_id)
+    return _get_user_project_ids_and_permissions(user_id, include_groups=include_groups)
+
+
+def _get_user_project_ids_and_permissions(user_id: int, include_groups: bool, project_id: typing.Optional[int] = None) -> typing.Dict[int, Permissions]:
+    query = db.session.query(
+        UserProjectPermissions.project_id,
+        UserProjectPermissions.permissions
+    ).filter(
+        UserProjectPermissions.user_id == user_id
+    )
+    if project_id is not None:
+        query = query.filter(UserProjectPermissions.project_id == project_id)
     if include_groups:
-        group_permissions = projects.GroupProjectPermissions.query.filter_by(project_id=project_id).all()
-        for group_permission in group_permissions:
-            if user_id in groups.get_group_member_ids(group_permission.group_id) and permissions in group_permission.permissions:
-                permissions = group_permission.permissions
-    return permissions
+        group_query = db.session.query(
+            GroupProjectPermissions.project_id,
+            GroupProjectPermissions.permissions
+        ).join(
+            user_group_memberships,
+            user_group_memberships.c.group_id == GroupProjectPermissions.group_id
+        ).filter(
+            user_group_memberships.c.user_id == user_id
+        )
+        if project_id is not None:
+            group_query = group_query.filter(GroupProjectPermissions.project_id == project_id)
+        query = query.union_all(group_query)
+    project_ids_and_permissions = {}
+    for member_project_id, permissions in query.all():
+        if member_project_id not in project_ids_and_permissions or permissions not in project_ids_and_permissions[member_project_id]:
+            project_ids_and_permissions[member_project_id] = permissions
+    return project_ids_and_permissions
 
 
 def get_project_member_group_ids_and_permissions(project_id: int) -> typing.Dict[int, Permissions]:
@@ -255,18 +307,13 @@ def get_user_projects(user_id: int, include_groups: bool = False) -> typing.List
     :raise errors.UserDoesNotExistError: when no user with the given
         user ID exists
     """
-    user = get_user(user_id)
-    user_permissions = projects.UserProjectPermissions.query.filter_by(user_id=user.id).all()
-    project_ids = {
-        user_permission.project_id for user_permission in user_permissions
-    }
-    if include_groups:
-        user_groups = groups.get_user_groups(user_id)
-        for group in user_groups:
-            group_permissions = projects.GroupProjectPermissions.query.filter_by(group_id=group.id).all()
-            for group_permission in group_permissions:
-                project_ids.add(group_permission.project_id)
-    return [get_project(project_id) for project_id in project_ids]
+    project_ids = get_user_project_ids_and_permissions(user_id, include_groups=include_groups).keys()
+    if not project_ids:
+        return []
+    return [
+        Project.from_database(project)
+        for project in projects.Project.query.filter(projects.Project.id.in_(project_ids)).order_by(projects.Project.id).all()
+    ]
 
 
 def invite_user_to_project(project_id: int, user_id: int, inviter_id: int, add_to_parent_project_ids: typing.Sequence[int] = ()) -> None:
@@ -337,6 +384,7 @@ def add_user_to_project(project_id: int, user_id: int, permissions: Permissions,
         raise errors.UserAlreadyMemberOfProjectError()
     user_permissions = UserProjectPermissions(project_id=project_id, user_id=user_id, permissions=permissions)
     db.session.add(user_permissions)
+    update_effective_permissions_for_users([user_id])
     db.session.commit()
     if other_project_ids:
         ancestor_project_ids = get_ancestor_project_ids(project_id, only_if_child_can_add_users_to_ancestor=True)
@@ -377,6 +425,7 @@ def add_group_to_project(project_id: int, group_id: int, permissions: Permission
         raise errors.GroupAlreadyMemberOfProjectError()
     group_permissions = GroupProjectPermissions(project_id=project_id, group_id=group_id, permissions=permissions)
     db.session.add(group_permissions)
+    update_effective_permissions_for_users(groups.get_group_member_ids(group_id))
     db.session.commit()
 
 
@@ -419,6 +468,7 @@ def remove_user_from_project(project_id: int, user_id: int) -> None:
         db.session.delete(project)
     else:
         db.session.delete(existing_permissions)
+    update_effective_permissions_for_users([user_id])
     db.session.commit()
 
 
@@ -447,6 +497,7 @@ def remove_group_from_project(project_id: int, group_id: int) -> None:
     if existing_permissions is None:
         raise errors.GroupNotMemberOfProjectError()
     db.session.delete(existing_permissions)
+    update_effective_permissions_for_users(groups.get_group_member_ids(group_id))
     db.session.commit()
 
 
@@ -494,6 +545,7 @@ def update_user_project_permissions(project_id: int, user_id: int, permissions:
 
     existing_permissions.permissions = permissions
     db.session.add(existing_permissions)
+    update_effective_permissions_for_users([user_id])
     db.session.commit()
 
 
@@ -531,6 +583,7 @@ def update_group_project_permissions(project_id: int, group_id: int, permissions
 
     existing_permissions.permissions = permissions
     db.session.add(existing_permissions)
+    update_effective_permissions_for_users(groups.get_group_member_ids(group_id))
     db.session.commit()
 
 
@@ -665,16 +718,12 @@ def get_ancestor_project_ids(project_id: int, only_if_child_can_add_users_to_anc
         project can add users to (transitively)
     :return: set of project IDs
     """
-    ancestor_project_ids = set()
-    project_id_queue = [project_id]
-    while project_id_queue:
-        ancestor_project_id = project_id_queue.pop(0)
-        if ancestor_project_id in ancestor_project_ids:
-            continue
-        if ancestor_project_id != project_id:
-            ancestor_project_ids.add(ancestor_project_id)
-        project_id_queue.extend(get_parent_project_ids(ancestor_project_id, only_if_child_can_add_users_to_parent=only_if_child_can_add_users_to_ancestor))
-    return ancestor_project_ids
+    return _get_related_project_ids(
+        project_id,
+        from_column=SubprojectRelationship.child_project_id,
+        to_column=SubprojectRelationship.parent_project_id,
+        only_if_child_can_add_users_to_parent=only_if_child_can_add_users_to_ancestor
+    )
 
 
 def get_descendent_project_ids(project_id: int) -> typing.Set[int]:
@@ -685,16 +734,45 @@ def get_descendent_project_ids(project_id: int) -> typing.Set[int]:
     :param project_id: the ID of an existing project
     :return: set of project IDs
     """
-    descendent_project_ids = set()
-    project_id_queue = [project_id]
-    while project_id_queue:
-        descendent_project_id = project_id_queue.pop(0)
-        if descendent_project_id in descendent_project_ids:
-            continue
-        if descendent_project_id != project_id:
-            descendent_project_ids.add(descendent_project_id)
-        project_id_queue.extend(get_child_project_ids(descendent_project_id))
-    return descendent_project_ids
+    return _get_related_project_ids(
+        project_id,
+        from_column=SubprojectRelationship.parent_project_id,
+        to_column=SubprojectRelationship.child_project_id
+    )
+
+
+def _get_related_project_ids(project_id: int, from_column: typing.Any, to_column: typing.Any, only_if_child_can_add_users_to_parent: bool = False) -> typing.Set[int]:
+    """
+    Return the IDs of all projects transitively related to a project using a
+    recursive query following the subproject relationships from one column
+    to the other.
+    """
+    relationship_filters = []
+    if only_if_child_can_add_users_to_parent:
+        relationship_filters.append(SubprojectRelationship.child_can_add_users_to_parent)
+    related_projects = db.session.query(
+        to_column.label('project_id')
+    ).filter(
+        from_column == project_id,
+        *relationship_filters
+    ).cte('related_projects', recursive=True)
+    # UNION instead of UNION ALL prevents infinite recursion for cycles
+    related_projects = related_projects.union(
+        db.session.query(
+            to_column
+        ).join(
+            related_projects,
+            from_column == related_projects.c.project_id
+        ).filter(
+            *relationship_filters
+        )
+    )
+    related_project_ids = {
+        related_project_id
+        for related_project_id, in db.session.query(related_projects.c.project_id).all()
+    }
+    related_project_ids.discard(project_id)
+    return related_project_ids
 
 
 def can_child_add_users_to_parent_project(child_project_id: int, parent_project_id: int) -> bool:
@@ -17,11 +17,17 @@ from .convert_to_schema import convert_to_schema
 from .generate_placeholder import generate_placeholder
 from .validate_schema import validate_schema
 from .validate import validate
+from .compiled_validators import compile_validator, get_validator, validate_with_compiled_validator, validate_schema_once, clear_validator_cache
 
 
 __all__ = [
     'convert_to_schema',
     'generate_placeholder',
     'validate_schema',
-    'validate'
+    'validate',
+    'compile_validator',
+    'get_validator',
+    'validate_with_compiled_validator',
+    'validate_schema_once',
+    'clear_validator_cache'
 ]
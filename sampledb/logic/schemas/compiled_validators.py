@@ -0,0 +1,347 @@
+# coding: utf-8
+"""
+Compiled data validators for sampledb schemas
+
+validate(instance, schema) interprets the schema while validating, so it
+dispatches on the types of all subschemas and evaluates their constraints
+again for every instance. compile_validator(schema) instead walks the schema
+once and returns a tree of validator functions specialized for it, which
+raise the same errors as validate.
+
+As most objects are created or updated using the schema of their action,
+compiled validators are cached by a hash of their schema in a least recently
+used cache. Schemas that were already validated successfully are cached as
+well, so that they are not validated again.
+"""
+
+import collections
+import copy
+import datetime
+import functools
+import hashlib
+import json
+import re
+import threading
+import typing
+
+from .. import datatypes
+from ..errors import ValidationError, ValidationMultiError
+from .utils import units_are_valid
+from .validate import validate, _resolved_object_references, _validate_hazards, _validate_measurement, _validate_sample, _validate_tags
+from .validate_schema import validate_schema
+
+__author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
+
+# maximum number of compiled validators and of validated schema hashes
+MAX_NUM_CACHED_SCHEMAS = 100
+
+Validator = typing.Callable[[typing.Any, typing.List[str]], None]
+
+_compiled_validators = collections.OrderedDict()
+_validated_schema_hashes = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_validator(schema: dict) -> Validator:
+    """
+    Compile a schema into a function validating instances of it.
+
+    The returned function is given the instance and the path to it, and
+    raises a ValidationError if the instance is invalid. Subschemas which
+    cannot be compiled, e.g. because they are invalid, are interpreted using
+    validate instead.
+
+    :param schema: the sampledb object schema
+    :return: the validator function
+    """
+    compiler = None
+    if isinstance(schema, dict) and isinstance(schema.get('type'), str):
+        compiler = _compilers.get(schema['type'])
+    if compiler is not None:
+        validator = compiler(schema)
+        if validator is not None:
+            return validator
+    return functools.partial(_interpret, schema=schema)
+
+
+def get_validator(schema: dict) -> Validator:
+    """
+    Get the compiled validator for a schema, compiling it if necessary.
+
+    :param schema: the sampledb object schema
+    :return: the validator function
+    """
+    schema_hash = _get_schema_hash(schema)
+    if schema_hash is None:
+        return compile_validator(schema)
+    with _cache_lock:
+        validator = _compiled_validators.get(schema_hash)
+        if validator is not None:
+            _compiled_validators.move_to_end(schema_hash)
+            return validator
+    # the schema is copied, so that the cached validator cannot be changed by
+    # modifying the schema afterwards
+    validator = compile_validator(copy.deepcopy(schema))
+    with _cache_lock:
+        _compiled_validators[schema_hash] = validator
+        while len(_compiled_validators) > MAX_NUM_CACHED_SCHEMAS:
+            _compiled_validators.popitem(last=False)
+    return validator
+
+
+def validate_with_compiled_validator(instance: dict, schema: dict) -> None:
+    """
+    Validates the given instance using the compiled validator for the given
+    schema and raises a ValidationError if it is invalid.
+
+    :param instance: the sampledb object
+    :param schema: the valid sampledb object schema
+    :raise ValidationError: if the instance is invalid
+    """
+    validator = get_validator(schema)
+    with _resolved_object_references(instance, schema):
+        validator(instance, [])
+
+
+def validate_schema_once(schema: dict) -> None:
+    """
+    Validates the given schema and raises a ValidationError if it is invalid,
+    unless the same schema has already been validated successfully.
+
+    :param schema: the sampledb object schema
+    :raise ValidationError: if the schema is invalid
+    """
+    schema_hash = _get_schema_hash(schema)
+    if schema_hash is not None:
+        with _cache_lock:
+            if schema_hash in _validated_schema_hashes:
+                _validated_schema_hashes.move_to_end(schema_hash)
+                return
+    validate_schema(schema)
+    if schema_hash is not None:
+        with _cache_lock:
+            _validated_schema_hashes[schema_hash] = True
+            while len(_validated_schema_hashes) > MAX_NUM_CACHED_SCHEMAS:
+                _validated_schema_hashes.popitem(last=False)
+
+
+def clear_validator_cache() -> None:
+    """
+    Clear the cached compiled validators and validated schema hashes.
+    """
+    with _cache_lock:
+        _compiled_validators.clear()
+        _validated_schema_hashes.clear()
+
+
+def _get_schema_hash(schema: typing.Any) -> typing.Optional[str]:
+    try:
+        schema_json = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(schema_json.encode('utf-8')).hexdigest()
+
+
+def _interpret(instance: typing.Any, path: typing.List[str], schema: typing.Any) -> None:
+    validate(instance, schema, path)
+
+
+def _raise_errors(errors: typing.List[ValidationError]) -> None:
+    if len(errors) == 1:
+        raise errors[0]
+    elif len(errors) > 1:
+        raise ValidationMultiError(errors)
+
+
+def _check_keys(instance: dict, valid_keys: typing.Set[str], path: typing.List[str]) -> None:
+    # all valid keys are required, so the keys are valid if they are equal
+    if instance.keys() == valid_keys:
+        return
+    schema_keys = set(instance.keys())
+    invalid_keys = schema_keys - valid_keys
+    if invalid_keys:
+        raise ValidationError('unexpected keys in schema: {}'.format(invalid_keys), path)
+    missing_keys = valid_keys - schema_keys
+    if missing_keys:
+        raise ValidationError('missing keys in schema: {}'.format(missing_keys), path)
+
+
+@functools.lru_cache(maxsize=1000)
+def _units_are_valid(units: str) -> bool:
+    return units_are_valid(units)
+
+
+def _compile_array(schema: dict) -> typing.Optional[Validator]:
+    if 'items' not in schema:
+        return None
+    item_validator = compile_validator(schema['items'])
+    min_items = schema.get('minItems', None)
+    max_items = schema.get('maxItems', None)
+
+    def validate_array(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, list):
+            raise ValidationError('instance must be list', path)
+        if min_items is not None and len(instance) < min_items:
+            raise ValidationError('expected at least {} items'.format(min_items), path)
+        if max_items is not None and len(instance) > max_items:
+            raise ValidationError('expected at most {} items'.format(max_items), path)
+        errors = []
+        for index, item in enumerate(instance):
+            try:
+                item_validator(item, path + [str(index)])
+            except ValidationError as e:
+                errors.append(e)
+        _raise_errors(errors)
+    return validate_array
+
+
+def _compile_object(schema: dict) -> typing.Optional[Validator]:
+    if not isinstance(schema.get('properties'), dict):
+        return None
+    property_validators = {
+        property_name: compile_validator(property_schema)
+        for property_name, property_schema in schema['properties'].items()
+    }
+    required_property_names = list(schema.get('required', []))
+
+    def validate_object(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, dict):
+            raise ValidationError('instance must be dict', path)
+        errors = []
+        for property_name in required_property_names:
+            if property_name not in instance:
+                errors.append(ValidationError('missing required property "{}"'.format(property_name), path + [property_name]))
+        for property_name, property_value in instance.items():
+            property_validator = property_validators.get(property_name)
+            if property_validator is None:
+                errors.append(ValidationError('unknown property "{}"'.format(property_name), path + [property_name]))
+                continue
+            try:
+                property_validator(property_value, path + [property_name])
+            except ValidationError as e:
+                errors.append(e)
+        _raise_errors(errors)
+    return validate_object
+
+
+def _compile_text(schema: dict) -> typing.Optional[Validator]:
+    valid_keys = {'_type', 'text'}
+    choices = schema.get('choices', None)
+    min_length = schema.get('minLength', 0)
+    max_length = schema.get('maxLength', None)
+    pattern = schema.get('pattern', None)
+    compiled_pattern = None
+    if pattern is not None:
+        try:
+            compiled_pattern = re.compile(pattern)
+        except (TypeError, re.error):
+            return None
+
+    def validate_text(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, dict):
+            raise ValidationError('instance must be dict', path)
+        _check_keys(instance, valid_keys, path)
+        if instance['_type'] != 'text':
+            raise ValidationError('expected _type "text"', path)
+        text = instance['text']
+        if not isinstance(text, str):
+            raise ValidationError('text must be str', path)
+        if choices and text not in choices:
+            raise ValidationError('The text must be one of {}.'.format(choices), path)
+        if len(text) < min_length:
+            raise ValidationError('The text must be at least {} characters long.'.format(min_length), path)
+        if max_length is not None and len(text) > max_length:
+            raise ValidationError('The text must be at most {} characters long.'.format(max_length), path)
+        if compiled_pattern is not None and compiled_pattern.match(text) is None:
+            raise ValidationError('The text must match the pattern: {}.'.format(pattern), path)
+    return validate_text
+
+
+def _compile_datetime(schema: dict) -> typing.Optional[Validator]:
+    valid_keys = {'_type', 'utc_datetime'}
+
+    def validate_datetime(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, dict):
+            raise ValidationError('instance must be dict', path)
+        _check_keys(instance, valid_keys, path)
+        if instance['_type'] != 'datetime':
+            raise ValidationError('expected _type "datetime"', path)
+        if not isinstance(instance['utc_datetime'], str):
+            raise ValidationError('utc_datetime must be str', path)
+        try:
+            datetime.datetime.strptime(instance['utc_datetime'], '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            raise ValidationError('Please enter the date and time in the format: YYYY-MM-DD HH:MM:SS.', path)
+    return validate_datetime
+
+
+def _compile_bool(schema: dict) -> typing.Optional[Validator]:
+    valid_keys = {'_type', 'value'}
+
+    def validate_bool(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, dict):
+            raise ValidationError('instance must be dict', path)
+        _check_keys(instance, valid_keys, path)
+        if instance['_type'] != 'bool':
+            raise ValidationError('expected _type "bool"', path)
+        if not isinstance(instance['value'], bool):
+            raise ValidationError('value must be bool', path)
+    return validate_bool
+
+
+def _compile_quantity(schema: dict) -> typing.Optional[Validator]:
+    valid_keys = {'_type', 'units', 'dimensionality', 'magnitude_in_base_units'}
+    try:
+        schema_dimensionality = datatypes.Quantity(1.0, units=schema['units']).dimensionality
+    except Exception:
+        schema_dimensionality = None
+
+    def validate_quantity(instance: typing.Any, path: typing.List[str]) -> None:
+        if not isinstance(instance, dict):
+            raise ValidationError('instance must be dict', path)
+        _check_keys(instance, valid_keys, path)
+        if instance['_type'] != 'quantity':
+            raise ValidationError('expected _type "quantity"', path)
+        if not isinstance(instance['units'], str):
+            raise ValidationError('units must be str', path)
+        if not _units_are_valid(instance['units']):
+            raise ValidationError('Invalid/Unknown units', path)
+        if not isinstance(instance['magnitude_in_base_units'], float) and not isinstance(instance['magnitude_in_base_units'], int):
+            raise ValidationError('magnitude_in_base_units must be float or int', path)
+        try:
+            quantity = datatypes.Quantity(instance['magnitude_in_base_units'], units=instance['units'])
+        except Exception:
+            raise ValidationError('Unable to create quantity', path)
+        if not isinstance(instance['dimensionality'], str):
+            raise ValidationError('dimensionality must be str', path)
+        if schema_dimensionality is None:
+            raise ValidationError('Unable to create schema quantity', path)
+        if quantity.dimensionality != schema_dimensionality:
+            raise ValidationError('Invalid units, expected units for dimensionality "{}"'.format(str(schema_dimensionality)), path)
+        if str(quantity.dimensionality) != instance['dimensionality']:
+            raise ValidationError('Invalid dimensionality, expected "{}"'.format(str(schema_dimensionality)), path)
+    return validate_quantity
+
+
+def _compile_using(validate_function: typing.Callable[[typing.Any, dict, typing.List[str]], None]) -> typing.Callable[[dict], Validator]:
+    # types without schema-specific constraints use the interpreter's
+    # function for their type directly, skipping only the type dispatch
+    def compile_using_function(schema: dict) -> Validator:
+        def validate_using_function(instance: typing.Any, path: typing.List[str]) -> None:
+            validate_function(instance, schema, path)
+        return validate_using_function
+    return compile_using_function
+
+
+_compilers = {
+    'array': _compile_array,
+    'object': _compile_object,
+    'text': _compile_text,
+    'datetime': _compile_datetime,
+    'bool': _compile_bool,
+    'quantity': _compile_quantity,
+    'sample': _compile_using(_validate_sample),
+    'measurement': _compile_using(_validate_measurement),
+    'tags': _compile_using(_validate_tags),
+    'hazards': _compile_using(_validate_hazards)
+}
@@ -3,14 +3,18 @@
 Implementation of validate(instance, schema)
 """
 
+import contextlib
 import re
 import datetime
+import threading
 import typing
 
 from ...logic import actions, objects, datatypes
-from ..errors import ObjectDoesNotExistError, ValidationError, ValidationMultiError
+from ..errors import ValidationError, ValidationMultiError
 from .utils import units_are_valid
 
+_object_references = threading.local()
+
 
 def validate(instance: typing.Union[dict, list], schema: dict, path: typing.Optional[typing.List[str]] = None) -> None:
     """
@@ -22,7 +26,8 @@ def validate(instance: typing.Union[dict, list], schema: dict, path: typing.Opti
     :raise ValidationError: if the schema is invalid.
     """
     if path is None:
-        path = []
+        with _resolved_object_references(instance, schema):
+            return validate(instance, schema, [])
     if not isinstance(schema, dict):
         raise ValidationError('invalid schema (must be dict)', path)
     if 'type' not in schema:
@@ -51,6 +56,48 @@ def validate(instance: typing.Union[dict, list], schema: dict, path: typing.Opti
         raise ValidationError('invalid type', path)
 
 
+@contextlib.contextmanager
+def _resolved_object_references(instance: typing.Any, schema: typing.Any) -> typing.Iterator[None]:
+    """
+    Looks up the action types of all objects referenced in the given instance
+    using a single query, so that validating sample and measurement
+    references does not need to query each referenced object.
+
+    :param instance: the sampledb object
+    :param schema: the sampledb object schema
+    """
+    object_ids = {
+        object_id
+        for path, object_id, schema_type in objects.iter_object_references(instance, schema)
+    }
+    previous_object_references = getattr(_object_references, 'resolved', None)
+    _object_references.resolved = (object_ids, objects.get_object_action_types(object_ids))
+    try:
+        yield
+    finally:
+        _object_references.resolved = previous_object_references
+
+
+def _get_referenced_object_action_type(object_id: int, path: typing.List[str]) -> actions.ActionType:
+    """
+    Returns the action type of a referenced object, which has usually already
+    been looked up by _resolved_object_references.
+
+    :param object_id: the ID of the referenced object
+    :param path: the path to this subinstance / subschema
+    :return: the type of the action used to create the object
+    :raise ValidationError: if the object does not exist
+    """
+    resolved_object_references = getattr(_object_references, 'resolved', None)
+    if resolved_object_references is not None and object_id in resolved_object_references[0]:
+        action_types = resolved_object_references[1]
+    else:
+        action_types = objects.get_object_action_types([object_id])
+    if object_id not in action_types:
+        raise ValidationError('object does not exist', path)
+    return action_types[object_id]
+
+
 def _validate_array(instance: list, schema: dict, path: typing.List[str]) -> None:
     """
     Validates the given instance using the given array schema and raises a ValidationError if it is invalid.
@@ -358,12 +405,8 @@ def _validate_sample(instance: dict, schema: dict, path: typing.List[str]) -> No
         raise ValidationError('expected _type "sample"', path)
     if not isinstance(instance['object_id'], int):
         raise ValidationError('object_id must be int', path)
-    try:
-        sample = objects.get_object(object_id=instance['object_id'])
-    except ObjectDoesNotExistError:
-        raise ValidationError('object does not exist', path)
-    action = actions.get_action(sample.action_id)
-    if action.type != actions.ActionType.SAMPLE_CREATION:
+    action_type = _get_referenced_object_action_type(instance['object_id'], path)
+    if action_type != actions.ActionType.SAMPLE_CREATION:
         raise ValidationError('object must be sample', path)
 
 
@@ -391,10 +434,6 @@ def _validate_measurement(instance: dict, schema: dict, path: typing.List[str])
         raise ValidationError('expected _type "measurement"', path)
     if not isinstance(instance['object_id'], int):
         raise ValidationError('object_id must be int', path)
-    try:
-        measurement = objects.get_object(object_id=instance['object_id'])
-    except ObjectDoesNotExistError:
-        raise ValidationError('object does not exist', path)
-    action = actions.get_action(measurement.action_id)
-    if action.type != actions.ActionType.MEASUREMENT:
+    action_type = _get_referenced_object_action_type(instance['object_id'], path)
+    if action_type != actions.ActionType.MEASUREMENT:
         raise ValidationError('object must be measurement', path)
@@ -62,5 +62,60 @@ def update_object_tag_usage(object: objects.Object) -> None:
     db.session.commit()
 
 
+def _change_tag_usage(tag_use_changes: typing.Mapping[str, int]) -> None:
+    tag_use_changes = {
+        tag_name: change
+        for tag_name, change in tag_use_changes.items()
+        if change != 0
+    }
+    if not tag_use_changes:
+        return
+    existing_tags = tags.Tag.query.filter(tags.Tag.name.in_(tag_use_changes.keys())).all()
+    for tag in existing_tags:
+        tag.uses = max(0, tag.uses + tag_use_changes.pop(tag.name))
+        if tag.uses > 0:
+            db.session.add(tag)
+        else:
+            db.session.delete(tag)
+    for tag_name, change in tag_use_changes.items():
+        if change > 0:
+            db.session.add(tags.Tag(name=tag_name, uses=change))
+
+
+def add_tag_usage(objects: typing.Sequence[objects.Object]) -> None:
+    """
+    Add the tags of several newly created objects to the tag usage, updating
+    each tag only once.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction creating the objects.
+
+    :param objects: the newly created objects
+    """
+    tag_use_changes = collections.Counter()
+    for object in objects:
+        tag_use_changes.update(set(get_object_tags(object)))
+    _change_tag_usage(tag_use_changes)
+
+
+def update_objects_tag_usage(objects: typing.Sequence[objects.Object], previous_objects: typing.Sequence[objects.Object]) -> None:
+    """
+    Update the tag usage for several updated objects, updating each tag only
+    once.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction updating the objects.
+
+    :param objects: the updated objects
+    :param previous_objects: the previous versions of the updated objects
+    """
+    tag_use_changes = collections.Counter()
+    for object in objects:
+        tag_use_changes.update(set(get_object_tags(object)))
+    for previous_object in previous_objects:
+        tag_use_changes.subtract(set(get_object_tags(previous_object)))
+    _change_tag_usage(tag_use_changes)
+
+
 def get_tags() -> typing.Sequence[Tag]:
     return [Tag.from_database(tag) for tag in tags.Tag.query.order_by(tags.Tag.uses).all()]
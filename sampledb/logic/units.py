@@ -4,16 +4,41 @@
 """
 
 import os
+import threading
 import typing
 import pint
 
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
-ureg = pint.UnitRegistry()
-ureg.load_definitions(os.path.join(os.path.dirname(__file__), 'unit_definitions.txt'))
+
+class _LazyUnitRegistry:
+    """
+    A proxy for a pint UnitRegistry that is only created once it is used, as
+    creating it takes a considerable part of the time needed for starting
+    SampleDB.
+    """
+
+    def __init__(self):
+        self._unit_registry = None
+        self._lock = threading.Lock()
+
+    def _get_unit_registry(self) -> pint.UnitRegistry:
+        if self._unit_registry is None:
+            with self._lock:
+                if self._unit_registry is None:
+                    unit_registry = pint.UnitRegistry()
+                    unit_registry.load_definitions(os.path.join(os.path.dirname(__file__), 'unit_definitions.txt'))
+                    self._unit_registry = unit_registry
+        return self._unit_registry
+
+    def __getattr__(self, name):
+        return getattr(self._get_unit_registry(), name)
+
+
+ureg = _LazyUnitRegistry()
 
 
-def prettify_units(units: typing.Union[str, ureg.Unit]) -> str:
+def prettify_units(units: typing.Union[str, 'ureg.Unit']) -> str:
     """
     Returns a prettified version of the units, if defined, otherwise returns the units unaltered.
     :param units: The pint units or their string representation
@@ -5,9 +5,8 @@
 
 import datetime
 import typing
-from .errors import ObjectDoesNotExistError
 from .users import get_user
-from .object_permissions import get_user_object_permissions, Permissions
+from .object_permissions import get_user_objects_permissions, Permissions
 from ..models import UserLogEntry, UserLogEntryType
 from .. import db
 
@@ -18,24 +17,23 @@ def get_user_log_entries(user_id: int, as_user_id: typing.Optional[int] = None)
     user_log_entries = UserLogEntry.query.filter_by(user_id=user_id).order_by(db.desc(UserLogEntry.utc_datetime)).all()
     if as_user_id is None or as_user_id == user_id or get_user(as_user_id).is_admin:
         return user_log_entries
+    object_ids = set()
+    for user_log_entry in user_log_entries:
+        if 'object_id' in user_log_entry.data:
+            object_ids.add(user_log_entry.data['object_id'])
+        elif 'object_ids' in user_log_entry.data:
+            object_ids.update(user_log_entry.data['object_ids'])
+    objects_permissions = get_user_objects_permissions(user_id=as_user_id, object_ids=object_ids)
     visible_user_log_entries = []
     for user_log_entry in user_log_entries:
         if 'object_id' in user_log_entry.data:
-            object_id = user_log_entry.data['object_id']
-            try:
-                if Permissions.READ in get_user_object_permissions(user_id=as_user_id, object_id=object_id):
-                    visible_user_log_entries.append(user_log_entry)
-            except ObjectDoesNotExistError:
-                pass
+            object_ids = [user_log_entry.data['object_id']]
         elif 'object_ids' in user_log_entry.data:
             object_ids = user_log_entry.data['object_ids']
-            for object_id in object_ids:
-                try:
-                    if Permissions.READ in get_user_object_permissions(user_id=as_user_id, object_id=object_id):
-                        visible_user_log_entries.append(user_log_entry)
-                        break
-                except ObjectDoesNotExistError:
-                    pass
+        else:
+            continue
+        if any(Permissions.READ in objects_permissions[object_id] for object_id in object_ids):
+            visible_user_log_entries.append(user_log_entry)
     return visible_user_log_entries
 
 
@@ -67,6 +65,23 @@ def _store_new_log_entry(type: UserLogEntryType, user_id: int, data: dict):
     db.session.commit()
 
 
+def _store_new_log_entries(type: UserLogEntryType, user_id: int, data_sequence: typing.Sequence[dict]):
+    # this function does not commit the session, so that the log entries can
+    # be stored in the same transaction as the changes they describe
+    if not data_sequence:
+        return
+    utc_datetime = datetime.datetime.utcnow()
+    db.session.execute(UserLogEntry.__table__.insert().values([
+        {
+            'type': type,
+            'user_id': user_id,
+            'data': data,
+            'utc_datetime': utc_datetime
+        }
+        for data in data_sequence
+    ]))
+
+
 def create_object(user_id: int, object_id: int):
     _store_new_log_entry(
         type=UserLogEntryType.CREATE_OBJECT,
@@ -88,6 +103,29 @@ def edit_object(user_id: int, object_id: int, version_id: int):
     )
 
 
+def edit_objects(user_id: int, object_and_version_ids: typing.Sequence[typing.Tuple[int, int]]):
+    """
+    Create log entries for a user editing several objects.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction updating the objects.
+
+    :param user_id: the ID of the user who edited the objects
+    :param object_and_version_ids: a list of (object ID, version ID) tuples
+    """
+    _store_new_log_entries(
+        type=UserLogEntryType.EDIT_OBJECT,
+        user_id=user_id,
+        data_sequence=[
+            {
+                'object_id': object_id,
+                'version_id': version_id
+            }
+            for object_id, version_id in object_and_version_ids
+        ]
+    )
+
+
 def restore_object_version(user_id: int, object_id: int, version_id: int, restored_version_id: int):
     _store_new_log_entry(
         type=UserLogEntryType.RESTORE_OBJECT_VERSION,
@@ -170,6 +208,28 @@ def create_batch(user_id: int, batch_object_ids: typing.List[int]):
     )
 
 
+def create_batches(user_id: int, batches_object_ids: typing.Sequence[typing.List[int]]):
+    """
+    Create log entries for a user creating one or more batches of objects.
+
+    This function does not commit the session, so that it can be used as part
+    of the transaction creating the objects.
+
+    :param user_id: the ID of the user who created the batches
+    :param batches_object_ids: a list containing the object IDs of each batch
+    """
+    _store_new_log_entries(
+        type=UserLogEntryType.CREATE_BATCH,
+        user_id=user_id,
+        data_sequence=[
+            {
+                'object_ids': batch_object_ids
+            }
+            for batch_object_ids in batches_object_ids
+        ]
+    )
+
+
 def assign_location(user_id: int, object_location_assignment_id: int):
     _store_new_log_entry(
         type=UserLogEntryType.ASSIGN_LOCATION,
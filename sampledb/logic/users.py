@@ -6,10 +6,11 @@
 import typing
 
 from .. import db
-from . import errors
+from . import caching, errors
 from .. models import User, UserType
 
 
+@caching.cached('users')
 def get_user(user_id: int) -> User:
     if user_id is None:
         raise TypeError("user_id must be int")
@@ -41,6 +42,19 @@ def get_users_by_name(name: str) -> typing.List[User]:
     return User.query.filter_by(name=name).all()
 
 
+def get_users_by_ids(user_ids: typing.Iterable[int]) -> typing.List[User]:
+    """
+    Return all users with the given IDs using a single query.
+
+    :param user_ids: the IDs of the users
+    :return: the list of users with these IDs
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return []
+    return User.query.filter(User.id.in_(user_ids)).all()
+
+
 def create_user(name: str, email: str, type: UserType) -> User:
     """
     Create a new user.
@@ -74,6 +88,7 @@ def set_user_readonly(user_id: int, readonly: bool) -> None:
     user.is_readonly = readonly
     db.session.add(user)
     db.session.commit()
+    caching.invalidate('users', user_id)
 
 
 def set_user_hidden(user_id: int, hidden: bool) -> None:
@@ -90,3 +105,4 @@ def set_user_hidden(user_id: int, hidden: bool) -> None:
     user.is_hidden = hidden
     db.session.add(user)
     db.session.commit()
+    caching.invalidate('users', user_id)
@@ -10,6 +10,7 @@ precision. These filters use operators that include a range of EPSILON of the
 left operand's magnitude in base units.
 """
 
+import datetime
 import operator
 import json
 import sqlalchemy as db
@@ -22,20 +23,20 @@ __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
 def float_operator_equals(left, right):
     return db.and_(
-        left * (1 - EPSILON) <= right,
-        left * (1 + EPSILON) >= right
+        left <= right / (1 - EPSILON),
+        left >= right / (1 + EPSILON)
     )
 
 
 def float_operator_less_than_equals(left, right):
     return db.and_(
-        left * (1 - EPSILON) <= right
+        left <= right / (1 - EPSILON)
     )
 
 
 def float_operator_greater_than_equals(left, right):
     return db.and_(
-        left * (1 + EPSILON) >= right
+        left >= right / (1 + EPSILON)
     )
 
 
@@ -74,8 +75,8 @@ def quantity_between(db_obj, left, right, including=True):
         return db.and_(
             db_obj['_type'].astext == 'quantity',
             db_obj['dimensionality'].astext == str(left.dimensionality),
-            db_obj['magnitude_in_base_units'].astext.cast(db.Float) * (1 + EPSILON) >= left.maginitude_in_base_units,
-            db_obj['magnitude_in_base_units'].astext.cast(db.Float) * (1 - EPSILON) <= right.maginitude_in_base_units
+            db_obj['magnitude_in_base_units'].astext.cast(db.Float) >= left.maginitude_in_base_units / (1 + EPSILON),
+            db_obj['magnitude_in_base_units'].astext.cast(db.Float) <= right.maginitude_in_base_units / (1 - EPSILON)
         )
     else:
         return db.and_(
@@ -86,13 +87,39 @@ def quantity_between(db_obj, left, right, including=True):
         )
 
 
-def datetime_binary_operator(db_obj, other, operator):
-    if isinstance(other, datatypes.DateTime):
-        other = other.utc_datetime
-    other = other.date()
+def _datetime_range(value):
+    """
+    Return the first datetime string of the day of a given datetime and that
+    of the following day.
+
+    Datetimes are stored as strings starting with the date, so comparing
+    these strings with the returned ones is equivalent to comparing the
+    dates, while still allowing the use of an index.
+    """
+    if isinstance(value, datatypes.DateTime):
+        value = value.utc_datetime
+    value = value.date()
+    return value.strftime('%Y-%m-%d'), (value + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def datetime_binary_operator(db_obj, other, datetime_operator):
+    start, end = _datetime_range(other)
+    utc_datetime = db_obj['utc_datetime'].astext
+    if datetime_operator is operator.eq:
+        condition = db.and_(utc_datetime >= start, utc_datetime < end)
+    elif datetime_operator is operator.lt:
+        condition = utc_datetime < start
+    elif datetime_operator is operator.le:
+        condition = utc_datetime < end
+    elif datetime_operator is operator.gt:
+        condition = utc_datetime >= end
+    elif datetime_operator is operator.ge:
+        condition = utc_datetime >= start
+    else:
+        raise ValueError("Unsupported datetime operator")
     return db.and_(
         db_obj['_type'].astext == 'datetime',
-        operator(db.func.to_timestamp(db_obj['utc_datetime'].astext, 'YYYY-MM-DD'), other)
+        condition
     )
 
 
@@ -117,23 +144,19 @@ def datetime_greater_than_equals(db_obj, other):
 
 
 def datetime_between(db_obj, left, right, including=True):
-    if isinstance(left, datatypes.DateTime):
-        left = left.utc_datetime
-    if isinstance(right, datatypes.DateTime):
-        right = right.utc_datetime
-    left = left.date()
-    right = right.date()
+    left_start, left_end = _datetime_range(left)
+    right_start, right_end = _datetime_range(right)
     if including:
         return db.and_(
             db_obj['_type'].astext == 'datetime',
-            db.func.to_timestamp(db_obj['utc_datetime'].astext, 'YYYY-MM-DD') >= left,
-            db.func.to_timestamp(db_obj['utc_datetime'].astext, 'YYYY-MM-DD') <= right,
+            db_obj['utc_datetime'].astext >= left_start,
+            db_obj['utc_datetime'].astext < right_end,
         )
     else:
         return db.and_(
             db_obj['_type'].astext == 'datetime',
-            db.func.to_timestamp(db_obj['utc_datetime'].astext, 'YYYY-MM-DD') > left,
-            db.func.to_timestamp(db_obj['utc_datetime'].astext, 'YYYY-MM-DD') < right,
+            db_obj['utc_datetime'].astext >= left_end,
+            db_obj['utc_datetime'].astext < right_start,
         )
 
 
@@ -23,12 +23,14 @@ from .comments import Comment
 from .favorites import FavoriteAction, FavoriteInstrument
 from .files import File
 from .groups import Group
+from .indexed_properties import IndexedObjectProperty
 from .instruments import Instrument
-from .locations import Location, ObjectLocationAssignment
+from .jobs import Job, JobType, JobStatus
+from .locations import Location, ObjectLocationAssignment, CurrentObjectLocationAssignment
 from .notifications import Notification, NotificationType, NotificationMode, NotificationModeForType
 from .objects import Objects, Object
 from .object_log import ObjectLogEntry, ObjectLogEntryType
-from .object_permissions import UserObjectPermissions, GroupObjectPermissions, ProjectObjectPermissions, PublicObjects, DefaultUserPermissions, DefaultGroupPermissions, DefaultProjectPermissions, DefaultPublicPermissions
+from .object_permissions import UserObjectPermissions, GroupObjectPermissions, ProjectObjectPermissions, PublicObjects, DefaultUserPermissions, DefaultGroupPermissions, DefaultProjectPermissions, DefaultPublicPermissions, EffectiveUserObjectPermissions
 from .object_publications import ObjectPublication
 from .permissions import Permissions
 from .projects import Project, UserProjectPermissions, GroupProjectPermissions, SubprojectRelationship
@@ -66,9 +68,14 @@ __all__ = [
     'File',
     'Group',
     'HTTPMethod',
+    'IndexedObjectProperty',
     'Instrument',
+    'Job',
+    'JobType',
+    'JobStatus',
     'Location',
     'ObjectLocationAssignment',
+    'CurrentObjectLocationAssignment',
     'Notification',
     'NotificationType',
     'NotificationMode',
@@ -86,6 +93,7 @@ __all__ = [
     'DefaultGroupPermissions',
     'DefaultProjectPermissions',
     'DefaultPublicPermissions',
+    'EffectiveUserObjectPermissions',
     'Permissions',
     'Project',
     'UserProjectPermissions',
@@ -24,13 +24,16 @@ class Authentication(db.Model):
     login = db.Column(postgresql.JSONB)
     type = db.Column(db.Enum(AuthenticationType))
     confirmed = db.Column(db.Boolean, default=False, nullable=False)
+    # hex encoded SHA-256 digest of an API token, for finding it using the index
+    api_token_hash = db.Column(db.String(64), nullable=True, unique=True)
     user = db.relationship('User', backref="authentication_methods")
 
-    def __init__(self, login, authentication_type, confirmed, user_id):
+    def __init__(self, login, authentication_type, confirmed, user_id, api_token_hash=None):
         self.login = login
         self.type = authentication_type
         self.confirmed = confirmed
         self.user_id = user_id
+        self.api_token_hash = api_token_hash
 
     def __repr__(self):
         return '<{0}(id={1.id})>'.format(type(self).__name__, self)
@@ -0,0 +1,29 @@
+# coding: utf-8
+"""
+
+"""
+
+from sqlalchemy.dialects import postgresql
+
+from .. import db
+from .actions import Action
+
+
+class IndexedObjectProperty(db.Model):
+    __tablename__ = 'indexed_object_properties'
+    __table_args__ = (
+        db.UniqueConstraint('action_id', 'property_path', name='_indexed_object_properties_uc'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    action_id = db.Column(db.Integer, db.ForeignKey(Action.id), nullable=False)
+    property_path = db.Column(postgresql.JSONB, nullable=False)
+    property_type = db.Column(db.String, nullable=False)
+
+    def __init__(self, action_id, property_path, property_type):
+        self.action_id = action_id
+        self.property_path = property_path
+        self.property_type = property_type
+
+    def __repr__(self):
+        return '<{0}(id={1.id}, action_id={1.action_id}, property_path={1.property_path}, property_type={1.property_type})>'.format(type(self).__name__, self)
@@ -0,0 +1,53 @@
+# coding: utf-8
+"""
+
+"""
+
+import datetime
+import enum
+import typing
+
+from sqlalchemy.dialects import postgresql
+
+from .. import db
+
+
+@enum.unique
+class JobType(enum.Enum):
+    SEND_NOTIFICATION_EMAIL = 0
+
+
+@enum.unique
+class JobStatus(enum.Enum):
+    PENDING = 0
+    FAILED = 1
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_utc_datetime_next_attempt', 'status', 'utc_datetime_next_attempt'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.Enum(JobType), nullable=False)
+    data = db.Column(postgresql.JSONB, nullable=False)
+    status = db.Column(db.Enum(JobStatus), nullable=False)
+    num_attempts = db.Column(db.Integer, nullable=False)
+    utc_datetime_created = db.Column(db.DateTime, nullable=False)
+    utc_datetime_next_attempt = db.Column(db.DateTime, nullable=False)
+    error_message = db.Column(db.String, nullable=True)
+
+    def __init__(self, type: JobType, data: typing.Dict[str, typing.Any], utc_datetime_created: typing.Optional[datetime.datetime] = None):
+        self.type = type
+        self.data = data
+        self.status = JobStatus.PENDING
+        self.num_attempts = 0
+        if utc_datetime_created is None:
+            utc_datetime_created = datetime.datetime.utcnow()
+        self.utc_datetime_created = utc_datetime_created
+        self.utc_datetime_next_attempt = utc_datetime_created
+        self.error_message = None
+
+    def __repr__(self):
+        return '<{0}(id={1.id}, type={1.type}, status={1.status}, num_attempts={1.num_attempts})>'.format(type(self).__name__, self)
@@ -0,0 +1,113 @@
+# coding: utf-8
+"""
+Creating and applying JSON patches (RFC 6902) for JSON-serializable data.
+
+Only the add, remove and replace operations are used, which is sufficient
+for storing object versions as differences to each other.
+"""
+
+import copy
+
+__author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
+
+
+def make_patch(source, target):
+    """
+    Creates a JSON patch which turns the source into the target.
+
+    :param source: the JSON-serializable data to patch
+    :param target: the JSON-serializable data to create by patching
+    :return: the JSON patch as a list of operations
+    """
+    patch = []
+    _add_operations(source, target, '', patch)
+    return patch
+
+
+def apply_patch(document, patch):
+    """
+    Applies a JSON patch to the given data, without modifying it.
+
+    :param document: the JSON-serializable data to patch
+    :param patch: the JSON patch as a list of operations
+    :return: the patched data
+    :raise ValueError: if the patch cannot be applied to the data
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op = operation.get('op')
+        tokens = _parse_pointer(operation.get('path', ''))
+        if not tokens:
+            if op in ('add', 'replace'):
+                document = copy.deepcopy(operation['value'])
+                continue
+            raise ValueError('Invalid operation on the root: {}'.format(op))
+        parent = document
+        try:
+            for token in tokens[:-1]:
+                parent = parent[int(token) if isinstance(parent, list) else token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ValueError('Invalid path: {}'.format(operation.get('path')))
+        key = tokens[-1]
+        if isinstance(parent, list):
+            if op == 'add' and key == '-':
+                key = len(parent)
+            try:
+                key = int(key)
+            except ValueError:
+                raise ValueError('Invalid path: {}'.format(operation.get('path')))
+            if not 0 <= key <= len(parent) or (op != 'add' and key == len(parent)):
+                raise ValueError('Invalid path: {}'.format(operation.get('path')))
+        elif not isinstance(parent, dict) or (op != 'add' and key not in parent):
+            raise ValueError('Invalid path: {}'.format(operation.get('path')))
+        if op == 'add':
+            if isinstance(parent, list):
+                parent.insert(key, copy.deepcopy(operation['value']))
+            else:
+                parent[key] = copy.deepcopy(operation['value'])
+        elif op == 'remove':
+            del parent[key]
+        elif op == 'replace':
+            parent[key] = copy.deepcopy(operation['value'])
+        else:
+            raise ValueError('Unsupported operation: {}'.format(op))
+    return document
+
+
+def _add_operations(source, target, path, patch):
+    if isinstance(source, dict) and isinstance(target, dict):
+        for key in source:
+            if key not in target:
+                patch.append({'op': 'remove', 'path': path + '/' + _escape(key)})
+        for key, value in target.items():
+            if key in source:
+                _add_operations(source[key], value, path + '/' + _escape(key), patch)
+            else:
+                patch.append({'op': 'add', 'path': path + '/' + _escape(key), 'value': value})
+    elif isinstance(source, list) and isinstance(target, list):
+        num_common_items = min(len(source), len(target))
+        for index in range(num_common_items):
+            _add_operations(source[index], target[index], path + '/' + str(index), patch)
+        # items are removed from the end, so that the indices stay valid
+        for index in range(len(source) - 1, num_common_items - 1, -1):
+            patch.append({'op': 'remove', 'path': path + '/' + str(index)})
+        for index in range(num_common_items, len(target)):
+            patch.append({'op': 'add', 'path': path + '/' + str(index), 'value': target[index]})
+    elif type(source) is not type(target) or source != target:
+        # the type is compared as well, as e.g. True == 1 in Python
+        patch.append({'op': 'replace', 'path': path, 'value': target})
+
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _parse_pointer(pointer):
+    if not pointer:
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError('Invalid path: {}'.format(pointer))
+    return [
+        token.replace('~1', '/').replace('~0', '~')
+        for token in pointer[1:].split('/')
+    ]
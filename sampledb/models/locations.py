@@ -55,3 +55,19 @@ class ObjectLocationAssignment(db.Model):
 
     def __repr__(self):
         return '<{0}(id={1.id}, object_id={1.object_id}, location_id={1.location_id}, user_id={1.user_id}, responsible_user_id={1.responsible_user_id}, utc_datetime={1.utc_datetime}, description="{1.content}", confirmed={1.confirmed)>'.format(type(self).__name__, self)
+
+
+class CurrentObjectLocationAssignment(db.Model):
+    __tablename__ = 'current_object_location_assignments'
+
+    object_id = db.Column(db.Integer, db.ForeignKey(Objects.object_id_column), primary_key=True)
+    object_location_assignment_id = db.Column(db.Integer, db.ForeignKey(ObjectLocationAssignment.id), nullable=False, unique=True)
+    location_id = db.Column(db.Integer, db.ForeignKey(Location.id), nullable=True, index=True)
+
+    def __init__(self, object_id: int, object_location_assignment_id: int, location_id: typing.Optional[int]):
+        self.object_id = object_id
+        self.object_location_assignment_id = object_location_assignment_id
+        self.location_id = location_id
+
+    def __repr__(self):
+        return '<{0}(object_id={1.object_id}, object_location_assignment_id={1.object_location_assignment_id}, location_id={1.location_id})>'.format(type(self).__name__, self)
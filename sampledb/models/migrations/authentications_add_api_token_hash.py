@@ -0,0 +1,30 @@
+# coding: utf-8
+"""
+Add api_token_hash column to authentications table.
+
+The hashes of existing API tokens cannot be computed from their bcrypt
+hashes, so they are set when the tokens are used for the first time.
+"""
+
+import os
+
+MIGRATION_INDEX = 17
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    column_names = db.session.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'authentications'
+    """).fetchall()
+    if ('api_token_hash',) in column_names:
+        return False
+
+    # Perform migration
+    db.session.execute("""
+        ALTER TABLE authentications
+        ADD api_token_hash VARCHAR(64) NULL UNIQUE
+    """)
+    return True
@@ -0,0 +1,31 @@
+# coding: utf-8
+"""
+Fill the current_object_location_assignments table using the latest
+assignment of each object in the object_location_assignments table.
+"""
+
+import os
+
+MIGRATION_INDEX = 18
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    current_assignments_exist = db.session.execute("""
+        SELECT object_id
+        FROM current_object_location_assignments
+        LIMIT 1
+    """).first() is not None
+    if current_assignments_exist:
+        return False
+
+    # Perform migration
+    db.session.execute("""
+        INSERT INTO current_object_location_assignments
+        (object_id, object_location_assignment_id, location_id)
+        SELECT DISTINCT ON (object_id) object_id, id, location_id
+        FROM object_location_assignments
+        ORDER BY object_id, utc_datetime DESC, id DESC
+    """)
+    return True
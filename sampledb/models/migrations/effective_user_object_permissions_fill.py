@@ -0,0 +1,33 @@
+# coding: utf-8
+"""
+Fill the effective_user_object_permissions table using the view
+user_object_permissions_by_all.
+"""
+
+import os
+
+MIGRATION_INDEX = 15
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    effective_permissions_exist = db.session.execute("""
+        SELECT object_id
+        FROM effective_user_object_permissions
+        LIMIT 1
+    """).first() is not None
+    if effective_permissions_exist:
+        return False
+
+    # Perform migration
+    db.session.execute("""
+        INSERT INTO effective_user_object_permissions
+        (user_id, object_id, permissions_int)
+        SELECT user_id, object_id, MAX(permissions_int)
+        FROM user_object_permissions_by_all
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id, object_id
+        HAVING MAX(permissions_int) > 0
+    """)
+    return True
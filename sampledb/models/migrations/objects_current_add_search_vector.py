@@ -0,0 +1,35 @@
+# coding: utf-8
+"""
+Add search_vector column to objects_current table and fill it for all objects.
+"""
+
+import os
+
+from ..objects import Objects
+
+MIGRATION_INDEX = 16
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    column_names = db.session.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'objects_current'
+    """).fetchall()
+    if ('search_vector',) in column_names:
+        return False
+
+    # Perform migration
+    db.session.execute("""
+        ALTER TABLE objects_current
+        ADD search_vector TSVECTOR
+    """)
+    db.session.execute("""
+        CREATE INDEX ix_objects_current_search_vector
+        ON objects_current
+        USING gin (search_vector)
+    """)
+    Objects.update_search_vectors(connection=db.session.connection())
+    return True
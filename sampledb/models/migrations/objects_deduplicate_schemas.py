@@ -0,0 +1,60 @@
+# coding: utf-8
+"""
+Replace the schema columns of the objects_current and objects_previous tables
+with references to the schemas stored once in the objects_schemas table.
+"""
+
+import os
+
+import sqlalchemy.dialects.postgresql as postgresql
+
+from ..objects import Objects
+
+MIGRATION_INDEX = 19
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    column_names = db.session.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'objects_current'
+    """).fetchall()
+    if ('schema',) not in column_names:
+        return False
+
+    # Perform migration
+    schemas = db.session.execute("""
+        SELECT schema FROM objects_current
+        UNION
+        SELECT schema FROM objects_previous
+    """).fetchall()
+    if schemas:
+        # the hashes are computed in Python, as they have to match those of
+        # the schemas stored later on
+        db.session.execute(
+            postgresql.insert(Objects._schemas_table).on_conflict_do_nothing(index_elements=['hash']),
+            [
+                {'hash': Objects.get_schema_hash(schema), 'schema': schema}
+                for schema, in schemas
+            ]
+        )
+    for table_name in ('objects_current', 'objects_previous'):
+        db.session.execute("""
+            ALTER TABLE {table_name}
+            ADD schema_hash VARCHAR(64)
+        """.format(table_name=table_name))
+        db.session.execute("""
+            UPDATE {table_name} AS o
+            SET schema_hash = s.hash
+            FROM objects_schemas AS s
+            WHERE o.schema = s.schema
+        """.format(table_name=table_name))
+        db.session.execute("""
+            ALTER TABLE {table_name}
+            ALTER COLUMN schema_hash SET NOT NULL,
+            ADD FOREIGN KEY (schema_hash) REFERENCES objects_schemas(hash),
+            DROP COLUMN schema
+        """.format(table_name=table_name))
+    return True
@@ -0,0 +1,30 @@
+# coding: utf-8
+"""
+Add data_patch column to objects_previous table, so that previous object
+versions can be stored as patches instead of full snapshots.
+"""
+
+import os
+
+MIGRATION_INDEX = 20
+MIGRATION_NAME, _ = os.path.splitext(os.path.basename(__file__))
+
+
+def run(db):
+    # Skip migration by condition
+    column_names = db.session.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'objects_previous'
+    """).fetchall()
+    if ('data_patch',) in column_names:
+        return False
+
+    # Perform migration
+    db.session.execute("""
+        ALTER TABLE objects_previous
+        ADD data_patch JSONB,
+        ALTER COLUMN data DROP NOT NULL,
+        ADD CONSTRAINT objects_previous_data_check CHECK ((data IS NULL) <> (data_patch IS NULL))
+    """)
+    return True
@@ -101,3 +101,16 @@ class DefaultPublicPermissions(db.Model):
 
     creator_id = db.Column(db.Integer, db.ForeignKey(User.id), primary_key=True)
     is_public = db.Column(db.Boolean, default=False, nullable=False)
+
+
+class EffectiveUserObjectPermissions(db.Model):
+    __tablename__ = 'effective_user_object_permissions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id), nullable=False)
+    object_id = db.Column(db.Integer, db.ForeignKey(Objects.object_id_column), nullable=False, index=True)
+    permissions_int = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.PrimaryKeyConstraint(user_id, object_id),
+        {},
+    )
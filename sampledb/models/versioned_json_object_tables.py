@@ -4,12 +4,23 @@
 """
 
 import collections
+import copy
 import datetime
+import hashlib
+import json
+import threading
+
 import sqlalchemy as db
 import sqlalchemy.dialects.postgresql as postgresql
 
+from . import json_patch
+
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
+# maximum number of previous object versions reconstructed from patches which
+# are cached per instance of VersionedJSONSerializableObjectTables
+MAX_NUM_CACHED_VERSIONS = 1000
+
 
 class VersionedJSONSerializableObjectTables(object):
     """
@@ -19,8 +30,16 @@ class VersionedJSONSerializableObjectTables(object):
     object consists of an object ID, a version ID, the actual data, a JSON schema for the data and information about
     this current version (the ID of this version's author and a datetime of when the object was created or updated).
 
-    These two tables will be created when the instance of this class is created, if bind is provided. Otherwise you
-    can use the metadata attribute to access the SQLAlchemy MetaData object associated with these tables. You can then
+    As many objects share the same schema, schemas are stored only once in a third table, identified by the SHA-256
+    hash of their JSON representation, and the object tables only contain this hash. Schemas are cached per instance
+    of this class, so the returned objects may share their schemas, which must therefore not be modified.
+
+    If a snapshot interval is set, previous versions are stored as JSON patches to the data of the following version,
+    except for every version with a version ID divisible by the snapshot interval, which is stored as a full snapshot.
+    Versions stored as patches are reconstructed transparently and the most recently reconstructed versions are cached.
+
+    These tables will be created when the instance of this class is created, if bind is provided. Otherwise you can
+    use the metadata attribute to access the SQLAlchemy MetaData object associated with these tables. You can then
     call metadata.create_all(bind) to create the tables.
 
     You should **not** interact with the tables yourself. Instead, use the functions provided by this class.
@@ -45,11 +64,21 @@ class VersionedJSONSerializableObjectTables(object):
         def id(self) -> int:
             return self.object_id
 
-    def __init__(self, table_name_prefix, bind=None, object_type=VersionedJSONSerializableObject, user_id_column=None, action_id_column=None, action_schema_column=None, metadata=None, create_object_callbacks=None, data_validator=None, schema_validator=None):
+    VersionMetadata = collections.namedtuple(
+        'VersionMetadata',
+        [
+            'object_id',
+            'version_id',
+            'user_id',
+            'utc_datetime'
+        ]
+    )
+
+    def __init__(self, table_name_prefix, bind=None, object_type=VersionedJSONSerializableObject, user_id_column=None, action_id_column=None, action_schema_column=None, metadata=None, create_object_callbacks=None, data_validator=None, schema_validator=None, snapshot_interval=None):
         """
-        Creates new instance for storing versioned, JSON-serializable objects using two tables.
+        Creates new instance for storing versioned, JSON-serializable objects using two tables and a table of schemas.
 
-        :param table_name_prefix: the prefix used for naming the two used tables
+        :param table_name_prefix: the prefix used for naming the three used tables
         :param bind: the SQLAlchemy engine used for creating the tables and for future connections
         :param object_type: the type used for returning objects
         :param user_id_column: a SQLAlchemy column object for use as foreign key for the user ID (optional)
@@ -58,10 +87,18 @@ class VersionedJSONSerializableObjectTables(object):
         :param create_object_callbacks: a list of callables which will be called when an object is created (optional)
         :param data_validator: a data validator function (given the data and the schema) (optional)
         :param schema_validator: a schema validator function (given the schema) (optional)
+        :param snapshot_interval: the interval between previous versions stored as full snapshots, or None to store
+            all previous versions as full snapshots (optional)
         """
         if metadata is None:
             metadata = db.MetaData()
         self.metadata = metadata
+        self._schemas_table = db.Table(
+            table_name_prefix + '_schemas',
+            self.metadata,
+            db.Column('hash', db.String(64), nullable=False, primary_key=True),
+            db.Column('schema', postgresql.JSONB, nullable=False)
+        )
         self._current_table = db.Table(
             table_name_prefix + '_current',
             self.metadata,
@@ -69,9 +106,11 @@ class VersionedJSONSerializableObjectTables(object):
             db.Column('version_id', db.Integer, nullable=False, default=0),
             db.Column('action_id', db.Integer, nullable=False),
             db.Column('data', postgresql.JSONB, nullable=False),
-            db.Column('schema', postgresql.JSONB, nullable=False),
+            db.Column('schema_hash', db.String(64), db.ForeignKey(self._schemas_table.c.hash), nullable=False),
             db.Column('user_id', db.Integer, nullable=False),
-            db.Column('utc_datetime', db.DateTime, nullable=False)
+            db.Column('utc_datetime', db.DateTime, nullable=False),
+            db.Column('search_vector', postgresql.TSVECTOR, nullable=True),
+            db.Index('ix_' + table_name_prefix + '_current_search_vector', 'search_vector', postgresql_using='gin')
         )
         self._previous_table = db.Table(
             table_name_prefix + '_previous',
@@ -79,11 +118,13 @@ class VersionedJSONSerializableObjectTables(object):
             db.Column('object_id', db.Integer, nullable=False),
             db.Column('version_id', db.Integer, nullable=False),
             db.Column('action_id', db.Integer, nullable=False),
-            db.Column('data', postgresql.JSONB, nullable=False),
-            db.Column('schema', postgresql.JSONB, nullable=False),
+            db.Column('data', postgresql.JSONB(none_as_null=True), nullable=True),
+            db.Column('data_patch', postgresql.JSONB(none_as_null=True), nullable=True),
+            db.Column('schema_hash', db.String(64), db.ForeignKey(self._schemas_table.c.hash), nullable=False),
             db.Column('user_id', db.Integer, nullable=False),
             db.Column('utc_datetime', db.DateTime, nullable=False),
-            db.PrimaryKeyConstraint('object_id', 'version_id')
+            db.PrimaryKeyConstraint('object_id', 'version_id'),
+            db.CheckConstraint('(data IS NULL) <> (data_patch IS NULL)', name=table_name_prefix + '_previous_data_check')
         )
         if user_id_column is not None:
             self._current_table.append_constraint(db.ForeignKeyConstraint(['user_id'], [user_id_column]))
@@ -102,6 +143,263 @@ class VersionedJSONSerializableObjectTables(object):
             self.metadata.create_all(self.bind)
         self._data_validator = data_validator
         self._schema_validator = schema_validator
+        self._schemas_by_hash = {}
+        self._schemas_lock = threading.Lock()
+        self.snapshot_interval = snapshot_interval
+        self._cached_versions = collections.OrderedDict()
+        self._cached_versions_lock = threading.Lock()
+
+    @staticmethod
+    def get_schema_hash(schema):
+        """
+        Computes the hash used for identifying a schema in the table of schemas.
+
+        :param schema: a JSON schema
+        :return: the hexadecimal SHA-256 hash of the schema's canonical JSON representation
+        """
+        return hashlib.sha256(json.dumps(schema, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    def store_schema(self, schema, connection=None):
+        """
+        Stores a schema in the table of schemas, unless it has already been stored.
+
+        :param schema: a JSON schema
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :return: the hash of the schema
+        """
+        if connection is None:
+            connection = self.bind.connect()
+        schema_hash = self.get_schema_hash(schema)
+        # the schema is inserted even if it is cached, as the transaction
+        # that stored it before might have been rolled back
+        connection.execute(
+            postgresql.insert(self._schemas_table)
+            .values(hash=schema_hash, schema=schema)
+            .on_conflict_do_nothing(index_elements=['hash'])
+        )
+        with self._schemas_lock:
+            if schema_hash not in self._schemas_by_hash:
+                # the schema is copied, so that modifying it afterwards does not affect the cache
+                self._schemas_by_hash[schema_hash] = copy.deepcopy(schema)
+        return schema_hash
+
+    def _get_schemas(self, schema_hashes, connection):
+        """
+        Returns the schemas with the given hashes, querying only those schemas which have not been cached yet.
+
+        :param schema_hashes: a collection of schema hashes
+        :param connection: the SQLAlchemy connection
+        :return: a dict mapping the schema hashes to the schemas
+        """
+        with self._schemas_lock:
+            schemas_by_hash = {
+                schema_hash: self._schemas_by_hash[schema_hash]
+                for schema_hash in schema_hashes
+                if schema_hash in self._schemas_by_hash
+            }
+        missing_schema_hashes = set(schema_hashes) - set(schemas_by_hash)
+        if missing_schema_hashes:
+            rows = connection.execute(
+                db.select([
+                    self._schemas_table.c.hash,
+                    self._schemas_table.c.schema
+                ])
+                .where(self._schemas_table.c.hash.in_(missing_schema_hashes))
+            ).fetchall()
+            with self._schemas_lock:
+                for schema_hash, schema in rows:
+                    # schemas never change, so concurrently cached schemas can be used as well
+                    schemas_by_hash[schema_hash] = self._schemas_by_hash.setdefault(schema_hash, schema)
+        return schemas_by_hash
+
+    def _get_objects_from_rows(self, rows, connection):
+        """
+        Creates objects from rows containing the object columns, with the schema hash in place of the schema.
+
+        :param rows: the rows as returned by SQLAlchemy
+        :param connection: the SQLAlchemy connection
+        :return: a list of objects as object_type
+        """
+        schemas_by_hash = self._get_schemas({row[4] for row in rows}, connection)
+        return [
+            self.object_type(
+                object_id=row[0],
+                version_id=row[1],
+                action_id=row[2],
+                data=row[3],
+                schema=schemas_by_hash[row[4]],
+                user_id=row[5],
+                utc_datetime=row[6]
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _get_previous_version_storage(version_id, data, next_data, snapshot_interval):
+        """
+        Determines how the data of a previous version is stored.
+
+        :param version_id: the ID of the previous version
+        :param data: the data of the previous version
+        :param next_data: the data of the following version
+        :param snapshot_interval: the interval between versions stored as full snapshots, or None
+        :return: a tuple of the data and None for a full snapshot, or of None and the patch to next_data
+        """
+        if not snapshot_interval or version_id % snapshot_interval == 0:
+            return data, None
+        data_patch = json_patch.make_patch(next_data, data)
+        # a patch replacing most of the data is not worth reconstructing
+        if len(json.dumps(data_patch)) >= len(json.dumps(data)):
+            return data, None
+        return None, data_patch
+
+    def _get_cached_version_data(self, object_id, version_id):
+        with self._cached_versions_lock:
+            data_json = self._cached_versions.get((object_id, version_id))
+            if data_json is None:
+                return None
+            self._cached_versions.move_to_end((object_id, version_id))
+        # the data is cached as JSON, so that modifying the returned data does not affect the cache
+        return json.loads(data_json)
+
+    def _set_cached_version_data(self, object_id, version_id, data):
+        data_json = json.dumps(data)
+        with self._cached_versions_lock:
+            self._cached_versions[(object_id, version_id)] = data_json
+            while len(self._cached_versions) > MAX_NUM_CACHED_VERSIONS:
+                self._cached_versions.popitem(last=False)
+
+    def clear_version_cache(self):
+        """
+        Clears the cache of previous versions reconstructed from patches.
+        """
+        with self._cached_versions_lock:
+            self._cached_versions.clear()
+
+    def _reconstruct_data(self, object_id, rows, next_data):
+        """
+        Reconstructs the data of consecutive previous versions of an object.
+
+        :param object_id: the ID of the object
+        :param rows: a list of (version_id, data, data_patch) tuples, sorted descendingly by the version ID
+        :param next_data: the data of the version following the first row, or None if the first row is a snapshot
+        :return: a dict mapping the version IDs to the data
+        """
+        data_by_version_id = {}
+        for version_id, data, data_patch in rows:
+            if data is None:
+                data = self._get_cached_version_data(object_id, version_id)
+                if data is None:
+                    data = json_patch.apply_patch(next_data, data_patch)
+                    self._set_cached_version_data(object_id, version_id, data)
+            data_by_version_id[version_id] = data
+            next_data = data
+        return data_by_version_id
+
+    def _get_previous_version_data(self, object_id, version_id, connection):
+        """
+        Reconstructs the data of a previous version stored as a patch.
+
+        Only the versions between this version and the following snapshot (or the current version) are queried.
+
+        :param object_id: the ID of the object
+        :param version_id: the ID of the previous version
+        :param connection: the SQLAlchemy connection
+        :return: the data of the previous version
+        """
+        data = self._get_cached_version_data(object_id, version_id)
+        if data is not None:
+            return data
+        next_snapshot_version_id = db.select([
+            db.func.min(self._previous_table.c.version_id)
+        ]).where(db.and_(
+            self._previous_table.c.object_id == object_id,
+            self._previous_table.c.version_id > version_id,
+            self._previous_table.c.data.isnot(None)
+        )).as_scalar()
+        rows = connection.execute(
+            db.select([
+                self._previous_table.c.version_id,
+                self._previous_table.c.data,
+                self._previous_table.c.data_patch
+            ])
+            .where(db.and_(
+                self._previous_table.c.object_id == object_id,
+                self._previous_table.c.version_id >= version_id,
+                db.or_(
+                    next_snapshot_version_id.is_(None),
+                    self._previous_table.c.version_id <= next_snapshot_version_id
+                )
+            ))
+            .order_by(db.desc(self._previous_table.c.version_id))
+        ).fetchall()
+        if rows[0][1] is None:
+            next_data = connection.execute(
+                db.select([self._current_table.c.data])
+                .where(self._current_table.c.object_id == object_id)
+            ).scalar()
+        else:
+            next_data = None
+        return self._reconstruct_data(object_id, rows, next_data)[version_id]
+
+    @staticmethod
+    def _get_search_texts(data):
+        """
+        Collects the texts of an object which are used for the full text search.
+
+        :param data: a JSON serializable object containing the object data
+        :return: a tuple of the name, the tags and all other text values
+        """
+        names = []
+        tags = []
+        texts = []
+
+        def collect_texts(value, is_name=False):
+            if isinstance(value, list):
+                for item in value:
+                    collect_texts(item)
+            elif isinstance(value, dict):
+                if value.get('_type') == 'text' and isinstance(value.get('text'), str):
+                    (names if is_name else texts).append(value['text'])
+                elif value.get('_type') == 'tags' and isinstance(value.get('tags'), list):
+                    tags.extend(tag for tag in value['tags'] if isinstance(tag, str))
+                else:
+                    for item in value.values():
+                        collect_texts(item)
+
+        if isinstance(data, dict):
+            for property_name, value in data.items():
+                collect_texts(value, is_name=(property_name == 'name'))
+        return ' '.join(names), ' '.join(tags), ' '.join(texts)
+
+    @classmethod
+    def _get_search_vector(cls, data):
+        """
+        Creates an SQL expression for the full text search vector of an object.
+
+        :param data: a JSON serializable object containing the object data
+        :return: the SQLAlchemy expression for the search vector
+        """
+        return cls._get_search_vector_expression(*cls._get_search_texts(data))
+
+    @staticmethod
+    def _get_search_vector_expression(name, tags, text):
+        """
+        Creates an SQL expression for a full text search vector.
+
+        The name is weighted highest, followed by the tags and then all other
+        text values, so that these are ranked accordingly when searching.
+
+        :param name: the name or an SQLAlchemy expression for it
+        :param tags: the tags or an SQLAlchemy expression for them
+        :param text: all other text values or an SQLAlchemy expression for them
+        :return: the SQLAlchemy expression for the search vector
+        """
+        return db.func.setweight(db.func.to_tsvector('simple', name), 'A').op('||')(
+            db.func.setweight(db.func.to_tsvector('simple', tags), 'B')
+        ).op('||')(
+            db.func.to_tsvector('simple', text)
+        )
 
     def create_object(self, data, schema, user_id, action_id, utc_datetime=None, connection=None):
         """
@@ -115,6 +413,23 @@ class VersionedJSONSerializableObjectTables(object):
         :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
         :return: the newly created object as object_type
         """
+        return self.create_objects([data], schema, user_id, action_id, utc_datetime=utc_datetime, connection=connection)[0]
+
+    def create_objects(self, data_sequence, schema, user_id, action_id, utc_datetime=None, connection=None):
+        """
+        Creates several objects in the table for current objects, using a single multi-row insert. These objects will
+        always have version_id 0.
+
+        The schema is validated once, and all data is validated before any object is created.
+
+        :param data_sequence: a sequence of JSON serializable objects containing the object data
+        :param schema: a JSON schema describing the data (may be None if action's schema is to be used)
+        :param user_id: the ID of the user who created the objects
+        :param action_id: the ID of the action which was used to create the objects
+        :param utc_datetime: the datetime (in UTC) when the objects were created (optional, defaults to utcnow())
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :return: the newly created objects as object_type, in the order of data_sequence
+        """
         if connection is None:
             connection = self.bind.connect()
         if utc_datetime is None:
@@ -133,12 +448,45 @@ class VersionedJSONSerializableObjectTables(object):
         if self._schema_validator:
             self._schema_validator(schema)
         if self._data_validator:
-            self._data_validator(data, schema)
+            for data in data_sequence:
+                self._data_validator(data, schema)
+        if not data_sequence:
+            return []
+        schema_hash = self.store_schema(schema, connection)
         version_id = 0
-        object_id = connection.execute(
+        # the object IDs are allocated from the sequence first and inserted
+        # explicitly, as the order of the rows returned by a multi-row insert
+        # is not guaranteed
+        object_ids = [
+            row[0]
+            for row in connection.execute(
+                db
+                .select([
+                    db.func.nextval(db.func.pg_get_serial_sequence(self._current_table.name, 'object_id'))
+                ])
+                .select_from(db.func.generate_series(1, len(data_sequence)))
+            ).fetchall()
+        ]
+        connection.execute(
             self._current_table
             .insert()
-            .values(
+            .values([
+                {
+                    'object_id': object_id,
+                    'version_id': version_id,
+                    'action_id': action_id,
+                    'data': data,
+                    'schema_hash': schema_hash,
+                    'user_id': user_id,
+                    'utc_datetime': utc_datetime,
+                    'search_vector': self._get_search_vector(data)
+                }
+                for object_id, data in zip(object_ids, data_sequence)
+            ])
+        )
+        return [
+            self.object_type(
+                object_id=object_id,
                 version_id=version_id,
                 action_id=action_id,
                 data=data,
@@ -146,20 +494,8 @@ class VersionedJSONSerializableObjectTables(object):
                 user_id=user_id,
                 utc_datetime=utc_datetime
             )
-            .returning(
-                self._current_table.c.object_id
-            )
-        ).scalar()
-        obj = self.object_type(
-            object_id=object_id,
-            version_id=version_id,
-            action_id=action_id,
-            data=data,
-            schema=schema,
-            user_id=user_id,
-            utc_datetime=utc_datetime
-        )
-        return obj
+            for object_id, data in zip(object_ids, data_sequence)
+        ]
 
     def update_object(self, object_id, data, schema, user_id, utc_datetime=None, connection=None):
         """
@@ -176,51 +512,200 @@ class VersionedJSONSerializableObjectTables(object):
         :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
         :return: the updated object as object_type or None, if the object does not exist
         """
+        objects = self.update_objects([(object_id, data, schema)], user_id, utc_datetime=utc_datetime, connection=connection)
+        if objects is None:
+            return None
+        return objects[0]
+
+    def update_objects(self, updates, user_id, utc_datetime=None, connection=None):
+        """
+        Updates several existing objects using the given data, user id and datetime.
+
+        This step first copies the existing objects in the table of previous object versions using a single insert and
+        then modifies the objects' version ids and data using a single multi-row update. All data is validated before
+        any object is updated.
+
+        :param updates: a sequence of (object_id, data, schema) tuples, with schema being None to use the current object
+            schema, containing each object ID at most once
+        :param user_id: the ID of the user who updated the objects
+        :param utc_datetime: the datetime (in UTC) when the objects were updated (optional, defaults to utcnow())
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :return: the updated objects as object_type in the order of updates or None, if any of the objects does not
+            exist
+        """
         if connection is None:
             connection = self.bind.connect()
         if utc_datetime is None:
             utc_datetime = datetime.datetime.utcnow()
-        if schema is None:
-            schema = connection.execute(
-                db.select([self._current_table.c.schema]).where(self._current_table.c.object_id == object_id)
-            ).fetchone()
+        object_ids = [object_id for object_id, data, schema in updates]
+        if len(set(object_ids)) != len(object_ids):
+            raise ValueError('Objects can only be updated once at a time')
+        if not updates:
+            return []
+        snapshot_interval = self.snapshot_interval
+        columns = [
+            self._current_table.c.object_id,
+            self._current_table.c.version_id,
+            self._current_table.c.action_id,
+            self._current_table.c.schema_hash
+        ]
+        if snapshot_interval:
+            # the current data is needed for creating patches
+            columns.extend([
+                self._current_table.c.data,
+                self._current_table.c.user_id,
+                self._current_table.c.utc_datetime
+            ])
+        select_statement = db.select(columns).where(self._current_table.c.object_id.in_(object_ids))
+        if snapshot_interval:
+            select_statement = select_statement.with_for_update()
+        current_objects = {
+            row[0]: row
+            for row in connection.execute(select_statement).fetchall()
+        }
+        if len(current_objects) != len(object_ids):
+            return None
+        current_schemas_by_hash = self._get_schemas({row[3] for row in current_objects.values()}, connection)
+        updated_objects = []
+        validated_schemas = []
+        for object_id, data, schema in updates:
+            version_id, action_id, current_schema_hash = current_objects[object_id][1:4]
             if schema is None:
-                return None
-            schema = schema[0]
-        if self._schema_validator:
-            self._schema_validator(schema)
-        if self._data_validator:
-            self._data_validator(data, schema)
-        with connection.begin() as transaction:
-            # Copy current version to previous versions
-            if connection.execute(
-                self._previous_table
-                .insert()
-                .from_select(
-                    ['object_id', 'version_id', 'action_id', 'data', 'schema', 'user_id', 'utc_datetime'],
-                    self._current_table
-                    .select()
-                    .where(self._current_table.c.object_id == db.bindparam('oid'))
-                ),
-                [{'oid': object_id}]
-            ).rowcount != 1:
-                return None
-            # Update current version to new version
+                schema = current_schemas_by_hash[current_schema_hash]
+            if self._schema_validator and schema not in validated_schemas:
+                self._schema_validator(schema)
+                validated_schemas.append(schema)
+            if self._data_validator:
+                self._data_validator(data, schema)
+            updated_objects.append(self.object_type(
+                object_id=object_id,
+                version_id=version_id + 1,
+                action_id=action_id,
+                data=data,
+                schema=schema,
+                user_id=user_id,
+                utc_datetime=utc_datetime
+            ))
+        # the context manager commits the transaction, or only marks its end if
+        # the connection is already in a transaction, e.g. of a session
+        with connection.begin():
+            # updates often share the same schema, so each schema is only hashed and stored once
+            schema_hashes = {}
+            for object in updated_objects:
+                if id(object.schema) not in schema_hashes:
+                    schema_hashes[id(object.schema)] = self.store_schema(object.schema, connection)
+            # Copy current versions to previous versions
+            if snapshot_interval:
+                previous_versions = []
+                for object in updated_objects:
+                    object_id, version_id, action_id, schema_hash, data, previous_user_id, previous_utc_datetime = current_objects[object.object_id]
+                    data, data_patch = self._get_previous_version_storage(version_id, data, object.data, snapshot_interval)
+                    previous_versions.append({
+                        'object_id': object_id,
+                        'version_id': version_id,
+                        'action_id': action_id,
+                        'data': data,
+                        'data_patch': data_patch,
+                        'schema_hash': schema_hash,
+                        'user_id': previous_user_id,
+                        'utc_datetime': previous_utc_datetime
+                    })
+                connection.execute(self._previous_table.insert().values(previous_versions))
+            else:
+                connection.execute(
+                    self._previous_table
+                    .insert()
+                    .from_select(
+                        ['object_id', 'version_id', 'action_id', 'data', 'schema_hash', 'user_id', 'utc_datetime'],
+                        db.select([
+                            self._current_table.c.object_id,
+                            self._current_table.c.version_id,
+                            self._current_table.c.action_id,
+                            self._current_table.c.data,
+                            self._current_table.c.schema_hash,
+                            self._current_table.c.user_id,
+                            self._current_table.c.utc_datetime
+                        ])
+                        .where(self._current_table.c.object_id.in_(object_ids))
+                    )
+                )
+            # Update current versions to new versions
+            parameters = []
+            for object in updated_objects:
+                name, tags, text = self._get_search_texts(object.data)
+                parameters.append({
+                    'oid': object.object_id,
+                    'new_data': object.data,
+                    'new_schema_hash': schema_hashes[id(object.schema)],
+                    'search_name': name,
+                    'search_tags': tags,
+                    'search_text': text
+                })
             connection.execute(
                 self._current_table
                 .update()
                 .where(self._current_table.c.object_id == db.bindparam('oid'))
                 .values(
                     version_id=self._current_table.c.version_id + 1,
-                    data=data,
-                    schema=schema,
+                    data=db.bindparam('new_data'),
+                    schema_hash=db.bindparam('new_schema_hash'),
                     user_id=user_id,
-                    utc_datetime=utc_datetime
+                    utc_datetime=utc_datetime,
+                    search_vector=self._get_search_vector_expression(
+                        db.bindparam('search_name', type_=db.Text),
+                        db.bindparam('search_tags', type_=db.Text),
+                        db.bindparam('search_text', type_=db.Text)
+                    )
                 ),
-                [{'oid': object_id}]
+                parameters
             )
-            transaction.commit()
-        return self.get_current_object(object_id, connection=connection)
+        return updated_objects
+
+    def update_search_vectors(self, connection=None, batch_size=1000):
+        """
+        Updates the full text search vectors of all current objects, e.g. for objects created before search vectors
+        were maintained.
+
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :param batch_size: the number of objects to update per transaction
+        :return: the number of updated objects
+        """
+        if connection is None:
+            connection = self.bind.connect()
+        num_updated_objects = 0
+        last_object_id = None
+        while True:
+            select_statement = db.select([
+                self._current_table.c.object_id,
+                self._current_table.c.data
+            ])
+            if last_object_id is not None:
+                select_statement = select_statement.where(self._current_table.c.object_id > last_object_id)
+            rows = connection.execute(
+                select_statement
+                .order_by(self._current_table.c.object_id)
+                .limit(batch_size)
+            ).fetchall()
+            if not rows:
+                return num_updated_objects
+            parameters = []
+            for object_id, data in rows:
+                name, tags, text = self._get_search_texts(data)
+                parameters.append({'oid': object_id, 'search_name': name, 'search_tags': tags, 'search_text': text})
+            with connection.begin():
+                connection.execute(
+                    self._current_table
+                    .update()
+                    .where(self._current_table.c.object_id == db.bindparam('oid'))
+                    .values(search_vector=self._get_search_vector_expression(
+                        db.bindparam('search_name', type_=db.Text),
+                        db.bindparam('search_tags', type_=db.Text),
+                        db.bindparam('search_text', type_=db.Text)
+                    )),
+                    parameters
+                )
+            num_updated_objects += len(rows)
+            last_object_id = rows[-1][0]
 
     def get_current_object(self, object_id, connection=None):
         """
@@ -239,7 +724,7 @@ class VersionedJSONSerializableObjectTables(object):
                 self._current_table.c.version_id,
                 self._current_table.c.action_id,
                 self._current_table.c.data,
-                self._current_table.c.schema,
+                self._current_table.c.schema_hash,
                 self._current_table.c.user_id,
                 self._current_table.c.utc_datetime
             ])
@@ -247,42 +732,23 @@ class VersionedJSONSerializableObjectTables(object):
         ).fetchone()
         if current_object is None:
             return None
-        return self.object_type(*current_object)
+        return self._get_objects_from_rows([current_object], connection)[0]
 
-    def get_current_objects(self, filter_func=lambda data: True, action_table=None, action_filter=None, connection=None, table=None, parameters=None, sorting_func=None, limit=None, offset=None, num_objects_found=None):
+    def _get_current_objects_selectable(self, filter_func, action_table, action_filter, table, object_ids, include_original_columns):
         """
-        Queries and returns all objects matching a given filter.
+        Creates the selectable and where clause for querying current objects.
 
         :param filter_func: a lambda that may return an SQLAlchemy filter when given a table
+        :param action_table: the SQLAlchemy table of actions, if action_filter is used
         :param action_filter: a SQLAlchemy comparator, used to query only objects created by specific actions
-        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
-        :param table: a custom SQLAlchemy table-like object to use as base for the query (optional)
-        :param parameters: query parameters for the custom select statement (optional)
-        :return: a list of objects as object_type
+        :param table: the SQLAlchemy table-like object to use as base for the query
+        :param object_ids: a collection of object IDs to limit the query to or None
+        :param include_original_columns: whether the original versions should be joined
+        :return: the selectable and the where clause
         """
-        if connection is None:
-            connection = self.bind.connect()
-
-        if parameters is None:
-            parameters = {}
-
-        if table is None:
-            table = self._current_table
-
-        select_statement = db.select([
-            table.c.object_id,
-            table.c.version_id,
-            table.c.action_id,
-            table.c.data,
-            table.c.schema,
-            table.c.user_id,
-            table.c.utc_datetime,
-            db.sql.expression.text('COUNT(*) OVER()')
-        ])
-
         selectable = table
 
-        if sorting_func is not None and getattr(sorting_func, 'require_original_columns', False):
+        if include_original_columns:
             selectable = selectable.outerjoin(
                 self._previous_table,
                 db.and_(table.c.object_id == self._previous_table.c.object_id, self._previous_table.c.version_id == 0),
@@ -298,20 +764,180 @@ class VersionedJSONSerializableObjectTables(object):
                 db.and_(table.c.action_id == self._action_id_column, action_filter)
             )
 
-        select_statement = select_statement.select_from(selectable)
+        where_clause = filter_func(table.c.data)
+        if object_ids is not None:
+            object_ids = list(object_ids)
+            if object_ids:
+                where_clause = db.and_(where_clause, table.c.object_id.in_(object_ids))
+            else:
+                where_clause = db.sql.false()
+        return selectable, where_clause
 
-        if sorting_func is None:
-            def sorting_func(current_columns, original_columns):
-                return db.sql.desc(current_columns.object_id)
+    @staticmethod
+    def _get_cursor_clause(sorting_key, object_id_column, is_descending, cursor):
+        """
+        Creates a where clause for selecting the objects following a cursor.
 
-        select_statement = select_statement.where(filter_func(table.c.data))
-        select_statement = select_statement.order_by(sorting_func(table.c, self._previous_table.c))
+        PostgreSQL sorts NULL values as if they were larger than any other
+        value, so these need to be handled separately for sorting keys that
+        may be NULL.
+
+        :param sorting_key: the SQLAlchemy expression used for sorting
+        :param object_id_column: the object ID column used as tie-breaker
+        :param is_descending: whether the objects are sorted in descending order
+        :param cursor: a tuple of the sorting key and object ID of the last
+            object before the requested objects
+        :return: the where clause
+        """
+        cursor_key, cursor_object_id = cursor
+        if is_descending:
+            if cursor_key is None:
+                return db.or_(
+                    db.and_(sorting_key.is_(None), object_id_column < cursor_object_id),
+                    sorting_key.isnot(None)
+                )
+            return db.or_(
+                sorting_key < cursor_key,
+                db.and_(sorting_key == cursor_key, object_id_column < cursor_object_id)
+            )
+        else:
+            if cursor_key is None:
+                return db.and_(sorting_key.is_(None), object_id_column > cursor_object_id)
+            return db.or_(
+                sorting_key > cursor_key,
+                db.and_(sorting_key == cursor_key, object_id_column > cursor_object_id),
+                sorting_key.is_(None)
+            )
+
+    def _get_current_objects_statement(self, filter_func, action_table, action_filter, table, sorting_func, limit, offset, object_ids, cursor, include_sorting_key, include_count, include_original_versions):
+        """
+        Creates the select statement for querying objects matching a given filter.
+
+        :return: the select statement
+        """
+        columns = [
+            table.c.object_id,
+            table.c.version_id,
+            table.c.action_id,
+            table.c.data,
+            table.c.schema_hash,
+            table.c.user_id,
+            table.c.utc_datetime
+        ]
+        if include_original_versions:
+            columns.extend([
+                self._previous_table.c.user_id,
+                self._previous_table.c.utc_datetime
+            ])
+        use_cursor = cursor is not None or include_sorting_key
+        if use_cursor:
+            sorting_key = sorting_func.sorting_key_func(table.c, self._previous_table.c)
+        if include_sorting_key:
+            # the label ensures the key is selected even if it is one of the columns above
+            columns.append(db.sql.expression.label('sorting_key', sorting_key))
+        if include_count:
+            columns.append(db.sql.expression.text('COUNT(*) OVER()'))
+        select_statement = db.select(columns)
+
+        selectable, where_clause = self._get_current_objects_selectable(
+            filter_func=filter_func,
+            action_table=action_table,
+            action_filter=action_filter,
+            table=table,
+            object_ids=object_ids,
+            include_original_columns=include_original_versions or getattr(sorting_func, 'require_original_columns', False)
+        )
+        select_statement = select_statement.select_from(selectable)
+        select_statement = select_statement.where(where_clause)
+
+        if use_cursor:
+            if cursor is not None:
+                select_statement = select_statement.where(self._get_cursor_clause(sorting_key, table.c.object_id, sorting_func.is_descending, cursor))
+            if sorting_func.is_descending:
+                object_id_order = db.sql.desc(table.c.object_id)
+            else:
+                object_id_order = db.sql.asc(table.c.object_id)
+            select_statement = select_statement.order_by(sorting_func(table.c, self._previous_table.c), object_id_order)
+        else:
+            select_statement = select_statement.order_by(sorting_func(table.c, self._previous_table.c))
 
         if limit is not None:
             select_statement = select_statement.limit(limit)
 
         if offset is not None:
             select_statement = select_statement.offset(offset)
+        return select_statement
+
+    @staticmethod
+    def _get_default_sorting_func():
+        def sorting_func(current_columns, original_columns):
+            return db.sql.desc(current_columns.object_id)
+        sorting_func.sorting_key_func = lambda current_columns, original_columns: current_columns.object_id
+        sorting_func.is_descending = True
+        return sorting_func
+
+    def get_current_objects(self, filter_func=lambda data: True, action_table=None, action_filter=None, connection=None, table=None, parameters=None, sorting_func=None, limit=None, offset=None, num_objects_found=None, object_ids=None, original_versions=None, cursor=None, next_cursor=None):
+        """
+        Queries and returns all objects matching a given filter.
+
+        Instead of using an offset, the objects can be paginated using a
+        cursor, consisting of the sorting key and object ID of the last object
+        on the previous page. This requires a sorting function created with
+        sampledb.logic.object_sorting, or no sorting function at all.
+
+        :param filter_func: a lambda that may return an SQLAlchemy filter when given a table
+        :param action_filter: a SQLAlchemy comparator, used to query only objects created by specific actions
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :param table: a custom SQLAlchemy table-like object to use as base for the query (optional)
+        :param parameters: query parameters for the custom select statement (optional)
+        :param num_objects_found: a list which will be filled with the total number of matching objects (optional)
+        :param object_ids: a collection of object IDs to limit the query to (optional)
+        :param original_versions: a dict which will be filled with the user ID and datetime of each object's first
+            version, queried in the same statement (optional)
+        :param cursor: a tuple of the sorting key and object ID of the last object before the requested objects
+            (optional)
+        :param next_cursor: a list which will be filled with the cursor for the following objects, if there are more
+            objects than the given limit (optional)
+        :return: a list of objects as object_type
+        """
+        if connection is None:
+            connection = self.bind.connect()
+
+        if parameters is None:
+            parameters = {}
+
+        if table is None:
+            table = self._current_table
+
+        if sorting_func is None:
+            sorting_func = self._get_default_sorting_func()
+
+        use_cursor = cursor is not None or next_cursor is not None
+        if use_cursor and not hasattr(sorting_func, 'sorting_key_func'):
+            raise ValueError("Cursor pagination requires a sorting function with a sorting key")
+        if use_cursor and offset is not None:
+            raise ValueError("Cursor pagination cannot be combined with an offset")
+
+        if use_cursor and limit is not None:
+            # query one additional object to find out whether there are more objects
+            query_limit = limit + 1
+        else:
+            query_limit = limit
+
+        select_statement = self._get_current_objects_statement(
+            filter_func=filter_func,
+            action_table=action_table,
+            action_filter=action_filter,
+            table=table,
+            sorting_func=sorting_func,
+            limit=query_limit,
+            offset=offset,
+            object_ids=object_ids,
+            cursor=cursor,
+            include_sorting_key=use_cursor,
+            include_count=num_objects_found is not None,
+            include_original_versions=original_versions is not None
+        )
 
         objects = connection.execute(
             select_statement,
@@ -323,7 +949,153 @@ class VersionedJSONSerializableObjectTables(object):
                 num_objects_found.append(objects[0][-1])
             else:
                 num_objects_found.append(0)
-        return [self.object_type(*obj[:-1]) for obj in objects]
+        if next_cursor is not None:
+            next_cursor.clear()
+        if use_cursor and limit is not None and len(objects) > limit:
+            objects = objects[:limit]
+            if next_cursor is not None:
+                sorting_key_index = 9 if original_versions is not None else 7
+                next_cursor.append((objects[-1][sorting_key_index], objects[-1][0]))
+        if original_versions is not None:
+            original_versions.clear()
+            for obj in objects:
+                if obj[1] == 0 or obj[7] is None:
+                    # the current version is the original version
+                    original_versions[obj[0]] = (obj[5], obj[6])
+                else:
+                    original_versions[obj[0]] = (obj[7], obj[8])
+        return self._get_objects_from_rows([obj[:7] for obj in objects], connection)
+
+    def iter_current_objects(self, filter_func=lambda data: True, action_table=None, action_filter=None, connection=None, table=None, parameters=None, sorting_func=None, limit=None, object_ids=None, cursor=None, next_cursor=None, batch_size=100):
+        """
+        Queries all objects matching a given filter and returns an iterator
+        over them, fetching the objects in batches from a server-side cursor.
+
+        The query is built when this method is called, so errors in the filter
+        function are raised immediately, while the objects are only fetched
+        while iterating.
+
+        :param filter_func: a lambda that may return an SQLAlchemy filter when given a table
+        :param action_filter: a SQLAlchemy comparator, used to query only objects created by specific actions
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind, which
+            is closed after iterating)
+        :param table: a custom SQLAlchemy table-like object to use as base for the query (optional)
+        :param parameters: query parameters for the custom select statement (optional)
+        :param object_ids: a collection of object IDs to limit the query to (optional)
+        :param cursor: a tuple of the sorting key and object ID of the last object before the requested objects
+            (optional)
+        :param next_cursor: a list which will be filled with the cursor for the following objects, if there are more
+            objects than the given limit. As the cursor has to be known before iterating, it is determined using an
+            additional query for the sorting keys of the last requested object and the one following it. (optional)
+        :param batch_size: the number of objects to fetch at once
+        :return: an iterator over the objects as object_type
+        """
+        if parameters is None:
+            parameters = {}
+
+        if table is None:
+            table = self._current_table
+
+        if sorting_func is None:
+            sorting_func = self._get_default_sorting_func()
+
+        use_cursor = cursor is not None or next_cursor is not None
+        if use_cursor and not hasattr(sorting_func, 'sorting_key_func'):
+            raise ValueError("Cursor pagination requires a sorting function with a sorting key")
+
+        if next_cursor is not None:
+            next_cursor.clear()
+            if limit is not None:
+                sorting_key_statement = self._get_current_objects_statement(
+                    filter_func=filter_func,
+                    action_table=action_table,
+                    action_filter=action_filter,
+                    table=table,
+                    sorting_func=sorting_func,
+                    limit=2,
+                    offset=limit - 1,
+                    object_ids=object_ids,
+                    cursor=cursor,
+                    include_sorting_key=True,
+                    include_count=False,
+                    include_original_versions=False
+                )
+                rows = (connection if connection is not None else self.bind).execute(
+                    sorting_key_statement,
+                    **parameters
+                ).fetchall()
+                if len(rows) == 2:
+                    next_cursor.append((rows[0][7], rows[0][0]))
+
+        select_statement = self._get_current_objects_statement(
+            filter_func=filter_func,
+            action_table=action_table,
+            action_filter=action_filter,
+            table=table,
+            sorting_func=sorting_func,
+            limit=limit,
+            offset=None,
+            object_ids=object_ids,
+            cursor=cursor,
+            include_sorting_key=False,
+            include_count=False,
+            include_original_versions=False
+        )
+
+        def iter_objects(connection):
+            close_connection = connection is None
+            if connection is None:
+                connection = self.bind.connect()
+            try:
+                result = connection.execution_options(stream_results=True).execute(
+                    select_statement,
+                    **parameters
+                )
+                while True:
+                    objects = result.fetchmany(batch_size)
+                    if not objects:
+                        break
+                    for obj in self._get_objects_from_rows(objects, connection):
+                        yield obj
+                result.close()
+            finally:
+                if close_connection:
+                    connection.close()
+        return iter_objects(connection)
+
+    def count_current_objects(self, filter_func=lambda data: True, action_table=None, action_filter=None, connection=None, table=None, parameters=None, object_ids=None):
+        """
+        Queries and returns the number of objects matching a given filter.
+
+        :param filter_func: a lambda that may return an SQLAlchemy filter when given a table
+        :param action_filter: a SQLAlchemy comparator, used to query only objects created by specific actions
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :param table: a custom SQLAlchemy table-like object to use as base for the query (optional)
+        :param parameters: query parameters for the custom select statement (optional)
+        :param object_ids: a collection of object IDs to limit the query to (optional)
+        :return: the number of objects
+        """
+        if connection is None:
+            connection = self.bind.connect()
+
+        if parameters is None:
+            parameters = {}
+
+        if table is None:
+            table = self._current_table
+
+        selectable, where_clause = self._get_current_objects_selectable(
+            filter_func=filter_func,
+            action_table=action_table,
+            action_filter=action_filter,
+            table=table,
+            object_ids=object_ids,
+            include_original_columns=False
+        )
+        return connection.execute(
+            db.select([db.func.count()]).select_from(selectable).where(where_clause),
+            **parameters
+        ).scalar()
 
     def get_object_versions(self, object_id, connection=None):
         """
@@ -346,19 +1118,57 @@ class VersionedJSONSerializableObjectTables(object):
                 self._previous_table.c.version_id,
                 self._previous_table.c.action_id,
                 self._previous_table.c.data,
-                self._previous_table.c.schema,
+                self._previous_table.c.schema_hash,
                 self._previous_table.c.user_id,
-                self._previous_table.c.utc_datetime
+                self._previous_table.c.utc_datetime,
+                self._previous_table.c.data_patch
             ])
             .where(self._previous_table.c.object_id == object_id)
             .order_by(db.asc(self._previous_table.c.version_id))
         ).fetchall()
-        objects = []
-        for obj in previous_objects:
-            objects.append(self.object_type(*obj))
+        data_by_version_id = self._reconstruct_data(
+            object_id,
+            [(row[1], row[3], row[7]) for row in reversed(previous_objects)],
+            current_object.data
+        )
+        objects = self._get_objects_from_rows([
+            tuple(row[:3]) + (data_by_version_id[row[1]],) + tuple(row[4:7])
+            for row in previous_objects
+        ], connection)
         objects.append(current_object)
         return objects
 
+    def get_object_versions_metadata(self, object_id, connection=None):
+        """
+        Queries and returns the metadata of all versions of an object with a given ID, sorted ascendingly by the
+        version ID, without their data and schemas.
+
+        :param object_id: the ID of the existing object
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :return: a list of VersionMetadata or an empty list if the object does not exist
+        """
+        if connection is None:
+            connection = self.bind.connect()
+        versions = db.union_all(*[
+            db
+            .select([
+                table.c.object_id,
+                table.c.version_id,
+                table.c.user_id,
+                table.c.utc_datetime
+            ])
+            .where(table.c.object_id == object_id)
+            for table in (self._previous_table, self._current_table)
+        ]).alias('versions')
+        return [
+            self.VersionMetadata(*row)
+            for row in connection.execute(
+                db
+                .select([versions])
+                .order_by(db.asc(versions.c.version_id))
+            ).fetchall()
+        ]
+
     def get_object_version(self, object_id, version_id, connection=None):
         """
         Queries and returns an individual version of an object with a given object and version ID.
@@ -377,7 +1187,7 @@ class VersionedJSONSerializableObjectTables(object):
                 self._previous_table.c.version_id,
                 self._previous_table.c.action_id,
                 self._previous_table.c.data,
-                self._previous_table.c.schema,
+                self._previous_table.c.schema_hash,
                 self._previous_table.c.user_id,
                 self._previous_table.c.utc_datetime
             ])
@@ -387,8 +1197,80 @@ class VersionedJSONSerializableObjectTables(object):
             ))
         ).fetchall()
         if previous_objects:
-            return self.object_type(*previous_objects[0])
+            row = tuple(previous_objects[0])
+            if row[3] is None:
+                row = row[:3] + (self._get_previous_version_data(object_id, version_id, connection),) + row[4:]
+            return self._get_objects_from_rows([row], connection)[0]
         current_object = self.get_current_object(object_id, connection=connection)
         if current_object is not None and current_object.version_id == version_id:
             return current_object
         return None
+
+    def convert_previous_versions(self, snapshot_interval, connection=None, batch_size=100):
+        """
+        Converts the storage of all previous object versions, e.g. after changing the snapshot interval.
+
+        :param snapshot_interval: the interval between previous versions stored as full snapshots, or None to store
+            all previous versions as full snapshots
+        :param connection: the SQLAlchemy connection (optional, defaults to a new connection using self.bind)
+        :param batch_size: the number of objects to convert per transaction
+        :return: the number of previous versions whose storage was changed
+        """
+        if connection is None:
+            connection = self.bind.connect()
+        num_converted_versions = 0
+        last_object_id = None
+        while True:
+            select_statement = db.select([self._previous_table.c.object_id]).distinct()
+            if last_object_id is not None:
+                select_statement = select_statement.where(self._previous_table.c.object_id > last_object_id)
+            object_ids = [
+                row[0]
+                for row in connection.execute(
+                    select_statement
+                    .order_by(self._previous_table.c.object_id)
+                    .limit(batch_size)
+                ).fetchall()
+            ]
+            if not object_ids:
+                return num_converted_versions
+            parameters = []
+            with connection.begin():
+                for object_id in object_ids:
+                    object_versions = self.get_object_versions(object_id, connection=connection)
+                    stored_data_patches = {
+                        row[0]: row[1]
+                        for row in connection.execute(
+                            db.select([
+                                self._previous_table.c.version_id,
+                                self._previous_table.c.data_patch
+                            ])
+                            .where(self._previous_table.c.object_id == object_id)
+                        ).fetchall()
+                    }
+                    for object_version, next_object_version in zip(object_versions[:-1], object_versions[1:]):
+                        data, data_patch = self._get_previous_version_storage(object_version.version_id, object_version.data, next_object_version.data, snapshot_interval)
+                        if data_patch == stored_data_patches[object_version.version_id]:
+                            continue
+                        parameters.append({
+                            'oid': object_id,
+                            'vid': object_version.version_id,
+                            'new_data': data,
+                            'new_data_patch': data_patch
+                        })
+                if parameters:
+                    connection.execute(
+                        self._previous_table
+                        .update()
+                        .where(db.and_(
+                            self._previous_table.c.object_id == db.bindparam('oid'),
+                            self._previous_table.c.version_id == db.bindparam('vid')
+                        ))
+                        .values(
+                            data=db.bindparam('new_data'),
+                            data_patch=db.bindparam('new_data_patch')
+                        ),
+                        parameters
+                    )
+            num_converted_versions += len(parameters)
+            last_object_id = object_ids[-1]
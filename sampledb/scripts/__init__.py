@@ -16,6 +16,12 @@ from . import send_announcement
 from . import set_administrator
 from . import set_user_readonly
 from . import set_user_hidden
+from . import effective_object_permissions
+from . import indexed_properties
+from . import update_search_vectors
+from . import convert_object_versions
+from . import migrate
+from . import process_jobs
 from . import run
 
 
@@ -33,5 +39,11 @@ script_functions = {
     'set_administrator': set_administrator.main,
     'set_user_readonly': set_user_readonly.main,
     'set_user_hidden': set_user_hidden.main,
+    'effective_object_permissions': effective_object_permissions.main,
+    'indexed_properties': indexed_properties.main,
+    'update_search_vectors': update_search_vectors.main,
+    'convert_object_versions': convert_object_versions.main,
+    'migrate': migrate.main,
+    'process_jobs': process_jobs.main,
     'run': run.main
 }
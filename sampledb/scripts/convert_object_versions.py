@@ -0,0 +1,36 @@
+# coding: utf-8
+"""
+Script for converting the storage of all previous object versions, so that
+they are stored as full snapshots at the given interval and as patches to the
+following version in between. By default, the interval set in
+OBJECT_VERSION_SNAPSHOT_INTERVAL is used. An interval of 0 stores all previous
+versions as full snapshots.
+
+Usage: python -m sampledb convert_object_versions [<snapshot_interval>]
+"""
+
+import sys
+
+from .. import create_app
+from ..logic.objects import convert_object_versions
+
+
+def main(arguments):
+    if len(arguments) > 1:
+        print(__doc__)
+        exit(1)
+    snapshot_interval = None
+    if arguments:
+        try:
+            snapshot_interval = int(arguments[0])
+        except ValueError:
+            snapshot_interval = -1
+        if snapshot_interval < 0:
+            print("Error: snapshot_interval must be a non-negative integer", file=sys.stderr)
+            exit(1)
+    app = create_app()
+    if snapshot_interval is None:
+        snapshot_interval = int(app.config['OBJECT_VERSION_SNAPSHOT_INTERVAL'])
+    with app.app_context():
+        num_converted_versions = convert_object_versions(snapshot_interval)
+        print("Success: {} object versions have been converted".format(num_converted_versions))
@@ -0,0 +1,34 @@
+# coding: utf-8
+"""
+Script for rebuilding or verifying the materialized effective object
+permissions.
+
+Usage: python -m sampledb effective_object_permissions <rebuild_or_verify>
+"""
+
+import sys
+from .. import create_app
+from ..logic.effective_object_permissions import rebuild_effective_permissions, verify_effective_permissions
+
+
+def main(arguments):
+    if len(arguments) != 1 or arguments[0] not in ('rebuild', 'verify'):
+        print(__doc__)
+        exit(1)
+    command = arguments[0]
+    app = create_app()
+    with app.app_context():
+        if command == 'rebuild':
+            rebuild_effective_permissions()
+            print("Success: the effective object permissions have been rebuilt")
+        else:
+            mismatches = verify_effective_permissions()
+            if mismatches:
+                for user_id, object_id, stored_permissions_int, expected_permissions_int in mismatches:
+                    print(
+                        "Mismatch: user #{} and object #{}: stored {}, expected {}".format(user_id, object_id, stored_permissions_int, expected_permissions_int),
+                        file=sys.stderr
+                    )
+                print("Error: {} mismatches found, run rebuild to fix them".format(len(mismatches)), file=sys.stderr)
+                exit(1)
+            print("Success: the effective object permissions are up to date")
@@ -0,0 +1,60 @@
+# coding: utf-8
+"""
+Script for listing, adding or removing indexed properties of an action.
+
+Indexed properties can be searched and sorted by more efficiently when
+objects are limited to the action. Nested properties are separated by dots.
+
+Usage: python -m sampledb indexed_properties list <action_id>
+       python -m sampledb indexed_properties add <action_id> <property_path>
+       python -m sampledb indexed_properties remove <action_id> <property_path>
+"""
+
+import sys
+from .. import create_app
+from ..logic.actions import get_action
+from ..logic.indexed_properties import get_indexed_properties, create_indexed_property, delete_indexed_property
+from ..logic.errors import ActionDoesNotExistError, IndexedPropertyAlreadyExistsError, InvalidIndexedPropertyError
+
+
+def main(arguments):
+    if len(arguments) < 2 or arguments[0] not in ('list', 'add', 'remove') or len(arguments) != (2 if arguments[0] == 'list' else 3):
+        print(__doc__)
+        exit(1)
+    command, action_id = arguments[:2]
+    try:
+        action_id = int(action_id)
+    except ValueError:
+        print("Error: action_id must be an integer", file=sys.stderr)
+        exit(1)
+    if command != 'list':
+        property_path = arguments[2].split('.')
+    app = create_app()
+    with app.app_context():
+        try:
+            get_action(action_id)
+        except ActionDoesNotExistError:
+            print("Error: No action with this ID exists", file=sys.stderr)
+            exit(1)
+        if command == 'list':
+            for indexed_property in get_indexed_properties(action_id):
+                print(" - {} ({})".format('.'.join(indexed_property.property_path), indexed_property.property_type))
+        elif command == 'add':
+            try:
+                create_indexed_property(action_id, property_path)
+            except InvalidIndexedPropertyError:
+                print("Error: the property does not exist or cannot be indexed", file=sys.stderr)
+                exit(1)
+            except IndexedPropertyAlreadyExistsError:
+                print("Error: the property is already indexed", file=sys.stderr)
+                exit(1)
+            print("Success: the property has been indexed")
+        else:
+            for indexed_property in get_indexed_properties(action_id):
+                if indexed_property.property_path == property_path:
+                    delete_indexed_property(indexed_property.id)
+                    print("Success: the property is no longer indexed")
+                    break
+            else:
+                print("Error: the property is not indexed", file=sys.stderr)
+                exit(1)
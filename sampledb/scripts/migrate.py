@@ -0,0 +1,23 @@
+# coding: utf-8
+"""
+Script for creating all missing tables and running all migrations that have
+not been run before.
+
+Usage: python -m sampledb migrate
+
+This is done whenever SampleDB is started, unless SKIP_DATABASE_MIGRATIONS is
+set. This script allows setting it to speed up starting SampleDB and running
+the migrations only once after updating SampleDB.
+"""
+
+from .. import create_app, migrate_database
+
+
+def main(arguments):
+    if len(arguments) != 0:
+        print(__doc__)
+        exit(1)
+    app = create_app()
+    with app.app_context():
+        migrate_database()
+    print("Success: the database has been migrated")
@@ -0,0 +1,31 @@
+# coding: utf-8
+"""
+Script for processing jobs, e.g. sending notification emails, from the job
+queue.
+
+Usage: python -m sampledb process_jobs [--once]
+
+Unless --once is given, the script keeps processing new jobs until it is
+stopped. Several instances of this script can be run at once.
+"""
+
+from .. import create_app
+from ..logic.jobs import process_jobs, run_worker
+
+
+def main(arguments):
+    if arguments not in ([], ['--once']):
+        print(__doc__)
+        exit(1)
+    app = create_app()
+    with app.app_context():
+        if arguments:
+            num_processed_jobs = 0
+            while True:
+                num_jobs = process_jobs()
+                if not num_jobs:
+                    break
+                num_processed_jobs += num_jobs
+            print("Success: {} jobs have been processed".format(num_processed_jobs))
+        else:
+            run_worker()
@@ -3,12 +3,25 @@
 Script for running the SampleDB server.
 
 Usage: python -m sampledb run [<port>]
+
+The server handles requests using WORKER_THREADS threads. If WORKER_PROCESSES
+is greater than 1, that many worker processes are started, each with its own
+threads and database connection pool.
 """
 
+import os
+import signal
+import socket
 import sys
+
+import cheroot.wsgi
 import cherrypy
+import flask
+
+from .. import create_app, db
 
-from .. import create_app
+# maximum number of connections waiting to be accepted by a worker
+REQUEST_QUEUE_SIZE = 128
 
 
 def main(arguments):
@@ -27,13 +40,108 @@ def main(arguments):
     else:
         port = 8000
     app = create_app()
-    cherrypy.tree.graft(app, app.config['SERVER_PATH'])
-    cherrypy.config.update({
-        'environment': 'production',
-        'server.socket_host': '0.0.0.0',
-        'server.socket_port': port,
-        'server.thread_pool': 4,
-        'log.screen': True
-    })
-    cherrypy.engine.start()
-    cherrypy.engine.block()
+    for key in ('WORKER_THREADS', 'WORKER_PROCESSES'):
+        try:
+            if int(app.config[key]) < 1:
+                raise ValueError()
+        except ValueError:
+            print("Error: {} must be a positive integer".format(key), file=sys.stderr)
+            exit(1)
+    serve(app, port)
+
+
+def serve(app: flask.Flask, port: int) -> None:
+    """
+    Serve the SampleDB app using the configured number of worker processes
+    and threads.
+
+    :param app: the SampleDB app
+    :param port: the port to listen on
+    """
+    if int(app.config['WORKER_PROCESSES']) > 1:
+        _run_worker_processes(app, port)
+    else:
+        cherrypy.tree.graft(app, app.config['SERVER_PATH'])
+        cherrypy.config.update({
+            'environment': 'production',
+            'server.socket_host': '0.0.0.0',
+            'server.socket_port': port,
+            'server.thread_pool': int(app.config['WORKER_THREADS']),
+            'server.socket_queue_size': REQUEST_QUEUE_SIZE,
+            'log.screen': True
+        })
+        cherrypy.engine.start()
+        cherrypy.engine.block()
+
+
+class _WorkerServer(cheroot.wsgi.Server):
+    """
+    A WSGI server accepting connections on a socket created before forking.
+    """
+
+    def __init__(self, listening_socket, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._listening_socket = listening_socket
+
+    def bind(self, family, type, proto=0):
+        self.socket = self._listening_socket
+        return self.socket
+
+
+def _raise_system_exit(signum, frame):
+    raise SystemExit()
+
+
+def _run_worker_processes(app: flask.Flask, port: int) -> None:
+    """
+    Bind the server socket and fork worker processes accepting connections on
+    it, until the workers exit or the server receives SIGINT or SIGTERM.
+
+    :param app: the SampleDB app
+    :param port: the port to listen on
+    """
+    listening_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listening_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listening_socket.bind(('0.0.0.0', port))
+    listening_socket.listen(REQUEST_QUEUE_SIZE)
+
+    # database connections must not be shared between processes
+    with app.app_context():
+        db.engine.dispose()
+
+    wsgi_app = cheroot.wsgi.PathInfoDispatcher({app.config['SERVER_PATH']: app})
+    worker_pids = []
+    for _ in range(int(app.config['WORKER_PROCESSES'])):
+        pid = os.fork()
+        if pid == 0:
+            # the main process stops the workers on SIGINT
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, _raise_system_exit)
+            server = _WorkerServer(
+                listening_socket,
+                ('0.0.0.0', port),
+                wsgi_app,
+                numthreads=int(app.config['WORKER_THREADS']),
+                request_queue_size=REQUEST_QUEUE_SIZE
+            )
+            try:
+                server.safe_start()
+            except (KeyboardInterrupt, SystemExit):
+                pass
+            finally:
+                os._exit(0)
+        worker_pids.append(pid)
+    listening_socket.close()
+    print("Started {} worker processes on port {}".format(len(worker_pids), port))
+
+    def stop_workers(signum, frame):
+        for worker_pid in worker_pids:
+            try:
+                os.kill(worker_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+    for pid in worker_pids:
+        os.waitpid(pid, 0)
@@ -0,0 +1,20 @@
+# coding: utf-8
+"""
+Script for updating the full text search vectors of all objects, which are
+used by the simple search.
+
+Usage: python -m sampledb update_search_vectors
+"""
+
+from .. import create_app
+from ..logic.objects import update_search_vectors
+
+
+def main(arguments):
+    if len(arguments) != 0:
+        print(__doc__)
+        exit(1)
+    app = create_app()
+    with app.app_context():
+        num_updated_objects = update_search_vectors()
+        print("Success: the search vectors of {} objects have been updated".format(num_updated_objects))
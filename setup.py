@@ -27,7 +27,7 @@ setup(
         'Framework :: Flask',
         'Topic :: Scientific/Engineering',
     ],
-    packages=find_packages(exclude=['tests', 'tests.*', 'example_data']),
+    packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*', 'example_data']),
     install_requires=requirements,
     package_data={
         'sampledb': [
@@ -51,3 +51,65 @@ def test_authentication_token(flask_server):
     r = requests.get(flask_server.base_url + 'api/v1/objects/', headers={'Authorization': 'Bearer ' + api_token})
     assert r.status_code == 200
 
+
+
+def test_authentication_credential_cache(flask_server):
+    flask_server.app.config['CREDENTIAL_CACHE_TIMEOUT'] = 60
+    try:
+        with flask_server.app.app_context():
+            user = sampledb.logic.users.create_user(name="Basic User", email="example@fz-juelich.de", type=sampledb.models.UserType.PERSON)
+            sampledb.logic.authentication.add_other_authentication(user.id, 'username', 'password')
+            authentication_method_id = sampledb.models.Authentication.query.filter_by(user_id=user.id).first().id
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'password'))
+        assert r.status_code == 200
+        assert sampledb.logic.caching.get_process_cache_statistics()['credentials'] == {'hits': 0, 'misses': 1, 'size': 1}
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'password'))
+        assert r.status_code == 200
+        assert r.json()['user_id'] == user.id
+        assert sampledb.logic.caching.get_process_cache_statistics()['credentials'] == {'hits': 1, 'misses': 1, 'size': 1}
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'wrong password'))
+        assert r.status_code == 401
+        assert sampledb.logic.caching.get_process_cache_statistics()['credentials'] == {'hits': 1, 'misses': 2, 'size': 1}
+
+        with flask_server.app.app_context():
+            assert sampledb.logic.authentication.change_password_in_authentication_method(authentication_method_id, 'new password')
+        assert sampledb.logic.caching.get_process_cache_statistics()['credentials']['size'] == 0
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'password'))
+        assert r.status_code == 401
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'new password'))
+        assert r.status_code == 200
+    finally:
+        flask_server.app.config['CREDENTIAL_CACHE_TIMEOUT'] = 0
+
+
+def test_authentication_credential_cache_disabled(flask_server):
+    with flask_server.app.app_context():
+        user = sampledb.logic.users.create_user(name="Basic User", email="example@fz-juelich.de", type=sampledb.models.UserType.PERSON)
+        sampledb.logic.authentication.add_other_authentication(user.id, 'username', 'password')
+    for _ in range(2):
+        r = requests.get(flask_server.base_url + 'api/v1/users/me', auth=('username', 'password'))
+        assert r.status_code == 200
+    assert 'credentials' not in sampledb.logic.caching.get_process_cache_statistics()
+
+
+def test_authentication_legacy_token(flask_server):
+    with flask_server.app.app_context():
+        user = sampledb.logic.users.create_user(name="Basic User", email="example@fz-juelich.de", type=sampledb.models.UserType.PERSON)
+        api_token = secrets.token_hex(32)
+        sampledb.logic.authentication.add_api_token(user.id, api_token, 'Demo API Token')
+        authentication_method = sampledb.models.Authentication.query.filter_by(type=sampledb.models.AuthenticationType.API_TOKEN).one()
+        api_token_hash = authentication_method.api_token_hash
+        assert api_token_hash is not None
+        # simulate a token created before API token hashes were stored
+        authentication_method.api_token_hash = None
+        sampledb.db.session.add(authentication_method)
+        sampledb.db.session.commit()
+    r = requests.get(flask_server.base_url + 'api/v1/objects/', headers={'Authorization': 'Bearer ' + api_token[:8] + secrets.token_hex(28)})
+    assert r.status_code == 401
+    r = requests.get(flask_server.base_url + 'api/v1/objects/', headers={'Authorization': 'Bearer ' + api_token})
+    assert r.status_code == 200
+    with flask_server.app.app_context():
+        authentication_method = sampledb.models.Authentication.query.filter_by(type=sampledb.models.AuthenticationType.API_TOKEN).one()
+        assert authentication_method.api_token_hash == api_token_hash
+    r = requests.get(flask_server.base_url + 'api/v1/objects/', headers={'Authorization': 'Bearer ' + api_token.upper()})
+    assert r.status_code == 200
@@ -78,3 +78,27 @@ def test_api_log_remove_token(flask_server, auth_user, action):
 
     api_log_entries = sampledb.logic.api_log.get_api_log_entries(api_token_id=api_token_id)
     assert len(api_log_entries) == 0
+
+
+def test_api_log_async(flask_server, auth_user, action):
+    auth, user = auth_user
+    api_token_id = sampledb.models.authentication.Authentication.query.all()[0].id
+    flask_server.app.config['API_LOG_ASYNC'] = True
+    flask_server.app.config['API_LOG_FLUSH_INTERVAL'] = 0.1
+    try:
+        requests.get(flask_server.base_url + 'api/v1/objects/1/versions/0', headers=auth)
+        sampledb.logic.api_log.flush_log_entries()
+        statistics = sampledb.logic.api_log.get_log_writer_statistics()
+        for _ in range(3):
+            requests.get(flask_server.base_url + 'api/v1/objects/', headers=auth)
+        sampledb.logic.api_log.flush_log_entries()
+        api_log_entries = sampledb.logic.api_log.get_api_log_entries(api_token_id=api_token_id)
+        assert len(api_log_entries) == 4
+        assert api_log_entries[-1].route == '/api/v1/objects/1/versions/0'
+        assert api_log_entries[-1].method == sampledb.logic.api_log.HTTPMethod.GET
+        assert {api_log_entry.route for api_log_entry in api_log_entries[:3]} == {'/api/v1/objects/'}
+        new_statistics = sampledb.logic.api_log.get_log_writer_statistics()
+        assert new_statistics['written'] - statistics['written'] == 3
+        assert new_statistics['dropped'] == statistics['dropped']
+    finally:
+        flask_server.app.config['API_LOG_ASYNC'] = False
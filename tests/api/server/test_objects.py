@@ -88,6 +88,67 @@ def test_get_object_version(flask_server, auth, user, action):
     assert r.status_code == 404
 
 
+def test_get_object_versions(flask_server, auth, user, action):
+    r = requests.get(flask_server.base_url + 'api/v1/objects/1/versions/', auth=auth)
+    assert r.status_code == 404
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+    object = sampledb.logic.objects.create_object(action_id=action.id, data=data, user_id=user.id)
+    data['name']['text'] = 'Example 2'
+    sampledb.logic.objects.update_object(object_id=object.object_id, data=data, user_id=user.id)
+    object_versions = sampledb.logic.objects.get_object_versions(object.object_id)
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/'.format(object.object_id), auth=auth)
+    assert r.status_code == 200
+    assert json.loads(r.content.decode('utf-8')) == [
+        {
+            "object_id": object_version.object_id,
+            "version_id": object_version.version_id,
+            "user_id": user.id,
+            "utc_datetime": object_version.utc_datetime.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        for object_version in object_versions
+    ]
+
+
+def test_get_object_version_diff(flask_server, auth, user, action):
+    r = requests.get(flask_server.base_url + 'api/v1/objects/1/versions/1/diff', auth=auth)
+    assert r.status_code == 404
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+    object = sampledb.logic.objects.create_object(action_id=action.id, data=data, user_id=user.id)
+    data['name']['text'] = 'Example 2'
+    sampledb.logic.objects.update_object(object_id=object.object_id, data=data, user_id=user.id)
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/1/diff'.format(object.object_id), auth=auth)
+    assert r.status_code == 200
+    assert json.loads(r.content.decode('utf-8')) == {
+        "object_id": object.object_id,
+        "from_version_id": 0,
+        "version_id": 1,
+        "patch": [
+            {"op": "replace", "path": "/name/text", "value": "Example 2"}
+        ]
+    }
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/0/diff'.format(object.object_id), params={'from_version_id': 1}, auth=auth)
+    assert r.status_code == 200
+    assert json.loads(r.content.decode('utf-8'))['patch'] == [
+        {"op": "replace", "path": "/name/text", "value": "Example"}
+    ]
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/0/diff'.format(object.object_id), auth=auth)
+    assert r.status_code == 400
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/1/diff'.format(object.object_id), params={'from_version_id': 'first'}, auth=auth)
+    assert r.status_code == 400
+    r = requests.get(flask_server.base_url + 'api/v1/objects/{}/versions/2/diff'.format(object.object_id), auth=auth)
+    assert r.status_code == 404
+
+
 def test_get_object(flask_server, auth, user, action):
     r = requests.get(flask_server.base_url + 'api/v1/objects/1', auth=auth)
     assert r.status_code == 404
@@ -355,6 +416,119 @@ def test_get_objects(flask_server, auth, user, other_user, action):
     ]
 
 
+def test_get_objects_with_cursor(flask_server, auth, user, action):
+    object_ids = []
+    for i in range(5):
+        object = sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': 'Example {}'.format(i)
+            }
+        }, user_id=user.id)
+        object_ids.append(object.object_id)
+    url = flask_server.base_url + 'api/v1/objects/?limit=2'
+    found_object_ids = []
+    while True:
+        r = requests.get(url, auth=auth, allow_redirects=False)
+        assert r.status_code == 200
+        assert len(r.json()) <= 2
+        found_object_ids.extend(object['object_id'] for object in r.json())
+        if 'next' not in r.links:
+            break
+        url = r.links['next']['url']
+    assert found_object_ids == list(reversed(object_ids))
+
+    r = requests.get(flask_server.base_url + 'api/v1/objects/?limit=2&count', auth=auth, allow_redirects=False)
+    assert r.status_code == 200
+    assert r.headers['X-Total-Count'] == '5'
+
+    r = requests.get(flask_server.base_url + 'api/v1/objects/?limit=0', auth=auth, allow_redirects=False)
+    assert r.status_code == 400
+    r = requests.get(flask_server.base_url + 'api/v1/objects/?cursor=invalid', auth=auth, allow_redirects=False)
+    assert r.status_code == 400
+
+
+def test_get_objects_with_filters(flask_server, auth, user, action):
+    measurement_action = sampledb.logic.actions.create_action(
+        action_type=sampledb.logic.actions.ActionType.MEASUREMENT,
+        name="",
+        description="",
+        schema=action.schema
+    )
+    objects = []
+    for i, action_id in enumerate([action.id, measurement_action.id, action.id]):
+        objects.append(sampledb.logic.objects.create_object(action_id=action_id, data={
+            'name': {
+                '_type': 'text',
+                'text': 'Example {}'.format(i)
+            }
+        }, user_id=user.id))
+
+    def get_object_ids(query_string):
+        r = requests.get(flask_server.base_url + 'api/v1/objects/' + query_string, auth=auth, allow_redirects=False)
+        assert r.status_code == 200
+        return [object['object_id'] for object in r.json()]
+
+    assert get_object_ids('?action_id={}'.format(action.id)) == [objects[2].object_id, objects[0].object_id]
+    assert get_object_ids('?action_id={}'.format(measurement_action.id)) == [objects[1].object_id]
+    assert get_object_ids('?action_type=measurement') == [objects[1].object_id]
+    assert get_object_ids('?action_type=sample') == [objects[2].object_id, objects[0].object_id]
+    assert get_object_ids('?q=Example') == [objects[2].object_id, objects[1].object_id, objects[0].object_id]
+    assert get_object_ids('?q=name == "Example 1"&advanced') == [objects[1].object_id]
+    assert get_object_ids('?q=name == "Example 1"&action_type=sample') == []
+
+    for query_string in ['?action_id=x', '?action_type=unknown', '?q=name == &advanced']:
+        r = requests.get(flask_server.base_url + 'api/v1/objects/' + query_string, auth=auth, allow_redirects=False)
+        assert r.status_code == 400
+
+
+def test_get_objects_as_ndjson(flask_server, auth, user, action):
+    objects = []
+    for i in range(3):
+        objects.append(sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': 'Example {}'.format(i)
+            }
+        }, user_id=user.id))
+    r = requests.get(flask_server.base_url + 'api/v1/objects/', auth=auth, allow_redirects=False, headers={'Accept': 'application/x-ndjson'}, stream=True)
+    assert r.status_code == 200
+    assert r.headers['Content-Type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in r.iter_lines()] == [
+        {
+            "object_id": object.object_id,
+            "version_id": object.version_id,
+            "action_id": object.action_id,
+            "schema": object.schema,
+            "data": object.data
+        }
+        for object in reversed(objects)
+    ]
+    r = requests.get(flask_server.base_url + 'api/v1/objects/?limit=1&q=name == "Example 1"&advanced', auth=auth, allow_redirects=False, headers={'Accept': 'application/x-ndjson'})
+    assert r.status_code == 200
+    assert [json.loads(line)['object_id'] for line in r.text.splitlines()] == [objects[1].object_id]
+
+    object_ids = []
+    url = flask_server.base_url + 'api/v1/objects/?limit=2'
+    while url:
+        r = requests.get(url, auth=auth, allow_redirects=False, headers={'Accept': 'application/x-ndjson'})
+        assert r.status_code == 200
+        object_ids.append([json.loads(line)['object_id'] for line in r.text.splitlines()])
+        url = r.links.get('next', {}).get('url')
+    assert object_ids == [[objects[2].object_id, objects[1].object_id], [objects[0].object_id]]
+
+
+def test_get_objects_as_ndjson_error(flask_server, auth, user, action, monkeypatch):
+    def iter_objects_with_permissions(*args, **kwargs):
+        raise Exception("query failed")
+        yield
+
+    monkeypatch.setattr(sampledb.api.server.objects, 'iter_objects_with_permissions', iter_objects_with_permissions)
+    r = requests.get(flask_server.base_url + 'api/v1/objects/', auth=auth, allow_redirects=False, headers={'Accept': 'application/x-ndjson'})
+    assert r.status_code == 400
+    assert r.json()['message'] == 'Error during search: query failed'
+
+
 def test_create_object(flask_server, auth, user, action):
     object_json = {
         'action_id': action.id,
@@ -547,3 +721,134 @@ def test_create_object(flask_server, auth, user, action):
     assert r.json()['message'] == """validation failed:
  - unexpected keys in schema: {'value'} (at name)
  - unknown property "test" (at test)"""
+
+
+def test_create_and_update_objects_in_bulk(flask_server, auth, user, other_user, action):
+    object = sampledb.logic.objects.create_object(action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }, user_id=user.id)
+    bulk_json = [
+        {
+            'action_id': action.id,
+            'data': {
+                'name': {
+                    '_type': 'text',
+                    'text': 'Example 1'
+                }
+            }
+        },
+        {
+            'object_id': object.object_id,
+            'version_id': 1,
+            'data': {
+                'name': {
+                    '_type': 'text',
+                    'text': 'Updated Example'
+                }
+            }
+        },
+        {
+            'action_id': action.id,
+            'data': {
+                'name': {
+                    '_type': 'text',
+                    'text': 'Example 2'
+                }
+            }
+        }
+    ]
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, json=bulk_json)
+    assert r.status_code == 200
+    results = r.json()
+    assert results[1] == {'object_id': object.object_id, 'version_id': 1}
+    assert [result['version_id'] for result in results] == [0, 1, 0]
+    for item, result in zip(bulk_json, results):
+        assert sampledb.logic.objects.get_object(result['object_id']).data == item['data']
+    assert sampledb.logic.objects.get_object_versions(object.object_id)[0].data['name']['text'] == 'Example'
+    assert sampledb.logic.object_permissions.get_user_object_permissions(results[0]['object_id'], user.id) == sampledb.models.Permissions.GRANT
+    object_log_entries = sampledb.logic.object_log.get_object_log_entries(results[2]['object_id'])
+    assert object_log_entries[0].type == sampledb.models.ObjectLogEntryType.CREATE_BATCH
+    assert object_log_entries[0].data == {'object_ids': [results[0]['object_id'], results[2]['object_id']]}
+    object_log_entries = sampledb.logic.object_log.get_object_log_entries(object.object_id)
+    assert object_log_entries[0].type == sampledb.models.ObjectLogEntryType.EDIT_OBJECT
+    assert object_log_entries[0].data == {'version_id': 1}
+
+    ndjson = '\n'.join(json.dumps(item) for item in bulk_json[::2])
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, data=ndjson, headers={'Content-Type': 'application/x-ndjson'})
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+    assert len(sampledb.logic.objects.get_objects()) == 5
+
+
+def test_create_and_update_objects_in_bulk_errors(flask_server, auth, user, other_user, action):
+    object = sampledb.logic.objects.create_object(action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }, user_id=user.id)
+    other_object = sampledb.logic.objects.create_object(action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }, user_id=other_user.id)
+    sampledb.logic.object_permissions.set_object_public(other_object.object_id)
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, json={'action_id': action.id, 'data': data})
+    assert r.status_code == 400
+    assert r.json()['message'] == 'JSON array body required'
+
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, data='{}\n[', headers={'Content-Type': 'application/x-ndjson'})
+    assert r.status_code == 400
+    assert r.json()['message'] == 'invalid JSON in line 2'
+
+    bulk_json = [
+        {'action_id': action.id, 'data': data},
+        {'action_id': action.id + 1, 'data': data},
+        {'object_id': object.object_id, 'data': data},
+        {'object_id': object.object_id, 'data': data},
+        {'object_id': other_object.object_id, 'data': data},
+        {'object_id': other_object.object_id + 1, 'data': data},
+        {'object_id': object.object_id, 'version_id': 2, 'data': data},
+    ]
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, json=bulk_json)
+    assert r.status_code == 400
+    assert r.json()['errors'] == [
+        {'index': 1, 'message': 'action {} does not exist'.format(action.id + 1)},
+        {'index': 3, 'message': 'object {} can only be updated once'.format(object.object_id)},
+        {'index': 4, 'message': 'insufficient permissions to update object {}'.format(other_object.object_id)},
+        {'index': 5, 'message': 'object {} does not exist'.format(other_object.object_id + 1)},
+        {'index': 6, 'message': 'object {} can only be updated once'.format(object.object_id)},
+    ]
+
+    bulk_json = [
+        {'action_id': action.id, 'data': data},
+        {'action_id': action.id, 'data': {}},
+        {'object_id': object.object_id, 'data': {'name': {'_type': 'text', 'text': 1}}},
+    ]
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, json=bulk_json)
+    assert r.status_code == 400
+    assert [error['index'] for error in r.json()['errors']] == [1, 2]
+    assert r.json()['errors'][1]['message'].startswith('validation failed:\n - ')
+    assert len(sampledb.logic.objects.get_objects()) == 2
+    assert sampledb.logic.objects.get_object(object.object_id).version_id == 0
+
+
+def test_create_objects_in_bulk_inconsistent_validation(flask_server, auth, user, action, monkeypatch):
+    # if validating the items individually finds no errors, the error from
+    # validating the whole batch is returned instead
+    monkeypatch.setattr(sampledb.api.server.objects, '_validate_bulk_items', lambda *args: [])
+    r = requests.post(flask_server.base_url + 'api/v1/objects/bulk', auth=auth, json=[{'action_id': action.id, 'data': {}}])
+    assert r.status_code == 400
+    assert r.json()['message'].startswith('validation failed:\n - ')
+    assert len(sampledb.logic.objects.get_objects()) == 0
@@ -115,3 +115,60 @@ def test_get_objects_offset(flask_server: typing.Any, user: User, action: Action
     assert len(rows) == 3
     for i, row in enumerate(rows, start=5):
         assert row.find('th').text == str(10-i)
+
+
+def test_get_objects_cursor(flask_server: typing.Any, user: User, action: Action):
+    for i in range(10):
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }, user_id=user.id)
+    session = requests.session()
+    assert session.get(flask_server.base_url + 'users/{}/autologin'.format(user.id)).status_code == 200
+
+    url = flask_server.base_url + 'objects?limit=4&sortby=name&order=asc'
+    names = []
+    while True:
+        r = session.get(url)
+        assert r.status_code == 200
+        document = BeautifulSoup(r.content, 'html.parser')
+        rows = document.find(id='table-objects').find('tbody').find_all('tr')
+        assert len(rows) <= 4
+        names.extend(row.find_all('td')[0].text.strip() for row in rows)
+        next_link = document.find(id='link-next-page')
+        if next_link is None:
+            break
+        assert 'cursor=' in next_link['href']
+        url = flask_server.base_url.rstrip('/') + next_link['href']
+    assert names == [str(i) for i in range(10)]
+
+
+def test_get_objects_cursor_relevance(flask_server: typing.Any, user: User, action: Action):
+    names = ['Example example {}'.format(i) for i in range(3)] + ['Example {}'.format(i) for i in range(3)] + ['Other {}'.format(i) for i in range(3)]
+    for name in names:
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': name
+            }
+        }, user_id=user.id)
+    session = requests.session()
+    assert session.get(flask_server.base_url + 'users/{}/autologin'.format(user.id)).status_code == 200
+
+    url = flask_server.base_url + 'objects?limit=2&q=example'
+    found_names = []
+    while True:
+        r = session.get(url)
+        assert r.status_code == 200
+        document = BeautifulSoup(r.content, 'html.parser')
+        rows = document.find(id='table-objects').find('tbody').find_all('tr')
+        assert len(rows) <= 2
+        found_names.extend(row.find_all('td')[0].text.strip() for row in rows)
+        next_link = document.find(id='link-next-page')
+        if next_link is None:
+            break
+        assert 'cursor=' in next_link['href']
+        url = flask_server.base_url.rstrip('/') + next_link['href']
+    assert found_names == list(reversed(names[:3])) + list(reversed(names[3:6]))
@@ -53,6 +53,36 @@ def test_get_objects(flask_server, user):
         assert name in str(document.find('tbody'))
 
 
+def test_get_objects_by_ids(flask_server, user):
+    schema = json.load(open(os.path.join(SCHEMA_DIR, 'minimal.json'), encoding="utf-8"))
+    action = sampledb.logic.actions.create_action(sampledb.models.ActionType.SAMPLE_CREATION, 'Example Action', '', schema)
+    names = ['Example1', 'Example2', 'Example42']
+    objects = [
+        sampledb.logic.objects.create_object(
+            data={'name': {'_type': 'text', 'text': name}},
+            user_id=user.id,
+            action_id=action.id
+        )
+        for name in names
+    ]
+    other_user = sampledb.logic.users.create_user("Other User", "example@fz-juelich.de", sampledb.models.UserType.PERSON)
+    other_object = sampledb.logic.objects.create_object(
+        data={'name': {'_type': 'text', 'text': 'Other Object'}},
+        user_id=other_user.id,
+        action_id=action.id
+    )
+    session = requests.session()
+    assert session.get(flask_server.base_url + 'users/{}/autologin'.format(user.id)).status_code == 200
+    r = session.get(flask_server.base_url + 'objects/', params={'ids': ','.join(str(object_id) for object_id in [objects[0].id, objects[2].id, other_object.id, other_object.id + 1])})
+    assert r.status_code == 200
+    document = BeautifulSoup(r.content, 'html.parser')
+    assert len(document.find('tbody').find_all('tr')) == 2
+    assert 'Example1' in str(document.find('tbody'))
+    assert 'Example2' not in str(document.find('tbody'))
+    assert 'Example42' in str(document.find('tbody'))
+    assert 'Other Object' not in str(document.find('tbody'))
+
+
 def test_get_objects_by_action_id(flask_server, user):
     schema = json.load(open(os.path.join(SCHEMA_DIR, 'minimal.json'), encoding="utf-8"))
     action1 = sampledb.logic.actions.create_action(sampledb.models.ActionType.SAMPLE_CREATION, 'Example Action', '', schema)
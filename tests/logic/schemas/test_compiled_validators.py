@@ -0,0 +1,203 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+
+from sampledb.logic import schemas
+from sampledb.logic.schemas import compile_validator, compiled_validators
+from sampledb.logic.schemas.validate import validate
+from sampledb.logic.errors import ValidationError, ValidationMultiError
+
+__author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
+
+
+SCHEMA = {
+    'title': 'Example',
+    'type': 'object',
+    'properties': {
+        'name': {
+            'title': 'Name',
+            'type': 'text',
+            'minLength': 1,
+            'maxLength': 10,
+            'pattern': '^[A-Z]'
+        },
+        'kind': {
+            'title': 'Kind',
+            'type': 'text',
+            'choices': ['A', 'B']
+        },
+        'created': {
+            'title': 'Created',
+            'type': 'datetime'
+        },
+        'enabled': {
+            'title': 'Enabled',
+            'type': 'bool'
+        },
+        'length': {
+            'title': 'Length',
+            'type': 'quantity',
+            'units': 'm'
+        },
+        'tags': {
+            'title': 'Tags',
+            'type': 'tags'
+        },
+        'values': {
+            'title': 'Values',
+            'type': 'array',
+            'minItems': 1,
+            'maxItems': 2,
+            'items': {
+                'title': 'Value',
+                'type': 'object',
+                'properties': {
+                    'value': {
+                        'title': 'Value',
+                        'type': 'quantity',
+                        'units': '1'
+                    }
+                },
+                'required': ['value']
+            }
+        }
+    },
+    'required': ['name']
+}
+
+VALID_INSTANCE = {
+    'name': {'_type': 'text', 'text': 'Example'},
+    'kind': {'_type': 'text', 'text': 'A'},
+    'created': {'_type': 'datetime', 'utc_datetime': '2020-01-02 03:04:05'},
+    'enabled': {'_type': 'bool', 'value': True},
+    'length': {'_type': 'quantity', 'units': 'cm', 'dimensionality': '[length]', 'magnitude_in_base_units': 0.01},
+    'tags': {'_type': 'tags', 'tags': ['example']},
+    'values': [
+        {'value': {'_type': 'quantity', 'units': '1', 'dimensionality': 'dimensionless', 'magnitude_in_base_units': 1}}
+    ]
+}
+
+
+def _get_error(validate_function):
+    try:
+        validate_function()
+    except ValidationMultiError as e:
+        return type(e), e.message, e.paths
+    except ValidationError as e:
+        return type(e), e.message, e.path
+    return None
+
+
+@pytest.mark.parametrize('instance', [
+    VALID_INSTANCE,
+    [],
+    {},
+    {'unknown': {'_type': 'text', 'text': 'Example'}},
+    dict(VALID_INSTANCE, name={'_type': 'text', 'text': ''}),
+    dict(VALID_INSTANCE, name={'_type': 'text', 'text': 'Long Example'}),
+    dict(VALID_INSTANCE, name={'_type': 'text', 'text': 'example'}),
+    dict(VALID_INSTANCE, name={'_type': 'text', 'text': 1}),
+    dict(VALID_INSTANCE, name={'_type': 'text'}),
+    dict(VALID_INSTANCE, name={'_type': 'text', 'text': 'Example', 'other': 1}),
+    dict(VALID_INSTANCE, name={'_type': 'bool', 'text': 'Example'}),
+    dict(VALID_INSTANCE, kind={'_type': 'text', 'text': 'C'}),
+    dict(VALID_INSTANCE, created={'_type': 'datetime', 'utc_datetime': '2020-01-02'}),
+    dict(VALID_INSTANCE, enabled={'_type': 'bool', 'value': 1}),
+    dict(VALID_INSTANCE, length={'_type': 'quantity', 'units': 's', 'dimensionality': '[time]', 'magnitude_in_base_units': 1}),
+    dict(VALID_INSTANCE, length={'_type': 'quantity', 'units': 'm', 'dimensionality': '[time]', 'magnitude_in_base_units': 1}),
+    dict(VALID_INSTANCE, length={'_type': 'quantity', 'units': 'invalid', 'dimensionality': '[length]', 'magnitude_in_base_units': 1}),
+    dict(VALID_INSTANCE, length={'_type': 'quantity', 'units': 'm', 'dimensionality': '[length]', 'magnitude_in_base_units': '1'}),
+    dict(VALID_INSTANCE, tags={'_type': 'tags', 'tags': ['Example', 'example', 'example']}),
+    dict(VALID_INSTANCE, values=[]),
+    dict(VALID_INSTANCE, values=[{}, {}, {}]),
+    dict(VALID_INSTANCE, values=[{}, {'value': {'_type': 'bool', 'value': True}}]),
+    {'name': {'_type': 'text', 'text': ''}, 'kind': {'_type': 'text', 'text': 'C'}, 'values': {}},
+])
+def test_compiled_validator_errors(instance):
+    validator = compile_validator(SCHEMA)
+    compiled_error = _get_error(lambda: validator(instance, []))
+    interpreted_error = _get_error(lambda: validate(instance, SCHEMA))
+    assert compiled_error == interpreted_error
+
+
+def test_compiled_validator_invalid_schema():
+    schema = {
+        'title': 'Example',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'str'
+            },
+            'quantity': {
+                'title': 'Quantity',
+                'type': 'quantity',
+                'units': 'invalid'
+            }
+        }
+    }
+    validator = compile_validator(schema)
+    for instance in [
+        {'name': {'_type': 'text', 'text': 'Example'}},
+        {'quantity': {'_type': 'quantity', 'units': 'm', 'dimensionality': '[length]', 'magnitude_in_base_units': 1}}
+    ]:
+        compiled_error = _get_error(lambda: validator(instance, []))
+        assert compiled_error is not None
+        assert compiled_error == _get_error(lambda: validate(instance, schema))
+
+
+def test_get_validator_cache(monkeypatch):
+    schemas.clear_validator_cache()
+    monkeypatch.setattr(compiled_validators, 'MAX_NUM_CACHED_SCHEMAS', 2)
+    validator = schemas.get_validator(SCHEMA)
+    assert schemas.get_validator(dict(SCHEMA)) is validator
+    other_schemas = [
+        dict(SCHEMA, title='Example {}'.format(i))
+        for i in range(2)
+    ]
+    other_validator = schemas.get_validator(other_schemas[0])
+    assert schemas.get_validator(SCHEMA) is validator
+    schemas.get_validator(other_schemas[1])
+    # the least recently used validator has been evicted
+    assert schemas.get_validator(SCHEMA) is validator
+    assert schemas.get_validator(other_schemas[0]) is not other_validator
+
+    # changing a schema does not change the cached validator
+    schema = {
+        'title': 'Example',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'title': 'Name',
+                'type': 'text'
+            }
+        }
+    }
+    schemas.validate_with_compiled_validator({'name': {'_type': 'text', 'text': 'Example'}}, schema)
+    schema['properties']['name']['maxLength'] = 1
+    with pytest.raises(ValidationError):
+        schemas.validate_with_compiled_validator({'name': {'_type': 'text', 'text': 'Example'}}, schema)
+    schemas.clear_validator_cache()
+
+
+def test_validate_schema_once(monkeypatch):
+    schemas.clear_validator_cache()
+    validated_schemas = []
+
+    def validate_schema(schema):
+        validated_schemas.append(schema)
+        schemas.validate_schema(schema)
+    monkeypatch.setattr(compiled_validators, 'validate_schema', validate_schema)
+    schemas.validate_schema_once(SCHEMA)
+    schemas.validate_schema_once(dict(SCHEMA))
+    assert validated_schemas == [SCHEMA]
+
+    invalid_schema = dict(SCHEMA, type='text')
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            schemas.validate_schema_once(invalid_schema)
+    assert validated_schemas == [SCHEMA, invalid_schema, invalid_schema]
+    schemas.clear_validator_cache()
@@ -1376,3 +1376,78 @@ def test_validate_hazards_duplicate_hazards():
     }
     with pytest.raises(ValidationError):
         validate(instance, schema)
+
+
+def test_validate_object_references_query_count():
+    from sampledb.models.users import User, UserType
+    from sampledb.models.actions import Action, ActionType
+    user = User("User", "example@fz-juelich.de", UserType.OTHER)
+    action_schema = {
+        "title": "Object Information",
+        "type": "object",
+        "properties": {
+            "name": {
+                "title": "Name",
+                "type": "text"
+            }
+        },
+        'required': ['name']
+    }
+    sample_action = Action(ActionType.SAMPLE_CREATION, "Example Action", schema=action_schema)
+    measurement_action = Action(ActionType.MEASUREMENT, "Example Action", schema=action_schema)
+    sampledb.db.session.add(user)
+    sampledb.db.session.add(sample_action)
+    sampledb.db.session.add(measurement_action)
+    sampledb.db.session.commit()
+    sample_ids = [
+        create_object(data={'name': {'_type': 'text', 'text': 'example'}}, user_id=user.id, action_id=sample_action.id).id
+        for _ in range(10)
+    ]
+    measurement_id = create_object(data={'name': {'_type': 'text', 'text': 'example'}}, user_id=user.id, action_id=measurement_action.id).id
+    schema = {
+        'title': 'Example',
+        'type': 'object',
+        'properties': {
+            'samples': {
+                'title': 'Samples',
+                'type': 'array',
+                'items': {
+                    'title': 'Sample',
+                    'type': 'sample'
+                }
+            },
+            'measurement': {
+                'title': 'Measurement',
+                'type': 'measurement'
+            }
+        }
+    }
+    instance = {
+        'samples': [
+            {'_type': 'sample', 'object_id': sample_id}
+            for sample_id in sample_ids
+        ],
+        'measurement': {'_type': 'measurement', 'object_id': measurement_id}
+    }
+
+    queries = []
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    db.event.listen(sampledb.db.engine, 'before_cursor_execute', count_query)
+    try:
+        validate(instance, schema)
+    finally:
+        db.event.remove(sampledb.db.engine, 'before_cursor_execute', count_query)
+    assert len(queries) == 1
+
+    instance['samples'].append({'_type': 'sample', 'object_id': measurement_id})
+    with pytest.raises(ValidationError) as exc_info:
+        validate(instance, schema)
+    assert exc_info.value.message == 'object must be sample (at samples -> 10)'
+    assert exc_info.value.path == ['samples', '10']
+
+    instance['samples'][-1]['object_id'] = measurement_id + 1
+    with pytest.raises(ValidationError) as exc_info:
+        validate(instance, schema)
+    assert exc_info.value.message == 'object does not exist (at samples -> 10)'
@@ -0,0 +1,155 @@
+# coding: utf-8
+"""
+
+"""
+
+import flask
+import pytest
+import sqlalchemy
+
+import sampledb
+from sampledb import db
+import sampledb.logic
+from sampledb.logic import caching
+from sampledb.models import ActionType, UserType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def user():
+    return sampledb.logic.users.create_user("Example User", "example@fz-juelich.de", UserType.PERSON)
+
+
+@pytest.fixture
+def action():
+    return sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                }
+            },
+            'required': ['name']
+        }
+    )
+
+
+@pytest.fixture
+def process_cache():
+    caching.clear_process_caches()
+    flask.current_app.config['PROCESS_CACHE_TIMEOUT'] = 60
+    yield
+    flask.current_app.config['PROCESS_CACHE_TIMEOUT'] = 0
+    caching.clear_process_caches()
+
+
+@pytest.fixture
+def queries():
+    queries = []
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    sqlalchemy.event.listen(db.engine, 'before_cursor_execute', count_query)
+    yield queries
+    sqlalchemy.event.remove(db.engine, 'before_cursor_execute', count_query)
+
+
+def test_request_cache(user, action):
+    location = sampledb.logic.locations.create_location("Location", "", None, user.id)
+    with flask.current_app.test_request_context():
+        assert sampledb.logic.users.get_user(user.id) is sampledb.logic.users.get_user(user.id)
+        assert sampledb.logic.actions.get_action(action.id) is sampledb.logic.actions.get_action(action.id)
+        assert sampledb.logic.locations.get_location(location.id) is sampledb.logic.locations.get_location(location.id)
+        assert flask.g._sampledb_caches['locations'][location.id].name == "Location"
+        with pytest.raises(sampledb.logic.errors.UserDoesNotExistError):
+            sampledb.logic.users.get_user(user.id + 1)
+        assert user.id + 1 not in flask.g._sampledb_caches['users']
+
+        sampledb.logic.locations.update_location(location.id, "Other Location", "", None, user.id)
+        assert sampledb.logic.locations.get_location(location.id).name == "Other Location"
+
+    with flask.current_app.test_request_context():
+        assert not hasattr(flask.g, '_sampledb_caches')
+        assert sampledb.logic.locations.get_location(location.id).name == "Other Location"
+    assert sampledb.logic.locations.get_location(location.id) is not sampledb.logic.locations.get_location(location.id)
+
+
+def test_process_cache(action, process_cache, queries):
+    assert sampledb.logic.actions.get_action(action.id).name == 'Example Action'
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 0, 'misses': 1, 'size': 1}}
+    db.session.expunge_all()
+    queries.clear()
+    cached_action = sampledb.logic.actions.get_action(action.id)
+    assert queries == []
+    assert cached_action.name == 'Example Action'
+    assert cached_action.schema == action.schema
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 1, 'misses': 1, 'size': 1}}
+
+    # the cached values are not changed by modifying an action in place
+    cached_action.schema['title'] = 'Modified Object'
+    db.session.expunge_all()
+    assert sampledb.logic.actions.get_action(action.id).schema['title'] == 'Example Object'
+
+    sampledb.logic.actions.update_action(action.id, 'Updated Action', '', sampledb.logic.actions.get_action(action.id).schema)
+    db.session.expunge_all()
+    assert sampledb.logic.actions.get_action(action.id).name == 'Updated Action'
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 3, 'misses': 2, 'size': 1}}
+
+    instrument_id = sampledb.logic.instruments.create_instrument('Instrument', '').id
+    assert sampledb.logic.instruments.get_instrument(instrument_id).name == 'Instrument'
+    sampledb.logic.instruments.update_instrument(instrument_id, 'Updated Instrument', '')
+    db.session.expunge_all()
+    assert sampledb.logic.instruments.get_instrument(instrument_id).name == 'Updated Instrument'
+    assert caching.get_process_cache_statistics()['instruments'] == {'hits': 0, 'misses': 2, 'size': 1}
+
+
+def test_process_cache_timeout(action, process_cache, monkeypatch):
+    now = [1000]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+    sampledb.logic.actions.get_action(action.id)
+    now[0] += 30
+    sampledb.logic.actions.get_action(action.id)
+    now[0] += 60
+    sampledb.logic.actions.get_action(action.id)
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 1, 'misses': 2, 'size': 1}}
+
+
+def test_process_cache_eviction(action, process_cache, monkeypatch):
+    monkeypatch.setattr(caching, 'MAX_NUM_PROCESS_CACHE_ENTRIES', 2)
+    other_actions = [
+        sampledb.logic.actions.create_action(ActionType.SAMPLE_CREATION, 'Action {}'.format(i), '', action.schema)
+        for i in range(2)
+    ]
+    sampledb.logic.actions.get_action(action.id)
+    sampledb.logic.actions.get_action(other_actions[0].id)
+    sampledb.logic.actions.get_action(action.id)
+    sampledb.logic.actions.get_action(other_actions[1].id)
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 1, 'misses': 3, 'size': 2}}
+    # the least recently used action has been evicted
+    sampledb.logic.actions.get_action(action.id)
+    sampledb.logic.actions.get_action(other_actions[0].id)
+    assert caching.get_process_cache_statistics() == {'actions': {'hits': 2, 'misses': 4, 'size': 2}}
+
+
+def test_process_cache_locations_tree(user, process_cache, queries):
+    parent_location = sampledb.logic.locations.create_location("Location", "", None, user.id)
+    location = sampledb.logic.locations.create_location("Location", "", parent_location.id, user.id)
+    assert sampledb.logic.locations.get_locations_tree()[1] == {parent_location.id: {location.id: {}}}
+    queries.clear()
+    assert sampledb.logic.locations.get_locations_tree()[1] == {parent_location.id: {location.id: {}}}
+    assert sampledb.logic.locations.get_ancestor_location_ids(location.id) == [parent_location.id]
+    assert sampledb.logic.locations.get_descendent_location_ids(parent_location.id) == {location.id}
+    assert queries == []
+    assert caching.get_process_cache_statistics()['locations_tree'] == {'hits': 3, 'misses': 1, 'size': 1}
+
+    child_location = sampledb.logic.locations.create_location("Location", "", location.id, user.id)
+    assert sampledb.logic.locations.get_locations_tree()[1] == {parent_location.id: {location.id: {child_location.id: {}}}}
+    sampledb.logic.locations.update_location(child_location.id, "Location", "", parent_location.id, user.id)
+    assert sampledb.logic.locations.get_locations_tree()[1] == {parent_location.id: {location.id: {}, child_location.id: {}}}
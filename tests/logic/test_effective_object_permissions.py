@@ -0,0 +1,149 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+
+import sampledb
+import sampledb.logic
+from sampledb.logic import effective_object_permissions, object_permissions
+from sampledb.models import Permissions, UserType, ActionType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def users():
+    return [
+        sampledb.logic.users.create_user(name, "example@fz-juelich.de", UserType.PERSON)
+        for name in ['User 1', 'User 2']
+    ]
+
+
+@pytest.fixture
+def instrument():
+    return sampledb.logic.instruments.create_instrument('Example Instrument', '')
+
+
+@pytest.fixture
+def action(instrument):
+    return sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                }
+            },
+            'required': ['name']
+        },
+        instrument_id=instrument.id
+    )
+
+
+@pytest.fixture
+def object(users, action):
+    return sampledb.logic.objects.create_object(user_id=users[1].id, action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Name'
+        }
+    })
+
+
+def _get_stored_permissions():
+    return {
+        (row.user_id, row.object_id): row.permissions_int
+        for row in sampledb.models.EffectiveUserObjectPermissions.query.all()
+    }
+
+
+def test_create_object(users, object):
+    assert _get_stored_permissions() == {
+        (users[1].id, object.id): 3
+    }
+    assert effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_user_object_permissions(users, object):
+    object_permissions.set_user_object_permissions(object.id, users[0].id, Permissions.WRITE)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 2
+    object_permissions.set_user_object_permissions(object.id, users[0].id, Permissions.NONE)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    assert effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_group_membership(users, object):
+    group_id = sampledb.logic.groups.create_group("Example Group", "", users[1].id).id
+    object_permissions.set_group_object_permissions(object.id, group_id, Permissions.READ)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    sampledb.logic.groups.add_user_to_group(group_id, users[0].id)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 1
+    sampledb.logic.groups.remove_user_from_group(group_id, users[0].id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    sampledb.logic.groups.add_user_to_group(group_id, users[0].id)
+    sampledb.logic.groups.delete_group(group_id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    assert effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_project_membership(users, object):
+    project_id = sampledb.logic.projects.create_project("Example Project", "", users[1].id).id
+    object_permissions.set_project_object_permissions(object.id, project_id, Permissions.WRITE)
+    sampledb.logic.projects.add_user_to_project(project_id, users[0].id, Permissions.READ)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 1
+    sampledb.logic.projects.update_user_project_permissions(project_id, users[0].id, Permissions.GRANT)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 2
+    sampledb.logic.projects.remove_user_from_project(project_id, users[0].id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+
+    group_id = sampledb.logic.groups.create_group("Example Group", "", users[0].id).id
+    sampledb.logic.projects.add_group_to_project(project_id, group_id, Permissions.READ)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 1
+    sampledb.logic.projects.update_group_project_permissions(project_id, group_id, Permissions.WRITE)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 2
+    sampledb.logic.projects.remove_group_from_project(project_id, group_id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+
+    sampledb.logic.projects.add_group_to_project(project_id, group_id, Permissions.READ)
+    sampledb.logic.projects.delete_project(project_id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    assert effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_instrument_responsible_users(users, instrument, object):
+    sampledb.logic.instruments.add_instrument_responsible_user(instrument.id, users[0].id)
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 3
+    sampledb.logic.instruments.remove_instrument_responsible_user(instrument.id, users[0].id)
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    sampledb.logic.instruments.set_instrument_responsible_users(instrument.id, [users[0].id])
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 3
+    sampledb.logic.instruments.set_instrument_responsible_users(instrument.id, [])
+    assert (users[0].id, object.id) not in _get_stored_permissions()
+    assert effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_public_objects(users, object):
+    assert object_permissions.get_user_object_permissions(object.id, users[0].id) == Permissions.NONE
+    assert object_permissions.get_objects_with_permissions(users[0].id, Permissions.READ) == []
+    object_permissions.set_object_public(object.id)
+    assert object_permissions.get_user_object_permissions(object.id, users[0].id) == Permissions.READ
+    assert [obj.id for obj in object_permissions.get_objects_with_permissions(users[0].id, Permissions.READ)] == [object.id]
+    assert object_permissions.get_objects_with_permissions(users[0].id, Permissions.WRITE) == []
+
+
+def test_verify_and_rebuild(users, object):
+    sampledb.db.session.add(sampledb.models.UserObjectPermissions(user_id=users[0].id, object_id=object.id, permissions=Permissions.READ))
+    sampledb.db.session.commit()
+    assert effective_object_permissions.verify_effective_permissions() == [
+        (users[0].id, object.id, None, 1)
+    ]
+    effective_object_permissions.rebuild_effective_permissions()
+    assert effective_object_permissions.verify_effective_permissions() == []
+    assert _get_stored_permissions()[(users[0].id, object.id)] == 1
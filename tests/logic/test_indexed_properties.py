@@ -0,0 +1,226 @@
+# coding: utf-8
+"""
+
+"""
+
+import copy
+
+import pytest
+import sqlalchemy
+
+from sampledb import db
+import sampledb.logic
+import sampledb.models
+from sampledb.logic import object_search, object_sorting
+from sampledb.logic.indexed_properties import create_indexed_property, delete_indexed_property, get_indexed_properties, get_indexed_property, get_indexed_property_type
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def user():
+    user = sampledb.models.User(
+        name="User",
+        email="example@fz-juelich.de",
+        type=sampledb.models.UserType.PERSON)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def action():
+    return sampledb.logic.actions.create_action(
+        action_type=sampledb.logic.actions.ActionType.SAMPLE_CREATION,
+        name="",
+        description="",
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                },
+                'tags': {
+                    'title': 'Tags',
+                    'type': 'tags'
+                },
+                'mass': {
+                    'title': 'Mass',
+                    'type': 'quantity',
+                    'units': 'kg'
+                },
+                'date': {
+                    'title': 'Date',
+                    'type': 'datetime'
+                },
+                'flag': {
+                    'title': 'Flag',
+                    'type': 'bool'
+                },
+                'details': {
+                    'title': 'Details',
+                    'type': 'object',
+                    'properties': {
+                        'sample': {
+                            'title': 'Sample',
+                            'type': 'sample'
+                        }
+                    }
+                }
+            },
+            'required': ['name']
+        }
+    )
+
+
+def _get_index_names():
+    return {
+        row[0]
+        for row in db.session.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'objects_current'")
+    }
+
+
+def _explain(statement):
+    with db.engine.connect() as connection:
+        connection.execute("SET enable_seqscan = off")
+
+        @sqlalchemy.event.listens_for(connection, 'before_cursor_execute', retval=True)
+        def explain_statement(conn, cursor, statement, parameters, context, executemany):
+            return 'EXPLAIN ' + statement, parameters
+        return '\n'.join(row[0] for row in connection.execute(statement).fetchall())
+
+
+def _get_objects_statement(action, query_string, sorting_func=None):
+    filter_func, search_tree, use_advanced_search = object_search.generate_filter_func(query_string, True)
+    filter_func, search_notes = object_search.wrap_filter_func(filter_func)
+    table = sampledb.models.Objects._current_table
+    statement = sqlalchemy.select([table.c.object_id]).where(sqlalchemy.and_(table.c.action_id == action.id, filter_func(table.c.data)))
+    if sorting_func is not None:
+        statement = statement.order_by(sorting_func(table.c, None)).limit(10)
+    assert not search_notes
+    return statement
+
+
+def test_create_indexed_property(action):
+    assert get_indexed_properties() == []
+    indexed_property = create_indexed_property(action.id, ['mass'])
+    assert indexed_property.action_id == action.id
+    assert indexed_property.property_path == ['mass']
+    assert indexed_property.property_type == 'quantity'
+    assert get_indexed_property(indexed_property.id) == indexed_property
+    assert get_indexed_properties() == [indexed_property]
+    assert get_indexed_properties(action.id) == [indexed_property]
+    assert get_indexed_properties(action.id + 1) == []
+    assert 'ix_objects_current_indexed_property_{}'.format(indexed_property.id) in _get_index_names()
+    assert get_indexed_property_type(action.id, ['mass']) == 'quantity'
+    assert get_indexed_property_type(action.id, ['name']) is None
+
+
+def test_create_invalid_indexed_property(action):
+    with pytest.raises(sampledb.logic.errors.ActionDoesNotExistError):
+        create_indexed_property(action.id + 1, ['mass'])
+    for property_path in [[], ['unknown'], ['details'], ['mass', 'unit'], ['details', 'unknown']]:
+        with pytest.raises(sampledb.logic.errors.InvalidIndexedPropertyError):
+            create_indexed_property(action.id, property_path)
+    create_indexed_property(action.id, ['details', 'sample'])
+    with pytest.raises(sampledb.logic.errors.IndexedPropertyAlreadyExistsError):
+        create_indexed_property(action.id, ['details', 'sample'])
+    assert len(get_indexed_properties()) == 1
+
+
+def test_delete_indexed_property(action):
+    indexed_property_id = create_indexed_property(action.id, ['name']).id
+    delete_indexed_property(indexed_property_id)
+    assert get_indexed_properties() == []
+    assert 'ix_objects_current_indexed_property_{}'.format(indexed_property_id) not in _get_index_names()
+    with pytest.raises(sampledb.logic.errors.IndexedPropertyDoesNotExistError):
+        delete_indexed_property(indexed_property_id)
+    with pytest.raises(sampledb.logic.errors.IndexedPropertyDoesNotExistError):
+        get_indexed_property(indexed_property_id)
+
+
+def test_indexed_property_type_changed(action):
+    create_indexed_property(action.id, ['flag'])
+    assert get_indexed_property_type(action.id, ['flag']) == 'bool'
+    schema = copy.deepcopy(action.schema)
+    schema['properties']['flag'] = {
+        'title': 'Flag',
+        'type': 'text'
+    }
+    sampledb.logic.actions.update_action(action.id, action.name, action.description, schema)
+    assert get_indexed_property_type(action.id, ['flag']) is None
+
+
+@pytest.mark.parametrize(['property_path', 'query_string'], [
+    (['name'], 'name == "Example"'),
+    (['mass'], 'mass > 5kg'),
+    (['mass'], 'mass == 5kg'),
+    (['date'], 'date < 2020-01-01'),
+    (['date'], 'date == 2020-01-01'),
+    (['flag'], 'flag == True'),
+    (['tags'], '#example')
+])
+def test_search_uses_index(action, property_path, query_string):
+    statement = _get_objects_statement(action, query_string)
+    assert 'indexed_property' not in _explain(statement)
+    indexed_property = create_indexed_property(action.id, property_path)
+    assert 'ix_objects_current_indexed_property_{}'.format(indexed_property.id) in _explain(statement)
+
+
+@pytest.mark.parametrize(['property_name'], [['name'], ['mass'], ['date'], ['flag']])
+def test_sorting_uses_index(action, property_name):
+    indexed_property = create_indexed_property(action.id, [property_name])
+    for sorting_order in [object_sorting.ascending, object_sorting.descending]:
+        sorting_func = sorting_order(object_sorting.property_value(property_name, indexed_property.property_type))
+        statement = _get_objects_statement(action, '', sorting_func)
+        assert 'ix_objects_current_indexed_property_{}'.format(indexed_property.id) in _explain(statement)
+
+
+def test_search_with_indexed_properties(user, action):
+    for property_path in [['name'], ['mass'], ['date'], ['flag'], ['tags']]:
+        create_indexed_property(action.id, property_path)
+    for i in range(3):
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': 'Example {}'.format(i)
+            },
+            'mass': {
+                '_type': 'quantity',
+                'dimensionality': '[mass]',
+                'magnitude_in_base_units': i,
+                'units': 'kg'
+            },
+            'date': {
+                '_type': 'datetime',
+                'utc_datetime': '2020-01-0{} 12:00:00'.format(i + 1)
+            },
+            'flag': {
+                '_type': 'bool',
+                'value': i % 2 == 0
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': ['tag{}'.format(i)]
+            }
+        }, user_id=user.id)
+
+    def get_names(query_string, **kwargs):
+        filter_func, search_tree, use_advanced_search = object_search.generate_filter_func(query_string, True)
+        filter_func, search_notes = object_search.wrap_filter_func(filter_func)
+        objects = sampledb.logic.object_permissions.get_objects_with_permissions(user.id, sampledb.models.Permissions.READ, filter_func=filter_func, action_id=action.id, **kwargs)
+        assert not search_notes
+        return [object.data['name']['text'] for object in objects]
+
+    assert get_names('name == "Example 1"') == ['Example 1']
+    assert get_names('mass >= 1kg') == ['Example 2', 'Example 1']
+    assert get_names('mass == 1kg') == ['Example 1']
+    assert get_names('date == 2020-01-02') == ['Example 1']
+    assert get_names('date <= 2020-01-02') == ['Example 1', 'Example 0']
+    assert get_names('date > 2020-01-02') == ['Example 2']
+    assert get_names('flag') == ['Example 2', 'Example 0']
+    assert get_names('#tag1') == ['Example 1']
+    assert get_names('', sorting_func=object_sorting.descending(object_sorting.property_value('mass', 'quantity'))) == ['Example 2', 'Example 1', 'Example 0']
+    assert get_names('', sorting_func=object_sorting.ascending(object_sorting.property_value('date', 'datetime'))) == ['Example 0', 'Example 1', 'Example 2']
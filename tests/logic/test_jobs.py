@@ -0,0 +1,71 @@
+# coding: utf-8
+"""
+
+"""
+
+import datetime
+
+import flask
+import pytest
+
+import sampledb
+import sampledb.logic
+import sampledb.models
+from sampledb.logic import jobs
+from sampledb.models import JobType, JobStatus
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def handled_jobs(monkeypatch):
+    handled_jobs = []
+
+    def handler(data_sequence):
+        handled_jobs.append(data_sequence)
+        return [data.get('error') for data in data_sequence]
+    monkeypatch.setitem(jobs._job_handlers, JobType.SEND_NOTIFICATION_EMAIL, handler)
+    return handled_jobs
+
+
+def test_process_jobs(handled_jobs):
+    jobs.create_jobs(JobType.SEND_NOTIFICATION_EMAIL, [{'index': i} for i in range(5)])
+    assert len(jobs.get_jobs(JobStatus.PENDING)) == 5
+    assert jobs.process_jobs(batch_size=3) == 3
+    assert handled_jobs == [[{'index': 0}, {'index': 1}, {'index': 2}]]
+    assert [job.data for job in jobs.get_jobs()] == [{'index': 3}, {'index': 4}]
+    assert jobs.process_jobs() == 2
+    assert jobs.process_jobs() == 0
+    assert jobs.get_jobs() == []
+    assert len(handled_jobs) == 2
+
+
+def test_retry_failed_jobs(handled_jobs):
+    flask.current_app.config['JOB_MAX_ATTEMPTS'] = 2
+    jobs.create_jobs(JobType.SEND_NOTIFICATION_EMAIL, [{'index': 0}, {'index': 1, 'error': 'Error'}])
+    assert jobs.process_jobs() == 2
+    job, = jobs.get_jobs()
+    assert job.status == JobStatus.PENDING
+    assert job.num_attempts == 1
+    assert job.error_message == 'Error'
+    assert job.utc_datetime_next_attempt > datetime.datetime.utcnow()
+    # the job is not retried before the retry delay has passed
+    assert jobs.process_jobs() == 0
+
+    job.utc_datetime_next_attempt = datetime.datetime.utcnow()
+    sampledb.db.session.add(job)
+    sampledb.db.session.commit()
+    assert jobs.process_jobs() == 1
+    job, = jobs.get_jobs()
+    assert job.status == JobStatus.FAILED
+    assert job.num_attempts == 2
+    assert jobs.get_jobs(JobStatus.PENDING) == []
+
+
+def test_process_jobs_exception(monkeypatch):
+    def handler(data_sequence):
+        raise ConnectionRefusedError()
+    monkeypatch.setitem(jobs._job_handlers, JobType.SEND_NOTIFICATION_EMAIL, handler)
+    jobs.create_jobs(JobType.SEND_NOTIFICATION_EMAIL, [{'index': 0}, {'index': 1}])
+    assert jobs.process_jobs() == 2
+    assert [(job.num_attempts, job.error_message) for job in jobs.get_jobs()] == [(1, 'ConnectionRefusedError'), (1, 'ConnectionRefusedError')]
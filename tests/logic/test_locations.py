@@ -236,3 +236,59 @@ def test_object_responsibility_confirmation(user: User, object: Object, app):
     locations.confirm_object_responsibility(object_location_assignment.id)
     object_location_assignment = locations.get_current_object_location_assignment(object.id)
     assert object_location_assignment.confirmed
+
+
+def test_get_ancestor_and_descendent_location_ids(user: User):
+    parent_location = locations.create_location("Location", "This is an example location", None, user.id)
+    location = locations.create_location("Location", "This is an example location", parent_location.id, user.id)
+    child_location1 = locations.create_location("Location", "This is an example location", location.id, user.id)
+    child_location2 = locations.create_location("Location", "This is an example location", location.id, user.id)
+    other_location = locations.create_location("Location", "This is an example location", None, user.id)
+    assert locations.get_ancestor_location_ids(parent_location.id) == []
+    assert locations.get_ancestor_location_ids(child_location1.id) == [location.id, parent_location.id]
+    assert locations.get_descendent_location_ids(parent_location.id) == {location.id, child_location1.id, child_location2.id}
+    assert locations.get_descendent_location_ids(child_location1.id) == set()
+    assert locations.get_descendent_location_ids(other_location.id) == set()
+    locations.update_location(location.id, "Location", "This is an example location", other_location.id, user.id)
+    assert locations.get_ancestor_location_ids(child_location1.id) == [location.id, other_location.id]
+    assert locations.get_descendent_location_ids(parent_location.id) == set()
+    with pytest.raises(errors.LocationDoesNotExistError):
+        locations.get_ancestor_location_ids(other_location.id + 1)
+    with pytest.raises(errors.LocationDoesNotExistError):
+        locations.get_descendent_location_ids(other_location.id + 1)
+
+
+def test_object_ids_for_location_including_sublocations(user: User, action: Action):
+    data = {'name': {'_type': 'text', 'text': 'Object'}}
+    object1 = objects.create_object(user_id=user.id, action_id=action.id, data=data)
+    object2 = objects.create_object(user_id=user.id, action_id=action.id, data=data)
+    object3 = objects.create_object(user_id=user.id, action_id=action.id, data=data)
+    location1 = locations.create_location("Location", "This is an example location", None, user.id)
+    location2 = locations.create_location("Location", "This is an example location", location1.id, user.id)
+    location3 = locations.create_location("Location", "This is an example location", location2.id, user.id)
+    locations.assign_location_to_object(object1.id, location1.id, None, user.id, "")
+    locations.assign_location_to_object(object2.id, location3.id, None, user.id, "")
+    locations.assign_location_to_object(object3.id, location3.id, None, user.id, "")
+    locations.assign_location_to_object(object3.id, None, None, user.id, "")
+    assert locations.get_object_ids_at_location(location1.id) == {object1.id}
+    assert locations.get_object_ids_at_location(location1.id, include_sublocations=True) == {object1.id, object2.id}
+    assert locations.get_object_ids_at_location(location2.id, include_sublocations=True) == {object2.id}
+    assert locations.get_object_ids_at_location(location3.id) == {object2.id}
+    assert locations.get_object_ids_at_location(location3.id, include_sublocations=True) == {object2.id}
+
+
+def test_current_object_location_assignment(user: User, object: Object):
+    location1 = locations.create_location("Location", "This is an example location", None, user.id)
+    location2 = locations.create_location("Location", "This is an example location", None, user.id)
+    assert sampledb.models.CurrentObjectLocationAssignment.query.filter_by(object_id=object.id).first() is None
+    locations.assign_location_to_object(object.id, location1.id, None, user.id, "")
+    locations.assign_location_to_object(object.id, location2.id, None, user.id, "")
+    current_object_location_assignment = sampledb.models.CurrentObjectLocationAssignment.query.filter_by(object_id=object.id).one()
+    assert current_object_location_assignment.location_id == location2.id
+    assert current_object_location_assignment.object_location_assignment_id == locations.get_current_object_location_assignment(object.id).id
+    assert locations.get_object_ids_at_location(location1.id) == set()
+    assert locations.get_object_ids_at_location(location2.id) == {object.id}
+    locations.assign_location_to_object(object.id, None, user.id, user.id, "")
+    assert sampledb.models.CurrentObjectLocationAssignment.query.filter_by(object_id=object.id).one().location_id is None
+    assert locations.get_current_object_location_assignment(object.id).location_id is None
+    assert locations.get_object_ids_at_location(location2.id) == set()
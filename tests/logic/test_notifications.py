@@ -3,6 +3,8 @@
 
 """
 
+import smtplib
+import flask_mail
 import pytest
 import sampledb
 import sampledb.logic
@@ -106,6 +108,25 @@ def test_send_notification(app, user):
     assert 'This is a test message' in message
 
 
+def test_send_notification_smtp_errors(app, user, monkeypatch):
+    sampledb.logic.notifications.set_notification_mode_for_all_types(user.id, sampledb.models.NotificationMode.EMAIL)
+    user_id = user.id
+
+    def send_refused(connection, message):
+        raise smtplib.SMTPRecipientsRefused({message.recipients[0]: (550, b'Refused')})
+
+    def send_disconnected(connection, message):
+        raise smtplib.SMTPServerDisconnected()
+
+    app.config['SERVER_NAME'] = 'localhost'
+    with app.app_context():
+        monkeypatch.setattr(flask_mail.Connection, 'send', send_refused)
+        sampledb.logic.notifications.create_other_notification(user_id, 'This is a test message')
+        monkeypatch.setattr(flask_mail.Connection, 'send', send_disconnected)
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            sampledb.logic.notifications.create_other_notification(user_id, 'This is a test message')
+
+
 def test_create_announcement_notification(user):
     assert sampledb.logic.notifications.get_num_notifications(user.id) == 0
     sampledb.logic.notifications.create_announcement_notification_for_all_users('This is a test message', 'This is an html test message')
@@ -118,3 +139,32 @@ def test_create_announcement_notification(user):
         'message': 'This is a test message',
         'html': 'This is an html test message'
     }
+
+
+def test_create_announcement_notification_using_jobs(app, user):
+    other_user = sampledb.logic.users.create_user("Other User", "example2@fz-juelich.de", sampledb.models.UserType.PERSON)
+    ignoring_user = sampledb.logic.users.create_user("Ignoring User", "example3@fz-juelich.de", sampledb.models.UserType.PERSON)
+    sampledb.logic.notifications.set_notification_mode_for_all_types(user.id, sampledb.models.NotificationMode.EMAIL)
+    sampledb.logic.notifications.set_notification_mode_for_all_types(other_user.id, sampledb.models.NotificationMode.IGNORE)
+    sampledb.logic.notifications.set_notification_mode_for_type(sampledb.models.NotificationType.ANNOUNCEMENT, other_user.id, sampledb.models.NotificationMode.WEBAPP)
+    sampledb.logic.notifications.set_notification_mode_for_type(sampledb.models.NotificationType.ANNOUNCEMENT, ignoring_user.id, sampledb.models.NotificationMode.IGNORE)
+    # the inner app context removes the session, so the users cannot be refreshed afterwards
+    user_ids = [user.id, other_user.id, ignoring_user.id]
+
+    app.config['SERVER_NAME'] = 'localhost'
+    app.config['SEND_EMAILS_USING_JOBS'] = True
+    try:
+        with app.app_context():
+            with sampledb.mail.record_messages() as outbox:
+                sampledb.logic.notifications.create_announcement_notification_for_all_users('This is a test message', 'This is an html test message')
+                assert len(outbox) == 0
+                assert len(sampledb.logic.jobs.get_jobs()) == 1
+                assert sampledb.logic.jobs.process_jobs() == 1
+            assert sampledb.logic.jobs.get_jobs() == []
+    finally:
+        app.config['SEND_EMAILS_USING_JOBS'] = False
+
+    assert len(outbox) == 1
+    assert outbox[0].recipients == ['example1@fz-juelich.de']
+    assert 'This is an html test message' in outbox[0].html
+    assert [sampledb.logic.notifications.get_num_notifications(user_id) for user_id in user_ids] == [0, 1, 0]
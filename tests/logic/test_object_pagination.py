@@ -5,6 +5,8 @@
 
 __author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
 
+import datetime
+
 import pytest
 
 from sampledb import db
@@ -101,3 +103,196 @@ def test_offset_objects(user: User, action: Action) -> None:
     assert len(objects) == 3
     for i, object in enumerate(objects, start=6):
         assert object.data['name']['text'] == str(i)
+
+
+def _get_all_pages(limit, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        next_cursor = []
+        objects = sampledb.logic.objects.get_objects(limit=limit, cursor=cursor, next_cursor=next_cursor, **kwargs)
+        pages.append([object.data['name']['text'] if 'name' in object.data else None for object in objects])
+        if not next_cursor:
+            return pages
+        assert len(objects) == limit
+        cursor = next_cursor[0]
+
+
+def test_cursor_objects(user: User, action: Action) -> None:
+    for i in range(10):
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }, user_id=user.id)
+
+    assert _get_all_pages(4, sorting_func=object_sorting.ascending(object_sorting.object_id())) == [['0', '1', '2', '3'], ['4', '5', '6', '7'], ['8', '9']]
+    assert _get_all_pages(5, sorting_func=object_sorting.descending(object_sorting.object_id())) == [['9', '8', '7', '6', '5'], ['4', '3', '2', '1', '0']]
+    assert _get_all_pages(3) == [['9', '8', '7'], ['6', '5', '4'], ['3', '2', '1'], ['0']]
+    assert _get_all_pages(20, sorting_func=object_sorting.ascending(object_sorting.creation_date())) == [[str(i) for i in range(10)]]
+    assert _get_all_pages(3, sorting_func=object_sorting.descending(object_sorting.last_modification_date())) == [['9', '8', '7'], ['6', '5', '4'], ['3', '2', '1'], ['0']]
+
+
+def test_cursor_objects_by_property(user: User) -> None:
+    action = sampledb.logic.actions.create_action(
+        action_type=sampledb.logic.actions.ActionType.SAMPLE_CREATION,
+        name="",
+        description="",
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                },
+                'tag': {
+                    'title': 'Tag',
+                    'type': 'text'
+                }
+            },
+            'required': ['name']
+        }
+    )
+    for i in range(8):
+        data = {
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }
+        if i % 3 != 0:
+            data['tag'] = {
+                '_type': 'text',
+                'text': 'b' if i % 2 == 0 else 'a'
+            }
+        sampledb.logic.objects.create_object(action_id=action.id, data=data, user_id=user.id)
+
+    # objects without a tag are sorted last in ascending and first in descending order
+    assert _get_all_pages(2, sorting_func=object_sorting.ascending(object_sorting.property_value('tag'))) == [['1', '5'], ['7', '2'], ['4', '0'], ['3', '6']]
+    assert _get_all_pages(3, sorting_func=object_sorting.descending(object_sorting.property_value('tag'))) == [['6', '3', '0'], ['4', '2', '7'], ['5', '1']]
+
+
+def test_cursor_objects_with_offset(user: User, action: Action) -> None:
+    with pytest.raises(ValueError):
+        sampledb.logic.objects.get_objects(limit=2, offset=2, next_cursor=[])
+
+
+def test_encode_cursor() -> None:
+    values = ['_creation_date', 'asc', datetime.datetime(2020, 3, 1, 12, 30, 15, 12345), 42]
+    cursor = sampledb.logic.object_pagination.encode_cursor(values)
+    assert isinstance(cursor, str)
+    assert sampledb.logic.object_pagination.decode_cursor(cursor) == values
+    values = ['name', 'desc', None, 1]
+    assert sampledb.logic.object_pagination.decode_cursor(sampledb.logic.object_pagination.encode_cursor(values)) == values
+
+
+def test_decode_invalid_cursor() -> None:
+    for cursor in ['', 'invalid', 'e30=', 'bnVsbA==']:
+        with pytest.raises(sampledb.logic.errors.InvalidCursorError):
+            sampledb.logic.object_pagination.decode_cursor(cursor)
+
+
+def test_get_num_objects_estimate(user: User, action: Action) -> None:
+    sampledb.logic.object_pagination.clear_num_objects_estimates()
+    for i in range(3):
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }, user_id=user.id)
+    assert sampledb.logic.object_pagination.get_num_objects_estimate(user.id, sampledb.models.Permissions.READ, cache_key='') == 3
+    sampledb.logic.objects.create_object(action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': '3'
+        }
+    }, user_id=user.id)
+    # the cached count is used
+    assert sampledb.logic.object_pagination.get_num_objects_estimate(user.id, sampledb.models.Permissions.READ, cache_key='') == 3
+    assert sampledb.logic.object_pagination.get_num_objects_estimate(user.id, sampledb.models.Permissions.READ, cache_key='other', filter_func=lambda data: data['name']['text'].astext == '3') == 1
+    assert sampledb.logic.object_pagination.get_num_objects_estimate(user.id, sampledb.models.Permissions.READ, cache_key='', action_id=action.id) == 4
+    sampledb.logic.object_pagination.clear_num_objects_estimates()
+    assert sampledb.logic.object_pagination.get_num_objects_estimate(user.id, sampledb.models.Permissions.READ, cache_key='') == 4
+
+
+def test_paginate_objects_at_location(user: User, action: Action) -> None:
+    location = sampledb.logic.locations.create_location("Location", "", None, user.id)
+    other_location = sampledb.logic.locations.create_location("Location", "", None, user.id)
+    for i in range(10):
+        object = sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }, user_id=user.id)
+        sampledb.logic.locations.assign_location_to_object(object.id, other_location.id, None, user.id, "")
+        if i % 2 == 0:
+            sampledb.logic.locations.assign_location_to_object(object.id, location.id, None, user.id, "")
+
+    num_objects_found = []
+    objects = sampledb.logic.object_permissions.get_objects_with_permissions(
+        user.id,
+        sampledb.models.Permissions.READ,
+        sorting_func=object_sorting.ascending(object_sorting.object_id()),
+        location_id=location.id,
+        limit=3,
+        offset=3,
+        num_objects_found=num_objects_found
+    )
+    assert [object.data['name']['text'] for object in objects] == ['6', '8']
+    assert num_objects_found == [5]
+    assert sampledb.logic.object_permissions.get_num_objects_with_permissions(user.id, sampledb.models.Permissions.READ, location_id=location.id) == 5
+    assert sampledb.logic.object_permissions.get_num_objects_with_permissions(user.id, sampledb.models.Permissions.READ, location_id=other_location.id) == 5
+
+
+def test_paginate_filtered_objects(user: User, action: Action) -> None:
+    other_user = sampledb.models.User(
+        name="User",
+        email="example@fz-juelich.de",
+        type=sampledb.models.UserType.PERSON)
+    db.session.add(other_user)
+    db.session.commit()
+    project_id = sampledb.logic.projects.create_project("Example Project", "", user.id).id
+    object_ids = []
+    for i in range(10):
+        object = sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': str(i)
+            }
+        }, user_id=user.id)
+        object_ids.append(object.id)
+        if i % 2 == 0:
+            sampledb.logic.object_permissions.set_project_object_permissions(object.id, project_id, sampledb.models.Permissions.WRITE)
+        if i % 3 == 0:
+            sampledb.logic.publications.link_publication_to_object(other_user.id, object.id, '10.1000/valid')
+
+    def get_names(**kwargs):
+        num_objects_found = []
+        objects = sampledb.logic.object_permissions.get_objects_with_permissions(
+            user.id,
+            sampledb.models.Permissions.READ,
+            sorting_func=object_sorting.ascending(object_sorting.object_id()),
+            limit=2,
+            offset=1,
+            num_objects_found=num_objects_found,
+            **kwargs
+        )
+        assert num_objects_found == [sampledb.logic.object_permissions.get_num_objects_with_permissions(user.id, sampledb.models.Permissions.READ, **kwargs)]
+        return num_objects_found[0], [object.data['name']['text'] for object in objects]
+
+    assert get_names(project_id=project_id) == (5, ['2', '4'])
+    assert get_names(doi='10.1000/valid') == (4, ['3', '6'])
+    assert get_names(related_user_id=other_user.id) == (4, ['3', '6'])
+    assert get_names(related_user_id=user.id) == (10, ['1', '2'])
+    assert get_names(object_ids=object_ids[5:]) == (5, ['6', '7'])
+    assert get_names(project_id=project_id, doi='10.1000/valid') == (2, ['6'])
+    assert get_names(object_ids=[]) == (0, [])
+
+    sampledb.logic.object_permissions.set_project_object_permissions(object_ids[0], project_id, sampledb.models.Permissions.READ)
+    num_objects_found = []
+    sampledb.logic.object_permissions.get_objects_with_permissions(user.id, sampledb.models.Permissions.WRITE, project_id=project_id, num_objects_found=num_objects_found)
+    assert num_objects_found == [4]
@@ -141,8 +141,7 @@ def test_default_user_object_permissions(user, independent_action_object):
 def test_get_user_object_permissions(user, independent_action_object):
     user_id = user.id
     object_id = independent_action_object.object_id
-    sampledb.db.session.add(UserObjectPermissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE))
-    sampledb.db.session.commit()
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.WRITE
 
 
@@ -155,8 +154,7 @@ def test_get_user_object_permissions_with_project(users, independent_action_obje
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.NONE
     sampledb.logic.projects.add_user_to_project(project_id, user_id, Permissions.READ)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.READ
-    sampledb.db.session.add(UserObjectPermissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE))
-    sampledb.db.session.commit()
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.WRITE
     sampledb.logic.projects.update_user_project_permissions(project_id, user_id, Permissions.GRANT)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.GRANT
@@ -174,8 +172,7 @@ def test_get_user_object_permissions_with_group_project(users, independent_actio
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.NONE
     sampledb.logic.groups.add_user_to_group(group_id=group_id, user_id=user_id)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.READ
-    sampledb.db.session.add(UserObjectPermissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE))
-    sampledb.db.session.commit()
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.WRITE
     sampledb.logic.projects.update_group_project_permissions(project_id, group_id, Permissions.GRANT)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.GRANT
@@ -186,8 +183,7 @@ def test_get_instrument_responsible_user_object_permissions(user, instrument, in
     object_id = instrument_action_object.object_id
     instrument.responsible_users.append(user)
     sampledb.db.session.add(instrument)
-    sampledb.db.session.add(UserObjectPermissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE))
-    sampledb.db.session.commit()
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.GRANT
 
 
@@ -655,10 +651,47 @@ def test_get_object_permissions_for_readonly_users(users, instrument, instrument
 def test_get_readonly_user_object_permissions(user, independent_action_object):
     user_id = user.id
     object_id = independent_action_object.object_id
-    sampledb.db.session.add(UserObjectPermissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE))
-    sampledb.db.session.commit()
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=object_id, permissions=Permissions.WRITE)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.WRITE
     sampledb.logic.users.set_user_readonly(user_id, readonly=True)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.READ
     sampledb.logic.users.set_user_readonly(user_id, readonly=False)
     assert object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id) == Permissions.WRITE
+
+
+def test_get_user_objects_permissions(users, instrument, objects):
+    user_id = users[0].id
+    instrument_action_object_id = objects[0].object_id
+    independent_action_object_id = objects[1].object_id
+    object_ids = [instrument_action_object_id, independent_action_object_id, independent_action_object_id + 1]
+    assert object_permissions.get_user_objects_permissions(user_id=user_id, object_ids=object_ids) == {
+        instrument_action_object_id: Permissions.NONE,
+        independent_action_object_id: Permissions.NONE,
+        independent_action_object_id + 1: Permissions.NONE
+    }
+    assert object_permissions.get_user_objects_permissions(user_id=users[1].id, object_ids=object_ids) == {
+        instrument_action_object_id: Permissions.GRANT,
+        independent_action_object_id: Permissions.GRANT,
+        independent_action_object_id + 1: Permissions.NONE
+    }
+    object_permissions.set_object_public(instrument_action_object_id)
+    object_permissions.set_user_object_permissions(user_id=user_id, object_id=independent_action_object_id, permissions=Permissions.WRITE)
+    assert object_permissions.get_user_objects_permissions(user_id=user_id, object_ids=object_ids) == {
+        instrument_action_object_id: Permissions.READ,
+        independent_action_object_id: Permissions.WRITE,
+        independent_action_object_id + 1: Permissions.NONE
+    }
+    sampledb.logic.users.set_user_readonly(user_id, readonly=True)
+    assert object_permissions.get_user_objects_permissions(user_id=user_id, object_ids=object_ids) == {
+        instrument_action_object_id: Permissions.READ,
+        independent_action_object_id: Permissions.READ,
+        independent_action_object_id + 1: Permissions.NONE
+    }
+    assert object_permissions.get_user_objects_permissions(user_id=user_id, object_ids=[]) == {}
+    for object_id in object_ids:
+        assert object_permissions.get_user_objects_permissions(user_id=user_id, object_ids=[object_id])[object_id] == object_permissions.get_user_object_permissions(user_id=user_id, object_id=object_id)
+
+
+def test_get_user_objects_permissions_missing_user(objects):
+    with pytest.raises(sampledb.logic.errors.UserDoesNotExistError):
+        object_permissions.get_user_objects_permissions(user_id=42, object_ids=[objects[0].object_id])
@@ -217,6 +217,59 @@ def test_get_object_versions_errors() -> None:
         sampledb.logic.objects.get_object_versions(0)
 
 
+def test_get_object_versions_metadata(user, action, user2) -> None:
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+    object1 = sampledb.logic.objects.create_object(action_id=action.id, data=data, user_id=user.id)
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example 2'
+        }
+    }
+    sampledb.logic.objects.update_object(object1.object_id, data=data, user_id=user2.id)
+    object2 = sampledb.logic.objects.get_object(object_id=object1.id)
+    versions_metadata = sampledb.logic.objects.get_object_versions_metadata(object1.object_id)
+    assert [(version_metadata.version_id, version_metadata.user_id, version_metadata.utc_datetime) for version_metadata in versions_metadata] == [
+        (0, user.id, object1.utc_datetime),
+        (1, user2.id, object2.utc_datetime)
+    ]
+    with pytest.raises(sampledb.logic.errors.ObjectDoesNotExistError):
+        sampledb.logic.objects.get_object_versions_metadata(object1.object_id + 1)
+
+
+def test_get_object_version_diff(user, action) -> None:
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+    object = sampledb.logic.objects.create_object(action_id=action.id, data=data, user_id=user.id)
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example 2'
+        }
+    }
+    sampledb.logic.objects.update_object(object.object_id, data=data, user_id=user.id)
+    assert sampledb.logic.objects.get_object_version_diff(object.object_id, 0, 1) == [
+        {'op': 'replace', 'path': '/name/text', 'value': 'Example 2'}
+    ]
+    assert sampledb.logic.objects.get_object_version_diff(object.object_id, 1, 0) == [
+        {'op': 'replace', 'path': '/name/text', 'value': 'Example'}
+    ]
+    assert sampledb.logic.objects.get_object_version_diff(object.object_id, 1, 1) == []
+    with pytest.raises(sampledb.logic.errors.ObjectVersionDoesNotExistError):
+        sampledb.logic.objects.get_object_version_diff(object.object_id, 0, 2)
+    with pytest.raises(sampledb.logic.errors.ObjectDoesNotExistError):
+        sampledb.logic.objects.get_object_version_diff(object.object_id + 1, 0, 1)
+
+
 def test_get_object_version(user, action, user2) -> None:
     user1 = user
     data = {
@@ -247,6 +300,102 @@ def test_create_object_invalid_data(user, action) -> None:
         sampledb.logic.objects.create_object(action_id=action.id, data={'test': False}, user_id=user.id)
 
 
+def test_create_object_batch(user, user2) -> None:
+    sample_action = sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Sample Action',
+        description='',
+        schema={
+            'title': 'Sample',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Sample Name',
+                    'type': 'text'
+                },
+                'tags': {
+                    'title': 'Tags',
+                    'type': 'tags'
+                },
+                'sample': {
+                    'title': 'Sample',
+                    'type': 'sample'
+                }
+            },
+            'required': ['name']
+        }
+    )
+    sample = sampledb.logic.objects.create_object(
+        action_id=sample_action.id,
+        data={
+            'name': {
+                '_type': 'text',
+                'text': 'Sample'
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': ['existing']
+            }
+        },
+        user_id=user.id
+    )
+    sampledb.logic.object_permissions.set_default_permissions_for_user(creator_id=user.id, user_id=user2.id, permissions=sampledb.models.Permissions.READ)
+    sampledb.logic.object_permissions.set_default_public(creator_id=user.id)
+    data_sequence = [
+        {
+            'name': {
+                '_type': 'text',
+                'text': 'Sample {}'.format(i)
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': ['existing', 'new']
+            },
+            'sample': {
+                '_type': 'sample',
+                'object_id': sample.id
+            }
+        }
+        for i in range(3)
+    ]
+    objects = sampledb.logic.objects.create_object_batch(action_id=sample_action.id, data_sequence=data_sequence, user_id=user.id)
+    assert [object.data for object in objects] == data_sequence
+    object_ids = [object.id for object in objects]
+    assert sorted(object_ids) == object_ids
+    db.session.rollback()
+
+    for object in objects:
+        assert object == sampledb.logic.objects.get_object(object.id)
+        object_log_entries = sampledb.logic.object_log.get_object_log_entries(object_id=object.id)
+        assert [(entry.type, entry.data) for entry in object_log_entries] == [(sampledb.models.ObjectLogEntryType.CREATE_BATCH, {'object_ids': object_ids})]
+        assert sampledb.logic.object_permissions.get_user_object_permissions(object.id, user.id) == sampledb.models.Permissions.GRANT
+        assert sampledb.logic.object_permissions.get_user_object_permissions(object.id, user2.id) == sampledb.models.Permissions.READ
+        assert sampledb.logic.object_permissions.object_is_public(object.id)
+    object_log_entries = sampledb.logic.object_log.get_object_log_entries(object_id=sample.id)
+    assert sorted(
+        entry.data['sample_id']
+        for entry in object_log_entries
+        if entry.type == sampledb.models.ObjectLogEntryType.USE_OBJECT_IN_SAMPLE_CREATION
+    ) == object_ids
+    user_log_entries = sampledb.logic.user_log.get_user_log_entries(user.id)
+    assert user_log_entries[0].type == sampledb.models.UserLogEntryType.CREATE_BATCH
+    assert user_log_entries[0].data == {'object_ids': object_ids}
+    assert {tag.name: tag.uses for tag in sampledb.logic.tags.get_tags()} == {'existing': 4, 'new': 3}
+
+
+def test_create_object_batch_invalid_data(user, action) -> None:
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Example'
+        }
+    }
+    with pytest.raises(sampledb.logic.errors.ValidationError):
+        sampledb.logic.objects.create_object_batch(action_id=action.id, data_sequence=[data, {'test': False}], user_id=user.id)
+    assert sampledb.logic.objects.get_objects() == []
+    assert sampledb.logic.user_log.get_user_log_entries(user.id) == []
+
+
 def test_update_object_invalid_data(user, action) -> None:
     data = {
         'name': {
@@ -432,3 +581,87 @@ def test_measurement_referencing_sample(flask_server, user) -> None:
     assert len(object_log_entries) == 4
     object_log_entries = sampledb.logic.object_log.get_object_log_entries(object_id=sample.id, user_id=user.id)
     assert len(object_log_entries) == 3
+
+
+def test_create_and_update_objects(user) -> None:
+    action = sampledb.logic.actions.create_action(
+        action_type=ActionType.MEASUREMENT,
+        name='Measurement Action',
+        description='',
+        schema={
+            'title': 'Measurement',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                },
+                'tags': {
+                    'title': 'Tags',
+                    'type': 'tags'
+                },
+                'measurement': {
+                    'title': 'Measurement',
+                    'type': 'measurement'
+                }
+            },
+            'required': ['name']
+        }
+    )
+
+    def get_data(name, tags, measurement_id=None):
+        data = {
+            'name': {
+                '_type': 'text',
+                'text': name
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': tags
+            }
+        }
+        if measurement_id is not None:
+            data['measurement'] = {
+                '_type': 'measurement',
+                'object_id': measurement_id
+            }
+        return data
+
+    object1 = sampledb.logic.objects.create_object(action.id, get_data('Object 1', ['a', 'b']), user.id)
+    object2 = sampledb.logic.objects.create_object(action.id, get_data('Object 2', ['b']), user.id)
+    created_objects, updated_objects = sampledb.logic.objects.create_and_update_objects(
+        creations=[(action.id, get_data('Object 3', ['c'], object1.id))],
+        updates=[
+            (object1.id, get_data('Object 1', ['b', 'c'], object2.id), None),
+            (object2.id, get_data('Object 2', [], object1.id), None)
+        ],
+        user_id=user.id
+    )
+    object3, = created_objects
+    assert [(object.id, object.version_id) for object in updated_objects] == [(object1.id, 1), (object2.id, 1)]
+    assert sampledb.logic.objects.get_object(object3.id).data == object3.data
+    assert sampledb.logic.objects.get_object(object1.id).data == updated_objects[0].data
+    assert {tag.name: tag.uses for tag in sampledb.logic.tags.get_tags()} == {'b': 1, 'c': 2}
+    object_log_entries = sampledb.logic.object_log.get_object_log_entries(object1.id)
+    assert sorted(
+        entry.data['measurement_id']
+        for entry in object_log_entries
+        if entry.type == sampledb.models.ObjectLogEntryType.USE_OBJECT_IN_MEASUREMENT
+    ) == [object2.id, object3.id]
+    assert [
+        entry.data
+        for entry in object_log_entries
+        if entry.type == sampledb.models.ObjectLogEntryType.EDIT_OBJECT
+    ] == [{'version_id': 1}]
+    user_log_entry_types = [entry.type for entry in sampledb.logic.user_log.get_user_log_entries(user.id)]
+    assert user_log_entry_types.count(sampledb.models.UserLogEntryType.EDIT_OBJECT) == 2
+    assert user_log_entry_types.count(sampledb.models.UserLogEntryType.CREATE_BATCH) == 1
+
+    with pytest.raises(sampledb.logic.errors.ObjectDoesNotExistError):
+        sampledb.logic.objects.create_and_update_objects(
+            creations=[(action.id, get_data('Object 4', ['d']))],
+            updates=[(object3.id + 100, get_data('Object', []), None)],
+            user_id=user.id
+        )
+    assert len(sampledb.logic.objects.get_objects()) == 3
+    assert {tag.name: tag.uses for tag in sampledb.logic.tags.get_tags()} == {'b': 1, 'c': 2}
@@ -5,6 +5,7 @@
 
 import pytest
 import requests
+import sqlalchemy
 
 import sampledb
 import sampledb.logic
@@ -1464,3 +1465,103 @@ def test_cyclic_subproject_relationships():
     # Indirect cycle
     with pytest.raises(sampledb.logic.errors.InvalidSubprojectRelationshipError):
         sampledb.logic.projects.create_subproject_relationship(project_id3, project_id1)
+
+
+def test_get_ancestor_and_descendent_project_ids():
+    user = sampledb.models.User("Example User", "example@fz-juelich.de", sampledb.models.UserType.PERSON)
+    sampledb.db.session.add(user)
+    sampledb.db.session.commit()
+    project_id1 = sampledb.logic.projects.create_project("Test Project 1", "", user.id).id
+    project_id2 = sampledb.logic.projects.create_project("Test Project 2", "", user.id).id
+    project_id3 = sampledb.logic.projects.create_project("Test Project 3", "", user.id).id
+    project_id4 = sampledb.logic.projects.create_project("Test Project 4", "", user.id).id
+
+    sampledb.logic.projects.create_subproject_relationship(project_id1, project_id2, child_can_add_users_to_parent=True)
+    sampledb.logic.projects.create_subproject_relationship(project_id2, project_id3)
+    sampledb.logic.projects.create_subproject_relationship(project_id1, project_id4, child_can_add_users_to_parent=True)
+    sampledb.logic.projects.create_subproject_relationship(project_id4, project_id3, child_can_add_users_to_parent=True)
+
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id1) == set()
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id2) == {project_id1}
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id3) == {project_id1, project_id2, project_id4}
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id3, only_if_child_can_add_users_to_ancestor=True) == {project_id1, project_id4}
+    assert sampledb.logic.projects.get_descendent_project_ids(project_id1) == {project_id2, project_id3, project_id4}
+    assert sampledb.logic.projects.get_descendent_project_ids(project_id2) == {project_id3}
+    assert sampledb.logic.projects.get_descendent_project_ids(project_id3) == set()
+
+    sampledb.logic.projects.delete_subproject_relationship(project_id4, project_id3)
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id3) == {project_id1, project_id2}
+    assert sampledb.logic.projects.get_ancestor_project_ids(project_id3, only_if_child_can_add_users_to_ancestor=True) == set()
+
+
+def test_get_user_project_ids_and_permissions():
+    user = sampledb.models.User("Example User", "example@fz-juelich.de", sampledb.models.UserType.PERSON)
+    other_user = sampledb.models.User("Example User", "example@fz-juelich.de", sampledb.models.UserType.PERSON)
+    sampledb.db.session.add(user)
+    sampledb.db.session.add(other_user)
+    sampledb.db.session.commit()
+    project_id1 = sampledb.logic.projects.create_project("Test Project 1", "", other_user.id).id
+    project_id2 = sampledb.logic.projects.create_project("Test Project 2", "", other_user.id).id
+    project_id3 = sampledb.logic.projects.create_project("Test Project 3", "", other_user.id).id
+    group_id = sampledb.logic.groups.create_group("Example Group", "", user.id).id
+
+    sampledb.logic.projects.add_user_to_project(project_id1, user.id, sampledb.models.Permissions.READ)
+    sampledb.logic.projects.add_group_to_project(project_id1, group_id, sampledb.models.Permissions.WRITE)
+    sampledb.logic.projects.add_user_to_project(project_id2, user.id, sampledb.models.Permissions.GRANT)
+    sampledb.logic.projects.add_group_to_project(project_id2, group_id, sampledb.models.Permissions.READ)
+    sampledb.logic.projects.add_group_to_project(project_id3, group_id, sampledb.models.Permissions.READ)
+
+    assert sampledb.logic.projects.get_user_project_ids_and_permissions(user.id) == {
+        project_id1: sampledb.models.Permissions.READ,
+        project_id2: sampledb.models.Permissions.GRANT
+    }
+    assert sampledb.logic.projects.get_user_project_ids_and_permissions(user.id, include_groups=True) == {
+        project_id1: sampledb.models.Permissions.WRITE,
+        project_id2: sampledb.models.Permissions.GRANT,
+        project_id3: sampledb.models.Permissions.READ
+    }
+    assert sampledb.logic.projects.get_user_project_permissions(project_id1, user.id) == sampledb.models.Permissions.READ
+    assert sampledb.logic.projects.get_user_project_permissions(project_id1, user.id, include_groups=True) == sampledb.models.Permissions.WRITE
+    assert sampledb.logic.projects.get_user_project_permissions(project_id3, user.id) == sampledb.models.Permissions.NONE
+    assert sampledb.logic.projects.get_user_project_permissions(project_id3, user.id, include_groups=True) == sampledb.models.Permissions.READ
+    assert [project.id for project in sampledb.logic.projects.get_user_projects(user.id, include_groups=True)] == [project_id1, project_id2, project_id3]
+    assert sampledb.logic.projects.get_project_member_user_ids_and_permissions(project_id1, include_groups=True) == {
+        user.id: sampledb.models.Permissions.WRITE,
+        other_user.id: sampledb.models.Permissions.GRANT
+    }
+
+    sampledb.logic.groups.remove_user_from_group(group_id, user.id)
+    assert sampledb.logic.projects.get_user_project_ids_and_permissions(user.id, include_groups=True) == {
+        project_id1: sampledb.models.Permissions.READ,
+        project_id2: sampledb.models.Permissions.GRANT
+    }
+
+    with pytest.raises(sampledb.logic.errors.UserDoesNotExistError):
+        sampledb.logic.projects.get_user_project_ids_and_permissions(user.id + other_user.id)
+
+
+def test_get_user_project_ids_and_permissions_query_count():
+    user = sampledb.models.User("Example User", "example@fz-juelich.de", sampledb.models.UserType.PERSON)
+    sampledb.db.session.add(user)
+    sampledb.db.session.commit()
+    project_ids = []
+    for i in range(5):
+        project_id = sampledb.logic.projects.create_project("Test Project {}".format(i), "", user.id).id
+        group_id = sampledb.logic.groups.create_group("Example Group {}".format(i), "", user.id).id
+        sampledb.logic.projects.add_group_to_project(project_id, group_id, sampledb.models.Permissions.READ)
+        if project_ids:
+            sampledb.logic.projects.create_subproject_relationship(project_ids[-1], project_id)
+        project_ids.append(project_id)
+
+    queries = []
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    sqlalchemy.event.listen(sampledb.db.engine, 'before_cursor_execute', count_query)
+    try:
+        assert set(sampledb.logic.projects.get_user_project_ids_and_permissions(user.id, include_groups=True)) == set(project_ids)
+        assert sampledb.logic.projects.get_ancestor_project_ids(project_ids[-1]) == set(project_ids[:-1])
+        assert sampledb.logic.projects.get_descendent_project_ids(project_ids[0]) == set(project_ids[1:])
+    finally:
+        sqlalchemy.event.remove(sampledb.db.engine, 'before_cursor_execute', count_query)
+    assert len(queries) <= 4
@@ -155,6 +155,74 @@ def test_find_by_simple_text(user, action) -> None:
         assert 'test' in object.data['text_attr']['text']
 
 
+def test_find_by_simple_text_words(user, action) -> None:
+    for name, tags, text in [
+        ('Sample-12', ['tag1'], "This is a test."),
+        ('Sample-13', ['tag2'], "It's an example."),
+        ('Other', ['example'], "Another test.")
+    ]:
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': name
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': tags
+            },
+            'text_attr': {
+                '_type': 'text',
+                'text': text
+            }
+        }, user_id=user.id)
+
+    def get_names(query_string):
+        filter_func, search_tree, use_advanced_search = sampledb.logic.object_search.generate_filter_func(query_string, use_advanced_search=False)
+        assert not use_advanced_search
+        filter_func, search_notes = sampledb.logic.object_search.wrap_filter_func(filter_func)
+        objects = sampledb.logic.objects.get_objects(filter_func=filter_func)
+        assert len(search_notes) == 0
+        return {object.data['name']['text'] for object in objects}
+
+    assert get_names('sample') == {'Sample-12', 'Sample-13'}
+    assert get_names('SAMPLE-12') == {'Sample-12'}
+    assert get_names('samp test') == {'Sample-12'}
+    assert get_names('example') == {'Sample-13', 'Other'}
+    assert get_names('tag') == {'Sample-12', 'Sample-13'}
+    assert get_names("it's") == {'Sample-13'}
+    assert get_names('\\test\\') == {'Sample-12', 'Other'}
+    assert get_names('ample') == set()
+    assert get_names('text') == set()
+
+
+def test_simple_search_relevance(user, action) -> None:
+    for name, tags, text in [
+        ('Other', [], "An example."),
+        ('Example', [], "Other"),
+        ('Other', ['example'], "Other"),
+    ]:
+        sampledb.logic.objects.create_object(action_id=action.id, data={
+            'name': {
+                '_type': 'text',
+                'text': name
+            },
+            'tags': {
+                '_type': 'tags',
+                'tags': tags
+            },
+            'text_attr': {
+                '_type': 'text',
+                'text': text
+            }
+        }, user_id=user.id)
+    filter_func, search_tree, use_advanced_search = sampledb.logic.object_search.generate_filter_func('example', use_advanced_search=False)
+    filter_func, search_notes = sampledb.logic.object_search.wrap_filter_func(filter_func)
+    sorting_func = sampledb.logic.object_sorting.descending(sampledb.logic.object_sorting.relevance('example'))
+    objects = sampledb.logic.objects.get_objects(filter_func=filter_func, sorting_func=sorting_func)
+    assert [object.data['name']['text'] for object in objects] == ['Example', 'Other', 'Other']
+    assert objects[1].data['tags']['tags'] == ['example']
+
+
 def test_find_by_tag(user, action) -> None:
     data = {
         'name': {
@@ -0,0 +1,59 @@
+# coding: utf-8
+"""
+
+"""
+
+import json
+
+import pytest
+
+from sampledb.models.json_patch import make_patch, apply_patch
+
+__author__ = 'Florian Rhiem <f.rhiem@fz-juelich.de>'
+
+
+@pytest.mark.parametrize('source,target', [
+    ({}, {}),
+    ({'a': 1}, {'a': 2}),
+    ({'a': 1}, {'b': 1}),
+    ({'a': {'b': [1, 2, 3]}}, {'a': {'b': [1, 3]}}),
+    ({'a': [1]}, {'a': [1, [2], {'c': 3}]}),
+    ({'a/b': 1, 'c~d': 2}, {'a/b': 2}),
+    ({'a': 1}, {'a': True}),
+    ({'a': 1}, {'a': 1.0}),
+    ([1, 2], {'a': 1}),
+    ({'a': None}, {'a': {'b': None}}),
+])
+def test_make_and_apply_patch(source, target):
+    patch = make_patch(source, target)
+    # comparing the JSON representations also compares the types of values
+    assert json.dumps(apply_patch(source, patch), sort_keys=True) == json.dumps(target, sort_keys=True)
+
+
+def test_make_patch_unchanged():
+    assert make_patch({'a': [1, {'b': 'c'}]}, {'a': [1, {'b': 'c'}]}) == []
+
+
+def test_make_patch_changed_item():
+    assert make_patch({'a': [1, {'b': 'c'}]}, {'a': [1, {'b': 'd'}]}) == [
+        {'op': 'replace', 'path': '/a/1/b', 'value': 'd'}
+    ]
+
+
+def test_apply_patch_does_not_modify_document():
+    document = {'a': [1, 2]}
+    assert apply_patch(document, [{'op': 'add', 'path': '/a/-', 'value': 3}]) == {'a': [1, 2, 3]}
+    assert document == {'a': [1, 2]}
+
+
+@pytest.mark.parametrize('patch', [
+    [{'op': 'remove', 'path': '/b'}],
+    [{'op': 'replace', 'path': '/a/2', 'value': 1}],
+    [{'op': 'add', 'path': '/a/x', 'value': 1}],
+    [{'op': 'move', 'path': '/a', 'from': '/b'}],
+    [{'op': 'remove', 'path': ''}],
+    [{'op': 'add', 'path': 'a', 'value': 1}],
+])
+def test_apply_invalid_patch(patch):
+    with pytest.raises(ValueError):
+        apply_patch({'a': [1, 2]}, patch)
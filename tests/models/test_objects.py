@@ -121,6 +121,22 @@ def test_create_object_with_missing_action(session: sessionmaker(), objects: Ver
         objects.create_object(action_id=0, data={}, schema=None, user_id=user.id)
 
 
+def test_create_objects(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(name="User")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object0 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    data_sequence = [{'index': index} for index in range(100)]
+    created_objects = objects.create_objects(data_sequence, schema={}, user_id=user.id, action_id=action.id)
+    assert [object.data for object in created_objects] == data_sequence
+    assert len({object.object_id for object in created_objects} | {object0.object_id}) == 101
+    for object in created_objects:
+        assert objects.get_current_object(object.object_id) == object
+    assert objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id).object_id > max(object.object_id for object in created_objects)
+
+
 def test_update_object(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
     user1 = User(name="User 1")
     session.add(user1)
@@ -145,6 +161,55 @@ def test_update_object(session: sessionmaker(), objects: VersionedJSONSerializab
     assert object2 == objects.get_current_object(object2.object_id)
 
 
+def test_update_objects(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(name="User 1")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object1 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    object2 = objects.create_object(action_id=action.id, data={}, schema={'type': 'object'}, user_id=user.id)
+    object3 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    object3 = objects.update_object(object3.object_id, data={'test': 3}, schema=None, user_id=user.id)
+    updated_objects = objects.update_objects([
+        (object3.object_id, {'test': 4}, None),
+        (object1.object_id, {'test': 2}, {'type': 'object'})
+    ], user_id=user.id)
+    assert [(object.object_id, object.version_id, object.data, object.schema) for object in updated_objects] == [
+        (object3.object_id, 2, {'test': 4}, {}),
+        (object1.object_id, 1, {'test': 2}, {'type': 'object'})
+    ]
+    assert updated_objects == [objects.get_current_object(object.object_id) for object in updated_objects]
+    assert objects.get_current_object(object2.object_id) == object2
+    assert [object.data for object in objects.get_object_versions(object3.object_id)] == [{}, {'test': 3}, {'test': 4}]
+    assert objects.update_objects([], user_id=user.id) == []
+
+
+def test_update_objects_errors(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(name="User 1")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object1 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    object2 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    schema = {
+        'type': 'object',
+        'properties': {
+            'test': {
+                'type': 'integer'
+            }
+        }
+    }
+    assert objects.update_objects([(object1.object_id, {'test': 1}, None), (object2.object_id + 1, {'test': 1}, None)], user_id=user.id) is None
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        objects.update_objects([(object1.object_id, {'test': 1}, schema), (object2.object_id, {'test': '1'}, schema)], user_id=user.id)
+    with pytest.raises(ValueError):
+        objects.update_objects([(object1.object_id, {'test': 1}, None), (object1.object_id, {'test': 2}, None)], user_id=user.id)
+    assert objects.get_current_object(object1.object_id) == object1
+    assert objects.get_current_object(object2.object_id) == object2
+
+
 def test_get_current_objects(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
     user = User(id=0, name="User")
     session.add(user)
@@ -172,6 +237,93 @@ def test_get_current_objects_action_filter(session: sessionmaker(), objects: Ver
     assert current_objects == [object1]
 
 
+def test_get_current_objects_by_ids(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(id=0, name="User")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object1 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    object2 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user.id)
+    assert objects.get_current_objects(object_ids=[object1.object_id]) == [object1]
+    assert objects.get_current_objects(object_ids={object2.object_id, object2.object_id + 1}) == [object2]
+    assert objects.get_current_objects(object_ids=[]) == []
+
+
+def test_get_current_objects_original_versions(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user1 = User(id=1, name="User 1")
+    user2 = User(id=2, name="User 2")
+    session.add(user1)
+    session.add(user2)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object1 = objects.create_object(action_id=action.id, data={'x': 1}, schema={}, user_id=user1.id)
+    object2 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user2.id)
+    object1_updated = objects.update_object(object1.object_id, data={'x': 2}, schema={}, user_id=user2.id)
+    original_versions = {}
+    current_objects = objects.get_current_objects(original_versions=original_versions)
+    assert current_objects == [object2, object1_updated]
+    assert original_versions == {
+        object1.object_id: (user1.id, object1.utc_datetime),
+        object2.object_id: (user2.id, object2.utc_datetime)
+    }
+
+
+def test_iter_current_objects(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(id=0, name="User")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    created_objects = [
+        objects.create_object(action_id=action.id, data={'x': i}, schema={}, user_id=user.id)
+        for i in range(5)
+    ]
+    assert list(objects.iter_current_objects(batch_size=2)) == list(reversed(created_objects))
+    assert list(objects.iter_current_objects(limit=3, batch_size=2)) == list(reversed(created_objects))[:3]
+    cursor = (created_objects[2].object_id, created_objects[2].object_id)
+    assert list(objects.iter_current_objects(cursor=cursor)) == list(reversed(created_objects[:2]))
+    assert list(objects.iter_current_objects(filter_func=lambda data: data['x'].astext.cast(db.Integer) >= 3)) == list(reversed(created_objects[3:]))
+
+
+def test_update_search_vectors(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(id=0, name="User")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    data = {
+        'name': {'_type': 'text', 'text': 'Example'},
+        'tags': {'_type': 'tags', 'tags': ['tag']},
+        'details': [{'description': {'_type': 'text', 'text': 'Description'}}],
+        'mass': {'_type': 'quantity', 'units': 'kg'}
+    }
+    object_ids = [
+        objects.create_object(action_id=action.id, data=data, schema={}, user_id=user.id).object_id
+        for i in range(3)
+    ]
+    objects.update_object(object_ids[0], data={'name': {'_type': 'text', 'text': 'Updated'}}, schema={}, user_id=user.id)
+
+    def get_search_vectors():
+        with objects.bind.connect() as connection:
+            return [
+                row[0]
+                for row in connection.execute(
+                    db.select([objects._current_table.c.search_vector]).order_by(objects._current_table.c.object_id)
+                ).fetchall()
+            ]
+    search_vectors = get_search_vectors()
+    assert search_vectors == ["'updated':1A", "'description':3 'example':1A 'tag':2B", "'description':3 'example':1A 'tag':2B"]
+    assert len(objects.get_object_versions(object_ids[0])) == 2
+
+    with objects.bind.connect() as connection:
+        connection.execute(objects._current_table.update().values(search_vector=None))
+    assert get_search_vectors() == [None, None, None]
+    assert objects.update_search_vectors(batch_size=2) == 3
+    assert get_search_vectors() == search_vectors
+
+
 def test_get_current_object(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
     user = User(id=0, name="User")
     session.add(user)
@@ -204,6 +356,27 @@ def test_get_object_versions_errors(session: sessionmaker(), objects: VersionedJ
     assert object_versions == []
 
 
+def test_get_object_versions_metadata(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user1 = User(name="User 1")
+    session.add(user1)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    object1 = objects.create_object(action_id=action.id, data={}, schema={}, user_id=user1.id)
+    user2 = User(name="User 2")
+    session.add(user2)
+    session.commit()
+    object2 = objects.update_object(object1.object_id, data={'test': 1}, schema={}, user_id=user2.id)
+    objects.create_object(action_id=action.id, data={}, schema={}, user_id=user1.id)
+    versions_metadata = objects.get_object_versions_metadata(object1.object_id)
+    assert versions_metadata == [
+        (object.object_id, object.version_id, object.user_id, object.utc_datetime)
+        for object in (object1, object2)
+    ]
+    assert versions_metadata[1].user_id == user2.id
+    assert objects.get_object_versions_metadata(0) == []
+
+
 def test_get_object_version(session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
     user1 = User(name="User 1")
     session.add(user1)
@@ -289,3 +462,87 @@ def test_update_object_invalid_data(session: sessionmaker(), objects: VersionedJ
     }
     with pytest.raises(jsonschema.exceptions.ValidationError):
         objects.update_object(object1.object_id, data={'test': '1'}, schema=schema, user_id=user.id)
+
+
+def test_deduplicate_schemas(engine, session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(name="User 1")
+    session.add(user)
+    action = Action(id=0, schema={'type': 'object'})
+    session.add(action)
+    session.commit()
+    created_objects = objects.create_objects([{}, {}], schema=None, user_id=user.id, action_id=action.id)
+    object3 = objects.create_object(action_id=action.id, data={}, schema={'type': 'object'}, user_id=user.id)
+    objects.update_objects([
+        (created_objects[0].object_id, {'test': 1}, None),
+        (created_objects[1].object_id, {'test': 1}, {})
+    ], user_id=user.id)
+    assert engine.execute(db.select([db.func.count()]).select_from(objects._schemas_table)).scalar() == 2
+
+    # schemas are queried only once for all objects
+    queries = []
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    objects._schemas_by_hash.clear()
+    db.event.listen(engine, 'before_cursor_execute', count_query)
+    try:
+        current_objects = objects.get_current_objects()
+        assert len(queries) == 2
+        assert [object.schema for object in current_objects] == [{'type': 'object'}, {}, {'type': 'object'}]
+        assert objects.get_object_version(created_objects[1].object_id, 0).schema == {'type': 'object'}
+        assert len(queries) == 3
+    finally:
+        db.event.remove(engine, 'before_cursor_execute', count_query)
+    assert current_objects[0] == object3
+
+
+def test_store_previous_versions_as_patches(engine, session: sessionmaker(), objects: VersionedJSONSerializableObjectTables) -> None:
+    user = User(name="User 1")
+    session.add(user)
+    action = Action(id=0, schema={})
+    session.add(action)
+    session.commit()
+    objects.snapshot_interval = 3
+    object_data = [
+        {'name': 'Example', 'values': list(range(100)), 'version': version_id}
+        for version_id in range(8)
+    ]
+    object_data[4] = {'name': 'Replaced'}
+    object1 = objects.create_object(action_id=action.id, data=object_data[0], schema={}, user_id=user.id)
+    for data in object_data[1:]:
+        objects.update_object(object1.object_id, data=data, schema=None, user_id=user.id)
+
+    rows = engine.execute(
+        db.select([
+            objects._previous_table.c.version_id,
+            objects._previous_table.c.data.is_(None),
+            objects._previous_table.c.data_patch.is_(None)
+        ])
+        .order_by(objects._previous_table.c.version_id)
+    ).fetchall()
+    # versions 0, 3 and 6 are snapshots and a patch for version 4 would be larger than its data
+    assert [tuple(row) for row in rows] == [
+        (0, False, True),
+        (1, True, False),
+        (2, True, False),
+        (3, False, True),
+        (4, False, True),
+        (5, True, False),
+        (6, False, True)
+    ]
+
+    assert [object.data for object in objects.get_object_versions(object1.object_id)] == object_data
+    objects.clear_version_cache()
+    for version_id, data in enumerate(object_data):
+        assert objects.get_object_version(object1.object_id, version_id).data == data
+    # reconstructed versions are cached
+    assert objects.get_object_version(object1.object_id, 1).data == object_data[1]
+    assert len(objects._cached_versions) == 3
+
+    assert objects.convert_previous_versions(None) == 3
+    assert engine.execute(db.select([db.func.count()]).select_from(objects._previous_table).where(objects._previous_table.c.data.is_(None))).scalar() == 0
+    # versions 1 and 5 are stored as patches, version 3 would be patched to the replaced data
+    assert objects.convert_previous_versions(2) == 2
+    assert engine.execute(db.select([db.func.count()]).select_from(objects._previous_table).where(objects._previous_table.c.data.is_(None))).scalar() == 2
+    objects.clear_version_cache()
+    assert [object.data for object in objects.get_object_versions(object1.object_id)] == object_data
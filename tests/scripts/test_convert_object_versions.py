@@ -0,0 +1,79 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sampledb
+import sampledb.logic
+import sampledb.__main__ as scripts
+from sampledb.models import UserType, ActionType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def object():
+    user = sampledb.logic.users.create_user("Example User", "example@fz-juelich.de", UserType.PERSON)
+    action = sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                },
+                'description': {
+                    'title': 'Description',
+                    'type': 'text',
+                    'multiline': True
+                }
+            },
+            'required': ['name']
+        }
+    )
+    data = {
+        'name': {
+            '_type': 'text',
+            'text': 'Name'
+        },
+        'description': {
+            '_type': 'text',
+            'text': 'A long description of the object. ' * 10
+        }
+    }
+    object = sampledb.logic.objects.create_object(user_id=user.id, action_id=action.id, data=data)
+    for i in range(1, 4):
+        data['name']['text'] = 'Name {}'.format(i)
+        sampledb.logic.objects.update_object(object_id=object.id, user_id=user.id, data=data)
+    return object
+
+
+def test_convert_object_versions(object, capsys):
+    object_versions = sampledb.logic.objects.get_object_versions(object.id)
+    scripts.main([scripts.__file__, 'convert_object_versions', '2'])
+    assert 'Success: 1 object versions have been converted' in capsys.readouterr()[0]
+    assert sampledb.db.session.execute("SELECT COUNT(*) FROM objects_previous WHERE data IS NULL").scalar() == 1
+    sampledb.models.Objects.clear_version_cache()
+    assert sampledb.logic.objects.get_object_versions(object.id) == object_versions
+    scripts.main([scripts.__file__, 'convert_object_versions', '0'])
+    assert 'Success: 1 object versions have been converted' in capsys.readouterr()[0]
+    assert sampledb.db.session.execute("SELECT COUNT(*) FROM objects_previous WHERE data IS NULL").scalar() == 0
+
+
+def test_convert_object_versions_arguments(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'convert_object_versions', '2', '3'])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
+
+
+def test_convert_object_versions_invalid_interval(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'convert_object_versions', 'all'])
+    assert exc_info.value != 0
+    assert 'Error' in capsys.readouterr()[1]
@@ -0,0 +1,75 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sampledb
+import sampledb.logic
+import sampledb.__main__ as scripts
+from sampledb.models import Permissions, UserType, ActionType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def user():
+    return sampledb.logic.users.create_user("Example User", "example@fz-juelich.de", UserType.PERSON)
+
+
+@pytest.fixture
+def object(user):
+    action = sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                }
+            },
+            'required': ['name']
+        }
+    )
+    return sampledb.logic.objects.create_object(user_id=user.id, action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Name'
+        }
+    })
+
+
+def test_verify(object, capsys):
+    scripts.main([scripts.__file__, 'effective_object_permissions', 'verify'])
+    assert 'Success' in capsys.readouterr()[0]
+
+
+def test_verify_mismatch(user, object, capsys):
+    user_id = user.id
+    sampledb.models.EffectiveUserObjectPermissions.query.delete()
+    sampledb.db.session.commit()
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'effective_object_permissions', 'verify'])
+    assert exc_info.value != 0
+    assert 'Mismatch: user #{} and object #{}'.format(user_id, object.id) in capsys.readouterr()[1]
+
+
+def test_rebuild(user, object, capsys):
+    user_id = user.id
+    sampledb.models.EffectiveUserObjectPermissions.query.delete()
+    sampledb.db.session.commit()
+    scripts.main([scripts.__file__, 'effective_object_permissions', 'rebuild'])
+    assert 'Success' in capsys.readouterr()[0]
+    assert sampledb.logic.object_permissions.get_user_object_permissions(object.id, user_id) == Permissions.GRANT
+    assert sampledb.logic.effective_object_permissions.verify_effective_permissions() == []
+
+
+def test_missing_arguments(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'effective_object_permissions'])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
@@ -0,0 +1,75 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sampledb.logic
+import sampledb.__main__ as scripts
+from sampledb.models import ActionType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def action():
+    return sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                },
+                'mass': {
+                    'title': 'Mass',
+                    'type': 'quantity',
+                    'units': 'kg'
+                }
+            },
+            'required': ['name']
+        }
+    )
+
+
+def test_add_list_and_remove_indexed_property(action, capsys):
+    action_id = action.id
+    scripts.main([scripts.__file__, 'indexed_properties', 'add', str(action_id), 'mass'])
+    assert 'Success' in capsys.readouterr()[0]
+    assert [indexed_property.property_path for indexed_property in sampledb.logic.indexed_properties.get_indexed_properties(action_id)] == [['mass']]
+
+    scripts.main([scripts.__file__, 'indexed_properties', 'list', str(action_id)])
+    assert '- mass (quantity)' in capsys.readouterr()[0]
+
+    scripts.main([scripts.__file__, 'indexed_properties', 'remove', str(action_id), 'mass'])
+    assert 'Success' in capsys.readouterr()[0]
+    assert sampledb.logic.indexed_properties.get_indexed_properties(action_id) == []
+
+
+def test_add_invalid_indexed_property(action, capsys):
+    action_id = action.id
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'indexed_properties', 'add', str(action_id), 'unknown'])
+    assert exc_info.value != 0
+    assert 'Error' in capsys.readouterr()[1]
+    assert sampledb.logic.indexed_properties.get_indexed_properties(action_id) == []
+
+
+def test_remove_missing_indexed_property(action, capsys):
+    action_id = action.id
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'indexed_properties', 'remove', str(action_id), 'mass'])
+    assert exc_info.value != 0
+    assert 'Error' in capsys.readouterr()[1]
+
+
+def test_indexed_properties_arguments(action, capsys):
+    action_id = action.id
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'indexed_properties', 'add', str(action_id)])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
@@ -0,0 +1,42 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sqlalchemy
+import sampledb
+from sampledb import db
+import sampledb.__main__ as scripts
+import sampledb.models.migrations.utils
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def empty_database(monkeypatch):
+    db.session.remove()
+    sampledb.utils.empty_database(sqlalchemy.create_engine(sampledb.config.SQLALCHEMY_DATABASE_URI))
+    monkeypatch.setattr(sampledb.config, 'SKIP_DATABASE_MIGRATIONS', 'true')
+    app = sampledb.create_app()
+    with app.app_context():
+        yield
+
+
+def test_skip_database_migrations(empty_database):
+    assert not sqlalchemy.inspect(db.engine).get_table_names()
+
+
+def test_migrate(empty_database, capsys):
+    scripts.main([scripts.__file__, 'migrate'])
+    assert 'Success' in capsys.readouterr()[0]
+    assert 'users' in sqlalchemy.inspect(db.engine).get_table_names()
+    migration_index = db.session.execute("SELECT migration_index FROM migration_index").scalar()
+    assert migration_index == max(index for index, name, function in sampledb.models.migrations.utils.find_migrations())
+
+
+def test_migrate_arguments(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'migrate', 'all'])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
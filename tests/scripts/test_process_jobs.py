@@ -0,0 +1,28 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sampledb
+import sampledb.__main__ as scripts
+from sampledb.models import JobType
+
+from ..test_utils import app_context
+
+
+def test_process_jobs(capsys, monkeypatch):
+    handled_jobs = []
+    monkeypatch.setitem(sampledb.logic.jobs._job_handlers, JobType.SEND_NOTIFICATION_EMAIL, lambda data_sequence: handled_jobs.extend(data_sequence) or [None] * len(data_sequence))
+    sampledb.logic.jobs.create_jobs(JobType.SEND_NOTIFICATION_EMAIL, [{'index': i} for i in range(3)])
+    scripts.main([scripts.__file__, 'process_jobs', '--once'])
+    assert 'Success: 3 jobs have been processed' in capsys.readouterr()[0]
+    assert handled_jobs == [{'index': i} for i in range(3)]
+    assert sampledb.logic.jobs.get_jobs() == []
+
+
+def test_process_jobs_arguments(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'process_jobs', '--all'])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
@@ -0,0 +1,66 @@
+# coding: utf-8
+"""
+
+"""
+
+import multiprocessing
+import time
+
+import pytest
+import requests
+import sampledb
+import sampledb.__main__ as scripts
+
+from ..test_utils import app_context
+
+
+def test_run_worker_processes(monkeypatch):
+    monkeypatch.setattr(sampledb.config, 'WORKER_PROCESSES', 2)
+    monkeypatch.setattr(sampledb.config, 'WORKER_THREADS', 2)
+    server_process = multiprocessing.Process(target=scripts.main, args=([scripts.__file__, 'run', '8943'],))
+    server_process.start()
+    try:
+        for _ in range(100):
+            try:
+                response = requests.get('http://localhost:8943/users/me/sign_in')
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+        else:
+            assert False, "server did not start"
+        assert response.status_code == 200
+        assert [requests.get('http://localhost:8943/users/me/sign_in').status_code for _ in range(10)] == [200] * 10
+    finally:
+        server_process.terminate()
+        server_process.join(10)
+    assert server_process.exitcode == 0
+
+
+@pytest.mark.parametrize('key', ['WORKER_PROCESSES', 'WORKER_THREADS'])
+def test_run_invalid_worker_configuration(key, monkeypatch, capsys):
+    monkeypatch.setattr(sampledb.config, key, '0')
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'run'])
+    assert exc_info.value != 0
+    assert key in capsys.readouterr()[1]
+
+
+def test_run_invalid_port(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'run', '80'])
+    assert exc_info.value != 0
+    assert 'Error' in capsys.readouterr()[1]
+
+
+def test_sqlalchemy_engine_options(monkeypatch):
+    monkeypatch.setattr(sampledb.config, 'SQLALCHEMY_POOL_SIZE', '8')
+    monkeypatch.setattr(sampledb.config, 'SQLALCHEMY_MAX_OVERFLOW', '2')
+    monkeypatch.setattr(sampledb.config, 'SQLALCHEMY_POOL_RECYCLE', '3600')
+    monkeypatch.setattr(sampledb.config, 'SQLALCHEMY_POOL_PRE_PING', 'true')
+    app = sampledb.create_app()
+    with app.app_context():
+        pool = sampledb.db.engine.pool
+        assert pool.size() == 8
+        assert pool._max_overflow == 2
+        assert pool._recycle == 3600
+        assert pool._pre_ping
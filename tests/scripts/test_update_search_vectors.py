@@ -0,0 +1,56 @@
+# coding: utf-8
+"""
+
+"""
+
+import pytest
+import sampledb
+import sampledb.logic
+import sampledb.__main__ as scripts
+from sampledb.models import UserType, ActionType
+
+from ..test_utils import app_context
+
+
+@pytest.fixture
+def object():
+    user = sampledb.logic.users.create_user("Example User", "example@fz-juelich.de", UserType.PERSON)
+    action = sampledb.logic.actions.create_action(
+        action_type=ActionType.SAMPLE_CREATION,
+        name='Example Action',
+        description='',
+        schema={
+            'title': 'Example Object',
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'title': 'Name',
+                    'type': 'text'
+                }
+            },
+            'required': ['name']
+        }
+    )
+    return sampledb.logic.objects.create_object(user_id=user.id, action_id=action.id, data={
+        'name': {
+            '_type': 'text',
+            'text': 'Name'
+        }
+    })
+
+
+def test_update_search_vectors(object, capsys):
+    sampledb.db.session.execute("UPDATE objects_current SET search_vector = NULL")
+    sampledb.db.session.commit()
+    scripts.main([scripts.__file__, 'update_search_vectors'])
+    assert 'Success: the search vectors of 1 objects have been updated' in capsys.readouterr()[0]
+    filter_func, search_tree, use_advanced_search = sampledb.logic.object_search.generate_filter_func('name', use_advanced_search=False)
+    filter_func, search_notes = sampledb.logic.object_search.wrap_filter_func(filter_func)
+    assert [o.object_id for o in sampledb.logic.objects.get_objects(filter_func=filter_func)] == [object.object_id]
+
+
+def test_update_search_vectors_arguments(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        scripts.main([scripts.__file__, 'update_search_vectors', 'all'])
+    assert exc_info.value != 0
+    assert 'Usage' in capsys.readouterr()[0]
@@ -59,6 +59,9 @@ def create_app():
     os.environ['FLASK_ENV'] = 'development'
     os.environ['FLASK_TESTING'] = 'True'
     sampledb.utils.empty_database(sqlalchemy.create_engine(sampledb.config.SQLALCHEMY_DATABASE_URI))
+    # cached values may refer to users or actions of previous tests
+    sampledb.logic.caching.clear_process_caches()
+    sampledb.models.Objects.clear_version_cache()
     sampledb_app = sampledb.create_app()
 
     @sampledb_app.route('/users/me/loginstatus')